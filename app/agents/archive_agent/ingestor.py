@@ -1,11 +1,18 @@
 """Ingestion helpers for compressed archive files."""
 from __future__ import annotations
 
+import functools
+import gzip
+import logging
 import os
+import struct
+import tarfile
 import tempfile
 import zipfile
-from typing import List, Dict, Any
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import PurePosixPath
+from typing import Any, Callable, ContextManager, Iterator, List, Optional, Tuple
 
 # Provide fallback for environments without llama-parse
 try:
@@ -15,156 +22,231 @@ except ImportError:
     LLAMA_PARSE_AVAILABLE = False
     LlamaParse = None
 
-try:
-    from langchain_community.document_loaders import TextLoader
-except ImportError:
-    from common.text_normalization import Document
+from common.text_normalization import make_document
 
-    class TextLoader:
-        def __init__(self, file_path: str, encoding: str = "utf8", **_: object) -> None:
-            self.file_path = file_path
-            self.encoding = encoding
+from ..base import BaseFileIngestor
 
-        def load(self):
-            with open(self.file_path, "r", encoding=self.encoding) as handle:
-                return [Document(page_content=handle.read(), metadata={"source": self.file_path})]
+logger = logging.getLogger(__name__)
 
-from ..base import BaseFileIngestor
+TEXT_EXTENSIONS = frozenset({
+    '.txt', '.md', '.py', '.js', '.ts', '.java', '.c', '.cpp', '.cs',
+    '.go', '.rb', '.rs', '.php', '.sql', '.html', '.css', '.json',
+    '.xml', '.yaml', '.yml', '.ini', '.cfg', '.conf', '.log'
+})
+# Formats handed to LlamaParse when it is available.
+COMPLEX_EXTENSIONS = frozenset({'.pdf', '.docx', '.pptx', '.xlsx'})
+
+
+def _int_from_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        logger.warning("Valor entero inválido en %s; se usa %s", name, default)
+        return default
+
+
+@dataclass(frozen=True)
+class ArchiveLimits:
+    """Safety limits applied before any member is decompressed."""
+
+    max_member_bytes: int = 50 * 1024 * 1024
+    max_total_bytes: int = 500 * 1024 * 1024
+    max_compression_ratio: float = 100.0
+    max_members: int = 10_000
+    workers: int = 4
+
+    @classmethod
+    def from_environment(cls) -> "ArchiveLimits":
+        defaults = cls()
+        return cls(
+            max_member_bytes=_int_from_env("ARCHIVE_MAX_MEMBER_BYTES", defaults.max_member_bytes),
+            max_total_bytes=_int_from_env("ARCHIVE_MAX_TOTAL_BYTES", defaults.max_total_bytes),
+            max_compression_ratio=float(_int_from_env("ARCHIVE_MAX_COMPRESSION_RATIO", int(defaults.max_compression_ratio))),
+            max_members=_int_from_env("ARCHIVE_MAX_MEMBERS", defaults.max_members),
+            workers=max(_int_from_env("ARCHIVE_WORKERS", min(defaults.workers, os.cpu_count() or 1)), 1),
+        )
+
+
+@dataclass(frozen=True)
+class ArchiveMember:
+    """Central-directory entry: name, uncompressed and compressed size."""
+
+    name: str
+    size: int
+    compressed_size: Optional[int] = None
+
+    @property
+    def extension(self) -> str:
+        return PurePosixPath(self.name).suffix.lower()
+
+
+class _StreamingArchiveLoader:
+    """Read eligible archive members in memory, never extracting the archive.
 
+    The member listing is inspected first: directories, unsafe paths,
+    unsupported extensions and members breaking :class:`ArchiveLimits`
+    (size, compression ratio, cumulative size) are skipped without being
+    decompressed. Eligible members are decoded by a thread pool and
+    returned in archive order.
+    """
 
-class ZipFileLoader:
-    """Custom loader for ZIP files using LlamaParse or fallback extraction."""
-    
-    def __init__(self, file_path: str, **kwargs):
+    archive_format = "archive"
+
+    def __init__(self, file_path: str, limits: Optional[ArchiveLimits] = None, **kwargs):
         self.file_path = file_path
+        self.limits = limits or ArchiveLimits.from_environment()
         self.kwargs = kwargs
-        
+
     def load(self) -> List[Any]:
-        """Load and process ZIP file contents."""
-        documents = []
-        
+        """Load and process the archive contents."""
+        documents: List[Any] = []
         try:
-            with zipfile.ZipFile(self.file_path, 'r') as zip_ref:
-                # Create temporary directory for extraction
-                with tempfile.TemporaryDirectory() as temp_dir:
-                    # Extract all files
-                    zip_ref.extractall(temp_dir)
-                    
-                    # Process each extracted file
-                    for root, dirs, files in os.walk(temp_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            relative_path = os.path.relpath(file_path, temp_dir)
-                            
-                            try:
-                                # Try to process with LlamaParse if available
-                                if LLAMA_PARSE_AVAILABLE and self._should_use_llama_parse(file):
-                                    docs = self._process_with_llama_parse(file_path, relative_path)
-                                else:
-                                    docs = self._process_with_text_loader(file_path, relative_path)
-                                
-                                documents.extend(docs)
-                                
-                            except Exception as e:
-                                # Create error document for failed files
-                                error_doc = self._create_error_document(relative_path, str(e))
-                                documents.append(error_doc)
-                                
+            with self._open() as archive:
+                members = self._list_members(archive)
+                selected, skipped = self._plan(members)
+                documents.extend(skipped)
+                documents.extend(self._process(archive, selected))
         except Exception as e:
-            # Create error document for ZIP processing failure
-            error_doc = self._create_error_document(self.file_path, f"ZIP processing failed: {str(e)}")
+            # Create error document for archive processing failure
+            error_doc = self._create_error_document(self.file_path, f"{self.archive_format.upper()} processing failed: {str(e)}")
             documents.append(error_doc)
-            
         return documents
-    
-    def _should_use_llama_parse(self, filename: str) -> bool:
-        """Determine if file should be processed with LlamaParse."""
-        # Use LlamaParse for complex document formats
-        complex_formats = {'.pdf', '.docx', '.pptx', '.xlsx'}
-        file_ext = Path(filename).suffix.lower()
-        return file_ext in complex_formats
-    
-    def _process_with_llama_parse(self, file_path: str, relative_path: str) -> List[Any]:
-        """Process file using LlamaParse."""
-        try:
-            # Initialize LlamaParse
-            parser = LlamaParse(
-                api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
-                result_type="text",
-                verbose=True
+
+    # -- format specific -------------------------------------------------
+    def _open(self) -> ContextManager[Any]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def _list_members(self, archive: Any) -> List[ArchiveMember]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def _payloads(
+        self, archive: Any, members: List[ArchiveMember]
+    ) -> Iterator[Tuple[ArchiveMember, Callable[[], bytes]]]:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    # -- shared pipeline -------------------------------------------------
+    def _plan(self, members: List[ArchiveMember]) -> Tuple[List[ArchiveMember], List[Any]]:
+        limits = self.limits
+        if len(members) > limits.max_members:
+            raise ValueError(f"El archivo contiene {len(members)} entradas (máximo {limits.max_members})")
+
+        selected: List[ArchiveMember] = []
+        skipped: List[Any] = []
+        total = 0
+        for member in members:
+            path = PurePosixPath(member.name)
+            if member.name.startswith("/") or ".." in path.parts:
+                skipped.append(self._skipped_document(member, "unsafe_path"))
+                continue
+            extension = member.extension
+            if extension not in TEXT_EXTENSIONS and not (LLAMA_PARSE_AVAILABLE and extension in COMPLEX_EXTENSIONS):
+                skipped.append(self._skipped_document(member, "binary"))
+                continue
+            if member.size > limits.max_member_bytes:
+                skipped.append(self._skipped_document(member, "member_too_large"))
+                continue
+            if member.compressed_size is not None and member.size > limits.max_compression_ratio * max(member.compressed_size, 1):
+                skipped.append(self._skipped_document(member, "compression_ratio"))
+                continue
+            if total + member.size > limits.max_total_bytes:
+                skipped.append(self._skipped_document(member, "total_size_limit"))
+                continue
+            total += member.size
+            selected.append(member)
+
+        if skipped:
+            logger.info(
+                "%s: %s entradas omitidas sin descomprimir, %s seleccionadas (%s bytes)",
+                os.path.basename(self.file_path),
+                len(skipped),
+                len(selected),
+                total,
             )
-            
-            # Parse the document
-            documents = parser.load_data(file_path)
-            
-            # Convert to expected format
-            result_docs = []
-            for i, doc in enumerate(documents):
-                from common.text_normalization import Document
-                result_doc = Document(
-                    page_content=doc.text,
-                    metadata={
-                        "source": file_path,
-                        "archive_path": relative_path,
-                        "page": i,
-                        "parser": "llama_parse"
-                    }
-                )
-                result_docs.append(result_doc)
-                
-            return result_docs
-            
-        except Exception as e:
-            # Fallback to text loader
-            return self._process_with_text_loader(file_path, relative_path)
-    
-    def _process_with_text_loader(self, file_path: str, relative_path: str) -> List[Any]:
-        """Process file using standard text loader."""
+        return selected, skipped
+
+    def _process(self, archive: Any, members: List[ArchiveMember]) -> List[Any]:
+        if not members:
+            return []
+        with ThreadPoolExecutor(max_workers=self.limits.workers, thread_name_prefix="archive") as executor:
+            futures = [
+                executor.submit(self._member_documents, member, read)
+                for member, read in self._payloads(archive, members)
+            ]
+            documents: List[Any] = []
+            for future in futures:
+                documents.extend(future.result())
+        return documents
+
+    def _member_documents(self, member: ArchiveMember, read: Callable[[], bytes]) -> List[Any]:
         try:
-            # Determine if file is text-based
-            if self._is_text_file(file_path):
-                loader = TextLoader(file_path, encoding="utf8")
-                docs = loader.load()
-                
-                # Update metadata
-                for doc in docs:
-                    doc.metadata.update({
-                        "archive_path": relative_path,
-                        "parser": "text_loader"
-                    })
-                
-                return docs
-            else:
-                # Skip binary files or create placeholder
-                from common.text_normalization import Document
-                return [Document(
-                    page_content=f"Binary file: {relative_path}",
-                    metadata={
-                        "source": file_path,
-                        "archive_path": relative_path,
-                        "file_type": "binary",
-                        "parser": "skipped"
-                    }
-                )]
-                
+            data = read()
+            if len(data) > self.limits.max_member_bytes:
+                return [self._skipped_document(member, "member_too_large")]
+            if member.extension in COMPLEX_EXTENSIONS:
+                return self._process_with_llama_parse(data, member.name)
+            return [self._text_document(data, member.name)]
         except Exception as e:
-            return [self._create_error_document(relative_path, str(e))]
-    
-    def _is_text_file(self, file_path: str) -> bool:
-        """Check if file is text-based."""
-        text_extensions = {
-            '.txt', '.md', '.py', '.js', '.ts', '.java', '.c', '.cpp', '.cs',
-            '.go', '.rb', '.rs', '.php', '.sql', '.html', '.css', '.json',
-            '.xml', '.yaml', '.yml', '.ini', '.cfg', '.conf', '.log'
-        }
-        
-        file_ext = Path(file_path).suffix.lower()
-        return file_ext in text_extensions
-    
+            return [self._create_error_document(member.name, str(e))]
+
+    def _text_document(self, data: bytes, relative_path: str) -> Any:
+        try:
+            text = data.decode("utf-8")
+        except UnicodeDecodeError:
+            text = data.decode("latin-1", errors="ignore")
+        return make_document(
+            page_content=text,
+            metadata={
+                "source": self.file_path,
+                "archive_path": relative_path,
+                "parser": "archive_stream",
+            },
+        )
+
+    def _process_with_llama_parse(self, data: bytes, relative_path: str) -> List[Any]:
+        """Process a complex member with LlamaParse through a private temp file."""
+        suffix = PurePosixPath(relative_path).suffix
+        with tempfile.NamedTemporaryFile(suffix=suffix) as handle:
+            handle.write(data)
+            handle.flush()
+            try:
+                parser = LlamaParse(
+                    api_key=os.getenv("LLAMA_CLOUD_API_KEY"),
+                    result_type="text",
+                    verbose=True
+                )
+                parsed = parser.load_data(handle.name)
+            except Exception:
+                # Fallback to the raw text
+                return [self._text_document(data, relative_path)]
+
+        return [
+            make_document(
+                page_content=doc.text,
+                metadata={
+                    "source": self.file_path,
+                    "archive_path": relative_path,
+                    "page": i,
+                    "parser": "llama_parse"
+                }
+            )
+            for i, doc in enumerate(parsed)
+        ]
+
+    def _skipped_document(self, member: ArchiveMember, reason: str) -> Any:
+        return make_document(
+            page_content=f"Binary file: {member.name}" if reason == "binary" else f"Skipped file: {member.name} ({reason})",
+            metadata={
+                "source": self.file_path,
+                "archive_path": member.name,
+                "file_type": "binary" if reason == "binary" else "skipped",
+                "skip_reason": reason,
+                "parser": "skipped"
+            }
+        )
+
     def _create_error_document(self, path: str, error: str) -> Any:
         """Create error document for failed processing."""
-        from common.text_normalization import Document
-        return Document(
+        return make_document(
             page_content=f"Error processing {path}: {error}",
             metadata={
                 "source": path,
@@ -174,8 +256,107 @@ class ZipFileLoader:
         )
 
 
+class ZipFileLoader(_StreamingArchiveLoader):
+    """ZIP loader reading members straight from the central directory."""
+
+    archive_format = "zip"
+
+    def _open(self) -> ContextManager[Any]:
+        return zipfile.ZipFile(self.file_path, 'r')
+
+    def _list_members(self, archive: zipfile.ZipFile) -> List[ArchiveMember]:
+        return [
+            ArchiveMember(info.filename, info.file_size, info.compress_size)
+            for info in archive.infolist()
+            if not info.is_dir()
+        ]
+
+    def _payloads(self, archive: zipfile.ZipFile, members: List[ArchiveMember]):
+        # ZipFile serialises seeks on the shared handle, so workers can
+        # decompress different members concurrently.
+        for member in members:
+            yield member, functools.partial(self._read_member, archive, member)
+
+    def _read_member(self, archive: zipfile.ZipFile, member: ArchiveMember) -> bytes:
+        with archive.open(member.name) as handle:
+            return handle.read(self.limits.max_member_bytes + 1)
+
+
+class TarFileLoader(_StreamingArchiveLoader):
+    """``.tar``/``.tar.gz``/``.tgz`` loader streaming members in archive order."""
+
+    archive_format = "tar"
+
+    def _open(self) -> ContextManager[Any]:
+        return tarfile.open(self.file_path, 'r:*')
+
+    def _list_members(self, archive: tarfile.TarFile) -> List[ArchiveMember]:
+        members = [ArchiveMember(info.name, info.size) for info in archive.getmembers() if info.isfile()]
+        # Compressed tarballs have no per-member sizes; check the whole archive instead.
+        compressed = os.path.getsize(self.file_path)
+        declared = sum(member.size for member in members)
+        if declared > self.limits.max_compression_ratio * max(compressed, 1):
+            raise ValueError(
+                f"Ratio de descompresión sospechoso ({declared} bytes declarados para {compressed} comprimidos)"
+            )
+        return members
+
+    def _payloads(self, archive: tarfile.TarFile, members: List[ArchiveMember]):
+        # Compressed tar streams are read sequentially; only decoding is parallel.
+        wanted = {member.name: member for member in members}
+        for info in archive:
+            member = wanted.pop(info.name, None)
+            if member is None:
+                continue
+            handle = archive.extractfile(info)
+            data = handle.read(self.limits.max_member_bytes + 1) if handle is not None else b""
+            yield member, (lambda payload=data: payload)
+            if not wanted:
+                break
+
+
+class GzipFileLoader(TarFileLoader):
+    """``.gz`` loader: tarballs are read as tar, anything else as one gzip member.
+
+    ``os.path.splitext`` reports ``.tar.gz`` uploads as ``.gz``, so the
+    content is sniffed instead of trusting the suffix; a plain
+    ``notes.txt.gz`` becomes a single ``notes.txt`` member.
+    """
+
+    def _open(self) -> ContextManager[Any]:
+        try:
+            return tarfile.open(self.file_path, 'r:gz')
+        except tarfile.ReadError:
+            return gzip.open(self.file_path, 'rb')
+
+    def _list_members(self, archive: Any) -> List[ArchiveMember]:
+        if isinstance(archive, tarfile.TarFile):
+            return super()._list_members(archive)
+        compressed = os.path.getsize(self.file_path)
+        # The gzip trailer stores the uncompressed size (mod 2**32), so the
+        # size and ratio limits apply before anything is decompressed.
+        with open(self.file_path, 'rb') as handle:
+            handle.seek(max(compressed - 4, 0))
+            trailer = handle.read(4)
+        size = struct.unpack('<I', trailer)[0] if len(trailer) == 4 else 0
+        name = os.path.basename(self.file_path)
+        if name.lower().endswith('.gz'):
+            name = name[:-3]
+        return [ArchiveMember(name, size, compressed)]
+
+    def _payloads(self, archive: Any, members: List[ArchiveMember]):
+        if isinstance(archive, tarfile.TarFile):
+            yield from super()._payloads(archive, members)
+            return
+        for member in members:
+            yield member, functools.partial(archive.read, self.limits.max_member_bytes + 1)
+
+
 ARCHIVE_LOADERS = {
     ".zip": (ZipFileLoader, {}),
+    ".tar": (TarFileLoader, {}),
+    ".tgz": (TarFileLoader, {}),
+    ".gz": (GzipFileLoader, {}),
 }
 
 ARCHIVE_COLLECTION = "archive_documents"
@@ -194,7 +375,10 @@ ArchiveIngestor = create_archive_ingestor()
 
 __all__ = [
     "ARCHIVE_COLLECTION",
-    "ArchiveIngestor", 
+    "ArchiveIngestor",
+    "ArchiveLimits",
+    "ArchiveMember",
+    "TarFileLoader",
     "ZipFileLoader",
     "create_archive_ingestor",
 ]
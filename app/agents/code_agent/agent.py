@@ -174,9 +174,10 @@ class CodeAgent(BaseAgent):
 
     @staticmethod
     def _default_collection_resolver(collection_name: str) -> Any:
+        from common.chroma_utils import get_or_create_collection
         from common.constants import CHROMA_SETTINGS
 
-        return CHROMA_SETTINGS.get_or_create_collection(collection_name)
+        return get_or_create_collection(CHROMA_SETTINGS, collection_name)
 
 
 __all__ = ["CodeAgent", "CodeAgentConfig"]
@@ -17,6 +17,7 @@ if app_dir not in sys.path:
 from agents.base import AgentResponse, AgentTask, BaseAgent
 from common import langchain_module
 from common.langchain_module import LegalComplianceGuardError
+from common.llm_scheduler import LLMOverloadedError
 from common.observability import record_agent_invocation
 
 QueryFunction = Callable[[str, Optional[str], Optional[str], Optional[Mapping[str, Any]]], str]
@@ -65,6 +66,19 @@ class DocumentAgent(BaseAgent):
             )
             message = exc.render_message(language_label or "es")
             return AgentResponse(success=False, error=message)
+        except LLMOverloadedError as exc:
+            record_agent_invocation(
+                self.name,
+                task.task_type,
+                "overloaded",
+                duration_seconds=time.perf_counter() - start_time,
+                language=language_label,
+            )
+            return AgentResponse(
+                success=False,
+                error="llm_overloaded",
+                data={"retry_after": exc.retry_after},
+            )
         except Exception as exc:  # pragma: no cover - defensive branch
             record_agent_invocation(
                 self.name,
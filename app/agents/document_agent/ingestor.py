@@ -7,6 +7,7 @@ from typing import Dict, List, Tuple
 from common.text_normalization import Document
 
 from ..base import BaseFileIngestor
+from .pdf_loader import ParallelPyMuPDFLoader
 
 
 PLAIN_TEXT_FALLBACK = False
@@ -23,7 +24,6 @@ def _build_loader_mapping() -> Tuple[Dict[str, Tuple[type, Dict[str, object]]],
         from langchain_community.document_loaders import (
             CSVLoader,
             EverNoteLoader,
-            PyMuPDFLoader,
             TextLoader,
             UnstructuredEmailLoader,
             UnstructuredEPubLoader,
@@ -103,7 +103,7 @@ def _build_loader_mapping() -> Tuple[Dict[str, Tuple[type, Dict[str, object]]],
         ".html": (UnstructuredHTMLLoader, {}),
         ".md": (UnstructuredMarkdownLoader, {}),
         ".odt": (UnstructuredODTLoader, {}),
-        ".pdf": (PyMuPDFLoader, {}),
+        ".pdf": (ParallelPyMuPDFLoader, {}),
         ".ppt": (UnstructuredPowerPointLoader, {}),
         ".pptx": (UnstructuredPowerPointLoader, {}),
         ".txt": (TextLoader, {"encoding": "utf8"}),
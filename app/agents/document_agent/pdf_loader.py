@@ -0,0 +1,156 @@
+"""PDF loader that extracts page ranges in parallel worker processes.
+
+``PyMuPDFLoader`` parses a document page after page on one core, which
+takes minutes for 500+ page manuals. :class:`ParallelPyMuPDFLoader` splits
+the page range into slices of ``PDF_PAGES_PER_TASK`` pages, extracts them
+in a shared process pool (``PDF_PARALLEL_WORKERS``, defaults to the CPU
+count) and yields one ``Document`` per page in page order, with the same
+metadata ``PyMuPDFLoader`` produces. Documents shorter than
+``PDF_PARALLEL_MIN_PAGES`` are read in-process, where the pool would only
+add overhead.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from common.text_normalization import Document, make_document
+
+logger = logging.getLogger(__name__)
+
+
+_WORKERS_ENV_VAR = "PDF_PARALLEL_WORKERS"
+_PAGES_PER_TASK_ENV_VAR = "PDF_PAGES_PER_TASK"
+_MIN_PAGES_ENV_VAR = "PDF_PARALLEL_MIN_PAGES"
+
+_DEFAULT_PAGES_PER_TASK = 16
+_DEFAULT_MIN_PAGES = 64
+
+
+def _int_from_env(name: str, default: int) -> int:
+    try:
+        return max(int(os.getenv(name, default)), 1)
+    except (TypeError, ValueError):
+        logger.warning("Valor entero inválido en %s; se usa %s", name, default)
+        return default
+
+
+def page_ranges(total_pages: int, pages_per_task: int) -> List[Tuple[int, int]]:
+    """Split ``range(total_pages)`` into ``(start, stop)`` slices of *pages_per_task*."""
+
+    step = max(int(pages_per_task), 1)
+    return [(start, min(start + step, total_pages)) for start in range(0, max(total_pages, 0), step)]
+
+
+def _document_metadata(file_path: str, document: Any) -> Dict[str, Any]:
+    """Metadata shared by every page, matching ``PyMuPDFLoader``."""
+
+    metadata: Dict[str, Any] = {"source": file_path, "file_path": file_path, "total_pages": len(document)}
+    for key, value in (document.metadata or {}).items():
+        if isinstance(value, (str, int)):
+            metadata[key] = value
+    return metadata
+
+
+def _extract_range(file_path: str, start: int, stop: int, text_kwargs: Dict[str, Any]) -> List[str]:
+    """Return the text of pages ``start..stop-1``; runs in a worker process."""
+
+    import fitz
+
+    with fitz.open(file_path) as document:
+        return [document[number].get_text(**text_kwargs) for number in range(start, stop)]
+
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                workers = _int_from_env(_WORKERS_ENV_VAR, os.cpu_count() or 1)
+                _POOL = ProcessPoolExecutor(max_workers=workers)
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    """Stop the shared worker processes (they are restarted on demand)."""
+
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True, cancel_futures=True)
+            _POOL = None
+
+
+class ParallelPyMuPDFLoader:
+    """Drop-in replacement for ``PyMuPDFLoader`` with page-range parallelism."""
+
+    def __init__(
+        self,
+        file_path: str,
+        *,
+        pages_per_task: Optional[int] = None,
+        min_parallel_pages: Optional[int] = None,
+        **text_kwargs: Any,
+    ) -> None:
+        self.file_path = str(file_path)
+        self.pages_per_task = pages_per_task or _int_from_env(_PAGES_PER_TASK_ENV_VAR, _DEFAULT_PAGES_PER_TASK)
+        self.min_parallel_pages = min_parallel_pages or _int_from_env(_MIN_PAGES_ENV_VAR, _DEFAULT_MIN_PAGES)
+        self.text_kwargs = text_kwargs
+
+    def load(self) -> List[Document]:
+        return list(self.lazy_load())
+
+    def lazy_load(self) -> Iterator[Document]:
+        import fitz
+
+        with fitz.open(self.file_path) as document:
+            total_pages = len(document)
+            base_metadata = _document_metadata(self.file_path, document)
+            if total_pages < self.min_parallel_pages:
+                texts = (document[number].get_text(**self.text_kwargs) for number in range(total_pages))
+                for number, text in enumerate(texts):
+                    yield self._page(text, number, base_metadata)
+                return
+
+        for number, text in self._parallel_pages(total_pages):
+            yield self._page(text, number, base_metadata)
+
+    def _parallel_pages(self, total_pages: int) -> Iterator[Tuple[int, str]]:
+        ranges = page_ranges(total_pages, self.pages_per_task)
+        try:
+            pool = _get_pool()
+            futures: List[Future] = [
+                pool.submit(_extract_range, self.file_path, start, stop, self.text_kwargs) for start, stop in ranges
+            ]
+        except Exception as exc:  # pragma: no cover - e.g. sandboxes without process support
+            logger.warning("No se pudo usar el pool de procesos para PDF (%s); extracción secuencial", exc)
+            futures = []
+
+        try:
+            for (start, stop), future in zip(ranges, futures):
+                # Slices are consumed in order; later ones keep running meanwhile.
+                for offset, text in enumerate(future.result()):
+                    yield start + offset, text
+            if not futures:
+                for start, stop in ranges:
+                    for offset, text in enumerate(_extract_range(self.file_path, start, stop, self.text_kwargs)):
+                        yield start + offset, text
+        finally:
+            for future in futures:
+                future.cancel()
+
+    @staticmethod
+    def _page(text: str, number: int, base_metadata: Dict[str, Any]) -> Document:
+        metadata = dict(base_metadata)
+        metadata["page"] = number
+        return make_document(text, metadata)
+
+
+__all__ = ["ParallelPyMuPDFLoader", "page_ranges", "shutdown_pool"]
@@ -1,11 +1,8 @@
 """Ingestion helpers for multimedia transcripts, captions, and audio/video files."""
 from __future__ import annotations
 
-import os
-import tempfile
 import logging
-from pathlib import Path
-from typing import List, Any, Optional
+from typing import Any, Dict, List, Optional
 
 # Whisper for audio transcription
 try:
@@ -15,15 +12,6 @@ except ImportError:
     WHISPER_AVAILABLE = False
     whisper = None
 
-# MoviePy for video processing
-try:
-    from moviepy.editor import VideoFileClip, AudioFileClip
-    MOVIEPY_AVAILABLE = True
-except ImportError:
-    MOVIEPY_AVAILABLE = False
-    VideoFileClip = None
-    AudioFileClip = None
-
 try:  # pragma: no cover - use real loader when available
     from langchain_community.document_loaders import TextLoader
 except Exception:  # pragma: no cover - fallback loader for tests
@@ -39,10 +27,55 @@ except Exception:  # pragma: no cover - fallback loader for tests
                 return [Document(page_content=handle.read(), metadata={"source": self.file_path})]
 
 from ..base import BaseFileIngestor
+from .transcription import (
+    AudioDecodeError,
+    TranscriptionResult,
+    ffmpeg_available,
+    get_transcription_engine,
+    probe_video,
+)
 
 logger = logging.getLogger(__name__)
 
 
+def _transcription_documents(
+    file_path: str,
+    media_type: str,
+    model_name: str,
+    result: TranscriptionResult,
+    extra_metadata: Optional[Dict[str, Any]] = None,
+) -> List[Any]:
+    """Build the main transcript document plus one document per segment."""
+    from common.text_normalization import make_document
+
+    main_metadata = {
+        "source": file_path,
+        "media_type": media_type,
+        "transcription_model": model_name,
+        "language": result.language,
+        "duration": result.duration,
+        "segments_count": len(result.segments),
+    }
+    main_metadata.update(extra_metadata or {})
+    documents = [make_document(result.text, main_metadata)]
+
+    # Segment ids and timestamps are global even when chunks were transcribed in parallel
+    for segment in result.segments:
+        documents.append(make_document(
+            segment.get("text", ""),
+            {
+                "source": file_path,
+                "media_type": f"{media_type}_segment",
+                "segment_id": segment["id"],
+                "start_time": segment.get("start", 0),
+                "end_time": segment.get("end", 0),
+                "transcription_model": model_name,
+                "language": result.language,
+            },
+        ))
+    return documents
+
+
 class AudioTranscriptionLoader:
     """Custom loader for audio files using Whisper transcription."""
 
@@ -59,46 +92,9 @@ class AudioTranscriptionLoader:
 
             logger.info(f"Transcribiendo archivo de audio: {self.file_path}")
 
-            # Load Whisper model
-            model = whisper.load_model(self.model_name)
-
-            # Transcribe audio
-            result = model.transcribe(self.file_path)
-
-            # Create document with transcription
-            from common.text_normalization import Document
-
-            # Main transcription document
-            main_doc = Document(
-                page_content=result["text"],
-                metadata={
-                    "source": self.file_path,
-                    "media_type": "audio",
-                    "transcription_model": self.model_name,
-                    "language": result.get("language", "unknown"),
-                    "duration": self._get_audio_duration(),
-                    "segments_count": len(result.get("segments", []))
-                }
-            )
-
-            documents = [main_doc]
-
-            # Add segment-level documents for detailed analysis
-            if "segments" in result:
-                for i, segment in enumerate(result["segments"]):
-                    segment_doc = Document(
-                        page_content=segment["text"],
-                        metadata={
-                            "source": self.file_path,
-                            "media_type": "audio_segment",
-                            "segment_id": i,
-                            "start_time": segment.get("start", 0),
-                            "end_time": segment.get("end", 0),
-                            "transcription_model": self.model_name,
-                            "language": result.get("language", "unknown")
-                        }
-                    )
-                    documents.append(segment_doc)
+            # Cached model; long recordings are split and transcribed in parallel
+            result = get_transcription_engine().transcribe_file(self.file_path, self.model_name)
+            documents = _transcription_documents(self.file_path, "audio", self.model_name, result)
 
             logger.info(f"Transcripción completada: {len(documents)} documentos creados")
             return documents
@@ -107,22 +103,12 @@ class AudioTranscriptionLoader:
             logger.error(f"Error transcribiendo audio {self.file_path}: {e}")
             return self._create_error_document(f"Error en transcripción: {str(e)}")
 
-    def _get_audio_duration(self) -> Optional[float]:
-        """Get audio duration using moviepy if available."""
-        try:
-            if MOVIEPY_AVAILABLE:
-                with AudioFileClip(self.file_path) as audio:
-                    return audio.duration
-        except Exception:
-            pass
-        return None
-
     def _create_error_document(self, error: str) -> List[Any]:
         """Create error document for failed transcription."""
-        from common.text_normalization import Document
-        return [Document(
-            page_content=f"Error procesando archivo de audio: {error}",
-            metadata={
+        from common.text_normalization import make_document
+        return [make_document(
+            f"Error procesando archivo de audio: {error}",
+            {
                 "source": self.file_path,
                 "media_type": "audio",
                 "error": error,
@@ -142,78 +128,31 @@ class VideoTranscriptionLoader:
     def load(self) -> List[Any]:
         """Load and transcribe video file."""
         try:
-            if not WHISPER_AVAILABLE or not MOVIEPY_AVAILABLE:
+            if not WHISPER_AVAILABLE or not ffmpeg_available():
                 missing = []
                 if not WHISPER_AVAILABLE:
                     missing.append("openai-whisper")
-                if not MOVIEPY_AVAILABLE:
-                    missing.append("moviepy")
+                if not ffmpeg_available():
+                    missing.append("ffmpeg")
                 return self._create_error_document(f"Dependencias faltantes: {', '.join(missing)}")
 
             logger.info(f"Procesando archivo de video: {self.file_path}")
 
-            # Extract audio from video
-            with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-                temp_audio_path = temp_audio.name
-
+            # The soundtrack is piped from ffmpeg into the transcriber window by
+            # window; nothing is written to disk and memory stays bounded.
             try:
-                # Extract audio using moviepy
-                with VideoFileClip(self.file_path) as video:
-                    audio = video.audio
-                    if audio is None:
-                        return self._create_error_document("El video no contiene pista de audio")
-
-                    audio.write_audiofile(temp_audio_path, verbose=False, logger=None)
-                    video_duration = video.duration
-                    video_fps = video.fps
-
-                # Load Whisper model and transcribe
-                model = whisper.load_model(self.model_name)
-                result = model.transcribe(temp_audio_path)
-
-                # Create documents
-                from common.text_normalization import Document
-
-                # Main transcription document
-                main_doc = Document(
-                    page_content=result["text"],
-                    metadata={
-                        "source": self.file_path,
-                        "media_type": "video",
-                        "transcription_model": self.model_name,
-                        "language": result.get("language", "unknown"),
-                        "duration": video_duration,
-                        "fps": video_fps,
-                        "segments_count": len(result.get("segments", []))
-                    }
-                )
-
-                documents = [main_doc]
-
-                # Add segment-level documents
-                if "segments" in result:
-                    for i, segment in enumerate(result["segments"]):
-                        segment_doc = Document(
-                            page_content=segment["text"],
-                            metadata={
-                                "source": self.file_path,
-                                "media_type": "video_segment",
-                                "segment_id": i,
-                                "start_time": segment.get("start", 0),
-                                "end_time": segment.get("end", 0),
-                                "transcription_model": self.model_name,
-                                "language": result.get("language", "unknown")
-                            }
-                        )
-                        documents.append(segment_doc)
-
-                logger.info(f"Transcripción de video completada: {len(documents)} documentos creados")
-                return documents
-
-            finally:
-                # Clean up temporary audio file
-                if os.path.exists(temp_audio_path):
-                    os.unlink(temp_audio_path)
+                result = get_transcription_engine().transcribe_stream(self.file_path, self.model_name)
+            except AudioDecodeError as exc:
+                logger.error(f"ffmpeg no pudo extraer el audio de {self.file_path}: {exc}")
+                return self._create_error_document("El video no contiene pista de audio decodificable")
+            if not result.duration:
+                return self._create_error_document("El video no contiene pista de audio")
+
+            video_info = probe_video(self.file_path)
+            documents = _transcription_documents(self.file_path, "video", self.model_name, result, video_info)
+
+            logger.info(f"Transcripción de video completada: {len(documents)} documentos creados")
+            return documents
 
         except Exception as e:
             logger.error(f"Error procesando video {self.file_path}: {e}")
@@ -221,10 +160,10 @@ class VideoTranscriptionLoader:
 
     def _create_error_document(self, error: str) -> List[Any]:
         """Create error document for failed processing."""
-        from common.text_normalization import Document
-        return [Document(
-            page_content=f"Error procesando archivo de video: {error}",
-            metadata={
+        from common.text_normalization import make_document
+        return [make_document(
+            f"Error procesando archivo de video: {error}",
+            {
                 "source": self.file_path,
                 "media_type": "video",
                 "error": error,
@@ -0,0 +1,441 @@
+"""Whisper transcription with cached models and parallel chunked decoding.
+
+Loading a Whisper model takes seconds and hundreds of megabytes, so
+:func:`get_whisper_model` keeps every loaded model in a process-wide cache.
+Long recordings are split at the quietest frame near every
+``WHISPER_SEGMENT_SECONDS`` mark (:func:`silence_boundaries`) and the
+segments are transcribed in parallel by ``WHISPER_WORKERS`` CPU worker
+processes, each holding its own cached model. Segment timestamps are
+shifted back to the position of their chunk, so the stitched result looks
+like a single ``model.transcribe`` call.
+
+Video soundtracks are decoded by an ``ffmpeg`` pipe into 16 kHz mono PCM
+(:func:`ffmpeg_pcm_stream`) and cut into windows on the fly
+(:func:`stream_chunks`), so transcription overlaps with decoding and peak
+memory is bounded by the window size rather than the video length.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+SAMPLE_RATE = 16_000
+
+_WORKERS_ENV_VAR = "WHISPER_WORKERS"
+_SEGMENT_SECONDS_ENV_VAR = "WHISPER_SEGMENT_SECONDS"
+_MIN_PARALLEL_SECONDS_ENV_VAR = "WHISPER_PARALLEL_MIN_SECONDS"
+
+_DEFAULT_SEGMENT_SECONDS = 300.0
+
+
+def _load_whisper_model(model_name: str) -> Any:
+    import whisper
+
+    return whisper.load_model(model_name)
+
+
+# Swappable so tests and benchmarks can run without Whisper installed.
+_MODEL_LOADER: Callable[[str], Any] = _load_whisper_model
+_MODELS: Dict[str, Any] = {}
+_MODELS_LOCK = threading.Lock()
+
+
+def get_whisper_model(model_name: str) -> Any:
+    """Return the Whisper model *model_name*, loading it once per process."""
+
+    model = _MODELS.get(model_name)
+    if model is None:
+        with _MODELS_LOCK:
+            model = _MODELS.get(model_name)
+            if model is None:
+                logger.info("Cargando modelo Whisper '%s'", model_name)
+                model = _MODEL_LOADER(model_name)
+                _MODELS[model_name] = model
+    return model
+
+
+def clear_model_cache() -> None:
+    with _MODELS_LOCK:
+        _MODELS.clear()
+
+
+def silence_boundaries(
+    audio: np.ndarray,
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    target_seconds: float = _DEFAULT_SEGMENT_SECONDS,
+    search_seconds: float = 15.0,
+    frame_seconds: float = 0.03,
+) -> List[Tuple[int, int]]:
+    """Split *audio* into ``(start, end)`` sample ranges of about *target_seconds*.
+
+    Each cut is moved to the lowest-energy frame within *search_seconds*
+    of the ideal position, so words are not split between chunks.
+    """
+
+    total = len(audio)
+    target = max(int(target_seconds * sample_rate), 1)
+    if total <= target:
+        return [(0, total)] if total else []
+
+    search = int(search_seconds * sample_rate)
+    frame = max(int(frame_seconds * sample_rate), 1)
+    cuts = [0]
+    while total - cuts[-1] > target:
+        ideal = cuts[-1] + target
+        low = max(cuts[-1] + target // 2, ideal - search)
+        high = min(total, ideal + search)
+        window = np.asarray(audio[low:high], dtype=np.float32)
+        frames = len(window) // frame
+        if frames == 0:
+            cut = ideal
+        else:
+            energy = np.square(window[: frames * frame].reshape(frames, frame)).mean(axis=1)
+            cut = low + int(np.argmin(energy)) * frame + frame // 2
+        cuts.append(min(cut, total))
+    cuts.append(total)
+    return [(start, end) for start, end in zip(cuts, cuts[1:]) if end > start]
+
+
+class AudioDecodeError(RuntimeError):
+    """Raised when ``ffmpeg`` cannot decode an audio stream from a file."""
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+def ffmpeg_pcm_stream(
+    file_path: str, *, sample_rate: int = SAMPLE_RATE, block_seconds: float = 5.0
+) -> Iterator[np.ndarray]:
+    """Yield the first audio track of *file_path* as float32 mono blocks."""
+
+    command = [
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-threads", "0",
+        "-i", file_path,
+        "-vn", "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate),
+        "-",
+    ]
+    block_bytes = max(int(block_seconds * sample_rate), 1) * 2
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    # stderr is drained concurrently: a chatty ffmpeg would otherwise fill the
+    # pipe and block while we wait on stdout.
+    stderr_tail: Deque[bytes] = deque(maxlen=64)
+    assert process.stderr is not None
+    drain = threading.Thread(
+        target=lambda: stderr_tail.extend(iter(process.stderr.readline, b"")),
+        name="ffmpeg-stderr",
+        daemon=True,
+    )
+    drain.start()
+    try:
+        assert process.stdout is not None
+        pending = b""
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % 2
+            pending = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.int16).astype(np.float32) / 32768.0
+        returncode = process.wait()
+        drain.join()
+        stderr = b"".join(stderr_tail).decode("utf-8", "replace")
+        if returncode != 0:
+            raise AudioDecodeError(stderr.strip()[-500:] or f"ffmpeg terminó con código {process.returncode}")
+    finally:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        drain.join(timeout=5)
+
+
+def probe_video(file_path: str) -> Dict[str, Any]:
+    """Return ``duration`` and ``fps`` of *file_path* via ``ffprobe`` (best effort)."""
+
+    command = [
+        "ffprobe", "-v", "error", "-select_streams", "v:0",
+        "-show_entries", "stream=avg_frame_rate:format=duration", "-of", "json", file_path,
+    ]
+    try:
+        output = subprocess.run(command, capture_output=True, check=True, timeout=30).stdout
+        info = json.loads(output or b"{}")
+    except Exception:
+        return {}
+    probed: Dict[str, Any] = {}
+    try:
+        probed["duration"] = float(info["format"]["duration"])
+    except (KeyError, TypeError, ValueError):
+        pass
+    try:
+        numerator, _, denominator = info["streams"][0]["avg_frame_rate"].partition("/")
+        probed["fps"] = float(numerator) / float(denominator or 1)
+    except (KeyError, IndexError, TypeError, ValueError, ZeroDivisionError):
+        pass
+    return probed
+
+
+def stream_chunks(
+    blocks: Iterable[np.ndarray],
+    *,
+    sample_rate: int = SAMPLE_RATE,
+    target_seconds: float = _DEFAULT_SEGMENT_SECONDS,
+    search_seconds: float = 15.0,
+) -> Iterator[Tuple[float, np.ndarray]]:
+    """Cut a stream of sample blocks into ``(offset_seconds, samples)`` windows.
+
+    Cuts use the same quiet-frame search as :func:`silence_boundaries`; at
+    most one window plus the search margin is buffered at a time.
+    """
+
+    threshold = int((target_seconds + search_seconds) * sample_rate)
+    buffered: List[np.ndarray] = []
+    buffered_samples = 0
+    emitted = 0
+    for block in blocks:
+        buffered.append(block)
+        buffered_samples += len(block)
+        if buffered_samples < threshold:
+            continue
+        audio = np.concatenate(buffered)
+        cut = silence_boundaries(
+            audio, sample_rate=sample_rate, target_seconds=target_seconds, search_seconds=search_seconds
+        )[0][1]
+        yield emitted / sample_rate, audio[:cut]
+        emitted += cut
+        buffered = [audio[cut:]]
+        buffered_samples = len(audio) - cut
+    if buffered_samples:
+        yield emitted / sample_rate, np.concatenate(buffered)
+
+
+@dataclass
+class TranscriptionResult:
+    """Stitched transcription in the shape of ``whisper.transcribe`` output."""
+
+    text: str
+    language: str
+    segments: List[Dict[str, Any]] = field(default_factory=list)
+    duration: Optional[float] = None
+
+
+def _transcribe_chunk(
+    model_name: str, audio: np.ndarray, offset_seconds: float, options: Dict[str, Any]
+) -> Dict[str, Any]:
+    """Transcribe one chunk with the cached model; runs in a worker process."""
+
+    result = get_whisper_model(model_name).transcribe(audio, **options)
+    segments = []
+    for segment in result.get("segments", []) or []:
+        shifted = dict(segment)
+        shifted["start"] = float(segment.get("start", 0.0)) + offset_seconds
+        shifted["end"] = float(segment.get("end", 0.0)) + offset_seconds
+        # Token ids and probabilities are chunk-local and bulky.
+        shifted.pop("tokens", None)
+        segments.append(shifted)
+    return {"text": result.get("text", ""), "language": result.get("language"), "segments": segments}
+
+
+def _worker_initializer(torch_threads: int) -> None:
+    try:
+        import torch
+
+        torch.set_num_threads(torch_threads)
+    except Exception:  # pragma: no cover - torch is optional in tests
+        pass
+
+
+def _cuda_available() -> bool:
+    try:
+        import torch
+
+        return bool(torch.cuda.is_available())
+    except Exception:
+        return False
+
+
+def _stitch(parts: List[Dict[str, Any]], duration: Optional[float]) -> TranscriptionResult:
+    segments: List[Dict[str, Any]] = []
+    for part in parts:
+        for segment in part["segments"]:
+            segment["id"] = len(segments)
+            segments.append(segment)
+    languages = Counter(part["language"] for part in parts if part.get("language"))
+    text = " ".join(part["text"].strip() for part in parts if part["text"].strip())
+    return TranscriptionResult(
+        text=text,
+        language=languages.most_common(1)[0][0] if languages else "unknown",
+        segments=segments,
+        duration=duration,
+    )
+
+
+class TranscriptionEngine:
+    """Transcribe audio with cached Whisper models, chunking long inputs."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        segment_seconds: float = _DEFAULT_SEGMENT_SECONDS,
+        min_parallel_seconds: Optional[float] = None,
+    ) -> None:
+        self.workers = max(int(workers), 1)
+        self.segment_seconds = float(segment_seconds)
+        self.min_parallel_seconds = (
+            float(min_parallel_seconds) if min_parallel_seconds is not None else 2 * self.segment_seconds
+        )
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "TranscriptionEngine":
+        # A GPU decodes faster than CPU processes would, and cannot be shared
+        # between them, so parallel chunks are a CPU-only default.
+        cpus = os.cpu_count() or 1
+        default_workers = 1 if _cuda_available() else max(min(cpus // 2, 4), 1)
+        try:
+            workers = int(os.getenv(_WORKERS_ENV_VAR, default_workers))
+            segment_seconds = float(os.getenv(_SEGMENT_SECONDS_ENV_VAR, _DEFAULT_SEGMENT_SECONDS))
+            min_parallel = os.getenv(_MIN_PARALLEL_SECONDS_ENV_VAR)
+            min_parallel_seconds = float(min_parallel) if min_parallel else None
+        except ValueError:
+            logger.warning("Configuración de transcripción inválida; se usan valores por defecto")
+            workers, segment_seconds, min_parallel_seconds = 1, _DEFAULT_SEGMENT_SECONDS, None
+        return cls(workers=workers, segment_seconds=segment_seconds, min_parallel_seconds=min_parallel_seconds)
+
+    def transcribe_file(self, file_path: str, model_name: str, **options: Any) -> TranscriptionResult:
+        """Decode *file_path* to 16 kHz mono and transcribe it."""
+
+        import whisper
+
+        audio = whisper.load_audio(file_path)
+        return self.transcribe_audio(audio, model_name, **options)
+
+    def transcribe_audio(self, audio: np.ndarray, model_name: str, **options: Any) -> TranscriptionResult:
+        """Transcribe a 16 kHz mono float32 array."""
+
+        duration = len(audio) / SAMPLE_RATE
+        if self.workers == 1 or duration < self.min_parallel_seconds:
+            part = _transcribe_chunk(model_name, audio, 0.0, options)
+            return _stitch([part], duration)
+
+        chunks = (
+            (start / SAMPLE_RATE, audio[start:end])
+            for start, end in silence_boundaries(audio, target_seconds=self.segment_seconds)
+        )
+        return self.transcribe_chunks(chunks, model_name, duration=duration, **options)
+
+    def transcribe_chunks(
+        self,
+        chunks: Iterable[Tuple[float, np.ndarray]],
+        model_name: str,
+        *,
+        duration: Optional[float] = None,
+        **options: Any,
+    ) -> TranscriptionResult:
+        """Transcribe ``(offset_seconds, samples)`` chunks in parallel as they arrive.
+
+        At most ``2 * workers`` chunks are in flight, so a fast producer
+        (e.g. an ``ffmpeg`` pipe) cannot queue the whole recording in memory.
+        When *duration* is not given it is taken from the last chunk.
+        """
+
+        end = 0.0
+        parts: List[Dict[str, Any]] = []
+        if self.workers == 1:
+            for offset, samples in chunks:
+                end = max(end, offset + len(samples) / SAMPLE_RATE)
+                parts.append(_transcribe_chunk(model_name, samples, offset, options))
+            return _stitch(parts, duration if duration is not None else end)
+
+        pool = self._get_pool()
+        pending: Deque[Future] = deque()
+        try:
+            for offset, samples in chunks:
+                end = max(end, offset + len(samples) / SAMPLE_RATE)
+                if len(pending) >= 2 * self.workers:
+                    parts.append(pending.popleft().result())
+                pending.append(pool.submit(_transcribe_chunk, model_name, samples, offset, options))
+            while pending:
+                parts.append(pending.popleft().result())
+        finally:
+            for future in pending:
+                future.cancel()
+        logger.info("Transcripción en %s fragmentos con %s procesos", len(parts), self.workers)
+        return _stitch(parts, duration if duration is not None else end)
+
+    def transcribe_stream(self, file_path: str, model_name: str, **options: Any) -> TranscriptionResult:
+        """Decode *file_path* through ``ffmpeg`` and transcribe it window by window."""
+
+        chunks = stream_chunks(ffmpeg_pcm_stream(file_path), target_seconds=self.segment_seconds)
+        return self.transcribe_chunks(chunks, model_name, **options)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    torch_threads = max((os.cpu_count() or 1) // self.workers, 1)
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        initializer=_worker_initializer,
+                        initargs=(torch_threads,),
+                    )
+        return self._pool
+
+    def shutdown(self) -> None:
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=True, cancel_futures=True)
+                self._pool = None
+
+
+_DEFAULT_ENGINE: Optional[TranscriptionEngine] = None
+_ENGINE_LOCK = threading.Lock()
+
+
+def get_transcription_engine() -> TranscriptionEngine:
+    global _DEFAULT_ENGINE
+    if _DEFAULT_ENGINE is None:
+        with _ENGINE_LOCK:
+            if _DEFAULT_ENGINE is None:
+                _DEFAULT_ENGINE = TranscriptionEngine.from_environment()
+    return _DEFAULT_ENGINE
+
+
+def configure_default_transcription_engine(engine: Optional[TranscriptionEngine]) -> None:
+    global _DEFAULT_ENGINE
+    with _ENGINE_LOCK:
+        _DEFAULT_ENGINE = engine
+
+
+__all__ = [
+    "SAMPLE_RATE",
+    "AudioDecodeError",
+    "TranscriptionEngine",
+    "TranscriptionResult",
+    "clear_model_cache",
+    "configure_default_transcription_engine",
+    "ffmpeg_available",
+    "ffmpeg_pcm_stream",
+    "get_transcription_engine",
+    "get_whisper_model",
+    "probe_video",
+    "silence_boundaries",
+    "stream_chunks",
+]
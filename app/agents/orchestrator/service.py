@@ -23,6 +23,7 @@ from agents.media_agent import MediaAgent
 from agents.content_analyzer_agent import ContentAnalyzerAgent
 from agents.smart_converter_agent import SmartConverterAgent
 from common.observability import record_orchestrator_decision
+from common.tracing import span
 
 
 class OrchestratorService:
@@ -76,7 +77,10 @@ class OrchestratorService:
         for agent in self._agents.values():
             if agent.can_handle(task):
                 record_orchestrator_decision(task.task_type, agent.name)
-                return agent.handle(task)
+                with span(f"agent.{agent.name}", task_type=task.task_type) as agent_span:
+                    result = agent.handle(task)
+                    agent_span.set_attribute("success", bool(getattr(result, "success", False)))
+                return result
 
         record_orchestrator_decision(task.task_type, "unhandled")
         return AgentResponse(success=False, error=f"no_agent_for_{task.task_type}")
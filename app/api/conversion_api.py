@@ -3,7 +3,7 @@ API de Conversión para MVP - Anclora RAG
 Endpoint principal para iniciar conversiones desde el frontend
 """
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form
 from fastapi.responses import JSONResponse, FileResponse
 from pydantic import BaseModel
 from typing import Optional, Dict, Any
@@ -20,6 +20,7 @@ from orchestration.hybrid_orchestrator import (
     ConversionRequest, 
     ProcessingPriority
 )
+from orchestration.conversion_scheduler import ConversionScheduler, JobStateError, SchedulerFullError
 
 logger = logging.getLogger(__name__)
 
@@ -29,8 +30,21 @@ app = FastAPI(
     version="1.0.0"
 )
 
-# Inicializar orquestador
+# Inicializar orquestador y planificador de conversiones
 orchestrator = HybridOrchestrator()
+scheduler = ConversionScheduler(orchestrator.process_conversion)
+
+
+@app.on_event("startup")
+async def _warm_orchestrator() -> None:
+    await orchestrator.startup()
+    await scheduler.start()
+
+
+@app.on_event("shutdown")
+async def _close_orchestrator() -> None:
+    await scheduler.stop()
+    await orchestrator.shutdown()
 
 # Modelos de datos
 class ConversionRequestModel(BaseModel):
@@ -47,13 +61,8 @@ class ConversionStatusResponse(BaseModel):
     estimated_completion: Optional[str] = None
     result_url: Optional[str] = None
 
-# Storage temporal para resultados
-conversion_results = {}
-conversion_status = {}
-
 @app.post("/api/v1/conversions/start")
 async def start_conversion(
-    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     user_id: str = Form(...),
     priority: str = Form("standard"),
@@ -105,44 +114,31 @@ async def start_conversion(
             metadata=metadata_dict
         )
         
-        # Inicializar status
-        conversion_status[request_id] = {
-            "status": "queued",
-            "created_at": datetime.now().isoformat(),
-            "processing_mode": None,
-            "progress": 0.0
-        }
+        # Encolar en el planificador (cola por prioridad y pool de workers acotado)
+        try:
+            await scheduler.submit(conversion_request)
+        except SchedulerFullError as exc:
+            raise HTTPException(status_code=503, detail=str(exc))
         
-        # Procesar en background
         if priority == "realtime":
-            # Para realtime, procesamos inmediatamente
-            result = await orchestrator.process_conversion(conversion_request)
-            
-            # Guardar resultado
-            conversion_results[request_id] = result
-            conversion_status[request_id].update({
-                "status": "completed" if result.success else "failed",
-                "processing_mode": result.processing_mode.value,
-                "progress": 100.0,
-                "completed_at": datetime.now().isoformat()
-            })
+            # Para realtime, esperamos a que un worker la procese (se adelanta a standard y batch)
+            job = await scheduler.wait(request_id)
+            result = job.result or {}
+            success = job.status == "completed"
             
             return JSONResponse({
                 "request_id": request_id,
-                "status": "completed" if result.success else "failed",
-                "processing_mode": result.processing_mode.value,
-                "processing_time": result.processing_time,
-                "result_url": f"/api/v1/conversions/{request_id}/result" if result.success else None,
-                "download_url": f"/api/v1/conversions/{request_id}/download" if result.success else None,
-                "learning_applied": result.learning_applied,
-                "optimizations_used": result.optimizations_used,
-                "errors": result.errors if not result.success else None
+                "status": job.status,
+                "processing_mode": job.processing_mode,
+                "processing_time": result.get("processing_time"),
+                "result_url": f"/api/v1/conversions/{request_id}/result" if success else None,
+                "download_url": f"/api/v1/conversions/{request_id}/download" if success else None,
+                "learning_applied": result.get("learning_applied"),
+                "optimizations_used": result.get("optimizations_used"),
+                "errors": (result.get("errors") or [job.error]) if not success else None
             })
         
         else:
-            # Para standard y batch, procesamos en background
-            background_tasks.add_task(process_conversion_background, conversion_request)
-            
             return JSONResponse({
                 "request_id": request_id,
                 "status": "queued",
@@ -151,6 +147,8 @@ async def start_conversion(
                 "estimated_time": "30-60 segundos" if priority == "standard" else "2-5 minutos"
             })
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error iniciando conversión: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error interno: {str(e)}")
@@ -161,10 +159,11 @@ async def get_conversion_status(request_id: str):
     Obtiene el estado actual de una conversión
     """
     
-    if request_id not in conversion_status:
+    job = await scheduler.get(request_id)
+    if job is None:
         raise HTTPException(status_code=404, detail="Conversión no encontrada")
     
-    status_data = conversion_status[request_id].copy()
+    status_data = job.status_dict()
     
     # Agregar URLs si está completada
     if status_data["status"] == "completed":
@@ -179,21 +178,18 @@ async def get_conversion_result(request_id: str):
     Obtiene el resultado detallado de una conversión
     """
     
-    if request_id not in conversion_results:
-        raise HTTPException(status_code=404, detail="Resultado no encontrado")
-    
-    result = conversion_results[request_id]
+    result = await _stored_result(request_id)
     
     return JSONResponse({
-        "request_id": result.request_id,
-        "success": result.success,
-        "processing_mode": result.processing_mode.value,
-        "processing_time": result.processing_time,
-        "learning_applied": result.learning_applied,
-        "optimizations_used": result.optimizations_used,
-        "result_data": result.result_data,
-        "errors": result.errors,
-        "download_url": f"/api/v1/conversions/{request_id}/download" if result.success else None
+        "request_id": result["request_id"],
+        "success": result["success"],
+        "processing_mode": result["processing_mode"],
+        "processing_time": result["processing_time"],
+        "learning_applied": result["learning_applied"],
+        "optimizations_used": result["optimizations_used"],
+        "result_data": result["result_data"],
+        "errors": result["errors"],
+        "download_url": f"/api/v1/conversions/{request_id}/download" if result["success"] else None
     })
 
 @app.get("/api/v1/conversions/{request_id}/download")
@@ -202,17 +198,14 @@ async def download_conversion_result(request_id: str):
     Descarga el archivo convertido
     """
     
-    if request_id not in conversion_results:
-        raise HTTPException(status_code=404, detail="Resultado no encontrado")
-    
-    result = conversion_results[request_id]
+    result = await _stored_result(request_id)
     
-    if not result.success:
+    if not result["success"]:
         raise HTTPException(status_code=400, detail="Conversión falló, no hay archivo para descargar")
     
     # En producción, esto devolvería el archivo real
     # Por ahora simulamos con un archivo de ejemplo
-    file_path = result.result_data.get('output_file_path')
+    file_path = (result["result_data"] or {}).get('output_file_path')
     
     if not file_path or not os.path.exists(file_path):
         # Crear archivo de ejemplo
@@ -234,13 +227,16 @@ async def get_conversion_stats():
     """
     
     stats = orchestrator.get_processing_stats()
+    scheduler_stats = await scheduler.stats()
+    by_status = scheduler_stats["jobs_by_status"]
     
     return JSONResponse({
         "processing_stats": stats,
-        "active_conversions": len([s for s in conversion_status.values() if s["status"] == "processing"]),
-        "completed_conversions": len([s for s in conversion_status.values() if s["status"] == "completed"]),
-        "failed_conversions": len([s for s in conversion_status.values() if s["status"] == "failed"]),
-        "total_conversions": len(conversion_status)
+        "scheduler": scheduler_stats,
+        "active_conversions": by_status.get("processing", 0),
+        "completed_conversions": by_status.get("completed", 0),
+        "failed_conversions": by_status.get("failed", 0),
+        "total_conversions": sum(by_status.values())
     })
 
 @app.delete("/api/v1/conversions/{request_id}")
@@ -249,19 +245,13 @@ async def cancel_conversion(request_id: str):
     Cancela una conversión en progreso
     """
     
-    if request_id not in conversion_status:
+    try:
+        # Saca la conversión de su cola o cancela la tarea si ya se está procesando
+        await scheduler.cancel(request_id)
+    except KeyError:
         raise HTTPException(status_code=404, detail="Conversión no encontrada")
-    
-    status = conversion_status[request_id]
-    
-    if status["status"] in ["completed", "failed", "cancelled"]:
-        raise HTTPException(status_code=400, detail=f"No se puede cancelar conversión en estado: {status['status']}")
-    
-    # Marcar como cancelada
-    conversion_status[request_id].update({
-        "status": "cancelled",
-        "cancelled_at": datetime.now().isoformat()
-    })
+    except JobStateError as exc:
+        raise HTTPException(status_code=400, detail=f"No se puede cancelar conversión en estado: {exc}")
     
     return JSONResponse({
         "message": "Conversión cancelada exitosamente",
@@ -302,42 +292,14 @@ async def analyze_document(file: UploadFile, file_path: str) -> Dict:
     
     return document_data
 
-async def process_conversion_background(request: ConversionRequest):
-    """Procesa conversión en background"""
+async def _stored_result(request_id: str) -> Dict[str, Any]:
+    """Resultado persistido de una conversión terminada"""
     
-    try:
-        # Actualizar status a processing
-        conversion_status[request.request_id].update({
-            "status": "processing",
-            "started_at": datetime.now().isoformat(),
-            "progress": 10.0
-        })
-        
-        # Procesar con orquestador
-        result = await orchestrator.process_conversion(request)
-        
-        # Guardar resultado
-        conversion_results[request.request_id] = result
-        
-        # Actualizar status final
-        conversion_status[request.request_id].update({
-            "status": "completed" if result.success else "failed",
-            "processing_mode": result.processing_mode.value,
-            "progress": 100.0,
-            "completed_at": datetime.now().isoformat()
-        })
-        
-        logger.info(f"✅ Conversión background completada: {request.request_id}")
-        
-    except Exception as e:
-        logger.error(f"❌ Error en conversión background: {str(e)}")
-        
-        conversion_status[request.request_id].update({
-            "status": "failed",
-            "progress": 100.0,
-            "error": str(e),
-            "failed_at": datetime.now().isoformat()
-        })
+    job = await scheduler.get(request_id)
+    if job is None or job.result is None:
+        raise HTTPException(status_code=404, detail="Resultado no encontrado")
+    
+    return job.result
 
 # Health check
 @app.get("/health")
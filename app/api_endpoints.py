@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+import hashlib
 import json  # Used by UTF8JSONResponse.render for proper UTF-8 output
 import logging
 import os
@@ -11,10 +12,12 @@ from datetime import datetime, timezone
 from typing import Any, Dict, List, Optional
 
 from fastapi import Body, Depends, FastAPI, File, HTTPException, Request, UploadFile
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from pydantic import BaseModel, Field
 from common.langchain_module import LegalComplianceGuardError, response
+from common.llm_scheduler import LLMOverloadedError, llm_request_context, normalise_priority
 from common.privacy import PrivacyManager
 from common.translations import get_text
 from security import AdvancedSecurityManager, SecurityPolicy
@@ -129,6 +132,7 @@ def _serialise_agent_response(
 _ERROR_STATUS_MAP = {
     "question_missing": 400,
     "media_reference_missing": 400,
+    "llm_overloaded": 503,
 }
 
 
@@ -154,9 +158,13 @@ def _build_agent_http_response(
 
     payload = _serialise_agent_response(agent_response, extra_metadata=extra_metadata)
     status_code = 200 if agent_response.success else _agent_error_status(agent_response.error)
+    headers: Dict[str, str] = {}
     if not agent_response.success:
         logger.warning("%s failed with agent error: %s", log_context, agent_response.error)
-    return UTF8JSONResponse(content=payload, status_code=status_code)
+        retry_after = (agent_response.data or {}).get("retry_after")
+        if status_code == 503 and retry_after:
+            headers["Retry-After"] = str(retry_after)
+    return UTF8JSONResponse(content=payload, status_code=status_code, headers=headers or None)
 
 # Modelos Pydantic
 class ChatRequest(BaseModel):
@@ -439,6 +447,33 @@ def _verify_jwt_token(token: str, secret: str) -> None:
         raise HTTPException(status_code=401, detail="Token inválido") from exc
 
 
+def _request_tenant(http_request: Request, token: str) -> str:
+    """Tenant used for fair queueing: ``X-Tenant-ID`` or a digest of the token."""
+
+    tenant = (http_request.headers.get("X-Tenant-ID") or "").strip()
+    if tenant:
+        return tenant[:64]
+    if not token:
+        return "anonymous"
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()[:16]
+
+
+def _overloaded_exception(exc: LLMOverloadedError) -> HTTPException:
+    return HTTPException(
+        status_code=503,
+        detail="Servicio saturado, inténtelo de nuevo más tarde",
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def _run_rag_query(message: str, language: str, priority: str, tenant: str) -> str:
+    with llm_request_context(priority, tenant):
+        try:
+            return response(message, language)
+        except TypeError:
+            return response(message)
+
+
 # Función de seguridad avanzada
 def verify_security(request: Request) -> bool:
     """Verificar seguridad avanzada antes de procesar la solicitud."""
@@ -576,12 +611,15 @@ async def chat_with_rag(
                 detail=f"Mensaje demasiado largo (máximo {request.max_length} caracteres)",
             )
 
-        # Procesar consulta
+        # Procesar consulta fuera del event loop; el planificador del LLM limita la concurrencia.
         logger.info(f"Procesando consulta API: {request.message[:50]}...")
-        try:
-            rag_response = response(request.message, language)
-        except TypeError:
-            rag_response = response(request.message)
+        rag_response = await run_in_threadpool(
+            _run_rag_query,
+            request.message,
+            language,
+            normalise_priority(http_request.headers.get("X-Request-Priority")),
+            _request_tenant(http_request, token),
+        )
 
         inspection = privacy_manager.inspect_response_citations(rag_response)
         warning_message: str | None = None
@@ -628,6 +666,8 @@ async def chat_with_rag(
             timestamp=datetime.now().isoformat(),
         )
       
+    except LLMOverloadedError as exc:
+        raise _overloaded_exception(exc) from exc
     except HTTPException:
         raise
     except Exception as exc:
@@ -645,13 +685,12 @@ async def chat_with_rag(
     ),
 )
 async def media_transcription(
+    http_request: Request,
     request: MediaTranscriptionRequest,
     token: str = Depends(verify_token),
 ):
     """Orquesta una solicitud de transcripción multimedia mediante el orquestador."""
 
-    del token  # La autenticación se valida mediante el dependency injector.
-
     if not request.media or len(request.media.strip()) == 0:
         raise HTTPException(status_code=400, detail="Referencia multimedia vacía")
 
@@ -667,7 +706,8 @@ async def media_transcription(
                 "source": "api_media_transcription",
             },
         )
-        agent_response = orchestrator.execute(task)
+        with llm_request_context("media", _request_tenant(http_request, token)):
+            agent_response = orchestrator.execute(task)
 
         metadata = {
             "language": language,
@@ -679,6 +719,8 @@ async def media_transcription(
             extra_metadata=metadata,
             log_context="media_transcription",
         )
+    except LLMOverloadedError as exc:
+        raise _overloaded_exception(exc) from exc
     except HTTPException:
         raise
     except Exception as exc:
@@ -736,6 +778,7 @@ async def upload_document(
 async def list_documents(token: str = Depends(verify_token)):
     """Obtiene el catálogo de documentos actualmente indexados."""
     try:
+        from common.chroma_utils import get_or_create_collection
         from common.constants import CHROMA_CLIENT
 
         # Usar la misma lógica que la UI para obtener documentos de ChromaDB
@@ -748,7 +791,7 @@ async def list_documents(token: str = Depends(verify_token)):
 
         for collection_info in collections:
             try:
-                collection = CHROMA_CLIENT.get_or_create_collection(collection_info.name)
+                collection = get_or_create_collection(CHROMA_CLIENT, collection_info.name)
                 # Obtener solo metadatos para no cargar documentos completos
                 try:
                     result = collection.get(include=["metadatas"], limit=2000)  # type: ignore
@@ -37,7 +37,7 @@ from langchain_core.vectorstores import VectorStore
 
 from langchain_community.vectorstores.utils import maximal_marginal_relevance
 
-from common.constants import CHROMA_COLLECTIONS
+from common.constants import CHROMA_COLLECTIONS, collection_metadata as hnsw_collection_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -158,6 +158,8 @@ class Chroma(VectorStore):
             )
 
         self._embedding_function = embedding_function
+        if collection_metadata is None:
+            collection_metadata = hnsw_collection_metadata(collection_name)
         self._collection = self._client.get_or_create_collection(
             name=collection_name,
             embedding_function=None,
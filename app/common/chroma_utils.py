@@ -11,6 +11,13 @@ from uuid import uuid4
 
 from langchain_core.documents import Document as LangChainDocument
 
+from .collection_router import forget_collection_vectors, update_collection_centroid
+from .constants import collection_metadata
+from .lexical_index import index_documents, remove_documents as remove_lexical_documents
+from .local_vector_cache import invalidate_local_mirror
+from .text_normalization import compact_provenance_metadata
+from .tracing import span
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,6 +82,20 @@ def _make_metadata_serializable(value: Any, *, _path: str = "metadata") -> Any:
 logger = logging.getLogger(__name__)
 
 
+def get_or_create_collection(client, collection_name: str):
+    """Return *collection_name*, creating it with its configured HNSW parameters.
+
+    The metadata only takes effect when the collection does not exist yet.
+    """
+
+    try:
+        return client.get_or_create_collection(
+            collection_name, metadata=collection_metadata(collection_name)
+        )
+    except TypeError:  # clients without ``metadata`` support (lightweight doubles)
+        return client.get_or_create_collection(collection_name)
+
+
 def add_langchain_documents(
     client,
     collection_name: str,
@@ -98,10 +119,11 @@ def add_langchain_documents(
     metadatas = [
         _make_metadata_serializable(dict(doc.metadata or {})) for doc in documents
     ]
-    vectors = embeddings.embed_documents(contents)
+    with span("ingest.embed", collection=collection_name, documents=len(contents)):
+        vectors = embeddings.embed_documents(contents)
     ids = [f"{collection_name}-{index}-{uuid4().hex}" for index in range(len(documents))]
 
-    collection = client.get_or_create_collection(collection_name)
+    collection = get_or_create_collection(client, collection_name)
     try:
         existed = collection.count() > 0
     except Exception:
@@ -128,12 +150,17 @@ def add_langchain_documents(
             len(batch_ids),
         )
         try:
-            collection.add(
-                ids=batch_ids,
-                documents=batch_contents,
-                embeddings=batch_vectors,
-                metadatas=batch_metadatas,
-            )
+            with span("ingest.chroma_add", collection=collection_name, documents=len(batch_ids)):
+                collection.add(
+                    ids=batch_ids,
+                    documents=batch_contents,
+                    embeddings=batch_vectors,
+                    metadatas=batch_metadatas,
+                )
+            with span("ingest.secondary_indexes", collection=collection_name):
+                index_documents(collection_name, batch_ids, batch_contents, batch_metadatas)
+                update_collection_centroid(collection_name, batch_vectors)
+                invalidate_local_mirror(collection_name)
         except AttributeError:
             if hasattr(collection, 'add_documents') and callable(getattr(collection, 'add_documents', None)):
                 collection.add_documents(documents[start:end])
@@ -146,4 +173,146 @@ def add_langchain_documents(
     return existed, total_added
 
 
-__all__ = ["add_langchain_documents"]
+def compact_collection_provenance(collection, *, batch_size: int = 500, dry_run: bool = False) -> dict:
+    """Strip or compress stored ``original_page_content`` copies in *collection*.
+
+    Copies identical to the stored document are removed and long ones are
+    re-encoded as a patch or compressed blob. Returns counters with the
+    records ``scanned``, ``removed``, ``compacted`` and ``bytes_saved``.
+
+    Chroma merges metadata on ``update`` and ``upsert`` and rejects ``None``
+    values, so keys can only disappear by deleting each changed record and
+    adding it back with its embedding and full cleaned metadata.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+
+    # Rewritten records move to the end of the collection, so offsets are only
+    # used to list the ids before anything changes.
+    record_ids = []
+    offset = 0
+    while True:
+        page = collection.get(include=[], limit=batch_size, offset=offset)
+        ids = page.get("ids") or []
+        if not ids:
+            break
+        record_ids.extend(ids)
+        offset += len(ids)
+
+    stats = {"scanned": 0, "removed": 0, "compacted": 0, "bytes_saved": 0}
+    name = getattr(collection, "name", None)
+    for start in range(0, len(record_ids), batch_size):
+        batch_ids = record_ids[start:start + batch_size]
+        include = ["documents", "metadatas"] if dry_run else ["documents", "metadatas", "embeddings"]
+        batch = collection.get(ids=batch_ids, include=include)
+        ids = batch.get("ids") or []
+        documents = batch.get("documents") or [None] * len(ids)
+        metadatas = batch.get("metadatas") or [None] * len(ids)
+        embeddings = batch.get("embeddings")
+        if embeddings is None:
+            embeddings = [None] * len(ids)
+
+        rewrite_ids = []
+        rewrite_texts = []
+        rewrite_embeddings = []
+        rewrite_metadatas = []
+        for record_id, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+            metadata = metadata or {}
+            update = compact_provenance_metadata(document or "", metadata)
+            if update is None:
+                continue
+            merged = {key: value for key, value in {**metadata, **update}.items() if value is not None}
+            before = sum(len(str(metadata.get(key, "")).encode("utf-8")) for key in update)
+            after = sum(len(value.encode("utf-8")) for value in update.values() if value is not None)
+            stats["bytes_saved"] += before - after
+            stats["removed" if all(value is None for value in update.values()) else "compacted"] += 1
+            rewrite_ids.append(record_id)
+            rewrite_texts.append(document or "")
+            rewrite_embeddings.append(embedding)
+            rewrite_metadatas.append(merged)
+
+        if rewrite_ids and not dry_run:
+            collection.delete(ids=rewrite_ids)
+            collection.add(
+                ids=rewrite_ids,
+                documents=rewrite_texts,
+                embeddings=rewrite_embeddings,
+                metadatas=rewrite_metadatas,
+            )
+            # The lexical index keeps its own copy of each record's metadata.
+            if name:
+                index_documents(name, rewrite_ids, rewrite_texts, rewrite_metadatas)
+                invalidate_local_mirror(name)
+        stats["scanned"] += len(ids)
+
+    logger.info(
+        "Procedencia compactada en '%s': %s revisados, %s copias eliminadas, %s comprimidas (%s bytes)",
+        name or "?",
+        stats["scanned"],
+        stats["removed"],
+        stats["compacted"],
+        stats["bytes_saved"],
+    )
+    return stats
+
+
+def delete_documents_by_file_hash(collection, file_hash: str) -> int:
+    """Delete every chunk of the file with SHA-256 *file_hash* from *collection*.
+
+    Secondary indexes (lexical index, local mirror, routing centroid) are
+    updated as well. Returns the number of deleted records.
+    """
+
+    response = collection.get(where={"file_hash": file_hash}, include=["embeddings"])
+    ids = list(response.get("ids") or [])
+    if not ids:
+        return 0
+    embeddings = response.get("embeddings")
+    vectors = [vector for vector in (embeddings if embeddings is not None else []) if vector is not None and len(vector)]
+
+    collection.delete(ids=ids)
+    name = getattr(collection, "name", None)
+    if name:
+        remove_lexical_documents(name, ids)
+        invalidate_local_mirror(name)
+        if vectors:
+            forget_collection_vectors(name, vectors)
+    logger.info("Eliminados %s fragmentos con hash %s de '%s'", len(ids), file_hash[:12], name or "?")
+    return len(ids)
+
+
+def update_documents_by_file_hash(collection, file_hash: str, metadata: Mapping[str, Any]) -> int:
+    """Merge *metadata* into every chunk of the file with SHA-256 *file_hash*.
+
+    Used when a file is renamed or moved: the chunks and their embeddings are
+    kept and only their metadata changes. The lexical index and the local
+    mirror are refreshed. Returns the number of updated records.
+    """
+
+    response = collection.get(where={"file_hash": file_hash}, include=["documents", "metadatas"])
+    ids = list(response.get("ids") or [])
+    if not ids:
+        return 0
+    documents = list(response.get("documents") or [""] * len(ids))
+    metadatas = [
+        _make_metadata_serializable({**dict(current or {}), **dict(metadata)})
+        for current in (response.get("metadatas") or [None] * len(ids))
+    ]
+
+    collection.update(ids=ids, metadatas=metadatas)
+    name = getattr(collection, "name", None)
+    if name:
+        index_documents(name, ids, documents, metadatas)
+        invalidate_local_mirror(name)
+    logger.info("Actualizados %s fragmentos con hash %s en '%s'", len(ids), file_hash[:12], name or "?")
+    return len(ids)
+
+
+__all__ = [
+    "add_langchain_documents",
+    "compact_collection_provenance",
+    "delete_documents_by_file_hash",
+    "get_or_create_collection",
+    "update_documents_by_file_hash",
+]
@@ -0,0 +1,394 @@
+"""Route queries to the most relevant collections using centroid vectors.
+
+Every ingestion batch folds its embeddings into a running sum per
+collection, so the centroid is maintained incrementally without rescanning
+Chroma. At query time the query embedding is compared against each
+centroid and only the top-M collections are searched; when the router is
+not confident enough the caller falls back to querying every collection.
+
+Sums live in a local SQLite database (``COLLECTION_ROUTER_PATH``, default
+``data/collection_centroids.sqlite3``) and every update is a single
+read-modify-write transaction, so API and ingestion processes on the same
+host never lose each other's updates. A centroid only describes the chunks
+it has seen: when its count differs from the collection's, the collection
+is never skipped. :func:`rebuild_collection_centroid` recomputes a
+centroid from the embeddings stored in Chroma
+(``scripts/migration/rebuild_collection_centroids.py``).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+_ENABLED_ENV_VAR = "COLLECTION_ROUTING_ENABLED"
+_PATH_ENV_VAR = "COLLECTION_ROUTER_PATH"
+_TOP_M_ENV_VAR = "COLLECTION_ROUTING_TOP_M"
+_MIN_SIMILARITY_ENV_VAR = "COLLECTION_ROUTING_MIN_SIMILARITY"
+
+DEFAULT_TOP_M = 3
+DEFAULT_MIN_SIMILARITY = 0.2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS centroids (
+    name TEXT PRIMARY KEY,
+    count INTEGER NOT NULL,
+    vector_sum BLOB NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+def routing_enabled() -> bool:
+    value = os.environ.get(_ENABLED_ENV_VAR)
+    if value is None:
+        return True
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def _default_path() -> Path:
+    configured = os.environ.get(_PATH_ENV_VAR)
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return base_dir / "data" / "collection_centroids.sqlite3"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+
+@dataclass(frozen=True)
+class RoutingDecision:
+    """Outcome of routing a query across candidate collections."""
+
+    selected: Tuple[str, ...]
+    skipped: Tuple[str, ...]
+    reason: str
+    scores: Mapping[str, float] = field(default_factory=dict)
+
+    @property
+    def routed(self) -> bool:
+        return bool(self.skipped)
+
+
+class CollectionRouter:
+    """Keeps per-collection centroid vectors and scores queries against them."""
+
+    def __init__(
+        self,
+        path: Optional[Path] = None,
+        *,
+        top_m: int = DEFAULT_TOP_M,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        persist: bool = True,
+    ) -> None:
+        self.path = Path(path) if path is not None else _default_path()
+        self.top_m = max(int(top_m), 1)
+        self.min_similarity = float(min_similarity)
+        self._persist = persist
+        self._sums: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._loaded_version: Optional[int] = None
+        self._lock = Lock()
+        if persist:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Autocommit mode: transactions are opened explicitly around each update.
+        self._conn = sqlite3.connect(
+            str(self.path) if persist else ":memory:",
+            check_same_thread=False,
+            timeout=10.0,
+            isolation_level=None,
+        )
+        with self._lock:
+            if persist:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(_SCHEMA)
+
+    @classmethod
+    def from_environment(cls) -> "CollectionRouter":
+        try:
+            top_m = int(os.environ.get(_TOP_M_ENV_VAR, DEFAULT_TOP_M))
+        except ValueError:
+            top_m = DEFAULT_TOP_M
+        try:
+            min_similarity = float(os.environ.get(_MIN_SIMILARITY_ENV_VAR, DEFAULT_MIN_SIMILARITY))
+        except ValueError:
+            min_similarity = DEFAULT_MIN_SIMILARITY
+        return cls(top_m=top_m, min_similarity=min_similarity)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    def _refresh_locked(self) -> None:
+        """Reload centroids when this or another process has committed changes."""
+
+        # ``data_version`` only moves on commits from other connections; our own
+        # writes reset ``_loaded_version`` instead.
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._loaded_version:
+            return
+        sums: Dict[str, np.ndarray] = {}
+        counts: Dict[str, int] = {}
+        for name, count, blob in self._conn.execute("SELECT name, count, vector_sum FROM centroids"):
+            sums[name] = np.frombuffer(blob, dtype=np.float64).copy()
+            counts[name] = int(count)
+        self._sums, self._counts = sums, counts
+        self._loaded_version = version
+
+    def _write_locked(self, collection_name: str, vector_sum: Optional[np.ndarray], count: int) -> None:
+        if vector_sum is None or count <= 0:
+            self._conn.execute("DELETE FROM centroids WHERE name = ?", (collection_name,))
+        else:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO centroids VALUES (?, ?, ?, ?)",
+                (collection_name, int(count), np.asarray(vector_sum, dtype=np.float64).tobytes(), time.time()),
+            )
+
+    # ------------------------------------------------------------------
+    # Updates
+    def _apply(self, collection_name: str, vectors: Iterable[Sequence[float]], sign: int) -> int:
+        matrix = np.asarray([list(vector) for vector in vectors], dtype=np.float64)
+        if matrix.ndim != 2 or matrix.shape[0] == 0:
+            return 0
+
+        with self._lock:
+            # IMMEDIATE takes the write lock before reading, so concurrent
+            # processes serialise their read-modify-write cycles.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT count, vector_sum FROM centroids WHERE name = ?", (collection_name,)
+                ).fetchone()
+                current = np.frombuffer(row[1], dtype=np.float64) if row else None
+                count = int(row[0]) if row else 0
+                if current is not None and current.shape[0] != matrix.shape[1]:
+                    if sign < 0:
+                        self._conn.execute("ROLLBACK")
+                        return 0
+                    logger.info(
+                        "Dimensión de embeddings cambiada en '%s'; se reinicia el centroide",
+                        collection_name,
+                    )
+                    current, count = None, 0
+                if current is None:
+                    if sign < 0:
+                        self._conn.execute("ROLLBACK")
+                        return 0
+                    current = np.zeros(matrix.shape[1], dtype=np.float64)
+
+                count += sign * matrix.shape[0]
+                self._write_locked(collection_name, current + sign * matrix.sum(axis=0), count)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._loaded_version = None
+        return matrix.shape[0]
+
+    def add_vectors(self, collection_name: str, vectors: Iterable[Sequence[float]]) -> int:
+        """Fold newly ingested *vectors* into the centroid of *collection_name*."""
+
+        return self._apply(collection_name, vectors, 1)
+
+    def remove_vectors(self, collection_name: str, vectors: Iterable[Sequence[float]]) -> int:
+        """Subtract deleted *vectors* from the centroid of *collection_name*."""
+
+        return self._apply(collection_name, vectors, -1)
+
+    def replace(self, collection_name: str, vector_sum: Optional[Sequence[float]], count: int) -> None:
+        """Overwrite the centroid of *collection_name* (used by full rebuilds)."""
+
+        with self._lock:
+            self._write_locked(
+                collection_name, None if vector_sum is None else np.asarray(vector_sum, dtype=np.float64), count
+            )
+            self._loaded_version = None
+
+    def count(self, collection_name: str) -> int:
+        """Number of chunks folded into the centroid of *collection_name*."""
+
+        with self._lock:
+            self._refresh_locked()
+            return self._counts.get(collection_name, 0)
+
+    def known_collections(self, collection_counts: Optional[Mapping[str, int]] = None) -> Tuple[str, ...]:
+        """Return the collections that currently have a usable centroid.
+
+        With *collection_counts* (chunks actually stored per collection),
+        centroids built from a different number of chunks are left out.
+        """
+
+        with self._lock:
+            self._refresh_locked()
+            return tuple(
+                name
+                for name, count in self._counts.items()
+                if count > 0 and (collection_counts is None or collection_counts.get(name, count) == count)
+            )
+
+    def centroid(self, collection_name: str) -> Optional[np.ndarray]:
+        with self._lock:
+            self._refresh_locked()
+            total = self._sums.get(collection_name)
+            count = self._counts.get(collection_name, 0)
+        if total is None or count <= 0:
+            return None
+        return total / count
+
+    # ------------------------------------------------------------------
+    # Routing
+    def route(
+        self,
+        query_vectors: Mapping[str, Sequence[float]],
+        candidates: Sequence[str],
+        collection_counts: Optional[Mapping[str, int]] = None,
+    ) -> RoutingDecision:
+        """Choose which *candidates* to query.
+
+        ``query_vectors`` maps each candidate collection to the query
+        embedding produced by that collection's model. Collections without a
+        centroid are always kept because the router cannot judge them, and
+        so are those whose centroid count differs from *collection_counts*
+        (chunks stored before routing existed, or added by other means).
+        """
+
+        scores: Dict[str, float] = {}
+        unknown: List[str] = []
+        for name in candidates:
+            centroid = self.centroid(name)
+            query_vector = query_vectors.get(name)
+            if centroid is None or query_vector is None:
+                unknown.append(name)
+                continue
+            if collection_counts is not None and name in collection_counts:
+                if collection_counts[name] != self.count(name):
+                    unknown.append(name)
+                    continue
+            query = np.asarray(query_vector, dtype=np.float64)
+            if query.shape != centroid.shape:
+                unknown.append(name)
+                continue
+            denominator = float(np.linalg.norm(query) * np.linalg.norm(centroid))
+            scores[name] = float(query @ centroid / denominator) if denominator else 0.0
+
+        everything = tuple(candidates)
+        if not scores:
+            return RoutingDecision(everything, (), "no_centroids", scores)
+        if len(scores) <= self.top_m:
+            return RoutingDecision(everything, (), "few_candidates", scores)
+
+        ranked = sorted(scores, key=lambda name: scores[name], reverse=True)
+        if scores[ranked[0]] < self.min_similarity:
+            return RoutingDecision(everything, (), "low_confidence", scores)
+
+        keep = set(ranked[: self.top_m]) | set(unknown)
+        selected = tuple(name for name in candidates if name in keep)
+        skipped = tuple(name for name in candidates if name not in keep)
+        return RoutingDecision(selected, skipped, "routed", scores)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_DEFAULT_ROUTER: Optional[CollectionRouter] = None
+_ROUTER_LOCK = Lock()
+
+
+def get_collection_router() -> CollectionRouter:
+    global _DEFAULT_ROUTER
+    if _DEFAULT_ROUTER is None:
+        with _ROUTER_LOCK:
+            if _DEFAULT_ROUTER is None:
+                _DEFAULT_ROUTER = CollectionRouter.from_environment()
+    return _DEFAULT_ROUTER
+
+
+def configure_default_router(router: Optional[CollectionRouter]) -> None:
+    global _DEFAULT_ROUTER
+    with _ROUTER_LOCK:
+        _DEFAULT_ROUTER = router
+
+
+def update_collection_centroid(collection_name: str, vectors: Sequence[Sequence[float]]) -> int:
+    """Best-effort centroid update used by the ingestion path."""
+
+    if not routing_enabled():
+        return 0
+    try:
+        return get_collection_router().add_vectors(collection_name, vectors)
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("No se pudo actualizar el centroide de '%s': %s", collection_name, exc)
+        return 0
+
+
+def forget_collection_vectors(collection_name: str, vectors: Sequence[Sequence[float]]) -> int:
+    """Best-effort centroid update used by the deletion path."""
+
+    try:
+        return get_collection_router().remove_vectors(collection_name, vectors)
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("No se pudo depurar el centroide de '%s': %s", collection_name, exc)
+        return 0
+
+
+def rebuild_collection_centroid(
+    collection: Any,
+    router: Optional[CollectionRouter] = None,
+    *,
+    batch_size: int = 500,
+) -> int:
+    """Recompute the centroid of *collection* from its stored embeddings.
+
+    Pages through ``collection.get(include=["embeddings"])`` and replaces the
+    router's sum and count, so chunks ingested before routing existed are
+    represented. Returns the number of embeddings folded in.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    router = router or get_collection_router()
+    name = getattr(collection, "name", None)
+    if not name:
+        raise ValueError("collection has no name")
+
+    total: Optional[np.ndarray] = None
+    count = 0
+    offset = 0
+    while True:
+        batch = collection.get(include=["embeddings"], limit=batch_size, offset=offset)
+        ids = batch.get("ids") or []
+        if not ids:
+            break
+        embeddings = batch.get("embeddings")
+        vectors = [vector for vector in (embeddings if embeddings is not None else []) if vector is not None and len(vector)]
+        if vectors:
+            matrix = np.asarray([list(vector) for vector in vectors], dtype=np.float64)
+            if total is not None and total.shape[0] != matrix.shape[1]:
+                raise ValueError(f"'{name}' mezcla embeddings de dimensiones distintas")
+            total = matrix.sum(axis=0) if total is None else total + matrix.sum(axis=0)
+            count += matrix.shape[0]
+        offset += len(ids)
+
+    router.replace(name, total, count)
+    logger.info("Centroide de '%s' reconstruido con %s embeddings", name, count)
+    return count
+
+
+__all__ = [
+    "CollectionRouter",
+    "RoutingDecision",
+    "configure_default_router",
+    "forget_collection_vectors",
+    "get_collection_router",
+    "rebuild_collection_centroid",
+    "routing_enabled",
+    "update_collection_centroid",
+]
@@ -98,28 +98,94 @@ else:
 
 # ChromaDB Collections with domain information
 
+@dataclass(frozen=True)
+class HNSWConfig:
+    """HNSW index parameters of a collection.
+
+    Chroma fixes them when the collection is created; changing them for an
+    existing collection requires re-creating it (see
+    ``scripts/analysis/tune_hnsw.py`` to choose values).
+    """
+
+    space: str = "l2"
+    m: int = 16
+    construction_ef: int = 100
+    search_ef: int = 10
+
+    def to_metadata(self) -> dict[str, object]:
+        return {
+            "hnsw:space": self.space,
+            "hnsw:M": self.m,
+            "hnsw:construction_ef": self.construction_ef,
+            "hnsw:search_ef": self.search_ef,
+        }
+
+
+# Chroma's defaults, fine for collections of a few thousand chunks.
+HNSW_SMALL = HNSWConfig()
+# Bulk collections fed by folder/archive ingestion keep recall with more links per node.
+HNSW_LARGE = HNSWConfig(m=32, construction_ef=200, search_ef=64)
+
+
 @dataclass(frozen=True)
 class CollectionConfig:
     domain: str
+    hnsw: HNSWConfig = HNSW_SMALL
 
 CHROMA_COLLECTIONS = {
-    "conversion_rules": CollectionConfig(domain="documents"),
-    "technical_docs": CollectionConfig(domain="documents"),
+    "conversion_rules": CollectionConfig(domain="documents", hnsw=HNSW_LARGE),
+    "technical_docs": CollectionConfig(domain="documents", hnsw=HNSW_LARGE),
     "business_docs": CollectionConfig(domain="documents"),
     "general_knowledge": CollectionConfig(domain="documents"),
-    "research_papers": CollectionConfig(domain="documents"),
+    "research_papers": CollectionConfig(domain="documents", hnsw=HNSW_LARGE),
     "research_sources": CollectionConfig(domain="research"),
     "knowledge_guides": CollectionConfig(domain="guides"),
     "format_specs": CollectionConfig(domain="formats"),
-    "troubleshooting": CollectionConfig(domain="code"),
+    "troubleshooting": CollectionConfig(domain="code", hnsw=HNSW_LARGE),
     "multimedia_assets": CollectionConfig(domain="multimedia"),
-    "archive_documents": CollectionConfig(domain="archives"),
+    "archive_documents": CollectionConfig(domain="archives", hnsw=HNSW_LARGE),
     "compliance_archive": CollectionConfig(domain="compliance"),
     "legal_documents": CollectionConfig(domain="legal"),
     "legal_repository": CollectionConfig(domain="legal"),
     "legal_compliance": CollectionConfig(domain="compliance"),
 }
 
+
+def _hnsw_overrides_from_env() -> dict[str, HNSWConfig]:
+    """Parse ``CHROMA_HNSW_OVERRIDES`` (``name=M:construction_ef:search_ef[:space],...``)."""
+
+    overrides: dict[str, HNSWConfig] = {}
+    raw = os.environ.get("CHROMA_HNSW_OVERRIDES", "")
+    for entry in raw.split(","):
+        name, _, spec = entry.partition("=")
+        parts = [part.strip() for part in spec.split(":")]
+        if not name.strip() or len(parts) not in (3, 4):
+            continue
+        try:
+            m, construction_ef, search_ef = (int(part) for part in parts[:3])
+        except ValueError:
+            logger.warning("Configuración HNSW inválida ignorada: %s", entry.strip())
+            continue
+        space = parts[3] if len(parts) == 4 else "l2"
+        overrides[name.strip()] = HNSWConfig(space=space, m=m, construction_ef=construction_ef, search_ef=search_ef)
+    return overrides
+
+
+def hnsw_config_for(collection_name: str) -> HNSWConfig:
+    """Return the HNSW parameters to use when creating *collection_name*."""
+
+    override = _hnsw_overrides_from_env().get(collection_name)
+    if override is not None:
+        return override
+    config = CHROMA_COLLECTIONS.get(collection_name)
+    return config.hnsw if config is not None else HNSW_SMALL
+
+
+def collection_metadata(collection_name: str) -> dict[str, object]:
+    """Chroma ``metadata`` for creating *collection_name* with its HNSW settings."""
+
+    return hnsw_config_for(collection_name).to_metadata()
+
 DOMAIN_TO_COLLECTION = {
     "documents": "conversion_rules",
     "code": "troubleshooting",
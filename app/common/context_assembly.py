@@ -0,0 +1,235 @@
+"""Context assembly: collapse near-duplicates, stitch neighbours and pack.
+
+Retrieval fans out over several collections and chunks overlap by design,
+so the raw candidate list often repeats the same paragraph. Before the
+prompt is built the candidates are de-duplicated (SimHash fingerprints over
+word shingles plus shingle containment), adjacent chunks of the same file
+are merged back together without their overlap, and the result is packed
+into the token budget. Ranking order is preserved throughout.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .context_selection import estimate_tokens
+
+
+_ENABLED_ENV_VAR = "CONTEXT_ASSEMBLY_ENABLED"
+_CONTAINMENT_ENV_VAR = "CONTEXT_DUPLICATE_CONTAINMENT"
+_SIMHASH_DISTANCE_ENV_VAR = "CONTEXT_SIMHASH_MAX_DISTANCE"
+
+DEFAULT_CONTAINMENT = 0.8
+DEFAULT_SIMHASH_DISTANCE = 3
+_SHINGLE_SIZE = 3
+_MAX_OVERLAP_CHARS = 1000
+_FILE_KEYS = ("file_hash", "uploaded_file_name", "source")
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass(frozen=True)
+class ContextAssemblyConfig:
+    """Settings for the context assembly stage."""
+
+    enabled: bool = True
+    containment_threshold: float = DEFAULT_CONTAINMENT
+    simhash_max_distance: int = DEFAULT_SIMHASH_DISTANCE
+
+    @classmethod
+    def from_sources(cls) -> "ContextAssemblyConfig":
+        enabled_value = os.environ.get(_ENABLED_ENV_VAR)
+        enabled = True if enabled_value is None else enabled_value.strip().lower() in {"1", "true", "yes", "on"}
+        try:
+            containment = float(os.environ.get(_CONTAINMENT_ENV_VAR, DEFAULT_CONTAINMENT))
+        except ValueError:
+            containment = DEFAULT_CONTAINMENT
+        try:
+            distance = int(os.environ.get(_SIMHASH_DISTANCE_ENV_VAR, DEFAULT_SIMHASH_DISTANCE))
+        except ValueError:
+            distance = DEFAULT_SIMHASH_DISTANCE
+        return cls(enabled=enabled, containment_threshold=containment, simhash_max_distance=distance)
+
+
+def _content(doc: Any) -> str:
+    return getattr(doc, "page_content", "") or ""
+
+
+def _metadata(doc: Any) -> Dict[str, Any]:
+    metadata = getattr(doc, "metadata", None)
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def shingle_hashes(text: str, size: int = _SHINGLE_SIZE) -> FrozenSet[int]:
+    """Return 64-bit hashes of the word *size*-grams of *text*."""
+
+    words = [word.lower() for word in _WORD_RE.findall(text)]
+    if not words:
+        return frozenset()
+    if len(words) < size:
+        grams = [" ".join(words)]
+    else:
+        grams = [" ".join(words[index:index + size]) for index in range(len(words) - size + 1)]
+    return frozenset(
+        int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=8).digest(), "little")
+        for gram in grams
+    )
+
+
+def simhash(shingles: FrozenSet[int]) -> int:
+    """64-bit SimHash fingerprint of a shingle set."""
+
+    if not shingles:
+        return 0
+    values = np.fromiter(shingles, dtype=np.uint64, count=len(shingles))
+    bits = np.unpackbits(values.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+    votes = bits.astype(np.int32).sum(axis=0) * 2 - len(shingles)
+    fingerprint = 0
+    for position in np.flatnonzero(votes > 0):
+        fingerprint |= 1 << int(position)
+    return fingerprint
+
+
+def collapse_near_duplicates(
+    documents: Sequence[Any],
+    *,
+    containment_threshold: float = DEFAULT_CONTAINMENT,
+    simhash_max_distance: int = DEFAULT_SIMHASH_DISTANCE,
+) -> List[Any]:
+    """Drop documents that repeat a higher-ranked one.
+
+    A candidate is a duplicate when its SimHash is within
+    ``simhash_max_distance`` bits of a kept document, or when the shared
+    shingles cover ``containment_threshold`` of the smaller document (which
+    catches a chunk that is mostly the overlap of a neighbour).
+    """
+
+    kept: List[Any] = []
+    kept_signatures: List[Tuple[FrozenSet[int], int]] = []
+    for doc in documents:
+        shingles = shingle_hashes(_content(doc))
+        fingerprint = simhash(shingles)
+        duplicate = False
+        for other_shingles, other_fingerprint in kept_signatures:
+            if not shingles or not other_shingles:
+                duplicate = not shingles and not other_shingles
+            elif bin(fingerprint ^ other_fingerprint).count("1") <= simhash_max_distance:
+                duplicate = True
+            else:
+                shared = len(shingles & other_shingles)
+                duplicate = shared >= containment_threshold * min(len(shingles), len(other_shingles))
+            if duplicate:
+                break
+        if not duplicate:
+            kept.append(doc)
+            kept_signatures.append((shingles, fingerprint))
+    return kept
+
+
+def _file_key(metadata: Dict[str, Any]) -> Optional[Tuple[Any, ...]]:
+    index = metadata.get("chunk_index")
+    if not isinstance(index, int) or isinstance(index, bool):
+        return None
+    for key in _FILE_KEYS:
+        value = metadata.get(key)
+        if value:
+            return (metadata.get("collection"), key, value)
+    return None
+
+
+def _join_overlapping(left: str, right: str) -> str:
+    """Concatenate two consecutive chunks dropping the duplicated overlap."""
+
+    limit = min(len(left), len(right), _MAX_OVERLAP_CHARS)
+    for size in range(limit, 0, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left}\n{right}"
+
+
+def merge_adjacent_chunks(
+    documents: Sequence[Any],
+    document_factory: Callable[[str, Dict[str, Any]], Any],
+) -> List[Any]:
+    """Merge chunks of the same file whose ``chunk_index`` values are consecutive.
+
+    The merged document takes the position of its best-ranked part and the
+    metadata of its first chunk, so no new metadata keys are introduced.
+    """
+
+    groups: Dict[Tuple[Any, ...], List[Tuple[int, int, Any]]] = {}
+    for rank, doc in enumerate(documents):
+        key = _file_key(_metadata(doc))
+        if key is not None:
+            groups.setdefault(key, []).append((_metadata(doc)["chunk_index"], rank, doc))
+
+    replacements: Dict[int, Any] = {}
+    absorbed: set = set()
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort(key=lambda item: item[0])
+        runs: List[List[Tuple[int, int, Any]]] = [[members[0]]]
+        for member in members[1:]:
+            if member[0] == runs[-1][-1][0] + 1:
+                runs[-1].append(member)
+            elif member[0] != runs[-1][-1][0]:
+                runs.append([member])
+        for run in runs:
+            if len(run) < 2:
+                continue
+            text = _content(run[0][2])
+            for _, _, doc in run[1:]:
+                text = _join_overlapping(text, _content(doc))
+            metadata = dict(_metadata(run[0][2]))
+            distances = [
+                _metadata(doc).get("distance")
+                for _, _, doc in run
+                if isinstance(_metadata(doc).get("distance"), (int, float))
+            ]
+            if distances:
+                metadata["distance"] = min(distances)
+            best_rank = min(rank for _, rank, _ in run)
+            replacements[best_rank] = document_factory(text, metadata)
+            absorbed.update(rank for _, rank, _ in run if rank != best_rank)
+
+    merged: List[Any] = []
+    for rank, doc in enumerate(documents):
+        if rank in absorbed:
+            continue
+        merged.append(replacements.get(rank, doc))
+    return merged
+
+
+def pack_to_budget(documents: Sequence[Any], token_budget: int) -> List[Any]:
+    """Keep documents in order while they fit in *token_budget*.
+
+    Documents that do not fit are skipped so smaller, lower-ranked ones can
+    still use the remaining space. The first document is always kept.
+    """
+
+    if token_budget <= 0:
+        return list(documents)
+    packed: List[Any] = []
+    used = 0
+    for doc in documents:
+        cost = estimate_tokens(_content(doc))
+        if packed and used + cost > token_budget:
+            continue
+        packed.append(doc)
+        used += cost
+    return packed
+
+
+__all__ = [
+    "ContextAssemblyConfig",
+    "collapse_near_duplicates",
+    "merge_adjacent_chunks",
+    "pack_to_budget",
+    "shingle_hashes",
+    "simhash",
+]
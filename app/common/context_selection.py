@@ -0,0 +1,173 @@
+"""Adaptive selection of the chunks sent to the LLM as context.
+
+Instead of always forwarding ``TARGET_SOURCE_CHUNKS`` documents, the
+candidates are taken in ranking order until the relevance scores fall off
+(a gap that dominates the spread of the window), the approximate token
+budget is spent or the per-prompt-variant maximum is reached. The
+per-variant minimum is always honoured so answers never lose their
+grounding.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+_ENABLED_ENV_VAR = "ADAPTIVE_CONTEXT_ENABLED"
+_TOKEN_BUDGET_ENV_VAR = "CONTEXT_TOKEN_BUDGET"
+_GAP_RATIO_ENV_VAR = "CONTEXT_SCORE_GAP_RATIO"
+_LIMITS_ENV_VAR = "CONTEXT_CHUNK_LIMITS"
+
+DEFAULT_TOKEN_BUDGET = 1500
+DEFAULT_GAP_RATIO = 0.5
+_DEFAULT_MINIMUMS = {"legal": 2}
+
+
+@dataclass(frozen=True)
+class ContextLimits:
+    """Minimum and maximum number of chunks for a prompt variant."""
+
+    min_chunks: int
+    max_chunks: int
+
+    def __post_init__(self) -> None:
+        minimum = max(int(self.min_chunks), 1)
+        object.__setattr__(self, "min_chunks", minimum)
+        object.__setattr__(self, "max_chunks", max(int(self.max_chunks), minimum))
+
+
+def _parse_limits(raw: str) -> Dict[str, ContextLimits]:
+    """Parse ``variant=min:max`` pairs separated by commas."""
+
+    limits: Dict[str, ContextLimits] = {}
+    for entry in raw.split(","):
+        variant, _, bounds = entry.partition("=")
+        minimum, _, maximum = bounds.partition(":")
+        variant = variant.strip().lower()
+        if not variant:
+            continue
+        try:
+            limits[variant] = ContextLimits(int(minimum), int(maximum))
+        except ValueError:
+            logger.warning("Límite de contexto inválido ignorado: %s", entry.strip())
+    return limits
+
+
+@dataclass(frozen=True)
+class ContextSelectionConfig:
+    """Settings for adaptive context selection."""
+
+    enabled: bool = True
+    default_max_chunks: int = 5
+    token_budget: int = DEFAULT_TOKEN_BUDGET
+    gap_ratio: float = DEFAULT_GAP_RATIO
+    variant_limits: Mapping[str, ContextLimits] = field(default_factory=dict)
+
+    @classmethod
+    def from_sources(cls, default_max_chunks: int) -> "ContextSelectionConfig":
+        enabled_value = os.environ.get(_ENABLED_ENV_VAR)
+        enabled = True if enabled_value is None else enabled_value.strip().lower() in {"1", "true", "yes", "on"}
+        try:
+            token_budget = int(os.environ.get(_TOKEN_BUDGET_ENV_VAR, DEFAULT_TOKEN_BUDGET))
+        except ValueError:
+            token_budget = DEFAULT_TOKEN_BUDGET
+        try:
+            gap_ratio = float(os.environ.get(_GAP_RATIO_ENV_VAR, DEFAULT_GAP_RATIO))
+        except ValueError:
+            gap_ratio = DEFAULT_GAP_RATIO
+        return cls(
+            enabled=enabled,
+            default_max_chunks=default_max_chunks,
+            token_budget=token_budget,
+            gap_ratio=gap_ratio,
+            variant_limits=_parse_limits(os.environ.get(_LIMITS_ENV_VAR, "")),
+        )
+
+    def limits_for(self, prompt_variant: str) -> ContextLimits:
+        if not self.enabled:
+            return ContextLimits(self.default_max_chunks, self.default_max_chunks)
+        configured = self.variant_limits.get((prompt_variant or "").lower())
+        if configured is not None:
+            return configured
+        minimum = _DEFAULT_MINIMUMS.get((prompt_variant or "").lower(), 1)
+        return ContextLimits(min(minimum, self.default_max_chunks), self.default_max_chunks)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for es/en text)."""
+
+    return max(1, (len(text or "") + 3) // 4)
+
+
+def score_cutoff(distances: Sequence[float], gap_ratio: float) -> Optional[float]:
+    """Return the largest distance worth keeping, or ``None`` without an elbow.
+
+    ``distances`` are "lower is better" values. The sorted values are cut at
+    the first gap that accounts for at least ``gap_ratio`` of their total
+    spread; fewer than three values never produce an elbow.
+    """
+
+    values = sorted(float(value) for value in distances)
+    if len(values) < 3 or gap_ratio <= 0:
+        return None
+    spread = values[-1] - values[0]
+    if spread <= 0:
+        return None
+    for index in range(1, len(values)):
+        if values[index] - values[index - 1] >= gap_ratio * spread:
+            return values[index - 1]
+    return None
+
+
+def select_context(
+    documents: Sequence[Any],
+    limits: ContextLimits,
+    *,
+    relevance: Callable[[Any], Optional[float]],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    gap_ratio: float = DEFAULT_GAP_RATIO,
+) -> List[Any]:
+    """Pick the leading *documents* worth sending to the LLM.
+
+    ``relevance`` maps a document to a distance-like value (lower is better)
+    or ``None`` when unknown; unknown documents never trigger the elbow.
+    """
+
+    window = list(documents)[: limits.max_chunks]
+    known = [value for value in (relevance(doc) for doc in window) if value is not None]
+    cutoff = score_cutoff(known, gap_ratio)
+
+    selected: List[Any] = []
+    used_tokens = 0
+    for doc in window:
+        cost = estimate_tokens(getattr(doc, "page_content", "") or "")
+        if len(selected) >= limits.min_chunks:
+            value = relevance(doc)
+            if cutoff is not None and value is not None and value > cutoff:
+                break
+            if token_budget > 0 and used_tokens + cost > token_budget:
+                break
+        selected.append(doc)
+        used_tokens += cost
+
+    if len(selected) < len(window):
+        logger.debug(
+            "Contexto adaptativo: %s de %s fragmentos (~%s tokens)",
+            len(selected),
+            len(window),
+            used_tokens,
+        )
+    return selected
+
+
+__all__ = [
+    "ContextLimits",
+    "ContextSelectionConfig",
+    "estimate_tokens",
+    "score_cutoff",
+    "select_context",
+]
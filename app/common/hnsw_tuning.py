@@ -0,0 +1,154 @@
+"""Offline sweep of HNSW parameters against exact nearest neighbours.
+
+Used by ``scripts/analysis/tune_hnsw.py``. Indexes are built with
+``hnswlib`` (the ``chroma-hnswlib`` package Chroma itself uses), so
+``search_ef`` can be varied without rebuilding while ``M`` and
+``construction_ef`` are swept by building one index per combination.
+"""
+from __future__ import annotations
+
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass(frozen=True)
+class SweepResult:
+    """Recall and single-query latency of one parameter combination."""
+
+    m: int
+    construction_ef: int
+    search_ef: int
+    recall: float
+    latency_p50_ms: float
+    latency_p95_ms: float
+    build_seconds: float
+
+    def as_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+def split_held_out(
+    vectors: np.ndarray, query_count: int, *, seed: int = 0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Split *vectors* into ``(indexed, held_out_queries)``."""
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if len(vectors) < 2:
+        raise ValueError("Se necesitan al menos dos vectores para reservar consultas")
+    query_count = min(max(int(query_count), 1), len(vectors) - 1)
+    order = np.random.default_rng(seed).permutation(len(vectors))
+    return vectors[order[query_count:]], vectors[order[:query_count]]
+
+
+def exact_neighbours(index_vectors: np.ndarray, queries: np.ndarray, k: int, space: str = "l2") -> np.ndarray:
+    """Brute-force top-*k* ids (rows of *index_vectors*) for every query."""
+
+    data = np.asarray(index_vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(data))
+    if space == "cosine":
+        data = data / np.maximum(np.linalg.norm(data, axis=1, keepdims=True), 1e-12)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        distances = -(queries @ data.T)
+    elif space == "ip":
+        distances = -(queries @ data.T)
+    else:
+        distances = (
+            np.einsum("ij,ij->i", queries, queries)[:, None]
+            - 2.0 * (queries @ data.T)
+            + np.einsum("ij,ij->i", data, data)[None, :]
+        )
+    top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    rows = np.arange(len(queries))[:, None]
+    return top[rows, np.argsort(distances[rows, top], axis=1, kind="stable")]
+
+
+def sweep(
+    index_vectors: np.ndarray,
+    queries: np.ndarray,
+    *,
+    k: int = 10,
+    space: str = "l2",
+    m_values: Iterable[int] = (8, 16, 32),
+    construction_ef_values: Iterable[int] = (100, 200),
+    search_ef_values: Iterable[int] = (10, 20, 40, 80, 160),
+    build_threads: int = 0,
+    seed: int = 100,
+) -> List[SweepResult]:
+    """Measure recall@*k* and latency for every parameter combination."""
+
+    import hnswlib
+
+    data = np.asarray(index_vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(data))
+    truth = exact_neighbours(data, queries, k, space)
+    labels = np.arange(len(data))
+    results: List[SweepResult] = []
+
+    for m in m_values:
+        for construction_ef in construction_ef_values:
+            started = time.perf_counter()
+            index = hnswlib.Index(space=space, dim=data.shape[1])
+            index.init_index(max_elements=len(data), ef_construction=construction_ef, M=m, random_seed=seed)
+            index.add_items(data, labels, num_threads=build_threads or -1)
+            build_seconds = time.perf_counter() - started
+
+            for search_ef in search_ef_values:
+                index.set_ef(search_ef)
+                timings: List[float] = []
+                hits = 0
+                # One query at a time, as Chroma issues them.
+                for query, expected in zip(queries, truth):
+                    begin = time.perf_counter()
+                    found, _ = index.knn_query(query[None, :], k=k, num_threads=1)
+                    timings.append((time.perf_counter() - begin) * 1000)
+                    hits += len(np.intersect1d(found[0], expected, assume_unique=True))
+                results.append(
+                    SweepResult(
+                        m=m,
+                        construction_ef=construction_ef,
+                        search_ef=search_ef,
+                        recall=hits / (len(queries) * k),
+                        latency_p50_ms=float(np.percentile(timings, 50)),
+                        latency_p95_ms=float(np.percentile(timings, 95)),
+                        build_seconds=build_seconds,
+                    )
+                )
+    return results
+
+
+def pareto_frontier(results: Sequence[SweepResult]) -> List[SweepResult]:
+    """Combinations not beaten on both recall and p50 latency, fastest first."""
+
+    frontier: List[SweepResult] = []
+    best_recall = -1.0
+    for result in sorted(results, key=lambda item: (item.latency_p50_ms, -item.recall)):
+        if result.recall > best_recall:
+            frontier.append(result)
+            best_recall = result.recall
+    return frontier
+
+
+def recommend(results: Sequence[SweepResult], target_recall: float) -> Optional[SweepResult]:
+    """Fastest combination reaching *target_recall*, else the most accurate one."""
+
+    if not results:
+        return None
+    eligible = [result for result in results if result.recall >= target_recall]
+    if eligible:
+        return min(eligible, key=lambda item: (item.latency_p50_ms, item.build_seconds))
+    return max(results, key=lambda item: (item.recall, -item.latency_p50_ms))
+
+
+__all__ = [
+    "SweepResult",
+    "exact_neighbours",
+    "pareto_frontier",
+    "recommend",
+    "split_held_out",
+    "sweep",
+]
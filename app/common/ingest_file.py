@@ -84,12 +84,20 @@ from dataclasses import dataclass
 
 from common.chroma_db_settings import Chroma, invalidate_sources_cache
 from common.embeddings_manager import get_embeddings_manager
-from common.chroma_utils import add_langchain_documents, _make_metadata_serializable
+from common.chroma_utils import (
+    add_langchain_documents,
+    delete_documents_by_file_hash,
+    update_documents_by_file_hash,
+    get_or_create_collection,
+    _make_metadata_serializable,
+)
 
 # Import de constantes (cliente Chroma unificado)
 from common.constants import CHROMA_CLIENT, CHROMA_COLLECTIONS
 from common.text_normalization import Document, normalize_documents_nfc
+from common.token_chunking import TokenBudgetSplitter, get_token_splitter
 from common.privacy import PrivacyManager
+from common.tracing import span
 
 get_unique_sources_df = None
 try:
@@ -225,9 +233,31 @@ def _get_ingestor_for_extension(extension: str) -> BaseFileIngestor:
     raise ValueError(f"Tipo de archivo no soportado: {extension}")
 
 
-def _get_text_splitter_for_domain(domain: str) -> RecursiveCharacterTextSplitter:
-    """Get a text splitter configured specifically for the given domain."""
+def _embedding_model_for_domain(domain: str) -> Optional[str]:
+    try:
+        return get_embeddings_manager().get_config().model_for_domain(domain)
+    except Exception as exc:  # pragma: no cover - stubbed managers in tests
+        logger.debug("Modelo de embeddings desconocido para %s: %s", domain, exc)
+        return None
+
+
+def _get_text_splitter_for_domain(domain: str) -> RecursiveCharacterTextSplitter | TokenBudgetSplitter:
+    """Get a text splitter configured specifically for the given domain.
+
+    Chunks are sized in tokens of the domain's embedding model when its
+    tokenizer is available, keeping the domain separators and the overlap
+    ratio of ``CHUNKING_CONFIG``; otherwise the character sizes apply.
+    """
     config = CHUNKING_CONFIG.get(domain, CHUNKING_CONFIG["default"])
+    model_name = _embedding_model_for_domain(domain)
+    if model_name:
+        token_splitter = get_token_splitter(
+            model_name,
+            config.get("separators"),
+            overlap_ratio=config["chunk_overlap"] / config["chunk_size"],
+        )
+        if token_splitter is not None:
+            return token_splitter
     kwargs = {
         "chunk_size": config["chunk_size"],
         "chunk_overlap": config["chunk_overlap"],
@@ -495,7 +525,8 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
 
         try:
             try:
-                scan_result = scan_file_for_conversion(temp_file_path)
+                with span("ingest.security_scan", extension=file_ext):
+                    scan_result = scan_file_for_conversion(temp_file_path)
             except Exception as e:
                 logger.exception(f"Fallo del escáner de seguridad en {file_name}: {e}")
                 record_security_event(event="security_scan_error", file=file_name, error=str(e))
@@ -543,8 +574,10 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
 
     # 2) Pre-check duplicado por hash en colección destino
     #    (Evita cargar/splitear si ya existe)
-    collection = CHROMA_CLIENT.get_or_create_collection(ingestor_cls.collection_name)
-    if _collection_contains_file_by_hash(collection, file_hash):
+    with span("ingest.duplicate_check", collection=ingestor_cls.collection_name):
+        collection = get_or_create_collection(CHROMA_CLIENT, ingestor_cls.collection_name)
+        is_duplicate = _collection_contains_file_by_hash(collection, file_hash)
+    if is_duplicate:
         # Invalidar cache de listados para reflejar estado real
         try:
             invalidate_sources_cache()
@@ -560,7 +593,8 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
                 uploaded_file.seek(0)
             except Exception:
                 pass
-        documents, ingestor = load_single_document(uploaded_file, file_name, file_hash=file_hash)
+        with span("ingest.load", extension=file_ext, bytes=file_size):
+            documents, ingestor = load_single_document(uploaded_file, file_name, file_hash=file_hash)
     except ValueError as ve:
         logger.error(f"Validation error loading document {file_name}: {ve}")
         raise
@@ -573,8 +607,9 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
 
     # 4) Chunking y normalización
     try:
-        text_splitter = _get_text_splitter_for_domain(ingestor.domain)
-        texts = text_splitter.split_documents(documents)
+        with span("ingest.chunking", collection=ingestor.collection_name):
+            text_splitter = _get_text_splitter_for_domain(ingestor.domain)
+            texts = text_splitter.split_documents(documents)
 
         # Agregar metadatos de chunking y file_hash para cada chunk
         for i, text in enumerate(texts):
@@ -588,9 +623,12 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
                     "file_hash": file_hash,
                     "file_size": file_size,
                 })
+                if isinstance(text_splitter, TokenBudgetSplitter):
+                    text.metadata["chunk_token_limit"] = text_splitter.max_tokens
                 text.metadata = _make_metadata_serializable(text.metadata)
 
-        normalized = normalize_documents_nfc(texts)
+        with span("ingest.normalize", collection=ingestor.collection_name):
+            normalized = normalize_documents_nfc(texts)
         return ProcessResult(normalized, ingestor)
     except ValueError as ve:
         logger.error(f"Value error processing documents for file {file_name}: {ve}")
@@ -605,7 +643,7 @@ def process_file(uploaded_file, file_name: str) -> ProcessResult:
 
 def does_vectorstore_exist(settings, collection_name: str) -> bool:
     """Check if a vectorstore already contains data for *collection_name*."""
-    collection = settings.get_or_create_collection(collection_name)
+    collection = get_or_create_collection(settings, collection_name)
     try:
         return collection.count() > 0
     except Exception:  # pragma: no cover - compatibility fallback
@@ -743,7 +781,7 @@ def ingest_file(uploaded_file, file_name):
 
                 collection_ref = locals().get('collection')
                 if collection_ref is None:
-                    collection_ref = collection = CHROMA_CLIENT.get_or_create_collection(ingestor.collection_name)
+                    collection_ref = collection = get_or_create_collection(CHROMA_CLIENT, ingestor.collection_name)
 
                 try:
                     if hasattr(collection_ref, 'add'):
@@ -959,9 +997,64 @@ def delete_file_from_vectordb(filename: str) -> bool:
     return True
 
 
+def delete_file_version(file_name: str, file_hash: str) -> int:
+    """Remove the chunks of one version of ``file_name`` identified by its SHA-256.
+
+    Unlike :func:`delete_file_from_vectordb`, other files sharing the same
+    basename are left untouched. Returns the number of deleted chunks
+    (``0`` for extensions that are never ingested).
+    """
+
+    extension = os.path.splitext(file_name)[1].lower()
+    if extension not in SUPPORTED_EXTENSIONS:
+        return 0  # never ingested, nothing to retract
+    ingestor = _get_ingestor_for_extension(extension)
+    collection = get_or_create_collection(CHROMA_CLIENT, ingestor.collection_name)
+    deleted = delete_documents_by_file_hash(collection, file_hash)
+    if deleted:
+        invalidate_sources_cache()
+    return deleted
+
+
+def rename_file_version(
+    old_name: str,
+    new_name: str,
+    file_hash: str,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> int:
+    """Point the chunks of ``old_name`` with SHA-256 ``file_hash`` at ``new_name``.
+
+    A renamed file keeps its content hash, so ingesting it again would be
+    rejected as a duplicate and its chunks would keep the old name. Only
+    their metadata is rewritten (``uploaded_file_name`` plus *metadata*).
+    Returns the number of updated chunks; ``0`` when nothing can be renamed
+    in place, e.g. because the new extension belongs to another collection
+    or either extension is not supported, in which case the caller should retract the old version and ingest the
+    new one.
+    """
+
+    old_extension = os.path.splitext(old_name)[1].lower()
+    new_extension = os.path.splitext(new_name)[1].lower()
+    if old_extension not in SUPPORTED_EXTENSIONS or new_extension not in SUPPORTED_EXTENSIONS:
+        return 0
+    old_ingestor = _get_ingestor_for_extension(old_extension)
+    new_ingestor = _get_ingestor_for_extension(new_extension)
+    if old_ingestor.collection_name != new_ingestor.collection_name:
+        return 0
+    collection = get_or_create_collection(CHROMA_CLIENT, new_ingestor.collection_name)
+    updates: Dict[str, Any] = {"uploaded_file_name": os.path.basename(new_name)}
+    updates.update(metadata or {})
+    updated = update_documents_by_file_hash(collection, file_hash, updates)
+    if updated:
+        invalidate_sources_cache()
+        logger.info("Renombrado %s -> %s (%s fragmentos)", old_name, new_name, updated)
+    return updated
+
+
 __all__ = [
     "SUPPORTED_EXTENSIONS",
     "delete_file_from_vectordb",
+    "delete_file_version",
     "does_vectorstore_exist",
     "get_embeddings",
     "get_unique_sources_df",
@@ -969,5 +1062,6 @@ __all__ = [
     "ProcessedFile",
     "load_single_document",
     "process_file",
+    "rename_file_version",
     "validate_uploaded_file",
 ]
@@ -152,7 +152,7 @@ def _translate(key: str, language: str, **kwargs) -> str:
 
 
 try:
-    from langdetect import DetectorFactory, LangDetectException, detect
+    from langdetect import DetectorFactory
 except ImportError:
     print("Error: langdetect module not found. Please install it with 'pip install langdetect==1.0.9'")
     import sys
@@ -201,6 +201,7 @@ class LegalComplianceGuardError(RuntimeError):
         return _translate(self.message_key, language, **formatted)
 
 model = os.environ.get("MODEL")
+ollama_base_url = os.environ.get("OLLAMA_BASE_URL", "http://ollama:11434")
 # For embeddings model, the example uses a sentence-transformers model
 # https://www.sbert.net/docs/pretrained_models.html
 # "The all-mpnet-base-v2 model provides the best quality, while all-MiniLM-L6-v2 is 5 times faster and still offers good quality."
@@ -221,17 +222,27 @@ except (ImportError, AttributeError):  # pragma: no cover - defensive fallback
 
     CHROMA_SETTINGS = SimpleNamespace(get_collection=lambda *_: _EmptyCollection())
 
+from common.collection_router import get_collection_router, routing_enabled
+from common.context_assembly import (
+    ContextAssemblyConfig,
+    collapse_near_duplicates,
+    merge_adjacent_chunks,
+    pack_to_budget,
+)
+from common.context_selection import ContextSelectionConfig, select_context
 from common.embeddings_manager import get_embeddings_manager
-from common.observability import record_rag_response
+from common.language_id import get_language_identifier
+from common.lexical_index import reciprocal_rank_fusion, search_documents as search_lexical_documents
+from common.llm_scheduler import LLMOverloadedError, get_llm_scheduler
+from common.local_vector_cache import LocalVectorRetriever, get_local_vector_cache
+from common.observability import record_collection_routing, record_rag_response
+from common.reranker import get_reranker_manager
+from common.tracing import get_tracer, llm_timing_callbacks, span as trace_span
 
 
 DetectorFactory.seed = 0
 
 SUPPORTED_LANGUAGES = {"es", "en"}
-SPANISH_HINT_CHARACTERS = set("áéíóúüñÁÉÍÓÚÜÑ¿¡")
-SPANISH_HINT_WORDS = {"hola", "buenos", "buenas", "gracias", "información", "informacion"}
-ENGLISH_HINT_WORDS = {"hello", "hi", "please", "summary", "status", "report", "what", "when", "where", "why", "how", "update", "overview", "there"}
-
 LEGAL_COMPLIANCE_COLLECTION = "legal_compliance"
 LEGAL_COMPLIANCE_ALLOWED_METADATA_KEYS = frozenset(
     {
@@ -286,40 +297,17 @@ PROMPT_BUILDERS = {
 }
 
 def detect_language(text: str) -> str:
-    """Detect the language of *text* returning ``es`` or ``en``."""
-
-    normalized_text = normalize_to_nfc(text or "")
-    stripped_text = normalized_text.strip()
-    if not stripped_text:
-        return "es"
-
-    normalized_lower = stripped_text.lower()
-    tokens = {token for token in re.split(r"\W+", normalized_lower) if token}
-    has_spanish_hint_char = any(char in SPANISH_HINT_CHARACTERS for char in stripped_text)
-    has_spanish_hint_word = any(word in normalized_lower for word in SPANISH_HINT_WORDS)
-    has_english_hint_word = bool(tokens & ENGLISH_HINT_WORDS)
+    """Detect the language of *text* returning ``es`` or ``en``.
 
-    try:
-        detected = detect(stripped_text).lower()
-    except LangDetectException:
-        detected = ""
-
-    if has_spanish_hint_char or has_spanish_hint_word:
-        return "es"
-
-    if has_english_hint_word:
-        return "en"
+    Hint characters/words and a trigram model answer almost every query;
+    ``langdetect`` is only consulted for ambiguous inputs (see
+    :mod:`common.language_id`).
+    """
 
-    if detected.startswith("es"):
+    stripped_text = normalize_to_nfc(text or "").strip()
+    if not stripped_text:
         return "es"
-
-    if detected.startswith("en"):
-        return "en"
-
-    if stripped_text.isascii():
-        return "en"
-
-    return "es"
+    return get_language_identifier().classify(stripped_text)
 
 
 def _extract_legal_metadata(document: Any) -> Mapping[str, Any] | None:
@@ -415,7 +403,14 @@ _PATCHABLE_DEPENDENCIES: Tuple[str, ...] = (
     "CHROMA_SETTINGS",
     "_get_collection_document_count",
     "_get_collection_store",
+    "_local_mirror_retriever",
+    "_retrieve_lexical_documents",
+    "_route_collection_states",
+    "get_collection_router",
     "get_embeddings",
+    "get_llm_scheduler",
+    "get_local_vector_cache",
+    "get_reranker_manager",
 )
 
 
@@ -435,6 +430,7 @@ class _TaskDirectives:
 
     prompt_variant: str
     candidate_collections: Tuple[str, ...]
+    explicit: bool = False
 
 
 def _get_collection_store(
@@ -494,7 +490,8 @@ def _prepare_collection_states() -> List[_CollectionState]:
     for collection_name, collection_config in CHROMA_COLLECTIONS.items():
         embeddings = manager.get_embeddings(collection_config.domain)
         store = _get_collection_store(collection_name, embeddings)
-        document_count = _get_collection_document_count(collection_name)
+        with trace_span("rag.collection_count", collection=collection_name):
+            document_count = _get_collection_document_count(collection_name)
         states.append(
             _CollectionState(
                 name=collection_name,
@@ -794,6 +791,7 @@ def _analyse_task_context(
     return _TaskDirectives(
         prompt_variant=prompt_variant,
         candidate_collections=tuple(candidate_collections),
+        explicit=bool(metadata_collections or combined_domains),
     )
 
 
@@ -834,6 +832,56 @@ def _select_collection_states(
     return list(states)
 
 
+def _route_collection_states(
+    query: str, states: Sequence[_CollectionState]
+) -> List[_CollectionState]:
+    """Keep only the collections whose centroid is close to *query*.
+
+    The query is embedded once per distinct embeddings model. Any failure or
+    low-confidence decision keeps the full fan-out.
+    """
+
+    if len(states) <= 1 or not routing_enabled():
+        return list(states)
+
+    module = sys.modules.get(__name__)
+    router_getter = getattr(module, "get_collection_router", get_collection_router)
+    manager_getter = getattr(module, "get_embeddings_manager", get_embeddings_manager)
+
+    try:
+        router = router_getter()
+        # Collections whose centroid misses chunks are treated as unknown.
+        counts = {state.name: state.document_count for state in states}
+        known = set(router.known_collections(counts))
+        if sum(1 for state in states if state.name in known) <= router.top_m:
+            # Nothing could be skipped; avoid embedding the query needlessly.
+            record_collection_routing("few_candidates", len(states), 0)
+            return list(states)
+        manager = manager_getter()
+        vectors_by_model: Dict[int, Sequence[float]] = {}
+        query_vectors: Dict[str, Sequence[float]] = {}
+        for state in states:
+            embeddings = manager.get_embeddings(state.domain)
+            key = id(embeddings)
+            if key not in vectors_by_model:
+                vectors_by_model[key] = embeddings.embed_query(query)
+            query_vectors[state.name] = vectors_by_model[key]
+        decision = router.route(query_vectors, [state.name for state in states], counts)
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("No se pudo enrutar la consulta por centroides: %s", exc)
+        record_collection_routing("error", len(states), 0)
+        return list(states)
+
+    record_collection_routing(decision.reason, len(decision.selected), len(decision.skipped))
+    if decision.skipped:
+        logger.info(
+            "Enrutador de colecciones omitió: %s",
+            ", ".join(decision.skipped),
+        )
+    selected = set(decision.selected)
+    return [state for state in states if state.name in selected]
+
+
 def _retrieve_from_collections(
     query: str,
     states: Sequence[_CollectionState],
@@ -867,6 +915,115 @@ def _retrieve_from_collections(
     return [doc for doc, _ in scored_documents[:max_results]]
 
 
+def _build_document(page_content: str, metadata: Dict[str, Any]) -> Any:
+    """Create a LangChain document, tolerating lightweight stand-ins."""
+
+    try:
+        from langchain_core.documents import Document as _Document
+
+        return _Document(page_content=page_content, metadata=metadata)
+    except (ImportError, TypeError):
+        return SimpleNamespace(page_content=page_content, metadata=metadata)
+
+
+class _ScoredStoreRetriever:
+    """Retriever that keeps the vector distance in ``metadata['distance']``."""
+
+    def __init__(self, store: Any, k: int) -> None:
+        self._store = store
+        self._k = k
+
+    def invoke(self, query: str) -> List[Any]:
+        documents: List[Any] = []
+        for doc, distance in self._store.similarity_search_with_score(query, k=self._k):
+            metadata = getattr(doc, "metadata", None)
+            if isinstance(metadata, dict):
+                metadata["distance"] = float(distance)
+            documents.append(doc)
+        return documents
+
+
+def _create_store_retriever(store: Any, k: int) -> Any:
+    """Prefer scored similarity search so context selection can see distances."""
+
+    if callable(getattr(store, "similarity_search_with_score", None)):
+        return _ScoredStoreRetriever(store, k)
+    return store.as_retriever(search_kwargs={"k": k})
+
+
+def _local_mirror_retriever(state: _CollectionState, k: int) -> Optional[Any]:
+    """Return an in-memory retriever when *state* is small enough to mirror."""
+
+    module = sys.modules.get(__name__)
+    cache = getattr(module, "get_local_vector_cache", get_local_vector_cache)()
+    if not cache.eligible(state.document_count):
+        return None
+    embeddings = getattr(state.store, "embeddings", None)
+    if embeddings is None or not hasattr(embeddings, "embed_query"):
+        return None
+    client = getattr(module, "CHROMA_SETTINGS", CHROMA_SETTINGS)
+    mirror = cache.get_mirror(client, state.name, state.document_count)
+    if mirror is None:
+        return None
+    return LocalVectorRetriever(mirror, embeddings, k, _build_document)
+
+
+def _retrieve_lexical_documents(
+    query: str,
+    collection_names: Sequence[str],
+    max_results: int,
+) -> List[Tuple[str, List[Any]]]:
+    """Return BM25 rankings per collection as documents ready for fusion."""
+
+    rankings: List[Tuple[str, List[Any]]] = []
+    for collection_name in collection_names:
+        hits = search_lexical_documents(collection_name, query, max(max_results, 1))
+        if not hits:
+            continue
+        documents = []
+        for hit in hits:
+            metadata = dict(hit.metadata)
+            metadata.setdefault("collection", collection_name)
+            documents.append(_build_document(hit.text, metadata))
+        rankings.append((collection_name, documents))
+    return rankings
+
+
+def _fuse_hybrid_rankings(
+    rankings: Sequence[Tuple[str, Sequence[Any]]],
+    max_results: int,
+) -> List[Any]:
+    """Merge per-collection vector and lexical rankings with reciprocal rank fusion."""
+
+    return [doc for doc, _ in _fuse_hybrid_rankings_with_scores(rankings, max_results)]
+
+
+def _fuse_hybrid_rankings_with_scores(
+    rankings: Sequence[Tuple[str, Sequence[Any]]],
+    max_results: int,
+) -> List[Tuple[Any, float]]:
+    """Return fused documents paired with their reciprocal rank fusion score.
+
+    Documents are identified by collection and content, so a chunk found by
+    both retrievers is counted once with both contributions. Ties keep the
+    order in which rankings were supplied (vector results first).
+    """
+
+    documents: Dict[Tuple[str, str], Any] = {}
+    keyed_rankings: List[List[Tuple[str, str]]] = []
+    for collection_name, ranked_documents in rankings:
+        keys: List[Tuple[str, str]] = []
+        for doc in ranked_documents:
+            key = (collection_name, normalize_to_nfc(getattr(doc, "page_content", "") or ""))
+            documents.setdefault(key, doc)
+            keys.append(key)
+        keyed_rankings.append(keys)
+
+    fused = reciprocal_rank_fusion(keyed_rankings)
+    ordered = sorted(fused, key=lambda key: -fused[key])
+    return [(documents[key], fused[key]) for key in ordered[:max_results]]
+
+
 def get_embeddings(domain: Optional[str] = None) -> Any:
     """Return embeddings for *domain* using the shared manager."""
 
@@ -906,6 +1063,7 @@ def response(
     language_code = "es"
 
     start_time = time.perf_counter()
+    response_span = get_tracer().start_span("rag.response")
     rag_started = False
     status = "error"
     context_document_count = 0
@@ -919,7 +1077,8 @@ def response(
     }
 
     try:
-        detected_language = detect_language(query)
+        with trace_span("rag.language_detection"):
+            detected_language = detect_language(query)
         requested_language = (language or "").strip().lower()
 
         if requested_language in SUPPORTED_LANGUAGES:
@@ -982,6 +1141,11 @@ def response(
         # Prepare collection states
         collection_states = _prepare_collection_states()
         selected_states = _select_collection_states(collection_states, directives)
+        if not directives.explicit:
+            module = sys.modules.get(__name__)
+            router = getattr(module, "_route_collection_states", _route_collection_states)
+            with trace_span("rag.routing"):
+                selected_states = router(stripped_query, selected_states)
         prompt_variant = directives.prompt_variant
 
         # Update per_collection_counts with actual document counts
@@ -997,14 +1161,25 @@ def response(
             or "ninguna",
         )
 
+        module = sys.modules.get(__name__)
+        reranker = getattr(module, "get_reranker_manager", get_reranker_manager)()
+        context_config = ContextSelectionConfig.from_sources(target_source_chunks)
+        context_limits = context_config.limits_for(prompt_variant)
+        assembly_config = ContextAssemblyConfig.from_sources()
+        retrieval_k = reranker.candidate_limit(context_limits.max_chunks)
+
         retrievers_by_collection: List[Tuple[str, Any]] = []
         for state in selected_states:
             if state.document_count == 0:
                 continue
 
             try:
-                # Create retriever from the vector store
-                retriever = state.store.as_retriever(search_kwargs={"k": target_source_chunks})
+                # Small collections are answered from an in-process mirror
+                retriever = getattr(
+                    module, "_local_mirror_retriever", _local_mirror_retriever
+                )(state, retrieval_k)
+                if retriever is None:
+                    retriever = _create_store_retriever(state.store, retrieval_k)
                 retrievers_by_collection.append((state.name, retriever))
             except Exception as exc:
                 logger.warning(
@@ -1018,8 +1193,9 @@ def response(
             status = "empty"
             return _translate("no_documents", language_code)
 
-        prompt_builder = _resolve_prompt_builder(prompt_variant)
-        prompt = prompt_builder(language_code)
+        with trace_span("rag.prompt_build", prompt_variant=prompt_variant):
+            prompt_builder = _resolve_prompt_builder(prompt_variant)
+            prompt = prompt_builder(language_code)
 
         def _document_priority(doc: Any) -> Tuple[int, float]:
             metadata = getattr(doc, "metadata", {}) or {}
@@ -1041,27 +1217,30 @@ def response(
             nonlocal context_collections_breakdown
             context_collections_breakdown = {}
             aggregated: List[Any] = []
+            vector_rankings: List[Tuple[str, List[Any]]] = []
 
             for collection_name, retriever in retrievers_by_collection:
-                try:
-                    results = retriever.invoke(rag_query)
-                except AttributeError:
+                with trace_span("rag.retrieval", collection=collection_name) as retrieval_span:
                     try:
-                        results = retriever.get_relevant_documents(rag_query)
-                    except Exception as retrieval_error:  # pragma: no cover - defensive
+                        results = retriever.invoke(rag_query)
+                    except AttributeError:
+                        try:
+                            results = retriever.get_relevant_documents(rag_query)
+                        except Exception as retrieval_error:  # pragma: no cover - defensive
+                            logger.warning(
+                                "No se pudo recuperar documentos de la colección '%s': %s",
+                                collection_name,
+                                retrieval_error,
+                            )
+                            continue
+                    except Exception as retrieval_error:
                         logger.warning(
                             "No se pudo recuperar documentos de la colección '%s': %s",
                             collection_name,
                             retrieval_error,
                         )
                         continue
-                except Exception as retrieval_error:
-                    logger.warning(
-                        "No se pudo recuperar documentos de la colección '%s': %s",
-                        collection_name,
-                        retrieval_error,
-                    )
-                    continue
+                    retrieval_span.set_attribute("documents", len(results or ()))
 
                 if not results:
                     continue
@@ -1071,17 +1250,89 @@ def response(
                     if isinstance(metadata, dict):
                         metadata.setdefault("collection", collection_name)
                     aggregated.append(doc)
+                vector_rankings.append(
+                    (collection_name, sorted(results, key=_document_priority))
+                )
 
-            if not aggregated:
+            lexical_retriever = getattr(
+                module, "_retrieve_lexical_documents", _retrieve_lexical_documents
+            )
+            with trace_span("rag.lexical_search"):
+                lexical_rankings = lexical_retriever(
+                    rag_query,
+                    [name for name, _ in retrievers_by_collection],
+                    retrieval_k,
+                )
+
+            # With reranking or de-duplication enabled every candidate
+            # survives the first stage so duplicates do not eat context slots.
+            selection_limit = context_limits.max_chunks
+            if reranker.enabled or assembly_config.enabled:
+                selection_limit = retrieval_k * max(
+                    len(vector_rankings) + len(lexical_rankings), 1
+                )
+
+            # Distance-like relevance (lower is better) from whichever stage
+            # produced the final order; it drives the adaptive cut-off.
+            relevance: Dict[int, float] = {}
+            if lexical_rankings:
+                fused = _fuse_hybrid_rankings_with_scores(
+                    vector_rankings + lexical_rankings,
+                    selection_limit,
+                )
+                selected_docs = [doc for doc, _ in fused]
+                relevance = {id(doc): -score for doc, score in fused}
+            elif not aggregated:
                 return []
+            else:
+                scored_docs: List[Tuple[int, Any, Tuple[int, float]]] = [
+                    (index, doc, _document_priority(doc))
+                    for index, doc in enumerate(aggregated)
+                ]
+
+                scored_docs.sort(key=lambda item: (item[2][0], item[2][1], item[0]))
+                selected_docs = [doc for _, doc, _ in scored_docs[:selection_limit]]
+                if scored_docs and scored_docs[0][2][0] < 2:
+                    leading_tier = scored_docs[0][2][0]
+                    relevance = {
+                        id(doc): priority[1]
+                        for _, doc, priority in scored_docs[:selection_limit]
+                        if priority[0] == leading_tier
+                    }
+
+            if reranker.enabled:
+                with trace_span("rag.rerank", candidates=len(selected_docs)):
+                    reranked = reranker.rerank_with_scores(
+                        rag_query, selected_docs, len(selected_docs)
+                    )
+                selected_docs = [doc for doc, _ in reranked]
+                relevance = {
+                    id(doc): -score for doc, score in reranked if score is not None
+                }
+
+            with trace_span("rag.context_selection", candidates=len(selected_docs)) as selection_span:
+                if assembly_config.enabled:
+                    selected_docs = collapse_near_duplicates(
+                        selected_docs,
+                        containment_threshold=assembly_config.containment_threshold,
+                        simhash_max_distance=assembly_config.simhash_max_distance,
+                    )
 
-            scored_docs: List[Tuple[int, Any, Tuple[int, float]]] = [
-                (index, doc, _document_priority(doc))
-                for index, doc in enumerate(aggregated)
-            ]
+                if context_config.enabled:
+                    selected_docs = select_context(
+                        selected_docs,
+                        context_limits,
+                        relevance=lambda doc: relevance.get(id(doc)),
+                        token_budget=context_config.token_budget,
+                        gap_ratio=context_config.gap_ratio,
+                    )
+                else:
+                    selected_docs = selected_docs[: context_limits.max_chunks]
 
-            scored_docs.sort(key=lambda item: (item[2][0], item[2][1], item[0]))
-            selected_docs = [doc for _, doc, _ in scored_docs[:target_source_chunks]]
+                if assembly_config.enabled:
+                    selected_docs = merge_adjacent_chunks(selected_docs, _build_document)
+                    selected_docs = pack_to_budget(selected_docs, context_config.token_budget)
+                selection_span.set_attribute("selected", len(selected_docs))
 
             breakdown_counter: Counter[str] = Counter()
             for doc in selected_docs:
@@ -1099,6 +1350,7 @@ def response(
         # activate/deactivate the streaming StdOut callback for LLMs
         streaming_available = StreamingStdOutCallbackHandler is not None and not args.mute_stream
         callbacks = [StreamingStdOutCallbackHandler()] if streaming_available else []
+        callbacks.extend(llm_timing_callbacks())
 
         if Ollama is None:
             raise RuntimeError(
@@ -1109,8 +1361,14 @@ def response(
             model=model,
             callbacks=callbacks,
             temperature=0,
-            base_url='http://ollama:11434',
+            base_url=ollama_base_url,
         )
+        llm_scheduler = get_llm_scheduler()
+
+        def scheduled_llm(prompt_value, config=None):
+            # Only the generation waits for a slot; retrieval runs unthrottled.
+            with llm_scheduler.slot():
+                return llm.invoke(prompt_value, config=config)
 
         def format_docs(docs):
             nonlocal context_document_count
@@ -1160,7 +1418,7 @@ def response(
                     "question": RunnablePassthrough(),
                 }
                 | prompt
-                | llm
+                | RunnableLambda(scheduled_llm)
                 | StrOutputParser()
             )
 
@@ -1171,6 +1429,8 @@ def response(
             status = "success"
 
             return result
+        except LLMOverloadedError:
+            raise
         except Exception as pipeline_error:
             # For testing mode, we would need to check if we're in testing
             testing_mode = os.getenv("PYTEST_CURRENT_TEST") is not None
@@ -1192,6 +1452,10 @@ def response(
             guard_exc.message_key,
         )
         raise
+    except LLMOverloadedError as overload_exc:
+        status = "overloaded"
+        logger.warning("Consulta rechazada por saturación del LLM: %s", overload_exc.reason)
+        raise
     except Exception as e:
         error_msg = f"Error al procesar la consulta: {str(e)}"
         logger.error(error_msg)
@@ -1209,4 +1473,7 @@ def response(
                 knowledge_base_collections=per_collection_counts,
                 collection_domains=collection_domains,
             )
+        response_span.set_attribute("status", status)
+        response_span.set_attribute("language", language_code)
+        response_span.end()
 
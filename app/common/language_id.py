@@ -0,0 +1,167 @@
+"""Fast es/en language identification for the chat hot path.
+
+Queries are classified with, in order: the Spanish/English hint heuristics,
+a naive Bayes score over character trigrams using the precomputed table in
+:mod:`common.language_profiles`, and only for ambiguous inputs the much
+slower ``langdetect``. Results for recent queries are kept in an LRU cache.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+from functools import lru_cache
+from threading import Lock
+from typing import Callable, Dict, Optional, Tuple
+
+from .language_profiles import EN_TRIGRAMS, ES_TRIGRAMS, UNSEEN_LOG_PROBABILITY
+
+logger = logging.getLogger(__name__)
+
+
+SPANISH_HINT_CHARACTERS = set("áéíóúüñÁÉÍÓÚÜÑ¿¡")
+SPANISH_HINT_WORDS = {"hola", "buenos", "buenas", "gracias", "información", "informacion"}
+ENGLISH_HINT_WORDS = {"hello", "hi", "please", "summary", "status", "report", "what", "when", "where", "why", "how", "update", "overview", "there"}
+
+_CACHE_SIZE_ENV_VAR = "LANGUAGE_ID_CACHE_SIZE"
+_MIN_MARGIN_ENV_VAR = "LANGUAGE_ID_MIN_MARGIN"
+
+DEFAULT_CACHE_SIZE = 2048
+DEFAULT_MIN_MARGIN = 0.25
+
+_NON_LETTERS = re.compile(r"[^\w]+|[\d_]+", re.UNICODE)
+_PROFILES: Dict[str, Dict[str, float]] = {"es": ES_TRIGRAMS, "en": EN_TRIGRAMS}
+
+
+def _langdetect_fallback(text: str) -> str:
+    """Ask ``langdetect`` for a language code, returning ``""`` on failure."""
+
+    try:
+        from langdetect import DetectorFactory, LangDetectException, detect
+    except ImportError:  # pragma: no cover - dependency declared in requirements
+        return ""
+    DetectorFactory.seed = 0
+    try:
+        return detect(text).lower()
+    except LangDetectException:
+        return ""
+
+
+def trigram_scores(text: str) -> Tuple[Dict[str, float], int]:
+    """Return per-language log-likelihoods of *text* and the trigram count."""
+
+    scores = {language: 0.0 for language in _PROFILES}
+    count = 0
+    for word in _NON_LETTERS.sub(" ", text.lower()).split():
+        padded = f" {word} "
+        for start in range(len(padded) - 2):
+            gram = padded[start:start + 3]
+            count += 1
+            for language, table in _PROFILES.items():
+                scores[language] += table.get(gram, UNSEEN_LOG_PROBABILITY[language])
+    return scores, count
+
+
+class LanguageIdentifier:
+    """Cached es/en classifier that only falls back to langdetect when unsure."""
+
+    def __init__(
+        self,
+        *,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        min_margin: float = DEFAULT_MIN_MARGIN,
+        fallback: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        self.min_margin = float(min_margin)
+        self._fallback = fallback or _langdetect_fallback
+        self._classify_cached = lru_cache(maxsize=max(int(cache_size), 0))(self._classify)
+
+    @classmethod
+    def from_environment(cls) -> "LanguageIdentifier":
+        try:
+            cache_size = int(os.environ.get(_CACHE_SIZE_ENV_VAR, DEFAULT_CACHE_SIZE))
+        except ValueError:
+            cache_size = DEFAULT_CACHE_SIZE
+        try:
+            min_margin = float(os.environ.get(_MIN_MARGIN_ENV_VAR, DEFAULT_MIN_MARGIN))
+        except ValueError:
+            min_margin = DEFAULT_MIN_MARGIN
+        return cls(cache_size=cache_size, min_margin=min_margin)
+
+    def classify(self, text: str) -> str:
+        """Return ``es`` or ``en`` for already normalised, stripped *text*."""
+
+        if not text:
+            return "es"
+        return self._classify_cached(text)
+
+    def cache_info(self):
+        return self._classify_cached.cache_info()
+
+    def clear_cache(self) -> None:
+        self._classify_cached.cache_clear()
+
+    def ngram_guess(self, text: str) -> Optional[str]:
+        """Return the trigram model's answer, or ``None`` when ambiguous."""
+
+        scores, count = trigram_scores(text)
+        if count == 0:
+            return None
+        margin = (scores["es"] - scores["en"]) / count
+        if margin >= self.min_margin:
+            return "es"
+        if margin <= -self.min_margin:
+            return "en"
+        return None
+
+    def _classify(self, text: str) -> str:
+        lowered = text.lower()
+        if any(char in SPANISH_HINT_CHARACTERS for char in text):
+            return "es"
+        if any(word in lowered for word in SPANISH_HINT_WORDS):
+            return "es"
+        tokens = {token for token in re.split(r"\W+", lowered) if token}
+        if tokens & ENGLISH_HINT_WORDS:
+            return "en"
+
+        guess = self.ngram_guess(text)
+        if guess is not None:
+            return guess
+
+        detected = self._fallback(text)
+        logger.debug("Idioma ambiguo resuelto con langdetect: %s", detected or "desconocido")
+        if detected.startswith("es"):
+            return "es"
+        if detected.startswith("en"):
+            return "en"
+        return "en" if text.isascii() else "es"
+
+
+_DEFAULT_IDENTIFIER: Optional[LanguageIdentifier] = None
+_IDENTIFIER_LOCK = Lock()
+
+
+def get_language_identifier() -> LanguageIdentifier:
+    global _DEFAULT_IDENTIFIER
+    if _DEFAULT_IDENTIFIER is None:
+        with _IDENTIFIER_LOCK:
+            if _DEFAULT_IDENTIFIER is None:
+                _DEFAULT_IDENTIFIER = LanguageIdentifier.from_environment()
+    return _DEFAULT_IDENTIFIER
+
+
+def configure_default_identifier(identifier: Optional[LanguageIdentifier]) -> None:
+    global _DEFAULT_IDENTIFIER
+    with _IDENTIFIER_LOCK:
+        _DEFAULT_IDENTIFIER = identifier
+
+
+__all__ = [
+    "ENGLISH_HINT_WORDS",
+    "LanguageIdentifier",
+    "SPANISH_HINT_CHARACTERS",
+    "SPANISH_HINT_WORDS",
+    "configure_default_identifier",
+    "get_language_identifier",
+    "trigram_scores",
+]
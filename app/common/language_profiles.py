@@ -0,0 +1,1075 @@
+"""Character trigram log-probabilities for the es/en classifier.
+
+Generated by ``scripts/analysis/build_language_profiles.py`` from the
+langdetect Wikipedia profiles (Apache 2.0). Do not edit by hand.
+"""
+
+from typing import Dict
+
+ES_TRIGRAMS: Dict[str, float] = {
+    ' a ': -5.991,
+    ' ac': -7.004,
+    ' al': -5.887,
+    ' am': -7.659,
+    ' an': -6.690,
+    ' ar': -6.629,
+    ' as': -7.370,
+    ' at': -8.248,
+    ' au': -7.211,
+    ' ba': -6.448,
+    ' be': -7.832,
+    ' bo': -7.346,
+    ' br': -7.443,
+    ' bu': -8.232,
+    ' ca': -5.506,
+    ' ce': -7.151,
+    ' ch': -6.954,
+    ' ci': -6.738,
+    ' cl': -7.731,
+    ' co': -4.712,
+    ' cr': -7.226,
+    ' cu': -6.705,
+    ' da': -7.723,
+    ' de': -3.455,
+    ' di': -5.867,
+    ' do': -7.103,
+    ' el': -4.835,
+    ' en': -4.543,
+    ' es': -4.550,
+    ' ex': -7.358,
+    ' fa': -6.843,
+    ' fe': -7.290,
+    ' fi': -7.210,
+    ' fo': -7.178,
+    ' fr': -6.489,
+    ' fu': -6.071,
+    ' ga': -7.462,
+    ' ge': -7.398,
+    ' gr': -6.777,
+    ' ha': -6.505,
+    ' he': -7.497,
+    ' hi': -7.268,
+    ' ho': -7.508,
+    ' in': -6.010,
+    ' is': -7.973,
+    ' it': -8.518,
+    ' ja': -7.728,
+    ' ju': -6.817,
+    ' la': -4.405,
+    ' le': -7.003,
+    ' li': -7.035,
+    ' lo': -5.569,
+    ' ma': -5.867,
+    ' me': -6.491,
+    ' mi': -6.704,
+    ' mo': -6.747,
+    ' mu': -6.698,
+    ' má': -7.404,
+    ' na': -6.809,
+    ' ne': -7.903,
+    ' no': -6.314,
+    ' o ': -6.746,
+    ' of': -8.265,
+    ' or': -6.793,
+    ' pa': -5.732,
+    ' pe': -6.072,
+    ' pi': -7.321,
+    ' pl': -7.378,
+    ' po': -5.411,
+    ' pr': -5.643,
+    ' pu': -7.100,
+    ' qu': -5.713,
+    ' ra': -7.590,
+    ' re': -5.626,
+    ' ri': -8.357,
+    ' ro': -7.100,
+    ' sa': -6.486,
+    ' sc': -9.044,
+    ' se': -5.527,
+    ' si': -6.174,
+    ' so': -6.566,
+    ' st': -8.319,
+    ' su': -5.838,
+    ' ta': -6.923,
+    ' te': -6.604,
+    ' th': -7.762,
+    ' ti': -7.228,
+    ' to': -7.112,
+    ' tr': -6.633,
+    ' un': -4.781,
+    ' us': -8.495,
+    ' va': -7.218,
+    ' ve': -7.110,
+    ' vi': -6.831,
+    ' wa': -8.887,
+    ' wi': -8.775,
+    ' y ': -5.002,
+    'aci': -5.597,
+    'act': -7.274,
+    'ad ': -6.299,
+    'ada': -5.967,
+    'ado': -5.403,
+    'ain': -8.038,
+    'al ': -5.395,
+    'ale': -6.488,
+    'ali': -6.436,
+    'all': -7.364,
+    'alm': -7.383,
+    'am ': -8.835,
+    'ama': -7.216,
+    'amb': -7.294,
+    'ame': -6.526,
+    'ami': -6.951,
+    'an ': -6.355,
+    'ana': -6.747,
+    'anc': -6.391,
+    'and': -6.427,
+    'ang': -8.035,
+    'ani': -7.153,
+    'ano': -6.633,
+    'ant': -5.683,
+    'ar ': -6.398,
+    'ara': -6.450,
+    'ard': -7.569,
+    'are': -7.471,
+    'ari': -6.589,
+    'arr': -7.128,
+    'art': -6.229,
+    'as ': -5.004,
+    'ase': -8.220,
+    'ast': -7.118,
+    'at ': -8.952,
+    'ata': -7.372,
+    'ate': -7.554,
+    'ati': -7.308,
+    'ay ': -8.386,
+    'año': -6.914,
+    'ber': -7.391,
+    'bla': -7.050,
+    'bli': -7.712,
+    'bor': -8.609,
+    'bre': -6.348,
+    'ca ': -6.031,
+    'cad': -7.062,
+    'cal': -6.897,
+    'can': -6.348,
+    'car': -6.861,
+    'cas': -6.993,
+    'cat': -8.332,
+    'cci': -7.352,
+    'ce ': -7.440,
+    'cen': -7.302,
+    'ces': -6.742,
+    'ch ': -8.600,
+    'cha': -7.271,
+    'chi': -7.417,
+    'cia': -5.985,
+    'cid': -6.752,
+    'cie': -6.535,
+    'cio': -6.370,
+    'cip': -7.190,
+    'ció': -5.664,
+    'ck ': -8.426,
+    'co ': -6.102,
+    'col': -7.424,
+    'com': -5.701,
+    'con': -5.388,
+    'cor': -7.402,
+    'cos': -7.421,
+    'cti': -7.991,
+    'cto': -7.206,
+    'cul': -7.305,
+    'da ': -5.648,
+    'dad': -6.057,
+    'das': -7.415,
+    'de ': -3.659,
+    'del': -5.577,
+    'den': -6.556,
+    'dep': -7.081,
+    'der': -7.097,
+    'des': -6.500,
+    'dic': -7.142,
+    'din': -8.527,
+    'dis': -6.616,
+    'do ': -5.174,
+    'dor': -7.018,
+    'dos': -6.440,
+    'eas': -8.459,
+    'eat': -9.006,
+    'eci': -6.512,
+    'eco': -7.936,
+    'ect': -7.202,
+    'ed ': -8.674,
+    'edi': -7.085,
+    'egi': -6.810,
+    'el ': -4.457,
+    'ela': -7.294,
+    'ele': -7.229,
+    'ell': -7.300,
+    'emb': -7.276,
+    'en ': -4.565,
+    'ena': -7.281,
+    'enc': -6.658,
+    'end': -7.075,
+    'ene': -6.460,
+    'eng': -8.689,
+    'eno': -7.396,
+    'ens': -7.166,
+    'ent': -4.996,
+    'epa': -7.152,
+    'er ': -6.418,
+    'era': -6.161,
+    'ere': -7.370,
+    'eri': -6.563,
+    'ern': -7.212,
+    'ero': -6.328,
+    'err': -7.030,
+    'ers': -7.050,
+    'ert': -6.873,
+    'es ': -4.403,
+    'esa': -6.634,
+    'esc': -7.180,
+    'ese': -7.643,
+    'esi': -7.169,
+    'esp': -6.203,
+    'est': -5.604,
+    'et ': -8.474,
+    'eve': -8.626,
+    'ey ': -8.063,
+    'fam': -7.362,
+    'fic': -6.949,
+    'for': -6.916,
+    'fra': -6.713,
+    'fue': -6.311,
+    'ge ': -8.610,
+    'gen': -6.964,
+    'ger': -8.915,
+    'gió': -7.009,
+    'go ': -7.030,
+    'gra': -6.961,
+    'har': -8.425,
+    'he ': -7.833,
+    'her': -8.203,
+    'his': -8.174,
+    'ho ': -8.154,
+    'ia ': -5.445,
+    'ial': -6.982,
+    'ian': -7.049,
+    'ic ': -8.971,
+    'ica': -5.628,
+    'ich': -8.066,
+    'ici': -6.341,
+    'ico': -6.188,
+    'ict': -8.735,
+    'ida': -6.043,
+    'ide': -6.967,
+    'ido': -6.262,
+    'ie ': -7.170,
+    'iem': -7.275,
+    'ien': -6.087,
+    'ier': -7.017,
+    'ies': -8.037,
+    'il ': -7.639,
+    'ili': -6.713,
+    'ill': -6.886,
+    'ime': -7.323,
+    'in ': -7.585,
+    'ina': -6.350,
+    'inc': -6.757,
+    'ind': -7.644,
+    'ine': -7.491,
+    'ing': -7.189,
+    'ini': -7.408,
+    'ino': -7.049,
+    'int': -6.744,
+    'io ': -6.003,
+    'ion': -6.224,
+    'ios': -7.213,
+    'ire': -7.946,
+    'is ': -7.208,
+    'ist': -5.828,
+    'ita': -6.502,
+    'ite': -7.868,
+    'iti': -8.328,
+    'ito': -6.414,
+    'itu': -6.961,
+    'ive': -7.718,
+    'iza': -6.970,
+    'ión': -5.329,
+    'la ': -4.474,
+    'lac': -6.840,
+    'lan': -6.766,
+    'lar': -7.285,
+    'las': -6.108,
+    'lat': -7.806,
+    'le ': -6.933,
+    'lea': -8.878,
+    'les': -6.493,
+    'lia': -6.705,
+    'lic': -7.128,
+    'lid': -7.362,
+    'lin': -7.870,
+    'lis': -7.640,
+    'lit': -7.862,
+    'll ': -8.641,
+    'lla': -6.696,
+    'lle': -7.157,
+    'lo ': -6.476,
+    'loc': -7.715,
+    'los': -5.764,
+    'ma ': -6.726,
+    'mad': -7.230,
+    'man': -6.701,
+    'mar': -6.676,
+    'mat': -8.095,
+    'mbi': -7.257,
+    'mbr': -6.742,
+    'me ': -8.458,
+    'men': -5.891,
+    'mer': -6.910,
+    'mie': -7.338,
+    'mil': -7.016,
+    'min': -7.078,
+    'mo ': -6.252,
+    'mon': -7.350,
+    'mun': -6.491,
+    'más': -7.364,
+    'na ': -5.022,
+    'nac': -6.953,
+    'nal': -6.747,
+    'nat': -7.956,
+    'nce': -6.891,
+    'nci': -6.019,
+    'nd ': -8.335,
+    'nda': -6.818,
+    'nde': -7.002,
+    'ndi': -7.348,
+    'ndo': -6.827,
+    'ne ': -6.961,
+    'ner': -6.829,
+    'nes': -6.617,
+    'ng ': -8.083,
+    'ngl': -7.914,
+    'nic': -6.762,
+    'nid': -7.076,
+    'nis': -7.645,
+    'nit': -8.865,
+    'no ': -5.945,
+    'noc': -7.356,
+    'nom': -7.112,
+    'nor': -7.220,
+    'nos': -7.261,
+    'ns ': -8.388,
+    'nt ': -7.815,
+    'nta': -6.377,
+    'nte': -5.329,
+    'nti': -6.796,
+    'nto': -6.093,
+    'ntr': -6.467,
+    'ntó': -7.398,
+    'obl': -7.087,
+    'oca': -7.290,
+    'oci': -6.969,
+    'of ': -8.976,
+    'ol ': -7.346,
+    'oli': -7.763,
+    'oll': -8.128,
+    'olo': -7.351,
+    'omb': -7.197,
+    'ome': -7.957,
+    'omo': -6.597,
+    'omp': -7.294,
+    'omu': -6.948,
+    'on ': -5.757,
+    'ona': -6.359,
+    'ond': -7.365,
+    'one': -6.699,
+    'ong': -8.581,
+    'ono': -7.048,
+    'ons': -7.089,
+    'ont': -6.921,
+    'ope': -8.420,
+    'or ': -5.481,
+    'ora': -7.175,
+    'ord': -7.604,
+    'ore': -7.130,
+    'ori': -6.814,
+    'orm': -6.836,
+    'orn': -8.401,
+    'ort': -6.825,
+    'os ': -4.668,
+    'oun': -8.321,
+    'our': -8.643,
+    'ove': -8.180,
+    'ovi': -6.957,
+    'par': -5.822,
+    'pañ': -6.923,
+    'pec': -6.950,
+    'per': -6.197,
+    'pla': -7.368,
+    'po ': -7.340,
+    'pob': -7.232,
+    'por': -5.854,
+    'pre': -6.816,
+    'pri': -6.918,
+    'pro': -6.176,
+    'que': -5.584,
+    'qui': -7.141,
+    'ra ': -5.564,
+    'rac': -7.238,
+    'rad': -6.914,
+    'ral': -7.041,
+    'ran': -6.023,
+    'ras': -7.095,
+    'rat': -7.559,
+    'rch': -9.012,
+    'rd ': -8.528,
+    're ': -5.964,
+    'rea': -7.243,
+    'rec': -6.994,
+    'red': -8.284,
+    'reg': -6.778,
+    'rel': -8.039,
+    'ren': -7.063,
+    'res': -6.063,
+    'ria': -6.705,
+    'ric': -7.020,
+    'rie': -7.313,
+    'rim': -7.391,
+    'rin': -7.209,
+    'rio': -6.598,
+    'ris': -7.744,
+    'rit': -6.538,
+    'rma': -6.900,
+    'ro ': -6.023,
+    'rom': -8.255,
+    'ron': -7.254,
+    'ros': -7.139,
+    'rov': -7.295,
+    'rra': -7.402,
+    'rs ': -8.565,
+    'rt ': -8.558,
+    'rta': -6.769,
+    'rte': -6.580,
+    'rti': -7.223,
+    'ry ': -8.719,
+    'sa ': -6.544,
+    'san': -7.240,
+    'se ': -5.928,
+    'ser': -7.270,
+    'sin': -8.081,
+    'sio': -8.071,
+    'sit': -7.140,
+    'so ': -7.206,
+    'son': -7.150,
+    'spa': -6.884,
+    'spe': -7.063,
+    'st ': -8.668,
+    'sta': -5.819,
+    'ste': -6.527,
+    'sti': -6.768,
+    'sto': -7.102,
+    'str': -6.230,
+    'su ': -6.756,
+    'ta ': -5.820,
+    'tad': -6.654,
+    'tal': -6.709,
+    'tam': -6.637,
+    'tan': -6.801,
+    'tar': -7.279,
+    'tas': -7.355,
+    'tat': -8.934,
+    'te ': -5.357,
+    'ten': -6.814,
+    'ter': -6.165,
+    'tes': -6.818,
+    'th ': -9.038,
+    'the': -7.866,
+    'tic': -6.540,
+    'tie': -7.367,
+    'tin': -7.200,
+    'tio': -8.268,
+    'tiv': -7.167,
+    'to ': -5.442,
+    'ton': -7.990,
+    'tor': -6.456,
+    'tos': -6.994,
+    'tra': -6.253,
+    'tre': -6.935,
+    'tri': -6.611,
+    'tro': -6.720,
+    'tua': -7.014,
+    'tur': -7.192,
+    'tón': -7.237,
+    'uad': -7.358,
+    'ual': -7.283,
+    'uda': -7.383,
+    'ue ': -5.323,
+    'uen': -7.358,
+    'uer': -7.167,
+    'ues': -7.424,
+    'ula': -7.154,
+    'um ': -7.971,
+    'un ': -5.627,
+    'una': -5.418,
+    'und': -7.120,
+    'uni': -6.481,
+    'unt': -7.819,
+    'ura': -6.795,
+    'ure': -8.822,
+    'us ': -7.114,
+    'use': -8.956,
+    'ust': -7.746,
+    've ': -8.300,
+    'ver': -7.260,
+    'vin': -7.387,
+    'ás ': -7.302,
+    'és ': -7.188,
+    'ía ': -6.507,
+    'ña ': -7.238,
+    'ón ': -5.118,
+}
+
+EN_TRIGRAMS: Dict[str, float] = {
+    ' a ': -4.892,
+    ' ac': -7.100,
+    ' al': -6.302,
+    ' am': -7.035,
+    ' an': -4.712,
+    ' ar': -6.218,
+    ' as': -6.122,
+    ' at': -6.626,
+    ' au': -7.047,
+    ' ba': -6.309,
+    ' be': -6.130,
+    ' bo': -6.313,
+    ' br': -6.718,
+    ' bu': -7.061,
+    ' by': -6.133,
+    ' ca': -6.036,
+    ' ce': -7.116,
+    ' ch': -6.286,
+    ' ci': -7.377,
+    ' cl': -7.205,
+    ' co': -5.194,
+    ' cr': -7.143,
+    ' cu': -7.551,
+    ' da': -7.131,
+    ' de': -6.034,
+    ' di': -6.338,
+    ' do': -7.466,
+    ' ea': -7.297,
+    ' el': -7.452,
+    ' en': -6.782,
+    ' es': -8.423,
+    ' ex': -7.536,
+    ' fa': -6.896,
+    ' fe': -7.272,
+    ' fi': -6.340,
+    ' fo': -5.576,
+    ' fr': -6.146,
+    ' fu': -8.419,
+    ' ga': -7.260,
+    ' ge': -6.905,
+    ' gr': -6.798,
+    ' ha': -6.400,
+    ' he': -6.303,
+    ' hi': -6.617,
+    ' ho': -6.852,
+    ' in': -4.550,
+    ' is': -4.949,
+    ' it': -6.081,
+    ' ja': -7.286,
+    ' ju': -7.321,
+    ' la': -6.428,
+    ' le': -6.738,
+    ' li': -6.531,
+    ' lo': -6.558,
+    ' ma': -5.718,
+    ' me': -6.471,
+    ' mi': -6.727,
+    ' mo': -6.392,
+    ' mu': -6.941,
+    ' na': -6.566,
+    ' ne': -6.627,
+    ' no': -6.302,
+    ' of': -4.594,
+    ' on': -6.021,
+    ' or': -6.370,
+    ' pa': -6.197,
+    ' pe': -6.837,
+    ' pi': -7.885,
+    ' pl': -6.885,
+    ' po': -6.428,
+    ' pr': -5.842,
+    ' pu': -7.338,
+    ' qu': -8.131,
+    ' ra': -6.897,
+    ' re': -5.682,
+    ' ri': -7.167,
+    ' ro': -6.741,
+    ' s ': -6.670,
+    ' sa': -6.939,
+    ' sc': -6.855,
+    ' se': -5.937,
+    ' sh': -6.855,
+    ' si': -6.591,
+    ' so': -6.258,
+    ' sp': -6.728,
+    ' st': -5.857,
+    ' su': -6.662,
+    ' ta': -7.424,
+    ' te': -6.592,
+    ' th': -3.917,
+    ' ti': -7.552,
+    ' to': -5.538,
+    ' tr': -6.796,
+    ' un': -6.410,
+    ' us': -7.332,
+    ' va': -7.710,
+    ' ve': -7.837,
+    ' vi': -7.094,
+    ' wa': -5.510,
+    ' we': -6.722,
+    ' wh': -6.282,
+    ' wi': -6.283,
+    ' wo': -6.866,
+    'aci': -8.444,
+    'act': -7.148,
+    'ad ': -7.410,
+    'ada': -8.222,
+    'ado': -8.828,
+    'age': -6.967,
+    'ain': -6.751,
+    'al ': -5.384,
+    'ale': -7.675,
+    'ali': -6.650,
+    'all': -6.177,
+    'als': -7.268,
+    'am ': -7.261,
+    'ama': -8.227,
+    'amb': -8.833,
+    'ame': -6.248,
+    'ami': -7.414,
+    'an ': -5.119,
+    'ana': -7.188,
+    'anc': -7.006,
+    'and': -4.762,
+    'ang': -7.287,
+    'ani': -6.962,
+    'ano': -8.411,
+    'ant': -6.939,
+    'ar ': -6.661,
+    'ara': -7.453,
+    'ard': -7.028,
+    'are': -6.621,
+    'ari': -6.918,
+    'arr': -7.913,
+    'art': -6.468,
+    'ary': -6.900,
+    'as ': -5.163,
+    'ase': -7.017,
+    'ass': -7.014,
+    'ast': -6.690,
+    'at ': -6.081,
+    'ata': -8.257,
+    'ate': -5.673,
+    'ati': -5.589,
+    'ay ': -6.827,
+    'ber': -6.334,
+    'bli': -7.291,
+    'bor': -6.968,
+    'bre': -8.670,
+    'by ': -6.074,
+    'ca ': -8.055,
+    'cad': -9.041,
+    'cal': -6.559,
+    'can': -6.610,
+    'car': -7.461,
+    'cas': -8.327,
+    'cat': -6.789,
+    'ce ': -6.130,
+    'cen': -7.129,
+    'ces': -7.288,
+    'ch ': -6.234,
+    'cha': -6.777,
+    'chi': -7.100,
+    'cia': -7.011,
+    'cie': -7.341,
+    'cip': -8.005,
+    'ck ': -7.330,
+    'co ': -8.377,
+    'col': -7.311,
+    'com': -6.195,
+    'con': -6.326,
+    'cor': -7.265,
+    'cou': -7.007,
+    'ct ': -7.188,
+    'cti': -6.755,
+    'cto': -7.401,
+    'cul': -8.087,
+    'da ': -7.862,
+    'de ': -6.894,
+    'del': -8.374,
+    'den': -7.281,
+    'dep': -8.402,
+    'der': -6.695,
+    'des': -7.282,
+    'dic': -8.334,
+    'din': -7.186,
+    'dis': -7.005,
+    'do ': -8.778,
+    'ds ': -7.219,
+    'ear': -6.849,
+    'eas': -6.765,
+    'eat': -7.073,
+    'eci': -7.521,
+    'eco': -7.312,
+    'ect': -6.604,
+    'ed ': -4.737,
+    'edi': -7.533,
+    'een': -7.152,
+    'egi': -7.600,
+    'el ': -7.108,
+    'ela': -7.775,
+    'ele': -6.845,
+    'ell': -7.167,
+    'emb': -6.874,
+    'en ': -6.078,
+    'ena': -8.346,
+    'enc': -7.056,
+    'end': -7.372,
+    'ene': -7.469,
+    'eng': -7.293,
+    'eno': -8.816,
+    'ens': -7.545,
+    'ent': -5.502,
+    'epa': -8.539,
+    'er ': -4.921,
+    'era': -6.752,
+    'ere': -6.710,
+    'eri': -6.408,
+    'ern': -6.631,
+    'ero': -8.228,
+    'err': -7.994,
+    'ers': -6.204,
+    'ert': -7.538,
+    'es ': -5.204,
+    'esc': -8.666,
+    'ese': -7.077,
+    'esi': -7.596,
+    'esp': -8.714,
+    'ess': -6.800,
+    'est': -6.292,
+    'et ': -7.111,
+    'eve': -7.015,
+    'ew ': -7.298,
+    'ey ': -7.106,
+    'fam': -7.745,
+    'fic': -7.444,
+    'for': -5.721,
+    'fra': -8.197,
+    'fro': -6.623,
+    'ge ': -6.657,
+    'gen': -7.184,
+    'ger': -7.273,
+    'ght': -7.256,
+    'go ': -8.677,
+    'gra': -7.202,
+    'har': -7.153,
+    'hat': -6.933,
+    'he ': -4.056,
+    'her': -6.332,
+    'hic': -7.102,
+    'his': -6.757,
+    'ho ': -7.313,
+    'ia ': -6.418,
+    'ial': -7.067,
+    'ian': -6.322,
+    'ic ': -6.331,
+    'ica': -6.172,
+    'ich': -6.919,
+    'ici': -7.171,
+    'ico': -8.755,
+    'ict': -7.265,
+    'ida': -7.958,
+    'ide': -6.981,
+    'ie ': -8.104,
+    'ien': -7.696,
+    'ier': -8.186,
+    'ies': -6.595,
+    'igh': -6.942,
+    'il ': -7.153,
+    'ili': -7.642,
+    'ill': -6.790,
+    'ime': -7.520,
+    'in ': -4.684,
+    'ina': -7.018,
+    'inc': -6.936,
+    'ind': -7.037,
+    'ine': -6.446,
+    'ing': -5.251,
+    'ini': -7.317,
+    'ino': -8.453,
+    'int': -6.697,
+    'io ': -7.783,
+    'ion': -5.138,
+    'ire': -7.214,
+    'is ': -4.809,
+    'ish': -6.470,
+    'ist': -5.993,
+    'it ': -6.176,
+    'ita': -7.270,
+    'ite': -6.666,
+    'ith': -6.661,
+    'iti': -6.579,
+    'ito': -8.525,
+    'itu': -7.922,
+    'ity': -6.572,
+    'ive': -6.296,
+    'iza': -8.489,
+    'la ': -7.874,
+    'lac': -7.889,
+    'lan': -6.322,
+    'lar': -7.345,
+    'las': -7.717,
+    'lat': -6.990,
+    'ld ': -6.902,
+    'le ': -6.183,
+    'lea': -7.091,
+    'les': -7.146,
+    'lia': -7.142,
+    'lic': -7.318,
+    'lin': -6.915,
+    'lis': -6.785,
+    'lit': -6.924,
+    'll ': -6.478,
+    'lla': -7.531,
+    'lle': -6.890,
+    'lly': -7.278,
+    'lo ': -8.852,
+    'loc': -7.325,
+    'los': -8.482,
+    'ls ': -7.332,
+    'ly ': -5.873,
+    'ma ': -8.282,
+    'mad': -8.814,
+    'man': -6.452,
+    'mar': -6.829,
+    'mat': -7.336,
+    'mbe': -6.801,
+    'mbi': -8.770,
+    'me ': -6.606,
+    'men': -6.456,
+    'mer': -6.592,
+    'mil': -7.305,
+    'min': -7.032,
+    'mon': -7.207,
+    'mun': -7.577,
+    'na ': -7.367,
+    'nal': -6.433,
+    'nat': -6.728,
+    'nce': -6.435,
+    'nci': -7.805,
+    'nd ': -4.757,
+    'nda': -7.909,
+    'nde': -6.747,
+    'ndi': -7.327,
+    'ndo': -8.121,
+    'ne ': -6.161,
+    'ner': -7.399,
+    'nes': -7.203,
+    'new': -7.282,
+    'ng ': -5.307,
+    'ngl': -7.288,
+    'nic': -7.441,
+    'nis': -7.336,
+    'nit': -6.950,
+    'no ': -8.461,
+    'nom': -8.523,
+    'nor': -6.993,
+    'now': -7.235,
+    'ns ': -6.457,
+    'nt ': -5.970,
+    'nta': -7.206,
+    'nte': -6.680,
+    'nti': -7.075,
+    'nto': -7.891,
+    'ntr': -7.277,
+    'ny ': -7.339,
+    'oca': -7.255,
+    'oci': -7.890,
+    'of ': -4.625,
+    'ol ': -7.626,
+    'oli': -7.198,
+    'oll': -7.295,
+    'olo': -7.449,
+    'om ': -6.450,
+    'omb': -8.825,
+    'ome': -7.192,
+    'omm': -7.220,
+    'omo': -8.646,
+    'omp': -6.959,
+    'on ': -4.889,
+    'ona': -6.634,
+    'ond': -7.492,
+    'one': -6.900,
+    'ong': -7.126,
+    'ono': -8.278,
+    'ons': -6.431,
+    'ont': -7.303,
+    'ope': -7.308,
+    'or ': -5.524,
+    'ora': -7.724,
+    'ord': -7.092,
+    'ore': -7.240,
+    'ori': -7.134,
+    'orm': -6.960,
+    'orn': -6.871,
+    'ort': -6.542,
+    'os ': -8.272,
+    'oun': -6.375,
+    'our': -7.099,
+    'ous': -7.258,
+    'out': -6.740,
+    'ove': -6.720,
+    'ovi': -7.591,
+    'own': -6.716,
+    'par': -6.578,
+    'pec': -7.475,
+    'per': -6.679,
+    'pla': -6.841,
+    'por': -7.332,
+    'pre': -6.968,
+    'pri': -7.146,
+    'pro': -6.280,
+    'que': -8.229,
+    'qui': -8.667,
+    'ra ': -7.636,
+    'rac': -7.460,
+    'rad': -7.680,
+    'ral': -6.744,
+    'ran': -6.744,
+    'ras': -8.561,
+    'rat': -6.762,
+    'rch': -7.223,
+    'rd ': -6.938,
+    're ': -5.871,
+    'rea': -6.824,
+    'rec': -7.314,
+    'red': -6.995,
+    'ree': -7.181,
+    'reg': -7.867,
+    'rel': -7.337,
+    'ren': -7.056,
+    'res': -6.444,
+    'ria': -7.250,
+    'ric': -6.391,
+    'rie': -7.122,
+    'rim': -8.359,
+    'rin': -6.780,
+    'rio': -7.946,
+    'ris': -7.225,
+    'rit': -6.809,
+    'rma': -7.345,
+    'rn ': -6.524,
+    'ro ': -8.470,
+    'rom': -6.403,
+    'ron': -7.552,
+    'ros': -8.257,
+    'rou': -7.069,
+    'rov': -7.728,
+    'rra': -8.917,
+    'rs ': -6.406,
+    'rt ': -6.883,
+    'rta': -8.448,
+    'rte': -8.128,
+    'rth': -7.074,
+    'rti': -7.474,
+    'ry ': -6.090,
+    'san': -8.051,
+    'se ': -6.545,
+    'sed': -6.795,
+    'ser': -6.855,
+    'sh ': -6.756,
+    'she': -7.217,
+    'shi': -7.208,
+    'sin': -7.092,
+    'sio': -7.091,
+    'sit': -7.294,
+    'so ': -7.549,
+    'son': -6.961,
+    'sou': -7.164,
+    'spa': -8.098,
+    'spe': -7.284,
+    'ss ': -7.094,
+    'ssi': -7.138,
+    'st ': -5.653,
+    'sta': -6.125,
+    'ste': -6.509,
+    'sti': -7.012,
+    'sto': -7.252,
+    'str': -6.370,
+    'ta ': -7.796,
+    'tal': -7.255,
+    'tan': -7.324,
+    'tar': -7.284,
+    'tat': -6.638,
+    'te ': -6.387,
+    'ted': -5.866,
+    'ten': -7.285,
+    'ter': -5.627,
+    'tes': -7.058,
+    'th ': -5.849,
+    'tha': -6.842,
+    'the': -3.991,
+    'thi': -7.206,
+    'tic': -6.700,
+    'tie': -8.076,
+    'tin': -6.782,
+    'tio': -5.445,
+    'tiv': -7.121,
+    'to ': -5.729,
+    'ton': -7.310,
+    'tor': -6.605,
+    'tra': -6.491,
+    'tre': -7.571,
+    'tri': -6.923,
+    'tro': -7.503,
+    'ts ': -6.181,
+    'tua': -8.591,
+    'tur': -6.933,
+    'ty ': -6.097,
+    'ual': -7.839,
+    'ue ': -7.529,
+    'uen': -8.585,
+    'ues': -8.584,
+    'ula': -7.399,
+    'um ': -7.340,
+    'un ': -8.845,
+    'und': -6.787,
+    'uni': -6.394,
+    'unt': -7.012,
+    'ura': -8.036,
+    'ure': -7.158,
+    'us ': -6.726,
+    'use': -7.075,
+    'ust': -7.034,
+    'ut ': -7.300,
+    'uth': -7.047,
+    've ': -6.637,
+    'ver': -6.292,
+    'vin': -7.631,
+    'war': -7.237,
+    'was': -5.742,
+    'whi': -7.240,
+    'who': -7.271,
+    'wit': -6.784,
+    'wn ': -6.914,
+    'wor': -7.057,
+}
+
+UNSEEN_LOG_PROBABILITY: Dict[str, float] = {
+    'es': -10.044,
+    'en': -10.041,
+}
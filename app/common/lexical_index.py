@@ -0,0 +1,453 @@
+"""Persistent BM25 inverted index kept alongside each Chroma collection.
+
+Dense retrieval struggles with exact identifiers (policy ids, error codes,
+file names). This module maintains a small lexical index per collection so
+``response()`` can fuse lexical and vector rankings with reciprocal rank
+fusion. Each collection is stored in its own SQLite file, which keeps the
+index incremental (no full rewrites on ingest/delete) and shareable between
+API workers.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+_ENABLED_ENV_VAR = "HYBRID_SEARCH_ENABLED"
+_INDEX_DIR_ENV_VAR = "LEXICAL_INDEX_DIR"
+_RRF_K_ENV_VAR = "HYBRID_SEARCH_RRF_K"
+
+DEFAULT_RRF_K = 60
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_PATTERN = re.compile(r"\w+(?:[-_./:]\w+)*", re.UNICODE)
+_SUBTOKEN_PATTERN = re.compile(r"[-_./:]")
+
+
+def _is_truthy(value: Optional[str], default: bool) -> bool:
+    if value is None:
+        return default
+    return value.strip().lower() in {"1", "true", "yes", "on"}
+
+
+def hybrid_search_enabled() -> bool:
+    """Return whether lexical retrieval should participate in queries."""
+
+    return _is_truthy(os.environ.get(_ENABLED_ENV_VAR), True)
+
+
+def rrf_k() -> int:
+    """Return the reciprocal rank fusion constant from the environment."""
+
+    try:
+        value = int(os.environ.get(_RRF_K_ENV_VAR, DEFAULT_RRF_K))
+    except ValueError:
+        return DEFAULT_RRF_K
+    return value if value > 0 else DEFAULT_RRF_K
+
+
+def tokenize(text: str) -> List[str]:
+    """Split *text* into lowercase lexical terms.
+
+    Compound identifiers such as ``POL-2023-07`` or ``config.yaml`` are kept
+    as a single term and additionally expanded into their components, so both
+    exact and partial mentions match.
+    """
+
+    if not text:
+        return []
+
+    normalised = unicodedata.normalize("NFC", text).lower()
+    terms: List[str] = []
+    for match in _TOKEN_PATTERN.finditer(normalised):
+        token = match.group(0)
+        terms.append(token)
+        if _SUBTOKEN_PATTERN.search(token):
+            terms.extend(part for part in _SUBTOKEN_PATTERN.split(token) if part)
+    return terms
+
+
+@dataclass(frozen=True)
+class LexicalHit:
+    """A document matched by the lexical index."""
+
+    doc_id: str
+    score: float
+    text: str
+    metadata: Mapping[str, Any]
+
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS documents (
+        doc_id TEXT PRIMARY KEY,
+        text TEXT NOT NULL,
+        metadata TEXT NOT NULL,
+        length INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS postings (
+        term TEXT NOT NULL,
+        doc_id TEXT NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term, doc_id)
+    ) WITHOUT ROWID
+    """,
+    "CREATE INDEX IF NOT EXISTS postings_doc ON postings (doc_id)",
+)
+
+
+class LexicalIndex:
+    """BM25 index for a single collection backed by SQLite."""
+
+    def __init__(self, collection_name: str, path: Optional[Path] = None) -> None:
+        self.collection_name = collection_name
+        self.path = path
+        database = str(path) if path is not None else ":memory:"
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(database, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def add(
+        self,
+        ids: Sequence[str],
+        texts: Sequence[str],
+        metadatas: Optional[Sequence[Optional[Mapping[str, Any]]]] = None,
+    ) -> int:
+        """Index (or re-index) the given documents and return how many were stored."""
+
+        if metadatas is None:
+            metadatas = [None] * len(ids)
+
+        rows = []
+        postings = []
+        for doc_id, text, metadata in zip(ids, texts, metadatas):
+            if not doc_id:
+                continue
+            content = text or ""
+            terms = Counter(tokenize(content))
+            rows.append(
+                (
+                    doc_id,
+                    content,
+                    json.dumps(dict(metadata or {}), ensure_ascii=False, default=str),
+                    sum(terms.values()),
+                )
+            )
+            postings.extend((term, doc_id, count) for term, count in terms.items())
+
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "DELETE FROM postings WHERE doc_id = ?", [(row[0],) for row in rows]
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO documents (doc_id, text, metadata, length) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                postings,
+            )
+        return len(rows)
+
+    def remove(self, ids: Iterable[str]) -> int:
+        """Drop *ids* from the index and return how many documents were removed."""
+
+        params = [(doc_id,) for doc_id in ids if doc_id]
+        if not params:
+            return 0
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM postings WHERE doc_id = ?", params)
+            cursor = self._conn.executemany("DELETE FROM documents WHERE doc_id = ?", params)
+            return max(cursor.rowcount, 0)
+
+    def count(self) -> int:
+        with self._lock:
+            row = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()
+        return int(row[0]) if row else 0
+
+    def document_ids(self) -> List[str]:
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT doc_id FROM documents")]
+
+    def search(self, query: str, k: int) -> List[LexicalHit]:
+        """Return the top *k* documents for *query* ranked by BM25."""
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        with self._lock:
+            stats = self._conn.execute("SELECT COUNT(*), AVG(length) FROM documents").fetchone()
+            total_docs = int(stats[0] or 0)
+            if total_docs == 0:
+                return []
+            average_length = float(stats[1] or 0.0) or 1.0
+
+            placeholders = ",".join("?" for _ in terms)
+            frequencies = dict(
+                self._conn.execute(
+                    f"SELECT term, COUNT(*) FROM postings WHERE term IN ({placeholders}) GROUP BY term",
+                    terms,
+                ).fetchall()
+            )
+            if not frequencies:
+                return []
+
+            postings = self._conn.execute(
+                f"SELECT p.term, p.doc_id, p.tf, d.length FROM postings p "
+                f"JOIN documents d ON d.doc_id = p.doc_id WHERE p.term IN ({placeholders})",
+                terms,
+            ).fetchall()
+
+            scores: Dict[str, float] = {}
+            for term, doc_id, tf, length in postings:
+                df = frequencies.get(term, 0)
+                idf = math.log(1.0 + (total_docs - df + 0.5) / (df + 0.5))
+                norm = tf + BM25_K1 * (1.0 - BM25_B + BM25_B * (length / average_length))
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * (tf * (BM25_K1 + 1.0)) / norm
+
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+            hits: List[LexicalHit] = []
+            for doc_id, score in ranked:
+                row = self._conn.execute(
+                    "SELECT text, metadata FROM documents WHERE doc_id = ?", (doc_id,)
+                ).fetchone()
+                if row is None:
+                    continue
+                try:
+                    metadata = json.loads(row[1]) if row[1] else {}
+                except ValueError:
+                    metadata = {}
+                hits.append(LexicalHit(doc_id=doc_id, score=score, text=row[0], metadata=metadata))
+        return hits
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM documents")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def _default_index_dir() -> Path:
+    configured = os.environ.get(_INDEX_DIR_ENV_VAR)
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return base_dir / "data" / "lexical_index"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+
+class LexicalIndexRegistry:
+    """Thread-safe cache of :class:`LexicalIndex` instances per collection."""
+
+    def __init__(self, index_dir: Optional[Path] = None, *, in_memory: bool = False) -> None:
+        self._index_dir = Path(index_dir) if index_dir is not None else _default_index_dir()
+        self._in_memory = in_memory
+        self._indexes: Dict[str, LexicalIndex] = {}
+        self._lock = Lock()
+
+    def _path_for(self, collection_name: str) -> Optional[Path]:
+        if self._in_memory:
+            return None
+        safe_name = re.sub(r"[^\w.-]", "_", collection_name)
+        return self._index_dir / f"{safe_name}.sqlite3"
+
+    def get(self, collection_name: str, *, create: bool = True) -> Optional[LexicalIndex]:
+        """Return the index for *collection_name*.
+
+        With ``create=False`` no new file is created, which keeps read and
+        delete paths from materialising empty indexes.
+        """
+
+        index = self._indexes.get(collection_name)
+        if index is not None:
+            return index
+
+        with self._lock:
+            index = self._indexes.get(collection_name)
+            if index is not None:
+                return index
+            path = self._path_for(collection_name)
+            if not create and (self._in_memory or path is None or not path.exists()):
+                return None
+            index = LexicalIndex(collection_name, path)
+            self._indexes[collection_name] = index
+            return index
+
+    def close(self) -> None:
+        with self._lock:
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
+
+
+_DEFAULT_REGISTRY: Optional[LexicalIndexRegistry] = None
+_REGISTRY_LOCK = Lock()
+
+
+def get_lexical_registry() -> LexicalIndexRegistry:
+    global _DEFAULT_REGISTRY
+    if _DEFAULT_REGISTRY is None:
+        with _REGISTRY_LOCK:
+            if _DEFAULT_REGISTRY is None:
+                _DEFAULT_REGISTRY = LexicalIndexRegistry()
+    return _DEFAULT_REGISTRY
+
+
+def configure_default_registry(registry: Optional[LexicalIndexRegistry]) -> None:
+    global _DEFAULT_REGISTRY
+    with _REGISTRY_LOCK:
+        _DEFAULT_REGISTRY = registry
+
+
+def index_documents(
+    collection_name: str,
+    ids: Sequence[str],
+    texts: Sequence[str],
+    metadatas: Optional[Sequence[Optional[Mapping[str, Any]]]] = None,
+) -> int:
+    """Add documents to the lexical index of *collection_name*.
+
+    Failures are logged and swallowed: the lexical index is an accelerator
+    and must never make an ingestion fail.
+    """
+
+    if not hybrid_search_enabled():
+        return 0
+    try:
+        index = get_lexical_registry().get(collection_name)
+        return index.add(ids, texts, metadatas) if index is not None else 0
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("No se pudo actualizar el índice léxico de '%s': %s", collection_name, exc)
+        return 0
+
+
+def remove_documents(collection_name: str, ids: Iterable[str]) -> int:
+    """Remove documents from the lexical index of *collection_name*."""
+
+    try:
+        index = get_lexical_registry().get(collection_name, create=False)
+        return index.remove(ids) if index is not None else 0
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("No se pudo depurar el índice léxico de '%s': %s", collection_name, exc)
+        return 0
+
+
+def rebuild_lexical_index(collection: Any, *, batch_size: int = 500) -> int:
+    """Re-index every document stored in the Chroma *collection*.
+
+    Chunks ingested before hybrid search existed have no BM25 entry; this
+    pages through ``collection.get(include=["documents", "metadatas"])`` and
+    indexes them, dropping entries whose chunk no longer exists. Returns the
+    number of indexed documents.
+    """
+
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    name = getattr(collection, "name", None)
+    if not name:
+        raise ValueError("collection has no name")
+    index = get_lexical_registry().get(name)
+    if index is None:
+        return 0
+
+    seen = set()
+    indexed = 0
+    offset = 0
+    while True:
+        batch = collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+        ids = batch.get("ids") or []
+        if not ids:
+            break
+        documents = batch.get("documents") or [None] * len(ids)
+        metadatas = batch.get("metadatas") or [None] * len(ids)
+        indexed += index.add(ids, documents, metadatas)
+        seen.update(ids)
+        offset += len(ids)
+
+    stale = [doc_id for doc_id in index.document_ids() if doc_id not in seen]
+    index.remove(stale)
+    logger.info(
+        "Índice léxico de '%s' reconstruido: %s documentos, %s obsoletos eliminados",
+        name,
+        indexed,
+        len(stale),
+    )
+    return indexed
+
+
+def search_documents(collection_name: str, query: str, k: int) -> List[LexicalHit]:
+    """Return lexical hits for *query* in *collection_name* (empty when unavailable)."""
+
+    if not hybrid_search_enabled():
+        return []
+    try:
+        index = get_lexical_registry().get(collection_name, create=False)
+        return index.search(query, k) if index is not None else []
+    except Exception as exc:  # pragma: no cover - defensive log path
+        logger.warning("Búsqueda léxica fallida en '%s': %s", collection_name, exc)
+        return []
+
+
+def reciprocal_rank_fusion(
+    rankings: Iterable[Sequence[Hashable]], k: Optional[int] = None
+) -> Dict[Hashable, float]:
+    """Fuse several ranked lists into a single score per key.
+
+    Each key receives ``sum(1 / (k + rank))`` over the lists it appears in,
+    with ranks starting at 1. Scores are comparable across collections and
+    retrieval methods because only positions are used.
+    """
+
+    constant = k if k is not None else rrf_k()
+    fused: Dict[Hashable, float] = {}
+    for ranking in rankings:
+        seen = set()
+        for position, key in enumerate(ranking, start=1):
+            if key in seen:
+                continue
+            seen.add(key)
+            fused[key] = fused.get(key, 0.0) + 1.0 / (constant + position)
+    return fused
+
+
+__all__ = [
+    "LexicalHit",
+    "LexicalIndex",
+    "LexicalIndexRegistry",
+    "configure_default_registry",
+    "get_lexical_registry",
+    "hybrid_search_enabled",
+    "index_documents",
+    "reciprocal_rank_fusion",
+    "rebuild_lexical_index",
+    "remove_documents",
+    "rrf_k",
+    "search_documents",
+    "tokenize",
+]
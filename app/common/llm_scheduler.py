@@ -0,0 +1,302 @@
+"""Priority scheduling and admission control for calls to the local LLM.
+
+Ollama only generates ``OLLAMA_NUM_PARALLEL`` responses at once; anything
+beyond that queues inside Ollama where interactive chat, media jobs and
+batch clients are served in arrival order. The scheduler keeps that queue
+on our side instead so that:
+
+* at most ``LLM_MAX_CONCURRENCY`` generations run at a time (defaults to
+  ``OLLAMA_NUM_PARALLEL``, then 1);
+* waiting requests are served strictly by priority class
+  (``interactive`` > ``media`` > ``batch``) and round-robin across tenants
+  within a class, FIFO for a single tenant;
+* a request that cannot start before its class deadline
+  (``LLM_QUEUE_TIMEOUTS``, e.g. ``interactive=30,media=120,batch=300``) or
+  that finds ``LLM_MAX_QUEUE_DEPTH`` requests already waiting is shed with
+  :class:`LLMOverloadedError`, which the API maps to ``503`` +
+  ``Retry-After``.
+
+Callers declare their class and tenant with :func:`llm_request_context`;
+the RAG chain picks them up when it reaches the LLM step.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, Mapping, Optional, Tuple
+
+from .observability import record_llm_queue, record_llm_queue_wait, record_llm_rejection
+
+logger = logging.getLogger(__name__)
+
+
+PRIORITY_CLASSES: Tuple[str, ...] = ("interactive", "media", "batch")
+DEFAULT_PRIORITY = "interactive"
+DEFAULT_TENANT = "default"
+
+_DEFAULT_QUEUE_TIMEOUTS: Dict[str, float] = {"interactive": 30.0, "media": 120.0, "batch": 300.0}
+
+_ENABLED_ENV_VAR = "LLM_SCHEDULER_ENABLED"
+_CONCURRENCY_ENV_VAR = "LLM_MAX_CONCURRENCY"
+_OLLAMA_PARALLEL_ENV_VAR = "OLLAMA_NUM_PARALLEL"
+_TIMEOUTS_ENV_VAR = "LLM_QUEUE_TIMEOUTS"
+_QUEUE_DEPTH_ENV_VAR = "LLM_MAX_QUEUE_DEPTH"
+
+_request_context: contextvars.ContextVar[Tuple[str, str]] = contextvars.ContextVar(
+    "anclora_llm_request", default=(DEFAULT_PRIORITY, DEFAULT_TENANT)
+)
+
+
+class LLMOverloadedError(RuntimeError):
+    """Raised when a request is shed instead of waiting for the LLM."""
+
+    def __init__(self, priority: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"LLM saturado ({reason}) para prioridad '{priority}'")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = max(int(math.ceil(retry_after)), 1)
+
+
+def normalise_priority(value: Optional[str]) -> str:
+    """Return a known priority class, falling back to ``interactive``."""
+
+    candidate = (value or "").strip().lower()
+    return candidate if candidate in PRIORITY_CLASSES else DEFAULT_PRIORITY
+
+
+def _parse_timeouts(raw: str) -> Dict[str, float]:
+    timeouts = dict(_DEFAULT_QUEUE_TIMEOUTS)
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        name = name.strip().lower()
+        if name not in PRIORITY_CLASSES:
+            continue
+        try:
+            timeouts[name] = max(float(value), 0.0)
+        except ValueError:
+            logger.warning("Timeout de cola inválido para '%s': %s", name, value)
+    return timeouts
+
+
+def _int_from_env(name: str) -> Optional[int]:
+    raw = os.getenv(name)
+    if raw is None or not raw.strip():
+        return None
+    try:
+        return int(raw)
+    except ValueError:
+        logger.warning("Valor entero inválido en %s: %s", name, raw)
+        return None
+
+
+@dataclass(frozen=True)
+class SchedulerConfig:
+    """Concurrency limit, per-class queue deadlines and maximum queue depth."""
+
+    enabled: bool = True
+    max_concurrency: int = 1
+    queue_timeouts: Mapping[str, float] = field(default_factory=lambda: dict(_DEFAULT_QUEUE_TIMEOUTS))
+    max_queue_depth: int = 64
+
+    @classmethod
+    def from_environment(cls) -> "SchedulerConfig":
+        enabled = os.getenv(_ENABLED_ENV_VAR, "true").strip().lower() not in {"0", "false", "no", "off"}
+        concurrency = _int_from_env(_CONCURRENCY_ENV_VAR) or _int_from_env(_OLLAMA_PARALLEL_ENV_VAR) or 1
+        depth = _int_from_env(_QUEUE_DEPTH_ENV_VAR)
+        return cls(
+            enabled=enabled,
+            max_concurrency=max(concurrency, 1),
+            queue_timeouts=_parse_timeouts(os.getenv(_TIMEOUTS_ENV_VAR, "")),
+            max_queue_depth=max(depth, 0) if depth is not None else 64,
+        )
+
+    def timeout_for(self, priority: str) -> float:
+        return float(self.queue_timeouts.get(priority, _DEFAULT_QUEUE_TIMEOUTS[DEFAULT_PRIORITY]))
+
+
+class _Waiter:
+    __slots__ = ("priority", "tenant", "enqueued", "granted")
+
+    def __init__(self, priority: str, tenant: str) -> None:
+        self.priority = priority
+        self.tenant = tenant
+        self.enqueued = time.monotonic()
+        self.granted = False
+
+
+class LLMScheduler:
+    """Bounded-concurrency gate with priority classes and per-tenant fairness."""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None) -> None:
+        self.config = config or SchedulerConfig()
+        self._condition = threading.Condition()
+        self._queues: Dict[str, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in PRIORITY_CLASSES
+        }
+        self._depths: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._active = 0
+        # Smoothed generation time, used to estimate Retry-After.
+        self._service_seconds = 5.0
+
+    @classmethod
+    def from_environment(cls) -> "LLMScheduler":
+        return cls(SchedulerConfig.from_environment())
+
+    @contextmanager
+    def slot(self, priority: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+        """Hold one of the LLM slots for the duration of the block.
+
+        Priority and tenant default to the values set with
+        :func:`llm_request_context`.
+        """
+
+        if not self.config.enabled:
+            yield
+            return
+
+        context_priority, context_tenant = _request_context.get()
+        priority = normalise_priority(priority or context_priority)
+        tenant = tenant or context_tenant or DEFAULT_TENANT
+
+        waited = self._acquire(priority, tenant)
+        record_llm_queue_wait(priority, waited)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(time.monotonic() - started)
+
+    def _acquire(self, priority: str, tenant: str) -> float:
+        with self._condition:
+            if sum(self._depths.values()) >= self.config.max_queue_depth and self._active >= self.config.max_concurrency:
+                self._reject(priority, "queue_full")
+
+            waiter = _Waiter(priority, tenant)
+            self._queues[priority].setdefault(tenant, deque()).append(waiter)
+            self._depths[priority] += 1
+            self._dispatch()
+
+            deadline = waiter.enqueued + self.config.timeout_for(priority)
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._discard(waiter)
+                    self._reject(priority, "deadline")
+                self._condition.wait(remaining)
+            return time.monotonic() - waiter.enqueued
+
+    def _release(self, service_seconds: float) -> None:
+        with self._condition:
+            self._active = max(self._active - 1, 0)
+            self._service_seconds = 0.8 * self._service_seconds + 0.2 * max(service_seconds, 0.0)
+            self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Grant free slots to the next waiters; the condition must be held."""
+
+        granted = False
+        while self._active < self.config.max_concurrency:
+            priority = next((name for name in PRIORITY_CLASSES if self._queues[name]), None)
+            if priority is None:
+                break
+            tenants = self._queues[priority]
+            tenant, waiters = tenants.popitem(last=False)
+            waiter = waiters.popleft()
+            if waiters:
+                # Re-queue the tenant at the back so the others get their turn.
+                tenants[tenant] = waiters
+            self._depths[priority] -= 1
+            waiter.granted = True
+            self._active += 1
+            granted = True
+        if granted:
+            self._condition.notify_all()
+        self._publish()
+
+    def _discard(self, waiter: _Waiter) -> None:
+        tenants = self._queues[waiter.priority]
+        waiters = tenants.get(waiter.tenant)
+        if waiters is None or waiter not in waiters:
+            return
+        waiters.remove(waiter)
+        if not waiters:
+            del tenants[waiter.tenant]
+        self._depths[waiter.priority] -= 1
+        self._publish()
+
+    def _reject(self, priority: str, reason: str) -> None:
+        ahead = sum(self._depths[name] for name in PRIORITY_CLASSES[: PRIORITY_CLASSES.index(priority) + 1])
+        retry_after = (ahead + 1) * self._service_seconds / self.config.max_concurrency
+        record_llm_rejection(priority, reason)
+        logger.warning(
+            "Solicitud LLM descartada (%s, prioridad=%s, en cola=%d, en curso=%d)",
+            reason,
+            priority,
+            sum(self._depths.values()),
+            self._active,
+        )
+        raise LLMOverloadedError(priority, reason, retry_after)
+
+    def _publish(self) -> None:
+        for priority in PRIORITY_CLASSES:
+            record_llm_queue(priority, self._depths[priority], self._active)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            return {
+                "enabled": self.config.enabled,
+                "max_concurrency": self.config.max_concurrency,
+                "in_flight": self._active,
+                "queued": dict(self._depths),
+                "service_seconds": round(self._service_seconds, 3),
+            }
+
+
+@contextmanager
+def llm_request_context(priority: Optional[str] = None, tenant: Optional[str] = None) -> Iterator[None]:
+    """Declare the priority class and tenant of LLM calls made inside the block."""
+
+    token = _request_context.set((normalise_priority(priority), tenant or DEFAULT_TENANT))
+    try:
+        yield
+    finally:
+        _request_context.reset(token)
+
+
+_DEFAULT_SCHEDULER: Optional[LLMScheduler] = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    global _DEFAULT_SCHEDULER
+    if _DEFAULT_SCHEDULER is None:
+        with _SCHEDULER_LOCK:
+            if _DEFAULT_SCHEDULER is None:
+                _DEFAULT_SCHEDULER = LLMScheduler.from_environment()
+    return _DEFAULT_SCHEDULER
+
+
+def configure_default_scheduler(scheduler: Optional[LLMScheduler]) -> None:
+    global _DEFAULT_SCHEDULER
+    with _SCHEDULER_LOCK:
+        _DEFAULT_SCHEDULER = scheduler
+
+
+__all__ = [
+    "DEFAULT_PRIORITY",
+    "LLMOverloadedError",
+    "LLMScheduler",
+    "PRIORITY_CLASSES",
+    "SchedulerConfig",
+    "configure_default_scheduler",
+    "get_llm_scheduler",
+    "llm_request_context",
+    "normalise_priority",
+]
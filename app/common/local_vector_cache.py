@@ -0,0 +1,273 @@
+"""In-process read-through mirrors of small Chroma collections.
+
+Small, frequently queried collections are copied once into a contiguous
+``float32`` matrix so a query costs a single matrix-vector product instead
+of an HTTP round trip to the Chroma server. Mirrors are refreshed when the
+local ingestion/deletion paths invalidate them, when the collection size
+reported by Chroma changes, or after a TTL; collections above the size
+threshold keep going to Chroma.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+_ENABLED_ENV_VAR = "LOCAL_VECTOR_CACHE_ENABLED"
+_MAX_DOCUMENTS_ENV_VAR = "LOCAL_VECTOR_CACHE_MAX_DOCUMENTS"
+_TTL_ENV_VAR = "LOCAL_VECTOR_CACHE_TTL_SECONDS"
+
+DEFAULT_MAX_DOCUMENTS = 5000
+DEFAULT_TTL_SECONDS = 300.0
+
+
+@dataclass
+class CollectionMirror:
+    """Dense snapshot of a collection ready for brute-force search."""
+
+    name: str
+    ids: List[str]
+    documents: List[str]
+    metadatas: List[Mapping[str, Any]]
+    matrix: np.ndarray
+    squared_norms: np.ndarray
+    space: str
+    document_count: int
+    generation: int
+    loaded_at: float
+
+    def query(self, vector: Sequence[float], k: int) -> List[Tuple[int, float]]:
+        """Return ``(row, distance)`` pairs using Chroma's distance for ``space``."""
+
+        if k <= 0 or not self.ids:
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        if query.shape != (self.matrix.shape[1],):
+            raise ValueError(
+                f"Query dimension {query.shape} does not match mirror {self.matrix.shape[1]}"
+            )
+
+        products = self.matrix @ query
+        if self.space == "ip":
+            distances = 1.0 - products
+        elif self.space == "cosine":
+            query_norm = float(np.linalg.norm(query)) or 1.0
+            norms = np.sqrt(self.squared_norms)
+            norms[norms == 0] = 1.0
+            distances = 1.0 - products / (norms * query_norm)
+        else:
+            distances = self.squared_norms - 2.0 * products + float(query @ query)
+
+        limit = min(k, distances.shape[0])
+        if limit < distances.shape[0]:
+            candidates = np.argpartition(distances, limit - 1)[:limit]
+        else:
+            candidates = np.arange(distances.shape[0])
+        ordered = candidates[np.argsort(distances[candidates], kind="stable")]
+        return [(int(row), float(distances[row])) for row in ordered]
+
+
+def _as_list(value: Any) -> List[Any]:
+    if value is None:
+        return []
+    return list(value)
+
+
+class LocalVectorCache:
+    """Thread-safe registry of :class:`CollectionMirror` objects."""
+
+    def __init__(
+        self,
+        *,
+        max_documents: int = DEFAULT_MAX_DOCUMENTS,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_documents = max(int(max_documents), 0)
+        self.ttl_seconds = float(ttl_seconds)
+        self.enabled = enabled
+        self._clock = clock
+        self._mirrors: Dict[str, CollectionMirror] = {}
+        self._generations: Dict[str, int] = {}
+        self._failures: Dict[str, float] = {}
+        self._lock = Lock()
+
+    @classmethod
+    def from_environment(cls) -> "LocalVectorCache":
+        enabled_value = os.environ.get(_ENABLED_ENV_VAR)
+        enabled = True if enabled_value is None else enabled_value.strip().lower() in {"1", "true", "yes", "on"}
+        try:
+            max_documents = int(os.environ.get(_MAX_DOCUMENTS_ENV_VAR, DEFAULT_MAX_DOCUMENTS))
+        except ValueError:
+            max_documents = DEFAULT_MAX_DOCUMENTS
+        try:
+            ttl = float(os.environ.get(_TTL_ENV_VAR, DEFAULT_TTL_SECONDS))
+        except ValueError:
+            ttl = DEFAULT_TTL_SECONDS
+        return cls(max_documents=max_documents, ttl_seconds=ttl, enabled=enabled)
+
+    def eligible(self, document_count: int) -> bool:
+        return self.enabled and 0 < document_count <= self.max_documents
+
+    def invalidate(self, collection_name: str) -> None:
+        """Drop the mirror of *collection_name* after a local ingest or delete."""
+
+        with self._lock:
+            self._generations[collection_name] = self._generations.get(collection_name, 0) + 1
+            self._mirrors.pop(collection_name, None)
+            self._failures.pop(collection_name, None)
+
+    def _is_fresh(self, mirror: CollectionMirror, document_count: int) -> bool:
+        if mirror.document_count != document_count:
+            return False
+        if mirror.generation != self._generations.get(mirror.name, 0):
+            return False
+        return self._clock() - mirror.loaded_at < self.ttl_seconds
+
+    def get_mirror(
+        self, client: Any, collection_name: str, document_count: int
+    ) -> Optional[CollectionMirror]:
+        """Return an up-to-date mirror or ``None`` when Chroma should be queried."""
+
+        if not self.eligible(document_count):
+            return None
+
+        mirror = self._mirrors.get(collection_name)
+        if mirror is not None and self._is_fresh(mirror, document_count):
+            return mirror
+
+        with self._lock:
+            mirror = self._mirrors.get(collection_name)
+            if mirror is not None and self._is_fresh(mirror, document_count):
+                return mirror
+            failed_at = self._failures.get(collection_name)
+            if failed_at is not None and self._clock() - failed_at < self.ttl_seconds:
+                return None
+            generation = self._generations.get(collection_name, 0)
+            try:
+                mirror = self._load(client, collection_name, generation)
+            except Exception as exc:
+                self._failures[collection_name] = self._clock()
+                self._mirrors.pop(collection_name, None)
+                logger.warning(
+                    "No se pudo reflejar la colección '%s' en memoria: %s",
+                    collection_name,
+                    exc,
+                )
+                return None
+            if mirror is None:
+                return None
+            self._mirrors[collection_name] = mirror
+            return mirror
+
+    def _load(self, client: Any, collection_name: str, generation: int) -> Optional[CollectionMirror]:
+        collection = client.get_collection(collection_name)
+        response = collection.get(include=["embeddings", "documents", "metadatas"])
+        ids = [str(value) for value in _as_list(response.get("ids"))]
+        if len(ids) > self.max_documents:
+            return None
+        embeddings = response.get("embeddings")
+        if embeddings is None or len(ids) == 0:
+            return None
+
+        matrix = np.ascontiguousarray(np.asarray(embeddings, dtype=np.float32))
+        if matrix.ndim != 2 or matrix.shape[0] != len(ids):
+            raise ValueError("Respuesta de Chroma sin embeddings completos")
+
+        documents = [text or "" for text in _as_list(response.get("documents"))] or [""] * len(ids)
+        metadatas = [dict(meta or {}) for meta in _as_list(response.get("metadatas"))] or [{}] * len(ids)
+        collection_metadata = getattr(collection, "metadata", None) or {}
+        space = str(collection_metadata.get("hnsw:space", "l2")).lower()
+
+        logger.info(
+            "Colección '%s' reflejada en memoria (%s vectores de dimensión %s)",
+            collection_name,
+            matrix.shape[0],
+            matrix.shape[1],
+        )
+        return CollectionMirror(
+            name=collection_name,
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,
+            matrix=matrix,
+            squared_norms=np.einsum("ij,ij->i", matrix, matrix),
+            space=space,
+            document_count=len(ids),
+            generation=generation,
+            loaded_at=self._clock(),
+        )
+
+
+class LocalVectorRetriever:
+    """Retriever with the ``invoke`` interface backed by a collection mirror."""
+
+    def __init__(
+        self,
+        mirror: CollectionMirror,
+        embeddings: Any,
+        k: int,
+        document_factory: Callable[[str, Dict[str, Any]], Any],
+    ) -> None:
+        self._mirror = mirror
+        self._embeddings = embeddings
+        self._k = k
+        self._document_factory = document_factory
+
+    def invoke(self, query: str) -> List[Any]:
+        vector = self._embeddings.embed_query(query)
+        documents = []
+        for row, distance in self._mirror.query(vector, self._k):
+            metadata = dict(self._mirror.metadatas[row])
+            metadata["distance"] = distance
+            documents.append(self._document_factory(self._mirror.documents[row], metadata))
+        return documents
+
+    def get_relevant_documents(self, query: str) -> List[Any]:  # pragma: no cover - legacy API
+        return self.invoke(query)
+
+
+_DEFAULT_CACHE: Optional[LocalVectorCache] = None
+_CACHE_LOCK = Lock()
+
+
+def get_local_vector_cache() -> LocalVectorCache:
+    global _DEFAULT_CACHE
+    if _DEFAULT_CACHE is None:
+        with _CACHE_LOCK:
+            if _DEFAULT_CACHE is None:
+                _DEFAULT_CACHE = LocalVectorCache.from_environment()
+    return _DEFAULT_CACHE
+
+
+def configure_default_cache(cache: Optional[LocalVectorCache]) -> None:
+    global _DEFAULT_CACHE
+    with _CACHE_LOCK:
+        _DEFAULT_CACHE = cache
+
+
+def invalidate_local_mirror(collection_name: str) -> None:
+    """Signal that *collection_name* changed so its mirror is reloaded lazily."""
+
+    cache = _DEFAULT_CACHE
+    if cache is not None:
+        cache.invalidate(collection_name)
+
+
+__all__ = [
+    "CollectionMirror",
+    "LocalVectorCache",
+    "LocalVectorRetriever",
+    "configure_default_cache",
+    "get_local_vector_cache",
+    "invalidate_local_mirror",
+]
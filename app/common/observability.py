@@ -196,6 +196,87 @@ _ORCHESTRATOR_ROUTING = _build_metric(
     ("task_type", "result"),
 )
 
+_RAG_ROUTING = _build_metric(
+    Counter,
+    "rag_routing_decisions_total",
+    "Decisiones del enrutador de colecciones por centroides.",
+    ("result",),
+)
+_RAG_ROUTING_COLLECTIONS = _build_metric(
+    Counter,
+    "rag_routing_collections_total",
+    "Colecciones consultadas u omitidas por el enrutador de colecciones.",
+    ("outcome",),
+)
+_RAG_ROUTING_SKIPPED_RATIO = _build_metric(
+    Histogram,
+    "rag_routing_skipped_ratio",
+    "Proporción de colecciones candidatas omitidas en cada consulta.",
+    (),
+    buckets=(0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0),
+)
+
+_PIPELINE_STAGE_LATENCY = _build_metric(
+    Histogram,
+    "pipeline_stage_duration_seconds",
+    "Duración de cada etapa de las canalizaciones RAG y de ingesta.",
+    ("stage", "collection"),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+
+_LLM_QUEUE_DEPTH = _build_metric(
+    Gauge,
+    "llm_queue_depth",
+    "Solicitudes al LLM en espera por clase de prioridad.",
+    ("priority",),
+)
+_LLM_QUEUE_WAIT = _build_metric(
+    Histogram,
+    "llm_queue_wait_seconds",
+    "Tiempo de espera en cola antes de obtener un turno del LLM.",
+    ("priority",),
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300),
+)
+_LLM_IN_FLIGHT = _build_metric(
+    Gauge,
+    "llm_requests_in_flight",
+    "Solicitudes al LLM en ejecución.",
+    (),
+)
+_LLM_REJECTIONS = _build_metric(
+    Counter,
+    "llm_requests_rejected_total",
+    "Solicitudes al LLM rechazadas por control de admisión.",
+    ("priority", "reason"),
+)
+
+_CONVERSION_QUEUE_DEPTH = _build_metric(
+    Gauge,
+    "conversion_queue_depth",
+    "Conversiones en cola por prioridad.",
+    ("priority",),
+)
+_CONVERSION_RUNNING = _build_metric(
+    Gauge,
+    "conversion_jobs_running",
+    "Conversiones en ejecución.",
+    (),
+)
+_CONVERSION_QUEUE_WAIT = _build_metric(
+    Histogram,
+    "conversion_queue_wait_seconds",
+    "Tiempo en cola antes de que un worker tome la conversión.",
+    ("priority",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+_CONVERSION_DURATION = _build_metric(
+    Histogram,
+    "conversion_job_duration_seconds",
+    "Duración de la ejecución de cada conversión por prioridad y estado final.",
+    ("priority", "status"),
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+
 _KNOWLEDGE_BASE_SIZE = _build_metric(
     Gauge,
     "knowledge_base_documents",
@@ -473,6 +554,77 @@ def record_orchestrator_decision(task_type: str, result: str) -> None:
     _ORCHESTRATOR_ROUTING.labels(task_type=task_type, result=result).inc()
 
 
+def record_collection_routing(result: str, queried: int, skipped: int) -> None:
+    """Register a collection routing decision and how many collections were skipped."""
+
+    _maybe_start_metrics_server()
+    queried = max(int(queried), 0)
+    skipped = max(int(skipped), 0)
+    _RAG_ROUTING.labels(result=result).inc()
+    _RAG_ROUTING_COLLECTIONS.labels(outcome="queried").inc(queried)
+    _RAG_ROUTING_COLLECTIONS.labels(outcome="skipped").inc(skipped)
+    total = queried + skipped
+    if total:
+        _RAG_ROUTING_SKIPPED_RATIO.observe(skipped / total)
+
+
+def record_stage_duration(
+    stage: str,
+    duration_seconds: float,
+    collection: Optional[str] = None,
+) -> None:
+    """Record the duration of a traced pipeline stage."""
+
+    _maybe_start_metrics_server()
+    _PIPELINE_STAGE_LATENCY.labels(stage=stage, collection=collection or "none").observe(
+        max(float(duration_seconds), 0.0)
+    )
+
+
+def record_llm_queue(priority: str, depth: int, in_flight: int) -> None:
+    """Record the current LLM queue depth for *priority* and the requests in flight."""
+
+    _maybe_start_metrics_server()
+    _LLM_QUEUE_DEPTH.labels(priority=priority).set(max(int(depth), 0))
+    _LLM_IN_FLIGHT.set(max(int(in_flight), 0))
+
+
+def record_llm_queue_wait(priority: str, wait_seconds: float) -> None:
+    """Record how long a request waited for an LLM slot."""
+
+    _maybe_start_metrics_server()
+    _LLM_QUEUE_WAIT.labels(priority=priority).observe(max(float(wait_seconds), 0.0))
+
+
+def record_llm_rejection(priority: str, reason: str) -> None:
+    """Register a request shed by the LLM admission control."""
+
+    _maybe_start_metrics_server()
+    _LLM_REJECTIONS.labels(priority=priority, reason=reason).inc()
+
+
+def record_conversion_queue(priority: str, depth: int, running: int) -> None:
+    """Record the conversion queue depth for *priority* and the jobs running."""
+
+    _maybe_start_metrics_server()
+    _CONVERSION_QUEUE_DEPTH.labels(priority=priority).set(max(int(depth), 0))
+    _CONVERSION_RUNNING.set(max(int(running), 0))
+
+
+def record_conversion_wait(priority: str, wait_seconds: float) -> None:
+    """Record how long a conversion waited for a worker."""
+
+    _maybe_start_metrics_server()
+    _CONVERSION_QUEUE_WAIT.labels(priority=priority).observe(max(float(wait_seconds), 0.0))
+
+
+def record_conversion_job(priority: str, status: str, duration_seconds: float) -> None:
+    """Record the run time of a conversion that reached a final *status*."""
+
+    _maybe_start_metrics_server()
+    _CONVERSION_DURATION.labels(priority=priority, status=status).observe(max(float(duration_seconds), 0.0))
+
+
 def record_predictive_insight(
     insight_type: str,
     impact_level: str,
@@ -586,7 +738,14 @@ def record_behavioral_anomaly(anomaly_type: str) -> None:
 __all__ = [
     "record_agent_invocation",
     "record_behavioral_anomaly",
+    "record_collection_routing",
     "record_ingestion",
+    "record_conversion_job",
+    "record_conversion_queue",
+    "record_conversion_wait",
+    "record_llm_queue",
+    "record_llm_queue_wait",
+    "record_llm_rejection",
     "record_optimization_action",
     "record_orchestrator_decision",
     "record_predictive_insight",
@@ -594,5 +753,6 @@ __all__ = [
     "record_query_metrics",
     "record_rag_response",
     "record_security_event",
+    "record_stage_duration",
     "record_usage_pattern",
 ]
@@ -13,6 +13,10 @@ from pathlib import Path
 from typing import Any, Iterable, Mapping, Sequence
 
 from .constants import CHROMA_COLLECTIONS, CHROMA_SETTINGS
+from .chroma_utils import get_or_create_collection
+from .collection_router import forget_collection_vectors
+from .lexical_index import remove_documents as remove_lexical_documents
+from .local_vector_cache import invalidate_local_mirror
 
 logger = logging.getLogger(__name__)
 
@@ -359,7 +363,7 @@ class PrivacyManager:
 
         for collection_name in self._collections:
             try:
-                collection = self._chroma_client.get_or_create_collection(collection_name)
+                collection = get_or_create_collection(self._chroma_client, collection_name)
             except Exception as exc:  # pragma: no cover - defensive fallback
                 logger.error("No se pudo obtener la colección %s: %s", collection_name, exc)
                 continue
@@ -371,9 +375,14 @@ class PrivacyManager:
                     batch = filtered_ids[start_index:start_index + _CHROMA_DELETE_BATCH_SIZE]
                     if not batch:
                         continue
+                    vectors = self._fetch_embeddings(collection, batch)
                     try:
                         collection.delete(ids=list(batch))
                         deleted_any = True
+                        remove_lexical_documents(collection_name, batch)
+                        invalidate_local_mirror(collection_name)
+                        if vectors:
+                            forget_collection_vectors(collection_name, vectors)
                     except Exception as exc:  # pragma: no cover - delete may fail
                         logger.error(
                             "No se pudo eliminar %s de la colección %s (lote de %s ids): %s",
@@ -417,6 +426,19 @@ class PrivacyManager:
 
         return affected
 
+    @staticmethod
+    def _fetch_embeddings(collection: Any, ids: Sequence[str]) -> list[Sequence[float]]:
+        """Return stored embeddings for *ids* so derived indexes can be updated."""
+
+        try:
+            response = collection.get(ids=list(ids), include=["embeddings"])
+        except Exception:
+            return []
+        embeddings = response.get("embeddings") if isinstance(response, Mapping) else None
+        if embeddings is None:
+            return []
+        return [vector for vector in embeddings if vector is not None and len(vector)]
+
     def _find_matching_ids(self, collection: Any, filename: str) -> list[str]:
         """Return ids within *collection* that reference *filename*."""
 
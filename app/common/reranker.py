@@ -0,0 +1,219 @@
+"""Optional cross-encoder reranking of retrieved chunks under a latency budget."""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+_DEFAULT_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+_ENABLED_ENV_VAR = "RERANKER_ENABLED"
+_MODEL_ENV_VAR = "RERANKER_MODEL_NAME"
+_CANDIDATES_ENV_VAR = "RERANKER_CANDIDATES_PER_COLLECTION"
+_BUDGET_ENV_VAR = "RERANKER_TIME_BUDGET_MS"
+_BATCH_ENV_VAR = "RERANKER_BATCH_SIZE"
+
+
+RerankerFactory = Callable[..., Any]
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        value = int(os.environ.get(name, default))
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+@dataclass(frozen=True)
+class RerankerConfig:
+    """Settings for the reranking stage."""
+
+    enabled: bool = False
+    model_name: str = _DEFAULT_MODEL
+    candidates_per_collection: int = 20
+    time_budget_seconds: float = 0.3
+    batch_size: int = 16
+
+    @classmethod
+    def from_sources(cls) -> "RerankerConfig":
+        enabled = os.environ.get(_ENABLED_ENV_VAR, "").strip().lower() in {"1", "true", "yes", "on"}
+        model = os.environ.get(_MODEL_ENV_VAR, "").strip() or _DEFAULT_MODEL
+        return cls(
+            enabled=enabled,
+            model_name=model,
+            candidates_per_collection=_env_int(_CANDIDATES_ENV_VAR, 20),
+            time_budget_seconds=_env_int(_BUDGET_ENV_VAR, 300) / 1000.0,
+            batch_size=_env_int(_BATCH_ENV_VAR, 16),
+        )
+
+
+class RerankerManager:
+    """Loads cross-encoder models once per process and scores query/chunk pairs.
+
+    Mirrors :class:`common.embeddings_manager.EmbeddingsManager`: the model
+    factory is injectable, instances are cached per model name behind a lock
+    and a process-wide default manager is exposed through
+    :func:`get_reranker_manager`.
+    """
+
+    def __init__(
+        self,
+        config: Optional[RerankerConfig] = None,
+        *,
+        model_factory: Optional[RerankerFactory] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ) -> None:
+        self._config = config or RerankerConfig.from_sources()
+        self._model_factory = model_factory or self._load_default_factory()
+        self._model_cache: Dict[str, Any] = {}
+        self._failed_models: Set[str] = set()
+        self._lock = Lock()
+        self._clock = clock
+
+    @staticmethod
+    def _load_default_factory() -> RerankerFactory:
+        def _factory(*, model_name: str):
+            from sentence_transformers import CrossEncoder
+
+            return CrossEncoder(model_name, device="cpu")
+
+        return _factory
+
+    @property
+    def enabled(self) -> bool:
+        return self._config.enabled
+
+    def get_config(self) -> RerankerConfig:
+        return self._config
+
+    def candidate_limit(self, target: int) -> int:
+        """Number of candidates to fetch per collection for a final *target*."""
+
+        if not self.enabled:
+            return target
+        return max(target, self._config.candidates_per_collection)
+
+    def get_model(self, model_name: Optional[str] = None) -> Optional[Any]:
+        name = model_name or self._config.model_name
+        cached = self._model_cache.get(name)
+        if cached is not None:
+            return cached
+        if name in self._failed_models:
+            return None
+
+        with self._lock:
+            cached = self._model_cache.get(name)
+            if cached is not None:
+                return cached
+            if name in self._failed_models:
+                return None
+            try:
+                model = self._model_factory(model_name=name)
+            except Exception as exc:
+                self._failed_models.add(name)
+                logger.warning("No se pudo cargar el modelo de reranking '%s': %s", name, exc)
+                return None
+            self._model_cache[name] = model
+            logger.info("Modelo de reranking inicializado: %s", name)
+            return model
+
+    def rerank(self, query: str, documents: Sequence[Any], top_n: int) -> List[Any]:
+        """Return the best *top_n* documents for *query*.
+
+        Candidates are scored in batches in their incoming order. Once the
+        time budget would be exceeded by another batch, the remaining
+        candidates keep their first-stage order after the scored ones.
+        Without a usable model the first-stage order is preserved.
+        """
+
+        return [doc for doc, _ in self.rerank_with_scores(query, documents, top_n)]
+
+    def rerank_with_scores(
+        self, query: str, documents: Sequence[Any], top_n: int
+    ) -> List[Tuple[Any, Optional[float]]]:
+        """Like :meth:`rerank` but also return the cross-encoder score.
+
+        Candidates that were not scored (budget exhausted, reranking
+        disabled or model unavailable) are paired with ``None``.
+        """
+
+        candidates = list(documents)
+        if top_n <= 0:
+            return []
+        if not self.enabled or len(candidates) <= 1:
+            return [(doc, None) for doc in candidates[:top_n]]
+
+        model = self.get_model()
+        if model is None:
+            return [(doc, None) for doc in candidates[:top_n]]
+
+        batch_size = max(self._config.batch_size, 1)
+        budget = self._config.time_budget_seconds
+        started = self._clock()
+        scores: List[float] = []
+        slowest_batch = 0.0
+
+        for start in range(0, len(candidates), batch_size):
+            elapsed = self._clock() - started
+            if scores and elapsed + slowest_batch > budget:
+                logger.debug(
+                    "Presupuesto de reranking agotado tras %s de %s candidatos",
+                    len(scores),
+                    len(candidates),
+                )
+                break
+            batch = candidates[start:start + batch_size]
+            pairs = [(query, getattr(doc, "page_content", "") or "") for doc in batch]
+            batch_started = self._clock()
+            try:
+                batch_scores = model.predict(pairs)
+            except Exception as exc:  # pragma: no cover - defensive log path
+                logger.warning("Fallo del reranker, se conserva el orden original: %s", exc)
+                break
+            slowest_batch = max(slowest_batch, self._clock() - batch_started)
+            scores.extend(float(score) for score in batch_scores)
+
+        if not scores:
+            return [(doc, None) for doc in candidates[:top_n]]
+
+        scored = sorted(
+            range(len(scores)), key=lambda index: (-scores[index], index)
+        )
+        ordered: List[Tuple[Any, Optional[float]]] = [
+            (candidates[index], scores[index]) for index in scored
+        ]
+        ordered.extend((doc, None) for doc in candidates[len(scores):])
+        return ordered[:top_n]
+
+
+_DEFAULT_MANAGER: Optional[RerankerManager] = None
+_MANAGER_LOCK = Lock()
+
+
+def get_reranker_manager() -> RerankerManager:
+    global _DEFAULT_MANAGER
+    if _DEFAULT_MANAGER is None:
+        with _MANAGER_LOCK:
+            if _DEFAULT_MANAGER is None:
+                _DEFAULT_MANAGER = RerankerManager()
+    return _DEFAULT_MANAGER
+
+
+def configure_default_reranker(manager: Optional[RerankerManager]) -> None:
+    global _DEFAULT_MANAGER
+    with _MANAGER_LOCK:
+        _DEFAULT_MANAGER = manager
+
+
+__all__ = [
+    "RerankerConfig",
+    "RerankerManager",
+    "configure_default_reranker",
+    "get_reranker_manager",
+]
@@ -38,6 +38,8 @@ except ImportError:
     RecursiveCharacterTextSplitter = _FallbackRecursiveCharacterTextSplitter  # type: ignore
     Document = _FallbackDocument  # type: ignore
 
+from common.token_chunking import get_token_splitter
+
 class SmartChunker:
     """Chunker inteligente que adapta la estrategia según el tipo de contenido"""
     
@@ -146,7 +148,9 @@ class SmartChunker:
         "default": "mixed"
     }
     
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None):
+        # Modelo de embeddings cuyo límite de tokens dimensiona los chunks
+        self.model_name = model_name
         self.splitters = {}
         self._initialize_splitters()
     
@@ -159,6 +163,23 @@ class SmartChunker:
                 separators=config["separators"]
             )
     
+    def _get_splitter(self, content_type: str) -> Any:
+        """Splitter por tokens del modelo si hay tokenizador; si no, por caracteres"""
+        config = self.CHUNKING_CONFIGS.get(content_type, self.CHUNKING_CONFIGS["mixed"])
+        model_name = self.model_name
+        if model_name is None:
+            from common.embeddings_manager import get_embeddings_manager
+
+            model_name = get_embeddings_manager().get_config().default_model
+        token_splitter = get_token_splitter(
+            model_name,
+            config["separators"],
+            overlap_ratio=config["chunk_overlap"] / config["chunk_size"],
+        )
+        if token_splitter is not None:
+            return token_splitter
+        return self.splitters.get(content_type, self.splitters["mixed"])
+
     def detect_content_type(self, file_path: str, content: Optional[str] = None) -> str:
         """Detecta el tipo de contenido basado en la extensión y contenido"""
         
@@ -193,7 +214,7 @@ class SmartChunker:
         content_type = self.detect_content_type(file_path, content)
         
         # Obtener el splitter apropiado
-        splitter = self.splitters.get(content_type, self.splitters["mixed"])
+        splitter = self._get_splitter(content_type)
         
         # Dividir el contenido
         chunks = splitter.split_text(content)
@@ -211,6 +232,9 @@ class SmartChunker:
                 **(metadata or {})
             }
             
+            if hasattr(splitter, "max_tokens"):
+                chunk_metadata["chunk_token_limit"] = splitter.max_tokens
+            
             # Agregar metadatos específicos del código
             if content_type == "code":
                 chunk_metadata.update(self._extract_code_metadata(chunk, file_path))
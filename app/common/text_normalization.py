@@ -1,9 +1,12 @@
 """Utility helpers for consistent text normalization across ingestion and querying."""
 from __future__ import annotations
 
+import base64
+import json
 import unicodedata
+import zlib
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
 
 try:  # pragma: no cover - the import path is environment dependent
     from langchain_core.documents import Document as _LangChainDocument  # type: ignore[assignment]
@@ -31,6 +34,15 @@ class _SimpleDocument:
         self.metadata = metadata
 
 
+def make_document(page_content: str, metadata: Dict[str, Any]) -> Document:
+    """Build a ``Document``, tolerating stand-ins that reject keyword arguments."""
+
+    try:
+        return Document(page_content=page_content, metadata=metadata)
+    except TypeError:
+        return _SimpleDocument(page_content=page_content, metadata=metadata)
+
+
 NORMALIZATION_FORM = "NFC"
 
 
@@ -46,31 +58,153 @@ def normalize_to_nfc(text: str) -> str:
     return unicodedata.normalize(NORMALIZATION_FORM, text)
 
 
+ORIGINAL_CONTENT_KEY = "original_page_content"
+ORIGINAL_PATCH_KEY = "original_page_content_patch"
+ORIGINAL_ZLIB_KEY = "original_page_content_zlib"
+PROVENANCE_KEYS = (ORIGINAL_CONTENT_KEY, ORIGINAL_PATCH_KEY, ORIGINAL_ZLIB_KEY)
+
+# Originals up to this size are stored verbatim; a patch would barely be smaller.
+INLINE_ORIGINAL_MAX_CHARS = 256
+
+
+def _clusters(text: str) -> Iterator[str]:
+    """Yield *text* split into a starter followed by its combining marks."""
+
+    start = 0
+    for index in range(1, len(text)):
+        if not unicodedata.combining(text[index]):
+            yield text[start:index]
+            start = index
+    if text:
+        yield text[start:]
+
+
+def _content_patch(normalized: str, original: str) -> Optional[str]:
+    """Return ``[[start, end, replacement], ...]`` turning *normalized* into *original*.
+
+    NFC only rewrites a character together with its combining marks, so the
+    texts are compared cluster by cluster in linear time. ``None`` is returned
+    for the rare compositions that span clusters (e.g. Hangul jamo).
+    """
+
+    operations: List[List[Any]] = []
+    position = 0
+    for cluster in _clusters(original):
+        composed = unicodedata.normalize(NORMALIZATION_FORM, cluster)
+        end = position + len(composed)
+        if normalized[position:end] != composed:
+            return None
+        if composed != cluster:
+            if operations and operations[-1][1] == position:
+                operations[-1][1] = end
+                operations[-1][2] += cluster
+            else:
+                operations.append([position, end, cluster])
+        position = end
+    if position != len(normalized):
+        return None
+    return json.dumps(operations, ensure_ascii=False, separators=(",", ":"))
+
+
+def _apply_patch(normalized: str, patch: str) -> str:
+    pieces: List[str] = []
+    cursor = 0
+    for start, end, replacement in json.loads(patch):
+        pieces.append(normalized[cursor:start])
+        pieces.append(replacement)
+        cursor = end
+    pieces.append(normalized[cursor:])
+    return "".join(pieces)
+
+
+def encode_original_content(normalized: str, original: str) -> Dict[str, str]:
+    """Return the provenance metadata needed to recover *original* from *normalized*.
+
+    Nothing is stored when normalisation was a no-op. Short originals are kept
+    verbatim under ``original_page_content``; longer ones as whichever is
+    smaller of a patch against the normalised text or a zlib/base64 copy.
+    """
+
+    if original == normalized:
+        return {}
+    if len(original) <= INLINE_ORIGINAL_MAX_CHARS:
+        return {ORIGINAL_CONTENT_KEY: original}
+    candidates = {
+        ORIGINAL_CONTENT_KEY: original,
+        ORIGINAL_ZLIB_KEY: base64.b64encode(zlib.compress(original.encode("utf-8"), 9)).decode("ascii"),
+    }
+    patch = _content_patch(normalized, original)
+    if patch is not None:
+        candidates[ORIGINAL_PATCH_KEY] = patch
+    key = min(candidates, key=lambda name: len(candidates[name].encode("utf-8")))
+    return {key: candidates[key]}
+
+
+def restore_original_content(page_content: str, metadata: Optional[Mapping[str, Any]]) -> str:
+    """Return the pre-normalisation text of a chunk stored with :func:`encode_original_content`."""
+
+    metadata = metadata or {}
+    if isinstance(metadata.get(ORIGINAL_CONTENT_KEY), str):
+        return metadata[ORIGINAL_CONTENT_KEY]
+    if isinstance(metadata.get(ORIGINAL_PATCH_KEY), str):
+        return _apply_patch(page_content or "", metadata[ORIGINAL_PATCH_KEY])
+    if isinstance(metadata.get(ORIGINAL_ZLIB_KEY), str):
+        return zlib.decompress(base64.b64decode(metadata[ORIGINAL_ZLIB_KEY])).decode("utf-8")
+    return page_content or ""
+
+
+def compact_provenance_metadata(page_content: str, metadata: Optional[Mapping[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Return a metadata update re-encoding a stored original, or ``None`` if already compact.
+
+    Keys set to ``None`` in the update must be dropped from the stored
+    metadata; Chroma itself rejects ``None`` values.
+    """
+
+    metadata = metadata or {}
+    current = {key: metadata[key] for key in PROVENANCE_KEYS if key in metadata}
+    if not current:
+        return None
+    target = encode_original_content(page_content or "", restore_original_content(page_content, metadata))
+    if target == current:
+        return None
+    update: Dict[str, Any] = {key: None for key in current if key not in target}
+    update.update(target)
+    return update
+
+
 def normalize_documents_nfc(documents: Iterable[Document]) -> List[Document]:
     """Normalize page content of ``documents`` using NFC.
 
-    The original page content is preserved in the ``original_page_content``
-    metadata field to retain the exact bytes that were ingested.
+    When normalisation changes the text, enough provenance is kept in the
+    metadata (see :func:`encode_original_content`) to recover the exact text
+    that was ingested with :func:`restore_original_content`.
     """
     normalized_docs: List[Document] = []
     for doc in documents:
-        original_content = doc.page_content or ""
-        normalized_content = normalize_to_nfc(original_content)
         metadata = dict(doc.metadata) if doc.metadata else {}
-        metadata["original_page_content"] = original_content
+        # Re-normalising keeps the provenance of the text first ingested.
+        original_content = restore_original_content(doc.page_content, metadata)
+        normalized_content = normalize_to_nfc(doc.page_content or "")
+        for key in PROVENANCE_KEYS:
+            metadata.pop(key, None)
+        metadata.update(encode_original_content(normalized_content, original_content))
         metadata["normalization"] = NORMALIZATION_FORM
-        try:
-            normalized_docs.append(
-                Document(page_content=normalized_content, metadata=metadata)
-            )
-        except TypeError:
-            normalized_docs.append(_SimpleDocument(page_content=normalized_content, metadata=metadata))
+        normalized_docs.append(make_document(normalized_content, metadata))
     return normalized_docs
 
 
 __all__ = [
     "Document",
+    "INLINE_ORIGINAL_MAX_CHARS",
+    "ORIGINAL_CONTENT_KEY",
+    "ORIGINAL_PATCH_KEY",
+    "ORIGINAL_ZLIB_KEY",
+    "PROVENANCE_KEYS",
+    "compact_provenance_metadata",
+    "encode_original_content",
+    "make_document",
     "normalize_documents_nfc",
     "normalize_to_nfc",
     "NORMALIZATION_FORM",
+    "restore_original_content",
 ]
@@ -0,0 +1,294 @@
+"""Token-budgeted chunking aligned to the embedding model's sequence limit.
+
+Sentence-transformer models silently truncate their input: ``all-MiniLM-L6-v2``
+keeps 256 word-pieces, ``all-mpnet-base-v2`` 384. Character-sized chunks
+therefore either lose their tail at embedding time or stay well below the
+limit. :class:`TokenBudgetSplitter` measures pieces with the model's own
+tokenizer and packs them as close to the limit as the separator hierarchy
+allows, never above it.
+
+Tokenizers are loaded once per model (:func:`get_tokenizer`) through
+``transformers`` when it is installed; without it :func:`get_token_splitter`
+returns ``None`` and callers keep their character-based splitters.
+``TOKEN_AWARE_CHUNKING=0`` forces that legacy behaviour and
+``EMBEDDINGS_MAX_TOKENS`` overrides the per-model limit.
+"""
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from common.text_normalization import make_document
+
+logger = logging.getLogger(__name__)
+
+_ENABLED_ENV_VAR = "TOKEN_AWARE_CHUNKING"
+_MAX_TOKENS_ENV_VAR = "EMBEDDINGS_MAX_TOKENS"
+_DEFAULT_SEPARATORS = ("\n\n", "\n", " ")
+
+# ``max_seq_length`` from each model's sentence_bert_config.json; the
+# tokenizer's own ``model_max_length`` is often the larger BERT limit.
+_KNOWN_MAX_SEQ_LENGTH = {
+    "all-minilm-l6-v2": 256,
+    "all-minilm-l12-v2": 128,
+    "all-mpnet-base-v2": 384,
+    "paraphrase-multilingual-minilm-l12-v2": 128,
+    "paraphrase-multilingual-mpnet-base-v2": 128,
+    "multi-qa-minilm-l6-cos-v1": 512,
+    "multi-qa-mpnet-base-dot-v1": 512,
+}
+_FALLBACK_MAX_TOKENS = 512
+# Initial search window of ``_hard_split``; it doubles while the prefix fits.
+_CHARS_PER_TOKEN_GUESS = 4
+
+
+def _load_tokenizer(model_name: str) -> Any:
+    from transformers import AutoTokenizer  # type: ignore
+
+    repo_id = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    return AutoTokenizer.from_pretrained(repo_id)
+
+
+# Swappable so tests can provide a lightweight tokenizer.
+_TOKENIZER_LOADER: Callable[[str], Any] = _load_tokenizer
+
+_TOKENIZERS: Dict[str, Optional[Any]] = {}
+_TOKENIZERS_LOCK = Lock()
+_SPLITTERS: Dict[Tuple[str, Tuple[str, ...], float], "TokenBudgetSplitter"] = {}
+
+
+def token_chunking_enabled() -> bool:
+    return os.environ.get(_ENABLED_ENV_VAR, "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def get_tokenizer(model_name: str) -> Optional[Any]:
+    """Return the cached tokenizer of *model_name*, or ``None`` if it cannot be loaded."""
+
+    if model_name in _TOKENIZERS:
+        return _TOKENIZERS[model_name]
+    with _TOKENIZERS_LOCK:
+        if model_name not in _TOKENIZERS:
+            try:
+                _TOKENIZERS[model_name] = _TOKENIZER_LOADER(model_name)
+            except Exception as exc:
+                logger.warning("Tokenizador no disponible para %s, se usará chunking por caracteres: %s", model_name, exc)
+                _TOKENIZERS[model_name] = None
+        return _TOKENIZERS[model_name]
+
+
+def clear_tokenizer_cache() -> None:
+    with _TOKENIZERS_LOCK:
+        _TOKENIZERS.clear()
+        _SPLITTERS.clear()
+
+
+def model_max_tokens(model_name: str, tokenizer: Any = None) -> int:
+    """Maximum sequence length, special tokens included, that *model_name* embeds."""
+
+    configured = os.environ.get(_MAX_TOKENS_ENV_VAR)
+    if configured:
+        try:
+            return max(int(configured), 8)
+        except ValueError:
+            logger.warning("Valor inválido para %s: %s", _MAX_TOKENS_ENV_VAR, configured)
+    known = _KNOWN_MAX_SEQ_LENGTH.get(model_name.rsplit("/", 1)[-1].lower())
+    if known:
+        return known
+    limit = getattr(tokenizer, "model_max_length", None)
+    # Tokenizers without a limit report a huge sentinel (int(1e30)).
+    if isinstance(limit, int) and 0 < limit <= 100_000:
+        return limit
+    return _FALLBACK_MAX_TOKENS
+
+
+class TokenBudgetSplitter:
+    """Recursive separator splitter whose chunk size is measured in model tokens.
+
+    Text is split on the first separator that occurs in it, keeping the
+    separator at the start of the following piece, and pieces are merged
+    greedily while the chunk fits in ``max_tokens`` (special tokens
+    included). Pieces that are too large on their own recurse with the next
+    separators; as a last resort they are cut at the longest prefix that
+    fits. Every emitted chunk is re-measured, so none exceeds the limit.
+    """
+
+    def __init__(
+        self,
+        tokenizer: Any,
+        max_tokens: int,
+        chunk_overlap: int = 0,
+        separators: Optional[Sequence[str]] = None,
+    ) -> None:
+        self.tokenizer = tokenizer
+        self.max_tokens = max_tokens
+        self.special_tokens = len(tokenizer.encode("", add_special_tokens=True))
+        self.budget = max(max_tokens - self.special_tokens, 1)
+        self.chunk_overlap = max(0, min(chunk_overlap, self.budget // 2))
+        self.separators = tuple(separators or _DEFAULT_SEPARATORS)
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens *text* occupies in the model input, special tokens included."""
+
+        return self._count(text) + self.special_tokens
+
+    def split_text(self, text: str) -> List[str]:
+        chunks: List[str] = []
+        for chunk in self._split(text, self.separators):
+            chunk = chunk.strip()
+            if not chunk:
+                continue
+            # Piece counts are additive for whitespace-pretokenised vocabularies;
+            # verify anyway so merges across a boundary never overflow.
+            chunks.extend([chunk] if self._count(chunk) <= self.budget else self._hard_split(chunk))
+        return chunks
+
+    def split_documents(self, documents: Iterable[Any]) -> List[Any]:
+        chunks: List[Any] = []
+        for document in documents:
+            metadata = dict(getattr(document, "metadata", None) or {})
+            for text in self.split_text(getattr(document, "page_content", "") or ""):
+                chunks.append(make_document(text, dict(metadata)))
+        return chunks
+
+    # ------------------------------------------------------------------
+    def _count(self, text: str) -> int:
+        return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _split(self, text: str, separators: Sequence[str]) -> List[str]:
+        if self._count(text) <= self.budget:
+            return [text]
+        for index, separator in enumerate(separators):
+            if separator and separator in text:
+                break
+        else:
+            return self._hard_split(text)
+
+        remaining = separators[index + 1 :]
+        head, *tail = text.split(separator)
+        pieces = [piece for piece in [head, *(separator + piece for piece in tail)] if piece]
+
+        chunks: List[str] = []
+        current: List[Tuple[str, int]] = []
+        current_tokens = 0
+        for piece in pieces:
+            tokens = self._count(piece)
+            if tokens > self.budget:
+                if current:
+                    chunks.append("".join(part for part, _ in current))
+                    current, current_tokens = [], 0
+                chunks.extend(self._split(piece, remaining))
+                continue
+            if current and current_tokens + tokens > self.budget:
+                chunks.append("".join(part for part, _ in current))
+                while current and (current_tokens > self.chunk_overlap or current_tokens + tokens > self.budget):
+                    current_tokens -= current.pop(0)[1]
+            current.append((piece, tokens))
+            current_tokens += tokens
+        if current:
+            chunks.append("".join(part for part, _ in current))
+        return chunks
+
+    def _hard_split(self, text: str) -> List[str]:
+        """Cut *text* into the longest prefixes that fit the budget.
+
+        The search window grows from a few characters per token until it
+        overflows, so each chunk only re-tokenizes text about its own size
+        rather than the whole remainder (base64 blobs, minified code).
+        """
+
+        chunks: List[str] = []
+        start = 0
+        while start < len(text):
+            window = max(self.budget * _CHARS_PER_TOKEN_GUESS, 1)
+            low, high = start + 1, min(start + window, len(text))
+            while high < len(text) and self._count(text[start:high]) <= self.budget:
+                low = high
+                window *= 2
+                high = min(start + window, len(text))
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self._count(text[start:middle]) <= self.budget:
+                    low = middle
+                else:
+                    high = middle - 1
+            chunks.append(text[start:low])
+            start = low
+        return chunks
+
+
+def get_token_splitter(
+    model_name: str,
+    separators: Optional[Sequence[str]] = None,
+    overlap_ratio: float = 0.1,
+) -> Optional[TokenBudgetSplitter]:
+    """Cached splitter sized to *model_name*, or ``None`` when token chunking is unavailable.
+
+    *overlap_ratio* is the fraction of the token limit repeated between
+    consecutive chunks, matching the ratio of the character configurations.
+    """
+
+    if not token_chunking_enabled():
+        return None
+    tokenizer = get_tokenizer(model_name)
+    if tokenizer is None:
+        return None
+    key = (model_name, tuple(separators or _DEFAULT_SEPARATORS), round(overlap_ratio, 3))
+    splitter = _SPLITTERS.get(key)
+    if splitter is None:
+        max_tokens = model_max_tokens(model_name, tokenizer)
+        splitter = TokenBudgetSplitter(tokenizer, max_tokens, int(max_tokens * overlap_ratio), key[1])
+        _SPLITTERS[key] = splitter
+    return splitter
+
+
+@dataclass(frozen=True)
+class TruncationReport:
+    """How many chunks exceed the embedding model's input limit.
+
+    ``mean_tokens`` counts the tokens actually embedded, so truncated chunks
+    contribute ``max_tokens``.
+    """
+
+    chunks: int
+    truncated: int
+    max_tokens: int
+    mean_tokens: float
+    largest_tokens: int
+
+    @property
+    def rate(self) -> float:
+        return self.truncated / self.chunks if self.chunks else 0.0
+
+    @property
+    def fill_ratio(self) -> float:
+        """Average share of the model limit each chunk uses (capped at 1 per chunk)."""
+
+        return min(self.mean_tokens / self.max_tokens, 1.0) if self.max_tokens else 0.0
+
+
+def truncation_report(texts: Iterable[str], tokenizer: Any, max_tokens: int) -> TruncationReport:
+    counts = [len(tokenizer.encode(text, add_special_tokens=True)) for text in texts]
+    if not counts:
+        return TruncationReport(0, 0, max_tokens, 0.0, 0)
+    return TruncationReport(
+        chunks=len(counts),
+        truncated=sum(1 for count in counts if count > max_tokens),
+        max_tokens=max_tokens,
+        mean_tokens=sum(min(count, max_tokens) for count in counts) / len(counts),
+        largest_tokens=max(counts),
+    )
+
+
+__all__ = [
+    "TokenBudgetSplitter",
+    "TruncationReport",
+    "clear_tokenizer_cache",
+    "get_token_splitter",
+    "get_tokenizer",
+    "model_max_tokens",
+    "token_chunking_enabled",
+    "truncation_report",
+]
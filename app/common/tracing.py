@@ -0,0 +1,331 @@
+"""Lightweight span tracing for the RAG and ingestion pipelines.
+
+Every span feeds the ``pipeline_stage_duration_seconds`` Prometheus
+histogram (labelled by stage and collection). When ``TRACE_EXPORT_PATH`` is
+set, finished traces are also appended to that file as OTLP/JSON lines (the
+format produced by the OpenTelemetry collector ``file`` exporter), so they
+can be inspected offline without running a collector.
+"""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import os
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .observability import record_stage_duration
+
+logger = logging.getLogger(__name__)
+
+
+_ENABLED_ENV_VAR = "TRACING_ENABLED"
+_EXPORT_PATH_ENV_VAR = "TRACE_EXPORT_PATH"
+_SERVICE_NAME_ENV_VAR = "TRACE_SERVICE_NAME"
+
+_SPAN_KIND_INTERNAL = 1
+_STATUS_OK = 1
+_STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "anclora_current_span", default=None
+)
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class Span:
+    """A timed pipeline stage; use :func:`span` or :meth:`Tracer.start_span`."""
+
+    __slots__ = (
+        "name", "collection", "trace_id", "span_id", "parent_id", "attributes",
+        "start_ns", "end_ns", "status", "status_message", "_tracer", "_token",
+    )
+
+    def __init__(
+        self,
+        tracer: "Tracer",
+        name: str,
+        parent: Optional["Span"],
+        collection: Optional[str],
+        attributes: Dict[str, Any],
+        start_ns: Optional[int] = None,
+    ) -> None:
+        self.name = name
+        self.collection = collection
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.start_ns = start_ns if start_ns is not None else time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = _STATUS_OK
+        self.status_message = ""
+        self._tracer = tracer
+        self._token: Optional[contextvars.Token] = None
+
+    @property
+    def duration_seconds(self) -> float:
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return max(end - self.start_ns, 0) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        self.status = _STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self, end_ns: Optional[int] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = end_ns if end_ns is not None else time.time_ns()
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:  # ended from a different context
+                pass
+            self._token = None
+        self._tracer._finish(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        attributes = dict(self.attributes)
+        if self.collection:
+            attributes["collection"] = self.collection
+        payload: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _SPAN_KIND_INTERNAL,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)} for key, value in attributes.items()
+            ],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            payload["parentSpanId"] = self.parent_id
+        if self.status_message:
+            payload["status"]["message"] = self.status_message
+        return payload
+
+
+class JsonFileSpanExporter:
+    """Append finished traces to a file as OTLP/JSON ``resourceSpans`` lines."""
+
+    def __init__(self, path: Path, service_name: str = "anclora-rag") -> None:
+        self.path = Path(path)
+        self.service_name = service_name
+        self._lock = threading.Lock()
+
+    def export(self, spans: List[Span]) -> None:
+        if not spans:
+            return
+        payload = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {"key": "service.name", "value": {"stringValue": self.service_name}}
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": "anclora.tracing"},
+                            "spans": [span.to_otlp() for span in spans],
+                        }
+                    ],
+                }
+            ]
+        }
+        line = json.dumps(payload, ensure_ascii=False)
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as handle:
+                handle.write(line + "\n")
+
+
+class Tracer:
+    """Creates spans, records their duration and batches them per trace."""
+
+    def __init__(self, *, enabled: bool = True, exporter: Optional[JsonFileSpanExporter] = None) -> None:
+        self.enabled = enabled
+        self.exporter = exporter
+        self._pending: Dict[str, List[Span]] = {}
+        self._open: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_environment(cls) -> "Tracer":
+        enabled_value = os.environ.get(_ENABLED_ENV_VAR)
+        enabled = True if enabled_value is None else enabled_value.strip().lower() in {"1", "true", "yes", "on"}
+        export_path = os.environ.get(_EXPORT_PATH_ENV_VAR, "").strip()
+        exporter = None
+        if export_path:
+            service = os.environ.get(_SERVICE_NAME_ENV_VAR, "").strip() or "anclora-rag"
+            exporter = JsonFileSpanExporter(Path(export_path), service)
+        return cls(enabled=enabled, exporter=exporter)
+
+    def start_span(
+        self,
+        name: str,
+        *,
+        collection: Optional[str] = None,
+        start_ns: Optional[int] = None,
+        activate: bool = True,
+        **attributes: Any,
+    ) -> Span:
+        new_span = Span(self, name, _current_span.get(), collection, dict(attributes), start_ns)
+        if self.enabled and self.exporter is not None:
+            with self._lock:
+                self._open[new_span.trace_id] = self._open.get(new_span.trace_id, 0) + 1
+        if activate:
+            new_span._token = _current_span.set(new_span)
+        return new_span
+
+    def record_stage(
+        self,
+        name: str,
+        duration_seconds: float,
+        *,
+        collection: Optional[str] = None,
+        **attributes: Any,
+    ) -> None:
+        """Record an already measured stage ending now as a child span."""
+
+        end_ns = time.time_ns()
+        start_ns = end_ns - int(max(duration_seconds, 0.0) * 1e9)
+        self.start_span(
+            name, collection=collection, start_ns=start_ns, activate=False, **attributes
+        ).end(end_ns)
+
+    def _finish(self, finished: Span) -> None:
+        if not self.enabled:
+            return
+        try:
+            record_stage_duration(finished.name, finished.duration_seconds, finished.collection)
+        except Exception as exc:  # pragma: no cover - defensive log path
+            logger.debug("No se pudo registrar la duración de la etapa %s: %s", finished.name, exc)
+
+        if self.exporter is None:
+            return
+        with self._lock:
+            trace_id = finished.trace_id
+            self._pending.setdefault(trace_id, []).append(finished)
+            remaining = self._open.get(trace_id, 1) - 1
+            if remaining > 0:
+                self._open[trace_id] = remaining
+                return
+            self._open.pop(trace_id, None)
+            batch = self._pending.pop(trace_id, [])
+        try:
+            self.exporter.export(batch)
+        except Exception as exc:  # pragma: no cover - defensive log path
+            logger.warning("No se pudo exportar la traza %s: %s", trace_id, exc)
+
+
+_DEFAULT_TRACER: Optional[Tracer] = None
+_TRACER_LOCK = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    global _DEFAULT_TRACER
+    if _DEFAULT_TRACER is None:
+        with _TRACER_LOCK:
+            if _DEFAULT_TRACER is None:
+                _DEFAULT_TRACER = Tracer.from_environment()
+    return _DEFAULT_TRACER
+
+
+def configure_default_tracer(tracer: Optional[Tracer]) -> None:
+    global _DEFAULT_TRACER
+    with _TRACER_LOCK:
+        _DEFAULT_TRACER = tracer
+
+
+@contextmanager
+def span(name: str, *, collection: Optional[str] = None, **attributes: Any) -> Iterator[Span]:
+    """Time the enclosed block as a pipeline stage nested under the current span."""
+
+    current = get_tracer().start_span(name, collection=collection, **attributes)
+    try:
+        yield current
+    except BaseException as exc:
+        current.record_error(exc)
+        raise
+    finally:
+        current.end()
+
+
+def record_stage(name: str, duration_seconds: float, *, collection: Optional[str] = None, **attributes: Any) -> None:
+    get_tracer().record_stage(name, duration_seconds, collection=collection, **attributes)
+
+
+def llm_timing_callbacks() -> List[Any]:
+    """Return a LangChain callback that records time-to-first-token and generation time.
+
+    An empty list is returned when ``langchain_core`` callbacks are unavailable.
+    """
+
+    try:
+        from langchain_core.callbacks import BaseCallbackHandler
+    except Exception:  # pragma: no cover - optional dependency path
+        return []
+    if not isinstance(BaseCallbackHandler, type):  # pragma: no cover - stubbed dependency
+        return []
+
+    class _LLMTimingHandler(BaseCallbackHandler):
+        def __init__(self) -> None:
+            self._started: Optional[float] = None
+            self._first_token: Optional[float] = None
+
+        def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+            self._started = time.perf_counter()
+            self._first_token = None
+
+        def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+            if self._started is None or self._first_token is not None:
+                return
+            self._first_token = time.perf_counter()
+            record_stage("rag.llm_first_token", self._first_token - self._started)
+
+        def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+            if self._started is None:
+                return
+            finished = time.perf_counter()
+            record_stage("rag.llm_generation", finished - (self._first_token or self._started))
+            self._started = None
+
+        def on_llm_error(self, error: BaseException, **kwargs: Any) -> None:
+            self._started = None
+
+    try:
+        return [_LLMTimingHandler()]
+    except Exception:  # pragma: no cover - stubbed dependency
+        return []
+
+
+__all__ = [
+    "JsonFileSpanExporter",
+    "Span",
+    "Tracer",
+    "configure_default_tracer",
+    "get_tracer",
+    "llm_timing_callbacks",
+    "record_stage",
+    "span",
+]
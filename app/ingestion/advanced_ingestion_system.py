@@ -3,26 +3,35 @@ from __future__ import annotations
 
 import asyncio
 import hashlib
+import os
 from dataclasses import dataclass, field, fields
 from datetime import datetime
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, TypeVar
 
 from langchain_core.documents import Document as LangChainDocument
 
 from common.logger import Logger
 from common.constants import CHROMA_SETTINGS
-from common.ingest_file import does_vectorstore_exist, get_embeddings
+from common.ingest_file import delete_file_version, does_vectorstore_exist, get_embeddings, rename_file_version
 from ingestion.config import IngestionConfig, get_ingestion_config
 from ingestion.file_processor import FileProcessor
 from ingestion.folder_processor import FolderProcessor
+from ingestion.folder_sync import FolderManifest, diff_folder, file_sha256, start_observer, sync_interval
 from ingestion.markdown_source_parser import MarkdownSourceParser
 from ingestion.validation_service import ValidationService
 from common.chroma_utils import add_langchain_documents
-from ingestion.github_processor import GitHubRepositoryProcessor, RepositoryOptions
+from ingestion.github_processor import GitHubRepositoryProcessor, RepositoryOptions, RepositorySyncState
 from common.chroma_db_settings import Chroma
 
 
+_T = TypeVar("_T")
+
+# Error message ``ingest_file`` returns for content already indexed (same SHA-256).
+_DUPLICATE_ERROR = "Archivo ya existe en la base de datos"
+_WATCH_DEBOUNCE_SECONDS = 2.0
+
+
 class IngestionStatus(Enum):
     PENDING = "pending"
     VALIDATING = "validating"
@@ -47,6 +56,16 @@ class IngestionJob:
     files: List[Dict[str, Any]] = field(default_factory=list)
     errors: List[Dict[str, Any]] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
+    handled_files: int = 0
+    cancel_requested: bool = False
+
+    @property
+    def progress(self) -> float:
+        """Fraction of ``total_files`` already handled, whatever the outcome."""
+
+        if not self.total_files:
+            return 1.0 if self.end_time else 0.0
+        return min(self.handled_files / self.total_files, 1.0)
 
 
 class AdvancedIngestionSystem:
@@ -60,9 +79,12 @@ class AdvancedIngestionSystem:
         self.markdown_parser = MarkdownSourceParser()
         self.validator = ValidationService()
         self.github_processor = GitHubRepositoryProcessor()
+        self.repository_state = RepositorySyncState()
+        self.folder_manifest_dir: Optional[str] = None
         self.supported_formats = self.config.supported_formats
         self.max_file_size = self.config.max_file_size
         self.markdown_collection = self.config.markdown_collection
+        self.max_concurrency = max(int(self.config.max_concurrency), 1)
         self.active_jobs: Dict[str, IngestionJob] = {}
         self._job_lock = asyncio.Lock()
 
@@ -77,57 +99,53 @@ class AdvancedIngestionSystem:
         job.total_files = len(files)
         self._logger.info("Iniciando ingesta de %s archivos para %s", job.total_files, user_id)
 
-        try:
-            job.status = IngestionStatus.VALIDATING
-            valid_files: List[Dict[str, Any]] = []
-            for file_obj in files:
-                validation = await self.validator.validate_file(file_obj, self.max_file_size, self.supported_formats)
-                if validation["valid"]:
-                    valid_files.append({"file": file_obj, "validation": validation})
-                else:
-                    job.errors.append({
-                        "file": getattr(file_obj, "name", "archivo_desconocido"),
-                        "error": validation.get("error", "Error de validacion"),
-                    })
-                    job.failed_files += 1
-            if not valid_files:
-                job.status = IngestionStatus.FAILED
-                return job
+        if not files:
+            job.status = IngestionStatus.FAILED
+            job.end_time = datetime.now()
+            return job
 
-            job.status = IngestionStatus.PROCESSING
-            for entry in valid_files:
-                file_obj = entry["file"]
-                validation = entry["validation"]
-                file_metadata = {
-                    "user_id": user_id,
-                    "category": validation.get("category"),
-                    "extension": validation.get("extension"),
-                    "size": validation.get("size"),
-                }
-                if metadata:
-                    file_metadata.update(metadata)
-                try:
-                    if hasattr(file_obj, "seek"):
-                        file_obj.seek(0)
-                    result = await self.file_processor.process_uploaded_file(file_obj, file_metadata)
-                    job.files.append(result)
-                    if result.get("success"):
-                        job.processed_files += 1
-                    else:
-                        job.failed_files += 1
-                        job.errors.append({
-                            "file": result.get("file_name"),
-                            "error": result.get("error", "Error desconocido"),
-                        })
-                except Exception as exc:  # pragma: no cover - defensive path
-                    self._logger.error("Error procesando archivo %s: %s", getattr(file_obj, "name", "?"), exc)
+        async def _ingest(file_obj: Any) -> None:
+            file_name = getattr(file_obj, "name", "archivo_desconocido")
+            validation = await self.validator.validate_file(file_obj, self.max_file_size, self.supported_formats)
+            if not validation["valid"]:
+                job.errors.append({
+                    "file": file_name,
+                    "error": validation.get("error", "Error de validacion"),
+                })
+                job.failed_files += 1
+                return
+
+            file_metadata = {
+                "user_id": user_id,
+                "category": validation.get("category"),
+                "extension": validation.get("extension"),
+                "size": validation.get("size"),
+            }
+            if metadata:
+                file_metadata.update(metadata)
+            try:
+                if hasattr(file_obj, "seek"):
+                    file_obj.seek(0)
+                result = await self.file_processor.process_uploaded_file(file_obj, file_metadata)
+                job.files.append(result)
+                if result.get("success"):
+                    job.processed_files += 1
+                else:
                     job.failed_files += 1
                     job.errors.append({
-                        "file": getattr(file_obj, "name", "archivo_desconocido"),
-                        "error": str(exc),
+                        "file": result.get("file_name"),
+                        "error": result.get("error", "Error desconocido"),
                     })
+            except Exception as exc:  # pragma: no cover - defensive path
+                self._logger.error("Error procesando archivo %s: %s", file_name, exc)
+                job.failed_files += 1
+                job.errors.append({"file": file_name, "error": str(exc)})
 
-            job.status = self._final_status(job)
+        try:
+            job.status = IngestionStatus.PROCESSING
+            await self._run_concurrently(job, files, _ingest)
+            if not job.cancel_requested:
+                job.status = self._final_status(job)
             return job
         finally:
             job.end_time = datetime.now()
@@ -154,44 +172,262 @@ class AdvancedIngestionSystem:
                 job.status = IngestionStatus.COMPLETED
                 return job
 
+            async def _ingest(file_path: str) -> None:
+                await self._ingest_folder_file(job, file_path, user_id, metadata)
+
             job.status = IngestionStatus.PROCESSING
-            for file_path in discovered:
-                validation = await self.validator.validate_file_path(file_path, self.max_file_size, self.supported_formats)
-                if not validation["valid"]:
+            await self._run_concurrently(job, discovered, _ingest)
+            if not job.cancel_requested:
+                job.status = self._final_status(job)
+            return job
+        finally:
+            job.end_time = datetime.now()
+
+    async def sync_folder(
+        self,
+        folder_path: str,
+        user_id: str,
+        recursive: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> IngestionJob:
+        """Ingest only the files of *folder_path* added or modified since the last sync.
+
+        Unchanged files are recognised from the folder manifest by size and
+        mtime without being read; chunks of deleted or replaced files are
+        retracted and those of moved or renamed files follow the new path.
+        """
+
+        job = self._create_job("folder_sync", metadata or {"user_id": user_id, "folder": folder_path})
+        try:
+            job.status = IngestionStatus.VALIDATING
+            manifest = await asyncio.to_thread(FolderManifest, folder_path, self.folder_manifest_dir)
+            discovered = await self.folder_processor.discover_files(
+                folder_path,
+                self.supported_formats,
+                recursive=recursive,
+            )
+            changes = await asyncio.to_thread(diff_folder, manifest, discovered)
+            sync_info: Dict[str, Any] = {
+                "added": len(changes.added),
+                "modified": len(changes.modified),
+                "deleted": len(changes.deleted),
+                "unchanged": changes.unchanged + changes.touched,
+            }
+            job.metadata["sync"] = sync_info
+            self._logger.info(
+                "Sincronizando carpeta %s: %s nuevos, %s modificados, %s eliminados, %s sin cambios",
+                folder_path,
+                sync_info["added"],
+                sync_info["modified"],
+                sync_info["deleted"],
+                sync_info["unchanged"],
+            )
+            previous_hashes = {path: manifest.files[path].get("sha256") for path in changes.modified}
+            handled_paths, moved_paths, added_hashes = await self._sync_folder_renames(
+                job, manifest, changes, sync_info
+            )
+            targets = [path for path in changes.changed_paths if path not in moved_paths]
+            job.total_files = len(targets)
+
+            async def _ingest(relative_path: str) -> None:
+                file_path = manifest.folder / relative_path
+                try:
+                    stat = await asyncio.to_thread(os.stat, file_path)
+                    sha256 = added_hashes.get(relative_path) or await asyncio.to_thread(file_sha256, file_path)
+                except OSError as exc:
                     job.failed_files += 1
-                    job.errors.append({"file": file_path, "error": validation.get("error")})
-                    continue
+                    job.errors.append({"file": str(file_path), "error": str(exc)})
+                    return
+                if await self._ingest_folder_file(job, str(file_path), user_id, metadata, duplicates_fail=False):
+                    manifest.record(relative_path, stat.st_size, stat.st_mtime_ns, sha256)
 
-                file_metadata = {
-                    "user_id": user_id,
-                    "category": validation.get("category"),
-                    "extension": validation.get("extension"),
-                    "size": validation.get("size"),
-                    "ingest_origin": "folder",
-                }
-                if metadata:
-                    file_metadata.update(metadata)
+            job.status = IngestionStatus.PROCESSING
+            await self._run_concurrently(job, targets, _ingest)
+
+            stale = [
+                (path, manifest.files[path].get("sha256")) for path in changes.deleted if path not in handled_paths
+            ]
+            for path in changes.deleted:
+                manifest.forget(path)
+            stale.extend(
+                (path, old_hash)
+                for path, old_hash in previous_hashes.items()
+                if manifest.files.get(path, {}).get("sha256") != old_hash
+            )
+            # Content still present under another path keeps its chunks.
+            current_hashes = manifest.hashes()
+            removed_chunks = 0
+            for relative_path, old_hash in stale:
+                if not old_hash or old_hash in current_hashes:
+                    continue
                 try:
-                    result = await self.file_processor.process_file_path(file_path, file_metadata)
-                    job.files.append(result)
-                    if result.get("success"):
-                        job.processed_files += 1
-                    else:
-                        job.failed_files += 1
-                        job.errors.append({
-                            "file": file_path,
-                            "error": result.get("error", "Error desconocido"),
-                        })
-                except Exception as exc:  # pragma: no cover - defensive path
-                    self._logger.error("Error procesando archivo %s: %s", file_path, exc)
+                    removed_chunks += await asyncio.to_thread(delete_file_version, relative_path, old_hash)
+                except Exception as exc:
+                    self._logger.error("Error retirando %s: %s", relative_path, exc)
                     job.failed_files += 1
-                    job.errors.append({"file": file_path, "error": str(exc)})
+                    job.errors.append({"file": relative_path, "error": f"No se pudo eliminar: {exc}"})
+            sync_info["removed_chunks"] += removed_chunks
 
-            job.status = self._final_status(job)
+            await asyncio.to_thread(manifest.save)
+            if not job.cancel_requested:
+                job.status = self._sync_status(job)
             return job
         finally:
             job.end_time = datetime.now()
 
+    async def _sync_folder_renames(
+        self,
+        job: IngestionJob,
+        manifest: FolderManifest,
+        changes: Any,
+        sync_info: Dict[str, Any],
+    ) -> tuple[set[str], set[str], Dict[str, str]]:
+        """Move the chunks of files moved or renamed inside the folder to their new path.
+
+        An added file whose content matches a deleted one is a rename: its
+        chunks are renamed in place, or retracted when the new extension
+        belongs to another collection (the file is then ingested as usual).
+        Returns the deleted paths handled here, the added paths left with
+        nothing to ingest and the hashes computed for the added files;
+        *sync_info* receives the rename counters.
+        """
+
+        sync_info.update(renamed=0, renamed_chunks=0, removed_chunks=0)
+        added_hashes: Dict[str, str] = {}
+        deleted_by_hash = {
+            manifest.files[path]["sha256"]: path for path in changes.deleted if manifest.files[path].get("sha256")
+        }
+        if not deleted_by_hash:
+            return set(), set(), added_hashes
+        replaced = set(changes.deleted) | set(changes.modified)
+        kept_hashes = {entry.get("sha256") for path, entry in manifest.files.items() if path not in replaced}
+
+        handled: set[str] = set()
+        moved: set[str] = set()
+        for relative_path in changes.added:
+            file_path = manifest.folder / relative_path
+            try:
+                added_hashes[relative_path] = sha256 = await asyncio.to_thread(file_sha256, file_path)
+            except OSError:
+                continue  # Reported by the regular ingestion.
+            old_path = deleted_by_hash.pop(sha256, None)
+            if old_path is None or sha256 in kept_hashes:
+                # Content still present under another path keeps its chunks.
+                continue
+            try:
+                updated = await asyncio.to_thread(
+                    rename_file_version, old_path, relative_path, sha256, {"source_path": str(file_path.resolve())}
+                )
+                if not updated:
+                    sync_info["removed_chunks"] += await asyncio.to_thread(delete_file_version, old_path, sha256)
+                stat = await asyncio.to_thread(os.stat, file_path)
+            except Exception as exc:
+                self._logger.error("Error renombrando %s -> %s: %s", old_path, relative_path, exc)
+                job.failed_files += 1
+                job.errors.append({"file": relative_path, "error": f"No se pudo renombrar: {exc}"})
+                continue
+            handled.add(old_path)
+            if updated:
+                moved.add(relative_path)
+                sync_info["renamed"] += 1
+                sync_info["renamed_chunks"] += updated
+                manifest.record(relative_path, stat.st_size, stat.st_mtime_ns, sha256)
+        return handled, moved, added_hashes
+
+    async def watch_folder(
+        self,
+        folder_path: str,
+        user_id: str,
+        *,
+        recursive: bool = True,
+        metadata: Optional[Dict[str, Any]] = None,
+        interval: Optional[float] = None,
+        stop_event: Optional[asyncio.Event] = None,
+        on_sync: Optional[Callable[[IngestionJob], Any]] = None,
+    ) -> None:
+        """Keep *folder_path* in sync until *stop_event* is set.
+
+        :meth:`sync_folder` runs every *interval* seconds
+        (``FOLDER_SYNC_INTERVAL``); with ``watchdog`` installed, filesystem
+        events trigger a sync after a short debounce instead.
+        """
+
+        stop_event = stop_event or asyncio.Event()
+        interval = interval if interval is not None else sync_interval()
+        loop = asyncio.get_running_loop()
+        changed = asyncio.Event()
+        observer = start_observer(folder_path, recursive, lambda: loop.call_soon_threadsafe(changed.set))
+        self._logger.info(
+            "Vigilando carpeta %s (%s)", folder_path, "eventos" if observer else f"sondeo cada {interval:.0f}s"
+        )
+        try:
+            while not stop_event.is_set():
+                changed.clear()
+                job = await self.sync_folder(folder_path, user_id, recursive=recursive, metadata=metadata)
+                if on_sync is not None:
+                    on_sync(job)
+                waiters = [asyncio.ensure_future(stop_event.wait()), asyncio.ensure_future(changed.wait())]
+                try:
+                    await asyncio.wait(waiters, timeout=interval, return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    for waiter in waiters:
+                        waiter.cancel()
+                if changed.is_set() and not stop_event.is_set():
+                    # Let bursts of events (copies, saves) settle before re-syncing.
+                    await asyncio.sleep(min(_WATCH_DEBOUNCE_SECONDS, interval))
+        finally:
+            if observer is not None:
+                observer.stop()
+                await asyncio.to_thread(observer.join, 5)
+
+    async def _ingest_folder_file(
+        self,
+        job: IngestionJob,
+        file_path: str,
+        user_id: str,
+        metadata: Optional[Dict[str, Any]],
+        *,
+        duplicates_fail: bool = True,
+    ) -> bool:
+        """Validate and ingest one file on disk; ``True`` when its content is indexed."""
+
+        validation = await self.validator.validate_file_path(file_path, self.max_file_size, self.supported_formats)
+        if not validation["valid"]:
+            job.failed_files += 1
+            job.errors.append({"file": file_path, "error": validation.get("error")})
+            return False
+
+        file_metadata = {
+            "user_id": user_id,
+            "category": validation.get("category"),
+            "extension": validation.get("extension"),
+            "size": validation.get("size"),
+            "ingest_origin": "folder",
+        }
+        if metadata:
+            file_metadata.update(metadata)
+        try:
+            result = await self.file_processor.process_file_path(file_path, file_metadata)
+        except Exception as exc:  # pragma: no cover - defensive path
+            self._logger.error("Error procesando archivo %s: %s", file_path, exc)
+            job.failed_files += 1
+            job.errors.append({"file": file_path, "error": str(exc)})
+            return False
+
+        job.files.append(result)
+        if result.get("success"):
+            job.processed_files += 1
+            return True
+        if not duplicates_fail and result.get("error") == _DUPLICATE_ERROR:
+            job.skipped_files += 1
+            return True
+        job.failed_files += 1
+        job.errors.append({
+            "file": file_path,
+            "error": result.get("error", "Error desconocido"),
+        })
+        return False
+
     async def ingest_github_repository(
         self,
         repo_url: str,
@@ -200,8 +436,14 @@ class AdvancedIngestionSystem:
         options: Optional[Dict[str, Any] | RepositoryOptions] = None,
         metadata: Optional[Dict[str, Any]] = None,
         analysis: Optional[Dict[str, Any]] = None,
+        incremental: bool = False,
     ) -> IngestionJob:
-        """Ingesta un repositorio publico de GitHub en el sistema RAG."""
+        """Ingesta un repositorio publico de GitHub en el sistema RAG.
+
+        With *incremental* only the files added, modified or renamed since
+        the last ingested commit of ``repo_url``/``branch`` are processed and
+        the chunks of deleted or replaced file versions are removed.
+        """
 
         additional_metadata = dict(metadata or {})
         additional_metadata.setdefault("user_id", user_id)
@@ -211,6 +453,10 @@ class AdvancedIngestionSystem:
 
         job = self._create_job("github_repository", additional_metadata)
         job.status = IngestionStatus.VALIDATING
+        repo_options = self._build_repository_options(options)
+
+        if incremental:
+            return await self._sync_github_repository(job, repo_url, user_id, branch, repo_options, metadata)
 
         repo_path: Optional[str]
         if analysis and analysis.get("temp_path"):
@@ -224,7 +470,6 @@ class AdvancedIngestionSystem:
             job.end_time = datetime.now()
             return job
 
-        repo_options = self._build_repository_options(options)
         files = await self.github_processor.gather_repository_files(repo_path, repo_options)
         job.total_files = len(files)
         job.status = IngestionStatus.PROCESSING
@@ -243,56 +488,263 @@ class AdvancedIngestionSystem:
 
         commit_hash = self.github_processor.get_commit_hash(repo_path)
 
+        async def _ingest(file_info: Dict[str, Any]) -> None:
+            try:
+                file_obj = self.github_processor.wrap_file(file_info["path"], file_info.get("size"))
+            except Exception as exc:  # pragma: no cover - defensive path
+                self._logger.error("Error procesando %s: %s", file_info["relative_path"], exc)
+                job.failed_files += 1
+                job.errors.append({"file": file_info["relative_path"], "error": str(exc)})
+                return
+            with file_obj:
+                await self._ingest_repository_file(
+                    job, file_obj, file_info["relative_path"], user_id, repo_url, branch, commit_hash, metadata
+                )
+
         try:
-            for file_info in files:
-                try:
-                    file_obj = self.github_processor.wrap_file(file_info["path"])
-                    validation = await self.validator.validate_file(file_obj, self.max_file_size, self.supported_formats)
-                    if not validation["valid"]:
-                        job.failed_files += 1
-                        job.errors.append({
-                            "file": file_info["relative_path"],
-                            "error": validation.get("error", "Archivo no valido"),
-                        })
-                        continue
+            await self._run_concurrently(job, files, _ingest)
+            if job.cancel_requested:
+                return job
 
-                    file_metadata = {
-                        "user_id": user_id,
-                        "category": validation.get("category"),
-                        "extension": validation.get("extension"),
-                        "size": validation.get("size"),
-                        "repo_url": repo_url,
-                        "repo_branch": branch or "default",
-                        "repo_relative_path": file_info["relative_path"],
-                        "repo_commit": commit_hash,
-                    }
-                    if metadata:
-                        file_metadata.update(metadata)
+            job.status = self._final_status(job)
+            # Duplicates are the only tolerated failures: a later incremental
+            # sync can then diff against this commit.
+            if commit_hash and job.failed_files == job.skipped_files:
+                self.repository_state.set(repo_url, branch, commit_hash)
+            return job
+        finally:
+            await self.github_processor.cleanup_repository(repo_path)
+            job.end_time = datetime.now()
 
-                    file_obj.seek(0)
-                    result = await self.file_processor.process_uploaded_file(file_obj, file_metadata)
-                    job.files.append(result)
-                    if result.get("success"):
-                        job.processed_files += 1
-                    else:
-                        if result.get("error") == "Archivo ya existe en la base de datos":
-                            job.skipped_files = job.skipped_files + 1 if hasattr(job, 'skipped_files') else 1
+    async def _sync_github_repository(
+        self,
+        job: IngestionJob,
+        repo_url: str,
+        user_id: str,
+        branch: Optional[str],
+        repo_options: RepositoryOptions,
+        metadata: Optional[Dict[str, Any]],
+    ) -> IngestionJob:
+        repo_path = await self.github_processor.clone_repository(repo_url, branch, full_history=True)
+        if not repo_path:
+            job.status = IngestionStatus.FAILED
+            job.errors.append({"general": "No fue posible clonar el repositorio proporcionado."})
+            job.end_time = datetime.now()
+            return job
+
+        processor = self.github_processor
+        try:
+            head = processor.resolve_commit(repo_path, branch)
+            if head is None:
+                job.status = IngestionStatus.FAILED
+                job.errors.append({"general": "No fue posible resolver el commit del repositorio."})
+                return job
+
+            previous = self.repository_state.get(repo_url, branch)
+            sync_info: Dict[str, Any] = {"from_commit": previous, "to_commit": head}
+            job.metadata["sync"] = sync_info
+            if previous == head:
+                self._logger.info("Repositorio %s sin cambios desde %s", repo_url, head[:12])
+                sync_info["mode"] = "unchanged"
+                job.status = IngestionStatus.COMPLETED
+                return job
+
+            changes = await asyncio.to_thread(processor.diff_commits, repo_path, previous, head)
+            current_files = await asyncio.to_thread(processor.list_commit_files, repo_path, head, repo_options)
+            sync_info.update(
+                mode="full" if changes.full else "incremental",
+                added=len(changes.added),
+                modified=len(changes.modified),
+                deleted=len(changes.deleted),
+                renamed=len(changes.renamed),
+            )
+
+            # Chunks are keyed by content hash: drop the versions that are gone,
+            # unless the same content is still present under another path.
+            current_blobs = {info["blob_sha"] for info in current_files.values()}
+            removed_chunks = 0
+            moved_paths: set[str] = set()
+            if changes.from_commit:
+                # Only paths that were ingestible at ``from_commit`` have chunks to
+                # retract; LICENSE, images or lock files were never ingested.
+                previous_files = await asyncio.to_thread(
+                    processor.list_commit_files, repo_path, changes.from_commit, repo_options
+                )
+                handled_paths, moved_paths, renamed_chunks, removed_chunks = await self._sync_repository_renames(
+                    job, repo_path, changes, previous_files, current_files, repo_url, head
+                )
+                sync_info["renamed_chunks"] = renamed_chunks
+                for relative_path in changes.stale_paths:
+                    if relative_path in handled_paths or relative_path not in previous_files:
+                        continue
+                    blob = await asyncio.to_thread(processor.read_blob, repo_path, changes.from_commit, relative_path)
+                    if blob is None or blob[0] in current_blobs:
+                        continue
+                    try:
+                        removed_chunks += await asyncio.to_thread(
+                            delete_file_version, relative_path, hashlib.sha256(blob[1]).hexdigest()
+                        )
+                    except Exception as exc:
+                        self._logger.error("Error eliminando la version anterior de %s: %s", relative_path, exc)
                         job.failed_files += 1
-                        job.errors.append({
-                            "file": file_info["relative_path"],
-                            "error": result.get("error", "Error desconocido"),
-                        })
-                except Exception as exc:  # pragma: no cover - defensive path
-                    self._logger.error("Error procesando %s: %s", file_info["relative_path"], exc)
-                    job.failed_files += 1
-                    job.errors.append({"file": file_info["relative_path"], "error": str(exc)})
+                        job.errors.append({"file": relative_path, "error": f"No se pudo eliminar: {exc}"})
+            sync_info["removed_chunks"] = removed_chunks
 
-            job.status = self._final_status(job)
+            targets = [path for path in changes.changed_paths if path in current_files and path not in moved_paths]
+            job.total_files = len(targets)
+            job.status = IngestionStatus.PROCESSING
+            self._logger.info(
+                "Sincronizando %s (%s -> %s): %s archivos a procesar, %s fragmentos eliminados",
+                repo_url,
+                (previous or "-")[:12],
+                head[:12],
+                len(targets),
+                removed_chunks,
+            )
+
+            async def _ingest(relative_path: str) -> None:
+                blob = await asyncio.to_thread(processor.read_blob, repo_path, head, relative_path)
+                if blob is None:
+                    job.failed_files += 1
+                    job.errors.append({"file": relative_path, "error": "No se pudo leer el archivo del commit"})
+                    return
+                await self._ingest_repository_file(
+                    job,
+                    processor.wrap_bytes(blob[1], relative_path),
+                    relative_path,
+                    user_id,
+                    repo_url,
+                    branch,
+                    head,
+                    metadata,
+                    duplicates_fail=False,
+                )
+
+            await self._run_concurrently(job, targets, _ingest)
+            if job.cancel_requested:
+                return job
+            job.status = self._sync_status(job)
+            if job.status == IngestionStatus.COMPLETED:
+                self.repository_state.set(repo_url, branch, head)
             return job
         finally:
-            await self.github_processor.cleanup_repository(repo_path)
+            await processor.cleanup_repository(repo_path)
             job.end_time = datetime.now()
 
+    async def _sync_repository_renames(
+        self,
+        job: IngestionJob,
+        repo_path: Any,
+        changes: Any,
+        previous_files: Dict[str, Dict[str, Any]],
+        current_files: Dict[str, Dict[str, Any]],
+        repo_url: str,
+        head: str,
+    ) -> tuple[set[str], set[str], int, int]:
+        """Move the chunks of files renamed without content changes to their new path.
+
+        Returns the old paths handled here, the new paths whose chunks were
+        moved (nothing left to ingest), the renamed chunks and the chunks
+        retracted because the new path belongs to another collection (that
+        new path is then ingested as usual).
+        """
+
+        processor = self.github_processor
+        handled: set[str] = set()
+        moved: set[str] = set()
+        renamed_chunks = removed_chunks = 0
+        for old_path, new_path in changes.renamed:
+            if old_path not in previous_files:
+                continue  # never ingested: the new path is ingested as a new file
+            new_info = current_files.get(new_path)
+            blob = await asyncio.to_thread(processor.read_blob, repo_path, changes.from_commit, old_path)
+            if blob is None or new_info is None or blob[0] != new_info["blob_sha"]:
+                continue
+            if any(
+                info["blob_sha"] == blob[0] for path, info in current_files.items() if path != new_path
+            ):
+                # The content survives under another path, which keeps the chunks.
+                continue
+            file_hash = hashlib.sha256(blob[1]).hexdigest()
+            try:
+                updated = await asyncio.to_thread(
+                    rename_file_version,
+                    old_path,
+                    new_path,
+                    file_hash,
+                    {"repo_url": repo_url, "repo_relative_path": new_path, "repo_commit": head},
+                )
+                if not updated:
+                    removed_chunks += await asyncio.to_thread(delete_file_version, old_path, file_hash)
+            except Exception as exc:
+                self._logger.error("Error renombrando %s -> %s: %s", old_path, new_path, exc)
+                job.failed_files += 1
+                job.errors.append({"file": new_path, "error": f"No se pudo renombrar: {exc}"})
+                continue
+            handled.add(old_path)
+            if updated:
+                moved.add(new_path)
+                renamed_chunks += updated
+        return handled, moved, renamed_chunks, removed_chunks
+
+    async def _ingest_repository_file(
+        self,
+        job: IngestionJob,
+        file_obj: Any,
+        relative_path: str,
+        user_id: str,
+        repo_url: str,
+        branch: Optional[str],
+        commit_hash: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+        *,
+        duplicates_fail: bool = True,
+    ) -> None:
+        """Validate and ingest one repository file, updating the job counters."""
+
+        try:
+            validation = await self.validator.validate_file(file_obj, self.max_file_size, self.supported_formats)
+            if not validation["valid"]:
+                job.failed_files += 1
+                job.errors.append({
+                    "file": relative_path,
+                    "error": validation.get("error", "Archivo no valido"),
+                })
+                return
+
+            file_metadata = {
+                "user_id": user_id,
+                "category": validation.get("category"),
+                "extension": validation.get("extension"),
+                "size": validation.get("size"),
+                "repo_url": repo_url,
+                "repo_branch": branch or "default",
+                "repo_relative_path": relative_path,
+                "repo_commit": commit_hash,
+            }
+            if metadata:
+                file_metadata.update(metadata)
+
+            file_obj.seek(0)
+            result = await self.file_processor.process_uploaded_file(file_obj, file_metadata)
+            job.files.append(result)
+            if result.get("success"):
+                job.processed_files += 1
+            elif result.get("error") == _DUPLICATE_ERROR:
+                job.skipped_files += 1
+                if duplicates_fail:
+                    job.failed_files += 1
+                    job.errors.append({"file": relative_path, "error": result["error"]})
+            else:
+                job.failed_files += 1
+                job.errors.append({
+                    "file": relative_path,
+                    "error": result.get("error", "Error desconocido"),
+                })
+        except Exception as exc:  # pragma: no cover - defensive path
+            self._logger.error("Error procesando %s: %s", relative_path, exc)
+            job.failed_files += 1
+            job.errors.append({"file": relative_path, "error": str(exc)})
 
     async def ingest_markdown_sources(
         self,
@@ -343,17 +795,51 @@ class AdvancedIngestionSystem:
         return [job for job in self.active_jobs.values() if job.metadata.get("user_id") == user_id]
 
     async def cancel_job(self, job_id: str) -> bool:
+        """Stop a running job: files already in flight finish, no new ones start."""
+
         async with self._job_lock:
             job = self.active_jobs.get(job_id)
             if not job:
                 return False
             if job.status in {IngestionStatus.COMPLETED, IngestionStatus.FAILED}:
                 return False
+            job.cancel_requested = True
             job.status = IngestionStatus.FAILED
             job.errors.append({"general": "Cancelado por el usuario"})
             job.end_time = datetime.now()
             return True
 
+    async def _run_concurrently(
+        self,
+        job: IngestionJob,
+        items: Iterable[_T],
+        handler: Callable[[_T], Awaitable[None]],
+    ) -> None:
+        """Run *handler* on every item with at most ``max_concurrency`` in flight.
+
+        Handlers offload blocking work to threads; the workers pull from one
+        shared iterator, update ``job.handled_files`` as they go and stop
+        picking new items once the job is cancelled.
+        """
+
+        iterator = iter(items)
+
+        async def _worker() -> None:
+            for item in iterator:
+                if job.cancel_requested:
+                    return
+                try:
+                    await handler(item)
+                finally:
+                    job.handled_files += 1
+
+        workers = max(min(self.max_concurrency, job.total_files or self.max_concurrency), 1)
+        await asyncio.gather(*(_worker() for _ in range(workers)))
+        if job.cancel_requested:
+            self._logger.info(
+                "Ingesta %s cancelada tras %s de %s archivos", job.job_id, job.handled_files, job.total_files
+            )
+
     def _build_repository_options(
         self, options: Optional[Dict[str, Any] | RepositoryOptions]
     ) -> RepositoryOptions:
@@ -405,6 +891,15 @@ class AdvancedIngestionSystem:
         payload = f"{user_id}-{job_type}-{datetime.utcnow().isoformat()}"
         return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
 
+    def _sync_status(self, job: IngestionJob) -> IngestionStatus:
+        """Status of a sync job, where duplicates count as skipped rather than failed."""
+
+        if job.failed_files == 0:
+            return IngestionStatus.COMPLETED
+        if job.processed_files or job.skipped_files:
+            return IngestionStatus.PARTIALLY_COMPLETED
+        return IngestionStatus.FAILED
+
     def _final_status(self, job: IngestionJob) -> IngestionStatus:
         if job.processed_files == job.total_files:
             return IngestionStatus.COMPLETED
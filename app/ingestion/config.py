@@ -1,6 +1,7 @@
 """Configuration helpers for the advanced ingestion system."""
 from __future__ import annotations
 
+import os
 from dataclasses import dataclass, field
 from typing import Dict, List
 
@@ -17,6 +18,8 @@ DEFAULT_SUPPORTED_FORMATS: Dict[str, List[str]] = {
 
 DEFAULT_MAX_FILE_SIZE = 200 * 1024 * 1024  # 200MB
 DEFAULT_MARKDOWN_COLLECTION = "research_sources"
+DEFAULT_MAX_CONCURRENCY = 4
+_MAX_CONCURRENCY_ENV_VAR = "INGESTION_MAX_CONCURRENCY"
 
 
 @dataclass(frozen=True)
@@ -26,12 +29,29 @@ class IngestionConfig:
     max_file_size: int = DEFAULT_MAX_FILE_SIZE
     supported_formats: Dict[str, List[str]] = field(default_factory=lambda: {k: list(v) for k, v in DEFAULT_SUPPORTED_FORMATS.items()})
     markdown_collection: str = DEFAULT_MARKDOWN_COLLECTION
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY
 
 
 def get_ingestion_config() -> IngestionConfig:
-    """Return a new :class:IngestionConfig instance."""
-
-    return IngestionConfig()
-
-
-__all__ = ["IngestionConfig", "DEFAULT_SUPPORTED_FORMATS", "DEFAULT_MAX_FILE_SIZE", "DEFAULT_MARKDOWN_COLLECTION", "get_ingestion_config"]
+    """Return a new :class:IngestionConfig instance.
+
+    ``INGESTION_MAX_CONCURRENCY`` sets how many files are validated and
+    processed at the same time (default: ``min(4, CPU count)``).
+    """
+
+    default = min(DEFAULT_MAX_CONCURRENCY, os.cpu_count() or 1)
+    try:
+        max_concurrency = max(int(os.environ.get(_MAX_CONCURRENCY_ENV_VAR, default)), 1)
+    except ValueError:
+        max_concurrency = default
+    return IngestionConfig(max_concurrency=max_concurrency)
+
+
+__all__ = [
+    "IngestionConfig",
+    "DEFAULT_SUPPORTED_FORMATS",
+    "DEFAULT_MAX_CONCURRENCY",
+    "DEFAULT_MAX_FILE_SIZE",
+    "DEFAULT_MARKDOWN_COLLECTION",
+    "get_ingestion_config",
+]
@@ -0,0 +1,204 @@
+"""Change manifests for incremental folder synchronisation.
+
+A :class:`FolderManifest` records ``(size, mtime_ns, sha256)`` for every
+file ingested from a source folder. :func:`diff_folder` compares a fresh
+listing against it: files whose size and modification time are unchanged
+are skipped without being read, and files that were only touched are
+recognised by their hash. Only new and modified files then go through the
+ingestion pipeline, and deleted ones are retracted.
+
+Manifests live in ``FOLDER_SYNC_MANIFEST_DIR`` (``data/folder_sync`` by
+default), one JSON file per source folder. Watch mode polls every
+``FOLDER_SYNC_INTERVAL`` seconds and, when ``watchdog`` is installed,
+re-syncs as soon as filesystem events arrive (:func:`start_observer`).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:  # pragma: no cover - optional dependency
+    from watchdog.events import FileSystemEventHandler  # type: ignore
+    from watchdog.observers import Observer  # type: ignore
+except Exception:  # pragma: no cover - polling only
+    FileSystemEventHandler = object  # type: ignore[assignment,misc]
+    Observer = None
+
+_MANIFEST_DIR_ENV_VAR = "FOLDER_SYNC_MANIFEST_DIR"
+_INTERVAL_ENV_VAR = "FOLDER_SYNC_INTERVAL"
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+DEFAULT_SYNC_INTERVAL = 60.0
+
+
+def sync_interval() -> float:
+    try:
+        return max(float(os.environ.get(_INTERVAL_ENV_VAR, DEFAULT_SYNC_INTERVAL)), 1.0)
+    except ValueError:
+        return DEFAULT_SYNC_INTERVAL
+
+
+def _default_manifest_dir() -> Path:
+    configured = os.environ.get(_MANIFEST_DIR_ENV_VAR)
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return base_dir / "data" / "folder_sync"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+
+def file_sha256(path: str | Path) -> str:
+    """Hash *path* in blocks, without loading it whole."""
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+@dataclass
+class FolderChanges:
+    """Outcome of comparing a folder listing with its manifest."""
+
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    unchanged: int = 0
+    touched: int = 0
+
+    @property
+    def changed_paths(self) -> List[str]:
+        return self.added + self.modified
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.modified or self.deleted)
+
+
+class FolderManifest:
+    """Persisted ``relative_path -> {size, mtime_ns, sha256}`` map of one folder."""
+
+    def __init__(self, folder_path: str | Path, directory: Optional[Path | str] = None) -> None:
+        self.folder = Path(folder_path).resolve()
+        digest = hashlib.sha1(str(self.folder).encode("utf-8")).hexdigest()[:16]
+        self.path = Path(directory) if directory is not None else _default_manifest_dir()
+        self.path = self.path / f"{digest}.json"
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self) -> None:
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                payload = json.load(handle)
+            files = payload.get("files") if payload.get("folder") == str(self.folder) else None
+        except (OSError, ValueError, AttributeError):
+            files = None
+        self.files = dict(files or {})
+
+    def save(self) -> None:
+        with self._lock:
+            payload = {"version": 1, "folder": str(self.folder), "files": self.files}
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump(payload, handle)
+                os.replace(tmp_name, self.path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+
+    def record(self, relative_path: str, size: int, mtime_ns: int, sha256: str) -> None:
+        with self._lock:
+            self.files[relative_path] = {"size": size, "mtime_ns": mtime_ns, "sha256": sha256}
+
+    def forget(self, relative_path: str) -> None:
+        with self._lock:
+            self.files.pop(relative_path, None)
+
+    def hashes(self) -> set[str]:
+        with self._lock:
+            return {entry.get("sha256") for entry in self.files.values() if entry.get("sha256")}
+
+
+def diff_folder(manifest: FolderManifest, file_paths: Iterable[str]) -> FolderChanges:
+    """Classify *file_paths* (absolute, under ``manifest.folder``) against *manifest*.
+
+    Only files whose size or mtime changed are hashed. Files that were
+    touched without a content change get their manifest entry refreshed.
+    """
+
+    changes = FolderChanges()
+    seen: set[str] = set()
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+            relative_path = Path(file_path).resolve().relative_to(manifest.folder).as_posix()
+        except (OSError, ValueError):
+            continue
+        seen.add(relative_path)
+        entry = manifest.files.get(relative_path)
+        if entry is None:
+            changes.added.append(relative_path)
+            continue
+        if entry.get("size") == stat.st_size and entry.get("mtime_ns") == stat.st_mtime_ns:
+            changes.unchanged += 1
+            continue
+        try:
+            sha256 = file_sha256(file_path)
+        except OSError:
+            continue
+        if sha256 == entry.get("sha256"):
+            manifest.record(relative_path, stat.st_size, stat.st_mtime_ns, sha256)
+            changes.touched += 1
+        else:
+            changes.modified.append(relative_path)
+
+    changes.deleted = sorted(set(manifest.files) - seen)
+    return changes
+
+
+class _ChangeHandler(FileSystemEventHandler):  # type: ignore[misc]
+    def __init__(self, callback: Callable[[], None]) -> None:
+        super().__init__()
+        self._callback = callback
+
+    # "opened"/"closed_no_write" events fire when the sync itself reads files.
+    _FILE_EVENTS = {"created", "modified", "deleted", "moved"}
+    _DIRECTORY_EVENTS = {"deleted", "moved"}
+
+    def on_any_event(self, event: Any) -> None:
+        relevant = self._DIRECTORY_EVENTS if getattr(event, "is_directory", False) else self._FILE_EVENTS
+        if getattr(event, "event_type", "") in relevant:
+            self._callback()
+
+
+def start_observer(folder_path: str, recursive: bool, callback: Callable[[], None]) -> Optional[Any]:
+    """Call *callback* on filesystem events under *folder_path* (``None`` without watchdog)."""
+
+    if Observer is None:
+        return None
+    observer = Observer()
+    observer.schedule(_ChangeHandler(callback), folder_path, recursive=recursive)
+    observer.daemon = True
+    observer.start()
+    return observer
+
+
+__all__ = [
+    "DEFAULT_SYNC_INTERVAL",
+    "FolderChanges",
+    "FolderManifest",
+    "diff_folder",
+    "file_sha256",
+    "start_observer",
+    "sync_interval",
+]
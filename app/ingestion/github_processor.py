@@ -1,19 +1,37 @@
-"""GitHub repository ingestion helpers."""
+"""GitHub repository ingestion helpers.
+
+Besides cloning and enumerating a working tree, the processor can work on
+bare clones: :meth:`GitHubRepositoryProcessor.diff_commits` lists the files
+added, modified, deleted and renamed between two commits and
+:meth:`GitHubRepositoryProcessor.read_blob` reads a file at any commit, so
+a repository can be re-synchronised incrementally. The last ingested
+commit per repository and branch is kept by :class:`RepositorySyncState`
+(``REPOSITORY_SYNC_STATE_PATH``, ``data/repository_sync_state.json`` by
+default).
+
+Working trees are scanned with ``os.scandir``: ignored directories are
+pruned before descending, ignore patterns are matched by a single
+precompiled expression and file sizes are read by ``REPOSITORY_SCAN_WORKERS``
+threads. :meth:`GitHubRepositoryProcessor.wrap_file` hands the pipeline a
+file-backed handle, so no file content is held in memory by the scan.
+"""
 from __future__ import annotations
 
 import asyncio
 import io
+import json
 import os
+import re
 import shutil
 import tempfile
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from fnmatch import translate
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
-
-try:
-    from fnmatch2 import fnmatchcase  # type: ignore
-except Exception:  # pragma: no cover - fallback to stdlib
-    from fnmatch import fnmatchcase  # type: ignore
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from common.logger import Logger
 
@@ -36,6 +54,109 @@ class RepositoryOptions:
     allowed_extensions: Optional[Iterable[str]] = None
 
 
+@dataclass
+class RepositoryChanges:
+    """Files that differ between two commits of a repository."""
+
+    from_commit: Optional[str]
+    to_commit: str
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    renamed: List[Tuple[str, str]] = field(default_factory=list)
+    full: bool = False
+
+    @property
+    def changed_paths(self) -> List[str]:
+        """Paths whose current version must be (re)ingested."""
+
+        return self.added + self.modified + [new for _, new in self.renamed]
+
+    @property
+    def stale_paths(self) -> List[str]:
+        """Paths whose version at ``from_commit`` is no longer current."""
+
+        return self.deleted + self.modified + [old for old, _ in self.renamed]
+
+    @property
+    def is_empty(self) -> bool:
+        return not (self.added or self.modified or self.deleted or self.renamed)
+
+
+_SYNC_STATE_ENV_VAR = "REPOSITORY_SYNC_STATE_PATH"
+_SCAN_WORKERS_ENV_VAR = "REPOSITORY_SCAN_WORKERS"
+
+_DEFAULT_SCAN_WORKERS = 8
+_STAT_BATCH_SIZE = 256
+
+
+def _scan_workers() -> int:
+    try:
+        return max(int(os.environ.get(_SCAN_WORKERS_ENV_VAR, _DEFAULT_SCAN_WORKERS)), 1)
+    except ValueError:
+        return _DEFAULT_SCAN_WORKERS
+
+
+def _stat_size(path: str) -> Optional[int]:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return None
+
+
+def _default_sync_state_path() -> Path:
+    configured = os.environ.get(_SYNC_STATE_ENV_VAR)
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return base_dir / "data" / "repository_sync_state.json"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+
+class RepositorySyncState:
+    """JSON-backed record of the last ingested commit per repository and branch."""
+
+    def __init__(self, path: Optional[Path | str] = None) -> None:
+        self.path = Path(path) if path is not None else _default_sync_state_path()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(repo_url: str, branch: Optional[str]) -> str:
+        normalised = repo_url.strip().rstrip("/")
+        if normalised.endswith(".git"):
+            normalised = normalised[: -len(".git")]
+        return f"{normalised}#{branch or 'default'}"
+
+    def get(self, repo_url: str, branch: Optional[str]) -> Optional[str]:
+        with self._lock:
+            entry = self._load().get(self.key(repo_url, branch))
+        return entry.get("commit") if isinstance(entry, dict) else None
+
+    def set(self, repo_url: str, branch: Optional[str], commit: str) -> None:
+        with self._lock:
+            payload = self._load()
+            payload[self.key(repo_url, branch)] = {
+                "commit": commit,
+                "synced_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=str(self.path.parent), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    json.dump({"version": 1, "repositories": payload}, handle, indent=2)
+                os.replace(tmp_name, self.path)
+            finally:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                return dict(json.load(handle).get("repositories") or {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+
 class GitHubRepositoryProcessor:
     """Clone, analyse and enumerate files from a public GitHub repository."""
 
@@ -63,6 +184,10 @@ class GitHubRepositoryProcessor:
         "*.so",
     }
 
+    _IGNORED_PATTERN_MATCH = re.compile(
+        "|".join(f"(?:{translate(pattern)})" for pattern in sorted(_DEFAULT_IGNORED_PATTERNS))
+    ).match
+
     def __init__(self) -> None:
         self._logger = Logger(__name__)
 
@@ -97,8 +222,19 @@ class GitHubRepositoryProcessor:
         }
         return summary
 
-    async def clone_repository(self, repo_url: str, branch: Optional[str]) -> Optional[str]:
-        """Clone *repo_url* to a temporary location and return the path."""
+    async def clone_repository(
+        self,
+        repo_url: str,
+        branch: Optional[str],
+        *,
+        full_history: bool = False,
+    ) -> Optional[str]:
+        """Clone *repo_url* to a temporary location and return the path.
+
+        With *full_history* the clone is bare and keeps every commit of the
+        branch, which incremental synchronisation needs to diff against the
+        previously ingested commit.
+        """
 
         if Repo is None:  # pragma: no cover - dependency missing
             self._logger.error("GitPython no esta instalado. Ejecuta 'pip install GitPython'.")
@@ -106,10 +242,11 @@ class GitHubRepositoryProcessor:
 
         target_dir = tempfile.mkdtemp(prefix="anclora_repo_")
         try:
-            clone_args = {"depth": 1}
+            clone_args: Dict[str, Any] = {"bare": True} if full_history else {"depth": 1}
             if branch:
                 clone_args["branch"] = branch
-            Repo.clone_from(repo_url, target_dir, **clone_args)
+                clone_args["single_branch"] = True
+            await asyncio.to_thread(Repo.clone_from, repo_url, target_dir, **clone_args)
             self._logger.info("Repositorio clonado en %s", target_dir)
             return target_dir
         except GitCommandError as exc:  # pragma: no cover - network dependent
@@ -147,56 +284,202 @@ class GitHubRepositoryProcessor:
         except Exception:
             return None
 
-    def _gather_repository_files_sync(
+    def resolve_commit(self, repo_path: str, branch: Optional[str] = None) -> Optional[str]:
+        """Return the commit hash *branch* (or ``HEAD``) points to."""
+
+        if Repo is None:  # pragma: no cover - dependency missing
+            return None
+        try:
+            return Repo(repo_path).commit(branch or "HEAD").hexsha
+        except Exception:
+            return None
+
+    def diff_commits(self, repo_path: str, old_commit: Optional[str], new_commit: str) -> RepositoryChanges:
+        """Return the files changed between *old_commit* and *new_commit*.
+
+        When *old_commit* is unknown or no longer reachable (e.g. after a
+        force push) every file of *new_commit* is reported as added and
+        ``full`` is set.
+        """
+
+        repository = Repo(repo_path)
+        base = None
+        if old_commit:
+            try:
+                # ``Repo.commit`` is lazy; ``cat-file -e`` checks the object exists.
+                repository.git.cat_file("-e", f"{old_commit}^{{commit}}")
+                base = repository.commit(old_commit).hexsha
+            except Exception:
+                self._logger.warning("Commit %s no encontrado en el repositorio; sincronizacion completa", old_commit)
+        if base is None:
+            tree = repository.commit(new_commit).tree
+            added = sorted(item.path for item in tree.traverse() if item.type == "blob")
+            return RepositoryChanges(from_commit=None, to_commit=new_commit, added=added, full=True)
+
+        changes = RepositoryChanges(from_commit=base, to_commit=new_commit)
+        output = repository.git.diff("--name-status", "-z", "-M", "--no-ext-diff", base, new_commit)
+        tokens = [token for token in output.split("\0") if token]
+        index = 0
+        while index < len(tokens):
+            status = tokens[index]
+            kind = status[:1]
+            if kind in {"R", "C"}:
+                old_path, new_path = tokens[index + 1], tokens[index + 2]
+                index += 3
+                if kind == "R":
+                    changes.renamed.append((old_path, new_path))
+                else:
+                    changes.added.append(new_path)
+                continue
+            path = tokens[index + 1]
+            index += 2
+            if kind == "A":
+                changes.added.append(path)
+            elif kind == "D":
+                changes.deleted.append(path)
+            else:  # M, T (type change) and anything else git may report
+                changes.modified.append(path)
+        return changes
+
+    def list_commit_files(
         self,
         repo_path: str,
+        commit: str,
         options: RepositoryOptions,
-    ) -> List[Dict[str, Any]]:
-        base = Path(repo_path)
-        candidates: List[Dict[str, Any]] = []
-        allowed_exts = set(options.allowed_extensions or [])
-        size_limit = options.max_file_size_mb * 1024 * 1024
+    ) -> Dict[str, Dict[str, Any]]:
+        """Return the files of *commit* that satisfy *options*, keyed by path.
 
-        for path in base.rglob("*"):
-            relative = path.relative_to(base)
-            relative_parts = relative.parts
-            relative_str = str(relative).replace(os.sep, "/")
+        Reads the git tree directly, so it also works on bare clones.
+        """
 
-            if path.is_dir():
-                if path.name in self._DEFAULT_IGNORED_DIRS or any(part in self._DEFAULT_IGNORED_DIRS for part in relative_parts):
-                    continue
+        allowed_exts = set(options.allowed_extensions or [])
+        files: Dict[str, Dict[str, Any]] = {}
+        for item in Repo(repo_path).commit(commit).tree.traverse():
+            if item.type != "blob":
                 continue
+            entry = self._describe_file(item.path, item.size, options, allowed_exts)
+            if entry is not None:
+                entry["blob_sha"] = item.hexsha
+                files[item.path] = entry
+        return files
 
-            if any(part in self._DEFAULT_IGNORED_DIRS for part in relative_parts):
-                continue
+    def read_blob(self, repo_path: str, commit: str, relative_path: str) -> Optional[Tuple[str, bytes]]:
+        """Return ``(blob_sha, content)`` of *relative_path* at *commit*, or ``None``."""
 
-            if any(fnmatchcase(path.name, pattern) or fnmatchcase(relative_str, pattern) for pattern in self._DEFAULT_IGNORED_PATTERNS):
-                continue
+        try:
+            blob = Repo(repo_path).commit(commit).tree / relative_path
+            return blob.hexsha, blob.data_stream.read()
+        except Exception:
+            return None
+
+    def iter_repository_files(
+        self,
+        repo_path: str,
+        options: RepositoryOptions,
+    ) -> Iterator[Dict[str, Any]]:
+        """Yield the working-tree files that satisfy *options* as they are found.
+
+        Files are filtered by name before their size is read, and sizes are
+        read in parallel batches, so memory stays flat for huge repositories.
+        """
+
+        allowed_exts = set(options.allowed_extensions or [])
+        candidates = (
+            (path, entry)
+            for path, relative_str in self._walk_repository(repo_path)
+            for entry in (self._classify_path(relative_str, options, allowed_exts, check_dirs=False),)
+            if entry is not None
+        )
+        with ThreadPoolExecutor(max_workers=_scan_workers(), thread_name_prefix="repo-scan") as pool:
+            while True:
+                batch = list(islice(candidates, _STAT_BATCH_SIZE))
+                if not batch:
+                    break
+                for (path, entry), size in zip(batch, pool.map(_stat_size, [path for path, _ in batch])):
+                    if size is None or not self._size_allowed(size, options):
+                        continue
+                    entry["path"] = Path(path)
+                    entry["size"] = size
+                    yield entry
+
+    def _gather_repository_files_sync(
+        self,
+        repo_path: str,
+        options: RepositoryOptions,
+    ) -> List[Dict[str, Any]]:
+        return list(self.iter_repository_files(repo_path, options))
+
+    def _walk_repository(self, repo_path: str) -> Iterator[Tuple[str, str]]:
+        """Yield ``(path, relative_path)`` of regular files, pruning ignored directories.
+
+        Symbolic links are skipped: a cloned repository must not make the
+        scan read files outside of it.
+        """
 
+        stack = [(repo_path, "")]
+        while stack:
+            directory, prefix = stack.pop()
             try:
-                size = path.stat().st_size
-            except OSError:
-                continue
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if entry.name not in self._DEFAULT_IGNORED_DIRS:
+                                    stack.append((entry.path, f"{prefix}{entry.name}/"))
+                            elif entry.is_file(follow_symlinks=False):
+                                yield entry.path, f"{prefix}{entry.name}"
+                        except OSError:
+                            continue
+            except OSError as exc:
+                self._logger.warning("No se pudo leer el directorio %s: %s", directory, exc)
+
+    def _describe_file(
+        self,
+        relative_str: str,
+        size: int,
+        options: RepositoryOptions,
+        allowed_exts: set[str],
+    ) -> Optional[Dict[str, Any]]:
+        """Apply the ignore rules and *options*; return the file entry or ``None``."""
 
-            if size == 0 or size > size_limit:
-                continue
+        entry = self._classify_path(relative_str, options, allowed_exts)
+        if entry is None or not self._size_allowed(size, options):
+            return None
+        entry["size"] = size
+        return entry
 
-            extension = path.suffix.lower()
-            category = self._category_for_extension(extension)
-            if not self._should_include(category, extension, options, allowed_exts):
-                continue
+    def _classify_path(
+        self,
+        relative_str: str,
+        options: RepositoryOptions,
+        allowed_exts: set[str],
+        *,
+        check_dirs: bool = True,
+    ) -> Optional[Dict[str, Any]]:
+        """Apply the rules that only need the path; ``None`` when excluded."""
+
+        relative_parts = relative_str.split("/")
+        name = relative_parts[-1]
+        if check_dirs and any(part in self._DEFAULT_IGNORED_DIRS for part in relative_parts):
+            return None
+
+        if self._IGNORED_PATTERN_MATCH(name) or self._IGNORED_PATTERN_MATCH(relative_str):
+            return None
 
-            candidates.append(
-                {
-                    "path": path,
-                    "relative_path": relative_str,
-                    "extension": extension,
-                    "size": size,
-                    "category": category,
-                }
-            )
+        extension = os.path.splitext(name)[1].lower()
+        category = self._category_for_extension(extension)
+        if not self._should_include(category, extension, options, allowed_exts):
+            return None
+
+        return {
+            "relative_path": relative_str,
+            "extension": extension,
+            "category": category,
+        }
 
-        return candidates
+    @staticmethod
+    def _size_allowed(size: int, options: RepositoryOptions) -> bool:
+        return 0 < size <= options.max_file_size_mb * 1024 * 1024
 
     def _should_include(
         self,
@@ -231,11 +514,56 @@ class GitHubRepositoryProcessor:
             summary[item["extension"]] = summary.get(item["extension"], 0) + 1
         return summary
 
-    def wrap_file(self, file_path: Path) -> Any:
-        """Return an in-memory file-like object compatible with the ingestion pipeline."""
+    def wrap_file(self, file_path: Path, size: Optional[int] = None) -> Any:
+        """Return a file-backed object compatible with the ingestion pipeline.
+
+        The file is opened on first read; call ``close()`` once processed.
+        """
+
+        return _RepositoryFile(Path(file_path), size)
+
+    def wrap_bytes(self, data: bytes, relative_path: str) -> Any:
+        """Wrap blob content read from git like :meth:`wrap_file` does for files."""
+
+        return _InMemoryFile(data, relative_path.rsplit("/", 1)[-1])
+
+
+class _RepositoryFile:
+    """Streamlit-style uploaded file that reads from disk on demand."""
+
+    def __init__(self, path: Path, size: Optional[int] = None) -> None:
+        self.path = path
+        self.name = path.name
+        self.size = size if size is not None else path.stat().st_size
+        self._handle: Optional[io.BufferedReader] = None
+
+    def _file(self) -> io.BufferedReader:
+        if self._handle is None:
+            self._handle = self.path.open("rb")
+        return self._handle
+
+    def read(self, size: int | None = None) -> bytes:
+        return self._file().read() if size is None else self._file().read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self._file().seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file().tell() if self._handle is not None else 0
+
+    def getvalue(self) -> bytes:
+        return self.path.read_bytes()
+
+    def close(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+    def __enter__(self) -> "_RepositoryFile":
+        return self
 
-        data = file_path.read_bytes()
-        return _InMemoryFile(data, file_path.name)
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
 
 
 class _InMemoryFile:
@@ -259,4 +587,4 @@ class _InMemoryFile:
         return self._buffer.getvalue()
 
 
-__all__ = ["GitHubRepositoryProcessor", "RepositoryOptions"]
+__all__ = ["GitHubRepositoryProcessor", "RepositoryChanges", "RepositoryOptions", "RepositorySyncState"]
@@ -5,16 +5,46 @@ Sistema de optimización para alcanzar tiempos competitivos
 
 import asyncio
 import concurrent.futures
+from collections import OrderedDict
 from typing import Dict, List, Optional, Any, Callable
 import time
 import hashlib
+import json
 import os
+import sqlite3
+import threading
 from dataclasses import dataclass
 from enum import Enum
+from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Claves de ``document_data`` que no describen el contenido (rutas temporales)
+_VOLATILE_KEYS = {"temp_file_path"}
+_CONTENT_KEYS = ("content", "file_content", "file_bytes")
+_PATH_KEYS = ("temp_file_path", "file_path")
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Valor inválido para %s, usando %s", name, default)
+        return default
+
+
+def _default_cache_dir() -> str:
+    """Directorio de la caché en disco: ``SPEED_CACHE_DIR`` o ``data/cache`` del repositorio."""
+
+    configured = os.environ.get("SPEED_CACHE_DIR")
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return str(base_dir / "data" / "cache")
+    candidate = Path(configured)
+    return str(candidate if candidate.is_absolute() else (base_dir / candidate).resolve())
+
 class OptimizationLevel(Enum):
     BASIC = "basic"
     AGGRESSIVE = "aggressive"
@@ -30,25 +60,159 @@ class ProcessingCache:
     access_count: int = 0
     last_accessed: float = 0
 
+class DiskCache:
+    """Cache persistente en SQLite con TTL y límites de entradas y bytes.
+
+    Cada entrada guarda el resultado serializado en JSON junto a su tamaño y
+    marcas de creación y último acceso; los índices sobre esas columnas
+    permiten expirar y desalojar (LRU) sin recorrer la tabla entera.
+    """
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+            key TEXT PRIMARY KEY,
+            payload TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            processing_time REAL NOT NULL,
+            created_at REAL NOT NULL,
+            last_accessed REAL NOT NULL,
+            access_count INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS entries_created ON entries (created_at)",
+        "CREATE INDEX IF NOT EXISTS entries_accessed ON entries (last_accessed)",
+    )
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int, ttl: float) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evictions = 0
+        self.expirations = 0
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    def get(self, key: str) -> Optional[ProcessingCache]:
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT payload, processing_time, created_at, access_count FROM entries WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[2] > self.ttl:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self.expirations += 1
+                return None
+            self._conn.execute(
+                "UPDATE entries SET last_accessed = ?, access_count = access_count + 1 WHERE key = ?",
+                (now, key),
+            )
+        try:
+            result_data = json.loads(row[0])
+        except ValueError:
+            self.delete(key)
+            return None
+        return ProcessingCache(
+            content_hash=key,
+            result_data=result_data,
+            processing_time=row[1],
+            created_at=row[2],
+            access_count=row[3] + 1,
+            last_accessed=now,
+        )
+
+    def put(self, entry: ProcessingCache) -> bool:
+        """Guarda *entry*; devuelve ``False`` si el resultado no es serializable."""
+
+        try:
+            payload = json.dumps(entry.result_data, ensure_ascii=False)
+        except (TypeError, ValueError) as exc:
+            logger.debug("Resultado no serializable, solo se cachea en memoria: %s", exc)
+            return False
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return False
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(key, payload, size, processing_time, created_at, last_accessed, access_count) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (entry.content_hash, payload, size, entry.processing_time, entry.created_at, now, entry.access_count),
+            )
+            self._enforce_limits(now)
+        return True
+
+    def delete(self, key: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _enforce_limits(self, now: float) -> None:
+        self.expirations += self._conn.execute(
+            "DELETE FROM entries WHERE created_at < ?", (now - self.ttl,)
+        ).rowcount
+        count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        # Desalojar por último acceso hasta volver a los límites
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_accessed"):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        self.evictions += len(evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
 class SpeedOptimizer:
     """Sistema de optimización de velocidad para Anclora RAG"""
     
-    def __init__(self, cache_dir: str = "data/cache"):
+    def __init__(self, cache_dir: Optional[str] = None):
+        cache_dir = cache_dir or _default_cache_dir()
         self.cache_dir = cache_dir
-        self.memory_cache = {}  # Cache en memoria para acceso ultra-rápido
-        self.disk_cache_index = {}  # Índice de cache en disco
+        # LRU en memoria: el orden del OrderedDict es el orden de acceso
+        self.memory_cache: "OrderedDict[str, ProcessingCache]" = OrderedDict()
         self.processing_pool = None
         self.optimization_stats = {
             "cache_hits": 0,
             "cache_misses": 0,
+            "memory_cache_hits": 0,
+            "disk_cache_hits": 0,
+            "memory_evictions": 0,
             "total_time_saved": 0.0,
             "avg_processing_time": 0.0
         }
         
         # Configuración de optimización
-        self.max_memory_cache_size = 100  # Máximo elementos en memoria
-        self.max_disk_cache_size = 1000   # Máximo elementos en disco
-        self.cache_ttl = 86400 * 7        # 7 días TTL
+        self.max_memory_cache_size = int(_env_number("SPEED_CACHE_MEMORY_ITEMS", 100))  # Máximo elementos en memoria
+        self.max_disk_cache_size = int(_env_number("SPEED_CACHE_DISK_ITEMS", 1000))     # Máximo elementos en disco
+        self.max_disk_cache_bytes = int(_env_number("SPEED_CACHE_DISK_MB", 256) * 1024 * 1024)
+        self.cache_ttl = _env_number("SPEED_CACHE_TTL_SECONDS", 86400 * 7)             # 7 días TTL
+        self._pending_writes: set = set()
         
         # Inicializar
         os.makedirs(cache_dir, exist_ok=True)
@@ -63,17 +227,16 @@ class SpeedOptimizer:
         
         start_time = time.time()
         
-        # 1. Generar hash del contenido para cache
-        content_hash = self._generate_content_hash(document_data)
+        # 1. Generar hash del contenido para cache (el resultado depende del nivel)
+        content_hash = await asyncio.to_thread(self._generate_content_hash, document_data)
+        cache_key = f"{optimization_level.value}:{content_hash}"
         
         # 2. Verificar cache (memoria → disco)
-        cached_result = await self._get_from_cache(content_hash)
+        cached_result = await self._get_from_cache(cache_key)
         if cached_result:
             logger.info(f"⚡ Cache hit: {content_hash[:8]}")
             self.optimization_stats["cache_hits"] += 1
-            
-            # Simular tiempo mínimo para evitar sospecha de cache
-            await asyncio.sleep(0.1)
+            self.optimization_stats["total_time_saved"] += cached_result.processing_time
             
             return {
                 **cached_result.result_data,
@@ -94,7 +257,7 @@ class SpeedOptimizer:
         # 4. Guardar en cache si es exitoso
         processing_time = time.time() - start_time
         if optimized_result.get("success", False):
-            await self._save_to_cache(content_hash, optimized_result, processing_time)
+            await self._save_to_cache(cache_key, optimized_result, processing_time)
         
         # 5. Actualizar estadísticas
         self._update_stats(processing_time)
@@ -370,74 +533,98 @@ class SpeedOptimizer:
         """Obtiene resultado del cache (memoria → disco)"""
         
         # 1. Verificar cache en memoria
-        if content_hash in self.memory_cache:
-            cache_entry = self.memory_cache[content_hash]
-            cache_entry.access_count += 1
-            cache_entry.last_accessed = time.time()
-            return cache_entry
+        cache_entry = self.memory_cache.get(content_hash)
+        if cache_entry is not None:
+            if time.time() - cache_entry.created_at > self.cache_ttl:
+                del self.memory_cache[content_hash]
+            else:
+                self.memory_cache.move_to_end(content_hash)
+                cache_entry.access_count += 1
+                cache_entry.last_accessed = time.time()
+                self.optimization_stats["memory_cache_hits"] += 1
+                return cache_entry
         
         # 2. Verificar cache en disco
-        if content_hash in self.disk_cache_index:
-            cache_entry = await self._load_from_disk_cache(content_hash)
-            if cache_entry:
-                # Promover a memoria cache
-                self._add_to_memory_cache(content_hash, cache_entry)
-                return cache_entry
+        cache_entry = await self._load_from_disk_cache(content_hash)
+        if cache_entry:
+            # Promover a memoria cache
+            self._add_to_memory_cache(content_hash, cache_entry)
+            self.optimization_stats["disk_cache_hits"] += 1
+            return cache_entry
         
         return None
     
     async def _save_to_cache(self, content_hash: str, result_data: Dict, processing_time: float):
         """Guarda resultado en cache"""
         
+        now = time.time()
         cache_entry = ProcessingCache(
             content_hash=content_hash,
-            result_data=result_data,
+            result_data=dict(result_data),  # el llamador sigue modificando su resultado
             processing_time=processing_time,
-            created_at=time.time()
+            created_at=now,
+            last_accessed=now
         )
         
         # Guardar en memoria
         self._add_to_memory_cache(content_hash, cache_entry)
         
-        # Guardar en disco de forma asíncrona
-        asyncio.create_task(self._save_to_disk_cache(content_hash, cache_entry))
+        # Guardar en disco de forma asíncrona (se conserva la referencia a la tarea)
+        task = asyncio.create_task(self._save_to_disk_cache(content_hash, cache_entry))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
     
     def _add_to_memory_cache(self, content_hash: str, cache_entry: ProcessingCache):
         """Añade entrada al cache en memoria"""
         
+        self.memory_cache[content_hash] = cache_entry
+        self.memory_cache.move_to_end(content_hash)
+        
         # Limpiar cache si está lleno
-        if len(self.memory_cache) >= self.max_memory_cache_size:
+        if len(self.memory_cache) > self.max_memory_cache_size:
             self._evict_memory_cache()
-        
-        self.memory_cache[content_hash] = cache_entry
     
     def _evict_memory_cache(self):
-        """Expulsa entradas menos usadas del cache en memoria"""
-        
-        # Ordenar por último acceso y eliminar las más antiguas
-        sorted_entries = sorted(
-            self.memory_cache.items(),
-            key=lambda x: x[1].last_accessed
-        )
+        """Expulsa las entradas usadas menos recientemente del cache en memoria (O(1) cada una)"""
         
-        # Eliminar 20% de las entradas más antiguas
-        to_remove = len(sorted_entries) // 5
-        for i in range(to_remove):
-            del self.memory_cache[sorted_entries[i][0]]
+        while len(self.memory_cache) > self.max_memory_cache_size:
+            self.memory_cache.popitem(last=False)
+            self.optimization_stats["memory_evictions"] += 1
     
     def _generate_content_hash(self, document_data: Dict) -> str:
-        """Genera hash único del contenido del documento"""
-        
-        # Usar características clave para el hash
-        hash_data = {
-            "file_name": document_data.get("file_name", ""),
-            "file_size": document_data.get("file_size", 0),
-            "file_type": document_data.get("file_type", ""),
-            "content_preview": document_data.get("content_preview", "")[:100]
-        }
-        
-        hash_string = str(sorted(hash_data.items()))
-        return hashlib.sha256(hash_string.encode()).hexdigest()
+        """Genera hash SHA-256 del contenido real del documento.
+        
+        Se usa, por orden, el contenido en memoria, el archivo en disco o,
+        si no hay ninguno, todos los campos del documento salvo rutas temporales.
+        """
+        
+        digest = hashlib.sha256()
+        for key in _CONTENT_KEYS:
+            content = document_data.get(key)
+            if isinstance(content, str):
+                content = content.encode("utf-8")
+            if isinstance(content, (bytes, bytearray)):
+                digest.update(b"content:")
+                digest.update(content)
+                return digest.hexdigest()
+        
+        for key in _PATH_KEYS:
+            path = document_data.get(key)
+            if path and os.path.isfile(path):
+                try:
+                    with open(path, "rb") as handle:
+                        digest.update(b"file:")
+                        for block in iter(lambda: handle.read(_HASH_BLOCK_SIZE), b""):
+                            digest.update(block)
+                    return digest.hexdigest()
+                except OSError as exc:
+                    logger.warning("No se pudo leer %s para el hash: %s", path, exc)
+                    digest = hashlib.sha256()
+        
+        hash_data = {key: value for key, value in document_data.items() if key not in _VOLATILE_KEYS}
+        digest.update(b"fields:")
+        digest.update(json.dumps(hash_data, sort_keys=True, default=str).encode("utf-8"))
+        return digest.hexdigest()
     
     def _update_stats(self, processing_time: float):
         """Actualiza estadísticas de optimización"""
@@ -456,12 +643,19 @@ class SpeedOptimizer:
         total_requests = self.optimization_stats["cache_hits"] + self.optimization_stats["cache_misses"]
         cache_hit_rate = (self.optimization_stats["cache_hits"] / max(total_requests, 1)) * 100
         
+        disk_stats = self.disk_cache.stats() if self.disk_cache else {}
+        
         return {
             **self.optimization_stats,
             "cache_hit_rate": cache_hit_rate,
             "total_requests": total_requests,
             "memory_cache_size": len(self.memory_cache),
-            "disk_cache_size": len(self.disk_cache_index)
+            "memory_cache_capacity": self.max_memory_cache_size,
+            "disk_cache_size": disk_stats.get("entries", 0),
+            "disk_cache_bytes": disk_stats.get("bytes", 0),
+            "disk_evictions": disk_stats.get("evictions", 0),
+            "disk_expirations": disk_stats.get("expirations", 0),
+            "cache_ttl": self.cache_ttl
         }
     
     def _init_processing_pool(self):
@@ -469,16 +663,33 @@ class SpeedOptimizer:
         self.processing_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4)
     
     def _load_disk_cache_index(self):
-        """Carga índice de cache en disco"""
-        # Implementación simplificada
-        pass
+        """Abre el índice SQLite del cache en disco"""
+        try:
+            self.disk_cache = DiskCache(
+                os.path.join(self.cache_dir, "processing_cache.sqlite3"),
+                max_entries=self.max_disk_cache_size,
+                max_bytes=self.max_disk_cache_bytes,
+                ttl=self.cache_ttl,
+            )
+        except sqlite3.Error as exc:
+            logger.warning("Cache en disco no disponible en %s: %s", self.cache_dir, exc)
+            self.disk_cache = None
     
     async def _load_from_disk_cache(self, content_hash: str) -> Optional[ProcessingCache]:
         """Carga entrada del cache en disco"""
-        # Implementación simplificada
-        return None
+        if self.disk_cache is None:
+            return None
+        try:
+            return await asyncio.to_thread(self.disk_cache.get, content_hash)
+        except sqlite3.Error as exc:
+            logger.warning("Error leyendo cache en disco: %s", exc)
+            return None
     
     async def _save_to_disk_cache(self, content_hash: str, cache_entry: ProcessingCache):
         """Guarda entrada en cache en disco"""
-        # Implementación simplificada
-        pass
+        if self.disk_cache is None:
+            return
+        try:
+            await asyncio.to_thread(self.disk_cache.put, cache_entry)
+        except sqlite3.Error as exc:
+            logger.warning("Error guardando cache en disco: %s", exc)
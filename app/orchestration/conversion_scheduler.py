@@ -0,0 +1,444 @@
+"""Priority job scheduler for document conversions.
+
+Conversions wait in one FIFO queue per priority (``realtime`` > ``standard``
+> ``batch``) and are executed by a fixed pool of ``CONVERSION_WORKERS``
+asyncio workers, so a burst of uploads never runs more conversions at once
+than the pool allows. At most ``CONVERSION_MAX_QUEUE_DEPTH`` jobs may wait;
+beyond that :class:`SchedulerFullError` is raised and the API answers
+``503``.
+
+Queued jobs are cancelled by removing them from their queue, running ones
+by cancelling their task. Every state change is written to a local SQLite
+store (``CONVERSION_JOB_STORE_PATH``): finished jobs are kept for
+``CONVERSION_RESULT_TTL_SECONDS`` and at most ``CONVERSION_MAX_RESULTS`` of
+them, queued jobs are re-enqueued after a restart and jobs that were
+running are marked as failed.
+
+Queue depth, running jobs, queue wait and run time are exported per
+priority through :mod:`common.observability`.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from threading import Lock
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from common.observability import record_conversion_job, record_conversion_queue, record_conversion_wait
+from orchestration.hybrid_orchestrator import ConversionRequest, ProcessingPriority
+
+logger = logging.getLogger(__name__)
+
+PRIORITIES = (ProcessingPriority.REALTIME, ProcessingPriority.STANDARD, ProcessingPriority.BATCH)
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+_STORE_PATH_ENV_VAR = "CONVERSION_JOB_STORE_PATH"
+
+ConversionProcessor = Callable[[ConversionRequest], Awaitable[Any]]
+
+
+class SchedulerFullError(RuntimeError):
+    """Raised when the queue already holds ``max_queue_depth`` jobs."""
+
+
+class JobStateError(RuntimeError):
+    """Raised when a job cannot change state (e.g. cancelling a finished job)."""
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Valor inválido para %s, usando %s", name, default)
+        return default
+
+
+def _jsonable(value: Any) -> Any:
+    """Plain JSON data for dataclasses and enums (e.g. ``ConversionResult``)."""
+
+    def _default(item: Any) -> Any:
+        if isinstance(item, Enum):
+            return item.value
+        return str(item)
+
+    if hasattr(value, "__dataclass_fields__"):
+        value = asdict(value)
+    return json.loads(json.dumps(value, default=_default))
+
+
+def _request_to_dict(request: ConversionRequest) -> Dict[str, Any]:
+    return _jsonable(request)
+
+
+def _request_from_dict(data: Dict[str, Any]) -> ConversionRequest:
+    return ConversionRequest(
+        request_id=data["request_id"],
+        user_id=data["user_id"],
+        document_data=data.get("document_data") or {},
+        priority=ProcessingPriority(data["priority"]),
+        callback_url=data.get("callback_url"),
+        metadata=data.get("metadata"),
+    )
+
+
+@dataclass
+class ConversionJob:
+    request: ConversionRequest
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    processing_mode: Optional[str] = None
+    error: Optional[str] = None
+    result: Optional[Dict[str, Any]] = None
+
+    @property
+    def job_id(self) -> str:
+        return self.request.request_id
+
+    @property
+    def priority(self) -> str:
+        return self.request.priority.value
+
+    def status_dict(self) -> Dict[str, Any]:
+        """Status payload served by ``/conversions/{id}/status``."""
+
+        def _iso(timestamp: Optional[float]) -> Optional[str]:
+            return datetime.fromtimestamp(timestamp).isoformat() if timestamp else None
+
+        payload: Dict[str, Any] = {
+            "request_id": self.job_id,
+            "status": self.status,
+            "priority": self.priority,
+            "created_at": _iso(self.created_at),
+            "processing_mode": self.processing_mode,
+            "progress": 100.0 if self.status in TERMINAL_STATUSES else (10.0 if self.status == "processing" else 0.0),
+        }
+        if self.started_at:
+            payload["started_at"] = _iso(self.started_at)
+        if self.finished_at:
+            payload[f"{self.status}_at"] = _iso(self.finished_at)
+        if self.error:
+            payload["error"] = self.error
+        return payload
+
+
+class JobStore:
+    """SQLite persistence of conversion jobs with retention limits."""
+
+    _SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS jobs (
+            job_id TEXT PRIMARY KEY,
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL,
+            processing_mode TEXT,
+            error TEXT,
+            request TEXT NOT NULL,
+            result TEXT
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status)",
+        "CREATE INDEX IF NOT EXISTS jobs_finished ON jobs (finished_at)",
+    )
+
+    def __init__(self, path: Optional[Path | str] = None, *, max_results: int = 1000, ttl: float = 7 * 86400) -> None:
+        self.path = Path(path) if path is not None else self._default_path()
+        self.max_results = max_results
+        self.ttl = ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        self._lock = Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in self._SCHEMA:
+                self._conn.execute(statement)
+
+    @staticmethod
+    def _default_path() -> Path:
+        configured = os.environ.get(_STORE_PATH_ENV_VAR)
+        base_dir = Path(__file__).resolve().parents[2]
+        if not configured:
+            return base_dir / "data" / "conversion_jobs.sqlite3"
+        candidate = Path(configured)
+        return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+    def save(self, job: ConversionJob) -> None:
+        row = (
+            job.job_id,
+            job.priority,
+            job.status,
+            job.created_at,
+            job.started_at,
+            job.finished_at,
+            job.processing_mode,
+            job.error,
+            json.dumps(_request_to_dict(job.request)),
+            json.dumps(job.result) if job.result is not None else None,
+        )
+        with self._lock, self._conn:
+            # Finished jobs are final: a late "processing" write must not resurrect a cancelled job.
+            self._conn.execute(
+                "INSERT INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(job_id) DO UPDATE SET "
+                "status = excluded.status, started_at = excluded.started_at, finished_at = excluded.finished_at, "
+                "processing_mode = excluded.processing_mode, error = excluded.error, result = excluded.result "
+                "WHERE jobs.status NOT IN ('completed', 'failed', 'cancelled')",
+                row,
+            )
+            if job.status in TERMINAL_STATUSES:
+                self._prune()
+
+    def load(self, job_id: str) -> Optional[ConversionJob]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def unfinished(self) -> List[ConversionJob]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM jobs WHERE status IN ('queued', 'processing') ORDER BY created_at"
+            ).fetchall()
+        return [job for job in (self._from_row(row) for row in rows) if job is not None]
+
+    def status_counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _prune(self) -> None:
+        terminal = "status IN ('completed', 'failed', 'cancelled')"
+        self._conn.execute(f"DELETE FROM jobs WHERE {terminal} AND finished_at < ?", (time.time() - self.ttl,))
+        self._conn.execute(
+            f"DELETE FROM jobs WHERE {terminal} AND job_id NOT IN "
+            f"(SELECT job_id FROM jobs WHERE {terminal} ORDER BY finished_at DESC LIMIT ?)",
+            (self.max_results,),
+        )
+
+    @staticmethod
+    def _from_row(row) -> Optional[ConversionJob]:
+        try:
+            request = _request_from_dict(json.loads(row[8]))
+        except (ValueError, KeyError) as exc:
+            logger.warning("Conversión %s ilegible en el almacén: %s", row[0], exc)
+            return None
+        return ConversionJob(
+            request=request,
+            status=row[2],
+            created_at=row[3],
+            started_at=row[4],
+            finished_at=row[5],
+            processing_mode=row[6],
+            error=row[7],
+            result=json.loads(row[9]) if row[9] else None,
+        )
+
+
+class ConversionScheduler:
+    """Bounded worker pool draining per-priority conversion queues."""
+
+    def __init__(
+        self,
+        processor: ConversionProcessor,
+        *,
+        workers: Optional[int] = None,
+        max_queue_depth: Optional[int] = None,
+        store: Optional[JobStore] = None,
+    ) -> None:
+        self.processor = processor
+        self.workers = max(workers or _env_int("CONVERSION_WORKERS", 4), 1)
+        self.max_queue_depth = max(max_queue_depth or _env_int("CONVERSION_MAX_QUEUE_DEPTH", 1000), 1)
+        self.store = (
+            store
+            if store is not None
+            else JobStore(
+                max_results=_env_int("CONVERSION_MAX_RESULTS", 1000),
+                ttl=_env_int("CONVERSION_RESULT_TTL_SECONDS", 7 * 86400),
+            )
+        )
+        self._queues: Dict[str, Deque[ConversionJob]] = {priority.value: deque() for priority in PRIORITIES}
+        self._active: Dict[str, ConversionJob] = {}
+        self._running: Dict[str, asyncio.Task] = {}
+        self._done: Dict[str, asyncio.Event] = {}
+        self._cancel_requested: set = set()
+        self._wake: Optional[asyncio.Condition] = None
+        self._worker_tasks: List[asyncio.Task] = []
+
+    # ------------------------------------------------------------------
+    async def start(self) -> None:
+        """Start the workers, resuming the jobs a previous process left queued."""
+
+        if self._worker_tasks:
+            return
+        self._wake = asyncio.Condition()
+        for job in await asyncio.to_thread(self.store.unfinished):
+            if job.status == "processing":
+                job.status, job.error, job.finished_at = "failed", "Interrumpida por reinicio del servicio", time.time()
+                await asyncio.to_thread(self.store.save, job)
+                continue
+            self._enqueue(job)
+        if self.queued:
+            logger.info("Reanudando %s conversiones en cola", self.queued)
+        self._worker_tasks = [asyncio.create_task(self._worker(index)) for index in range(self.workers)]
+        self._publish_queue_metrics()
+
+    async def stop(self) -> None:
+        for task in [*self._worker_tasks, *self._running.values()]:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    async def submit(self, request: ConversionRequest) -> ConversionJob:
+        if self._wake is None:
+            raise RuntimeError("El planificador de conversiones no está iniciado")
+        if self.queued >= self.max_queue_depth:
+            raise SchedulerFullError(f"Cola de conversiones llena ({self.max_queue_depth})")
+        job = ConversionJob(request=request)
+        await asyncio.to_thread(self.store.save, job)
+        self._enqueue(job)
+        async with self._wake:
+            self._wake.notify()
+        self._publish_queue_metrics(job.priority)
+        return job
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[ConversionJob]:
+        """Wait until *job_id* finishes and return it (``None`` if unknown)."""
+
+        done = self._done.get(job_id)
+        if done is not None:
+            await asyncio.wait_for(done.wait(), timeout)
+        return await self.get(job_id)
+
+    async def get(self, job_id: str) -> Optional[ConversionJob]:
+        job = self._active.get(job_id)
+        if job is not None:
+            return job
+        return await asyncio.to_thread(self.store.load, job_id)
+
+    async def cancel(self, job_id: str) -> ConversionJob:
+        """Cancel a queued or running job; raises ``KeyError`` or :class:`JobStateError`."""
+
+        job = await self.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        if job.status in TERMINAL_STATUSES:
+            raise JobStateError(job.status)
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancel_requested.add(job_id)
+            task.cancel()
+            await asyncio.wait({task})
+            return job
+        queue = self._queues[job.priority]
+        if job in queue:
+            queue.remove(job)
+        await self._finish(job, "cancelled")
+        self._publish_queue_metrics(job.priority)
+        return job
+
+    async def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": len(self._running),
+            "queued": {priority: len(queue) for priority, queue in self._queues.items()},
+            "jobs_by_status": await asyncio.to_thread(self.store.status_counts),
+        }
+
+    # ------------------------------------------------------------------
+    def _enqueue(self, job: ConversionJob) -> None:
+        self._queues[job.priority].append(job)
+        self._active[job.job_id] = job
+        self._done[job.job_id] = asyncio.Event()
+
+    def _next_job(self) -> Optional[ConversionJob]:
+        for priority in PRIORITIES:
+            queue = self._queues[priority.value]
+            if queue:
+                return queue.popleft()
+        return None
+
+    async def _worker(self, index: int) -> None:
+        assert self._wake is not None
+        while True:
+            async with self._wake:
+                await self._wake.wait_for(lambda: self.queued > 0)
+                job = self._next_job()
+            if job is None:
+                continue
+            await self._run(job)
+
+    async def _run(self, job: ConversionJob) -> None:
+        job.status, job.started_at = "processing", time.time()
+        record_conversion_wait(job.priority, job.started_at - job.created_at)
+        self._publish_queue_metrics(job.priority, running_delta=1)
+        # Registered before the first await so cancel() always finds the task.
+        task = asyncio.create_task(self._execute(job))
+        self._running[job.job_id] = task
+        try:
+            result = await task
+        except asyncio.CancelledError:
+            if job.job_id not in self._cancel_requested:
+                # The worker itself is being stopped; the job stays "processing" for the restart path.
+                task.cancel()
+                raise
+            self._cancel_requested.discard(job.job_id)
+            await self._finish(job, "cancelled")
+        except Exception as exc:
+            logger.error("❌ Error en conversión %s: %s", job.job_id, exc)
+            await self._finish(job, "failed", error=str(exc))
+        else:
+            job.result = _jsonable(result)
+            job.processing_mode = (job.result or {}).get("processing_mode")
+            await self._finish(job, "completed" if (job.result or {}).get("success") else "failed")
+        finally:
+            self._running.pop(job.job_id, None)
+            self._publish_queue_metrics(job.priority)
+
+    async def _execute(self, job: ConversionJob) -> Any:
+        await asyncio.to_thread(self.store.save, job)
+        return await self.processor(job.request)
+
+    async def _finish(self, job: ConversionJob, status: str, error: Optional[str] = None) -> None:
+        job.status, job.finished_at = status, time.time()
+        if error:
+            job.error = error
+        if job.started_at:
+            record_conversion_job(job.priority, status, job.finished_at - job.started_at)
+        await asyncio.to_thread(self.store.save, job)
+        self._active.pop(job.job_id, None)
+        done = self._done.pop(job.job_id, None)
+        if done is not None:
+            done.set()
+
+    def _publish_queue_metrics(self, priority: Optional[str] = None, running_delta: int = 0) -> None:
+        priorities = [priority] if priority else list(self._queues)
+        for name in priorities:
+            record_conversion_queue(name, len(self._queues[name]), len(self._running) + running_delta)
+
+
+__all__ = [
+    "ConversionJob",
+    "ConversionScheduler",
+    "JobStateError",
+    "JobStore",
+    "SchedulerFullError",
+]
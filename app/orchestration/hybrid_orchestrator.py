@@ -4,13 +4,16 @@ Combina velocidad de API directa con flexibilidad de N8N
 """
 
 import asyncio
-import aiohttp
 import json
+import os
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 from enum import Enum
 import logging
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
+
+from orchestration.n8n_client import N8nClient
+from orchestration.pattern_store import PatternStore
 
 # Importar optimizador de velocidad
 try:
@@ -49,15 +52,18 @@ class ConversionResult:
     result_data: Dict
     learning_applied: bool
     optimizations_used: List[str]
-    errors: List[str] = []
+    errors: List[str] = field(default_factory=list)
 
 class HybridOrchestrator:
     """Orquestador híbrido que combina velocidad y flexibilidad"""
     
-    def __init__(self):
-        self.n8n_webhook_url = "http://localhost:5678/webhook/process-document"
+    def __init__(self, pattern_store: Optional[PatternStore] = None, http_client: Optional[N8nClient] = None):
+        self.n8n_webhook_url = os.environ.get("N8N_WEBHOOK_URL", "http://localhost:5678/webhook/process-document")
         self.learning_system = None  # Se inicializa lazy
-        self.fast_path_cache = {}
+        # Patrones aprendidos: acotados, persistidos y compartidos entre workers
+        self.fast_path_cache = pattern_store if pattern_store is not None else PatternStore()
+        # Sesión HTTP única con pool de conexiones para N8N y callbacks
+        self.http_client = http_client if http_client is not None else N8nClient()
 
         # Inicializar optimizador de velocidad
         self.speed_optimizer = SpeedOptimizer() if SpeedOptimizer else None
@@ -71,6 +77,14 @@ class HybridOrchestrator:
             "cache_hit_count": 0
         }
     
+    async def startup(self) -> None:
+        """Precarga los patrones de fast path al arrancar el worker"""
+        await asyncio.to_thread(self.fast_path_cache.warm)
+
+    async def shutdown(self) -> None:
+        """Cierra la sesión HTTP compartida"""
+        await self.http_client.close()
+
     async def process_conversion(self, request: ConversionRequest) -> ConversionResult:
         """Punto de entrada principal para conversiones"""
         
@@ -149,7 +163,7 @@ class HybridOrchestrator:
         if sum(fast_path_criteria) >= 3:  # Umbral reducido para más fast paths
             # Verificar si tenemos patrón conocido
             pattern_key = self._generate_pattern_key(doc_data)
-            if pattern_key in self.fast_path_cache:
+            if await asyncio.to_thread(self.fast_path_cache.__contains__, pattern_key):
                 logger.info("⚡ Fast path: Patrón conocido encontrado")
                 return ProcessingMode.FAST_PATH
         
@@ -209,11 +223,12 @@ class HybridOrchestrator:
 
         # Método tradicional como fallback
         pattern_key = self._generate_pattern_key(doc_data)
-        cached_pattern = self.fast_path_cache.get(pattern_key)
+        cached_pattern = await asyncio.to_thread(self.fast_path_cache.get, pattern_key)
 
         if not cached_pattern:
             logger.warning("⚠️ No hay patrón cached, fallback a complex path")
             return await self._execute_complex_path(request)
+        await asyncio.to_thread(self.fast_path_cache.record_use, pattern_key)
 
         try:
             # Ejecutar secuencia optimizada directamente
@@ -250,29 +265,21 @@ class HybridOrchestrator:
                 'timestamp': datetime.now().isoformat()
             }
             
-            # Llamada asíncrona a N8N
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    self.n8n_webhook_url,
-                    json=n8n_payload,
-                    timeout=aiohttp.ClientTimeout(total=300)  # 5 min timeout
-                ) as response:
-                    
-                    if response.status == 200:
-                        result = await response.json()
-                        
-                        # Procesar resultado de N8N
-                        processed_result = await self._process_n8n_result(result, request)
-                        
-                        # Actualizar cache si es exitoso
-                        if processed_result.get('success') and processed_result.get('cacheable', False):
-                            await self._update_fast_path_cache(request.document_data, processed_result)
-                        
-                        self.processing_stats['complex_path_count'] += 1
-                        return processed_result
-                    
-                    else:
-                        raise Exception(f"N8N returned status {response.status}")
+            # Llamada asíncrona a N8N (sesión compartida con reintentos)
+            response = await self.http_client.post_json(self.n8n_webhook_url, n8n_payload)
+            
+            if response.status == 200 and isinstance(response.body, dict):
+                # Procesar resultado de N8N
+                processed_result = await self._process_n8n_result(response.body, request)
+                
+                # Actualizar cache si es exitoso
+                if processed_result.get('success') and processed_result.get('cacheable', False):
+                    await self._update_fast_path_cache(request.document_data, processed_result)
+                
+                self.processing_stats['complex_path_count'] += 1
+                return processed_result
+            
+            raise Exception(f"N8N returned status {response.status}")
             
         except Exception as e:
             logger.error(f"❌ Error en complex path: {str(e)}")
@@ -364,7 +371,7 @@ class HybridOrchestrator:
         
         # En producción consultaría el learning system
         pattern_key = self._generate_pattern_key(doc_data)
-        return pattern_key in self.fast_path_cache
+        return await asyncio.to_thread(self.fast_path_cache.__contains__, pattern_key)
     
     async def _process_n8n_result(self, n8n_result: Dict, request: ConversionRequest) -> Dict:
         """Procesa y enriquece resultado de N8N"""
@@ -393,14 +400,14 @@ class HybridOrchestrator:
         
         pattern_key = self._generate_pattern_key(doc_data)
         
-        self.fast_path_cache[pattern_key] = {
+        await asyncio.to_thread(self.fast_path_cache.put, pattern_key, {
             'agent_sequence': result.get('agent_sequence_used', []),
             'optimizations': result.get('optimizations_applied', {}),
             'confidence': result.get('quality_score', 0.8),
             'avg_processing_time': result.get('processing_time', 30),
             'usage_count': 1,
             'created_at': datetime.now().isoformat()
-        }
+        })
         
         logger.info(f"💾 Patrón cacheado: {pattern_key}")
     
@@ -430,8 +437,9 @@ class HybridOrchestrator:
         """Envía callback asíncrono con resultado"""
         
         try:
-            async with aiohttp.ClientSession() as session:
-                await session.post(callback_url, json=asdict(result))
+            response = await self.http_client.post_json(callback_url, asdict(result), timeout=30)
+            if response.status >= 400:
+                raise Exception(f"Callback returned status {response.status}")
             logger.info(f"📞 Callback enviado: {callback_url}")
         except Exception as e:
             logger.error(f"❌ Error enviando callback: {str(e)}")
@@ -447,6 +455,8 @@ class HybridOrchestrator:
         
         return {
             **self.processing_stats,
+            'fast_path_patterns': self.fast_path_cache.stats(),
+            'n8n_http': dict(self.http_client.stats),
             'total_processed': total_processed,
             'fast_path_percentage': (self.processing_stats['fast_path_count'] / max(total_processed, 1)) * 100,
             'avg_time_saved_per_fast_path': (
@@ -0,0 +1,153 @@
+"""Pooled HTTP client for n8n webhooks and conversion callbacks.
+
+One long-lived :class:`aiohttp.ClientSession` per event loop replaces a
+session per request, so TCP (and TLS) connections to n8n are reused. The
+connector caps connections overall (``N8N_MAX_CONNECTIONS``) and per host
+(``N8N_MAX_CONNECTIONS_PER_HOST``). Requests time out after
+``N8N_TIMEOUT_SECONDS`` (``N8N_CONNECT_TIMEOUT_SECONDS`` to connect) and
+connection errors, timeouts, ``429`` and ``5xx`` responses are retried up
+to ``N8N_RETRIES`` times with exponential backoff and full jitter.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import random
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ.get(name, default))
+    except ValueError:
+        logger.warning("Valor inválido para %s, usando %s", name, default)
+        return default
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    return str(value)
+
+
+class N8nRequestError(RuntimeError):
+    """Raised when a request still fails after every retry."""
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class N8nResponse:
+    status: int
+    body: Any
+
+
+class N8nClient:
+    """Shared, retrying JSON client for n8n and callback endpoints."""
+
+    def __init__(
+        self,
+        *,
+        max_connections: Optional[int] = None,
+        max_connections_per_host: Optional[int] = None,
+        timeout: Optional[float] = None,
+        connect_timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+    ) -> None:
+        self.max_connections = int(max_connections or _env_number("N8N_MAX_CONNECTIONS", 32))
+        self.max_connections_per_host = int(
+            max_connections_per_host or _env_number("N8N_MAX_CONNECTIONS_PER_HOST", 8)
+        )
+        self.timeout = timeout or _env_number("N8N_TIMEOUT_SECONDS", 300)
+        self.connect_timeout = connect_timeout or _env_number("N8N_CONNECT_TIMEOUT_SECONDS", 10)
+        self.retries = int(retries if retries is not None else _env_number("N8N_RETRIES", 3))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.stats = {"requests": 0, "retries": 0, "failures": 0, "sessions_created": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            # Sessions are bound to their loop; one per loop keeps tests and workers safe.
+            connector = aiohttp.TCPConnector(limit=self.max_connections, limit_per_host=self.max_connections_per_host)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, sock_connect=self.connect_timeout),
+                json_serialize=lambda payload: json.dumps(payload, default=_json_default),
+            )
+            self._session_loop = loop
+            self.stats["sessions_created"] += 1
+        return self._session
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def post_json(
+        self,
+        url: str,
+        payload: Dict[str, Any],
+        *,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+    ) -> N8nResponse:
+        """POST *payload* as JSON and return the decoded response.
+
+        Non-retryable statuses (e.g. ``4xx``) are returned to the caller;
+        :class:`N8nRequestError` is raised once retries are exhausted.
+        """
+
+        session = self._get_session()
+        attempts = (self.retries if retries is None else retries) + 1
+        request_timeout = aiohttp.ClientTimeout(total=timeout, sock_connect=self.connect_timeout) if timeout else None
+        last_error = "sin respuesta"
+        last_status: Optional[int] = None
+        for attempt in range(attempts):
+            self.stats["requests"] += 1
+            try:
+                async with session.post(url, json=payload, timeout=request_timeout) as response:
+                    if response.status not in _RETRY_STATUSES:
+                        return N8nResponse(response.status, await self._read_body(response))
+                    last_status = response.status
+                    last_error = f"HTTP {response.status}"
+            except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                last_status = None
+                last_error = str(exc) or exc.__class__.__name__
+            if attempt + 1 < attempts:
+                self.stats["retries"] += 1
+                delay = self._backoff(attempt)
+                logger.warning("Reintentando %s en %.2fs (%s)", url, delay, last_error)
+                await asyncio.sleep(delay)
+        self.stats["failures"] += 1
+        raise N8nRequestError(f"{url}: {last_error}", last_status)
+
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> Any:
+        try:
+            return await response.json(content_type=None)
+        except (ValueError, aiohttp.ContentTypeError):
+            return await response.text()
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+
+
+__all__ = ["N8nClient", "N8nRequestError", "N8nResponse"]
@@ -0,0 +1,192 @@
+"""Bounded, persistent store for the orchestrator's learned fast-path patterns.
+
+Patterns live in a local SQLite database (``FAST_PATH_STORE_PATH``, default
+``data/fast_path_patterns.sqlite3``) so they survive restarts and are shared
+by every API worker on the host. Each process keeps a small in-memory copy
+that is warmed at startup and re-read from disk after
+``refresh_seconds``, so patterns learned by another worker show up without a
+database round-trip per request. Misses are remembered for the same window,
+so unknown document profiles do not hit SQLite on every request either. The store keeps at most
+``FAST_PATH_MAX_PATTERNS`` entries, evicting the least recently used.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_PATH_ENV_VAR = "FAST_PATH_STORE_PATH"
+_MAX_PATTERNS_ENV_VAR = "FAST_PATH_MAX_PATTERNS"
+
+DEFAULT_MAX_PATTERNS = 256
+DEFAULT_REFRESH_SECONDS = 30.0
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS patterns (
+        key TEXT PRIMARY KEY,
+        pattern TEXT NOT NULL,
+        usage_count INTEGER NOT NULL DEFAULT 0,
+        updated_at REAL NOT NULL,
+        last_used REAL NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS patterns_last_used ON patterns (last_used)",
+)
+
+
+def _default_store_path() -> Path:
+    configured = os.environ.get(_PATH_ENV_VAR)
+    base_dir = Path(__file__).resolve().parents[2]
+    if not configured:
+        return base_dir / "data" / "fast_path_patterns.sqlite3"
+    candidate = Path(configured)
+    return candidate if candidate.is_absolute() else (base_dir / candidate).resolve()
+
+
+def _max_patterns_from_env() -> int:
+    try:
+        return max(int(os.environ.get(_MAX_PATTERNS_ENV_VAR, DEFAULT_MAX_PATTERNS)), 1)
+    except ValueError:
+        return DEFAULT_MAX_PATTERNS
+
+
+class PatternStore:
+    """Fast-path patterns keyed by document profile, persisted in SQLite."""
+
+    def __init__(
+        self,
+        path: Optional[Path | str] = None,
+        *,
+        max_patterns: Optional[int] = None,
+        refresh_seconds: float = DEFAULT_REFRESH_SECONDS,
+    ) -> None:
+        self.path = Path(path) if path is not None else _default_store_path()
+        self.max_patterns = max_patterns or _max_patterns_from_env()
+        self.refresh_seconds = refresh_seconds
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Several API workers share the file: WAL lets readers proceed during writes.
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=5.0)
+        self._lock = Lock()
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._misses: "OrderedDict[str, float]" = OrderedDict()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def warm(self) -> int:
+        """Load the most recently used patterns into memory; returns how many."""
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, pattern, usage_count FROM patterns ORDER BY last_used DESC LIMIT ?",
+                (self.max_patterns,),
+            ).fetchall()
+            now = time.monotonic()
+            self._memory.clear()
+            self._misses.clear()
+            for key, payload, usage_count in reversed(rows):
+                pattern = self._decode(payload, usage_count)
+                if pattern is not None:
+                    self._memory[key] = (now, pattern)
+        logger.info("Patrones de fast path precargados: %s", len(self._memory))
+        return len(self._memory)
+
+    def get(self, key: str, default: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None and now - cached[0] < self.refresh_seconds:
+                self._memory.move_to_end(key)
+                return cached[1]
+            missed_at = self._misses.get(key)
+            if missed_at is not None and now - missed_at < self.refresh_seconds:
+                return default
+            row = self._conn.execute("SELECT pattern, usage_count FROM patterns WHERE key = ?", (key,)).fetchone()
+            pattern = self._decode(*row) if row else None
+            if pattern is None:
+                self._memory.pop(key, None)
+                self._misses[key] = now
+                self._misses.move_to_end(key)
+                while len(self._misses) > self.max_patterns:
+                    self._misses.popitem(last=False)
+                return default
+            self._remember(key, pattern, now)
+            return pattern
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key) is not None
+
+    def put(self, key: str, pattern: Dict[str, Any]) -> None:
+        """Store *pattern* and evict the least recently used beyond ``max_patterns``."""
+
+        payload = json.dumps(pattern, ensure_ascii=False, default=str)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO patterns (key, pattern, usage_count, updated_at, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET pattern = excluded.pattern, updated_at = excluded.updated_at, "
+                "last_used = excluded.last_used",
+                (key, payload, int(pattern.get("usage_count", 0)), now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM patterns WHERE key NOT IN "
+                "(SELECT key FROM patterns ORDER BY last_used DESC LIMIT ?)",
+                (self.max_patterns,),
+            )
+            self._remember(key, pattern, time.monotonic())
+
+    def record_use(self, key: str) -> None:
+        """Count one fast-path execution of *key* (feeds the LRU order)."""
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE patterns SET usage_count = usage_count + 1, last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM patterns").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "patterns": len(self),
+            "patterns_in_memory": len(self._memory),
+            "max_patterns": self.max_patterns,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ------------------------------------------------------------------
+    def _remember(self, key: str, pattern: Dict[str, Any], now: float) -> None:
+        self._misses.pop(key, None)
+        self._memory[key] = (now, pattern)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_patterns:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _decode(payload: str, usage_count: int) -> Optional[Dict[str, Any]]:
+        try:
+            pattern = json.loads(payload)
+        except ValueError:
+            return None
+        if not isinstance(pattern, dict):
+            return None
+        pattern["usage_count"] = usage_count
+        return pattern
+
+
+__all__ = ["DEFAULT_MAX_PATTERNS", "PatternStore"]
@@ -264,6 +264,12 @@ def main():
             include_other = st.checkbox("Incluir otros archivos", value=False, key="github_include_other")
             max_file_size = st.slider("Tamaño máximo por archivo (MB)", min_value=1, max_value=200, value=25, key="github_max_size")
             allowed_exts_raw = st.text_input("Extensiones permitidas (opcional, separadas por coma)", value="", key="github_allowed_exts")
+            incremental = st.checkbox(
+                "Solo cambios desde la última ingesta",
+                value=True,
+                key="github_incremental",
+                help="Procesa únicamente los archivos añadidos, modificados o renombrados desde el último commit ingerido.",
+            )
 
         if st.button("Ingerir repositorio", key="github_ingest_button"):
             if not repo_url:
@@ -302,6 +308,7 @@ def main():
                                 branch=branch or None,
                                 options=repo_options,
                                 metadata=metadata,
+                                incremental=incremental,
                             )
                         )
                     except Exception as exc:
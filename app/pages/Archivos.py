@@ -21,6 +21,7 @@ for path_option in (project_root, app_dir):
 
 # Importar colores de Anclora RAG
 from common.anclora_colors import apply_anclora_theme, ANCLORA_RAG_COLORS, create_colored_alert
+from common.chroma_utils import get_or_create_collection
 from common.constants import CHROMA_CLIENT, CHROMA_COLLECTIONS
 
 # Aplicar tema de colores Anclora RAG
@@ -426,7 +427,7 @@ def _collect_files_from_chroma(max_per_collection: int = 2000):
 
     for c in cols:
         try:
-            col = CHROMA_CLIENT.get_or_create_collection(c.name)
+            col = get_or_create_collection(CHROMA_CLIENT, c.name)
             # Preferir traer solo metadatos para no cargar documentos completos
             try:
                 res = col.get(include=["metadatas"], limit=max_per_collection)  # type: ignore
@@ -0,0 +1,161 @@
+"""Compare the cached es/en classifier with the previous langdetect path.
+
+Reports accuracy over a labelled set of chat-style queries and the per-call
+latency (cold, i.e. cache disabled, and warm) of both implementations::
+
+    python scripts/analysis/benchmark_language_detection.py --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, List, Sequence, Tuple
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from langdetect import DetectorFactory, LangDetectException, detect  # noqa: E402
+
+from common.language_id import (  # noqa: E402
+    ENGLISH_HINT_WORDS,
+    SPANISH_HINT_CHARACTERS,
+    SPANISH_HINT_WORDS,
+    LanguageIdentifier,
+)
+
+DetectorFactory.seed = 0
+
+LABELLED_QUERIES: Sequence[Tuple[str, str]] = (
+    ("¿Cuál es la situación energética actual en España?", "es"),
+    ("What is the current energy policy status?", "en"),
+    ("La reunión is tomorrow", "es"),
+    ("Como convierto un archivo DOCX a PDF", "es"),
+    ("convertir epub a pdf sin perder las imagenes", "es"),
+    ("necesito el resumen del contrato de licencia", "es"),
+    ("que formatos soporta el conversor", "es"),
+    ("error al subir un archivo grande", "es"),
+    ("dame los pasos para configurar la api", "es"),
+    ("politica de privacidad y retencion de datos", "es"),
+    ("cuanto tarda en procesar un video largo", "es"),
+    ("se puede exportar a markdown", "es"),
+    ("lista de colecciones disponibles en el sistema", "es"),
+    ("por que falla la ingesta de documentos", "es"),
+    ("quiero borrar mis documentos del indice", "es"),
+    ("instrucciones para desplegar con docker compose", "es"),
+    ("el modelo responde muy lento en la cpu", "es"),
+    ("busca informes trimestrales de ventas", "es"),
+    ("diferencias entre la version gratuita y la de pago", "es"),
+    ("tabla de precios para empresas", "es"),
+    ("explicame el flujo de conversion de documentos", "es"),
+    ("mi factura no coincide con el plan contratado", "es"),
+    ("como cambio el idioma de la interfaz", "es"),
+    ("los subtitulos del video no aparecen", "es"),
+    ("necesito ayuda con la autenticacion", "es"),
+    ("How do I convert a DOCX file to PDF", "en"),
+    ("convert epub to pdf without losing images", "en"),
+    ("I need a summary of the license agreement", "en"),
+    ("which formats does the converter support", "en"),
+    ("error uploading a large file", "en"),
+    ("give me the steps to configure the api", "en"),
+    ("privacy policy and data retention", "en"),
+    ("can I export to markdown", "en"),
+    ("list the available collections in the system", "en"),
+    ("document ingestion keeps failing", "en"),
+    ("I want to delete my documents from the index", "en"),
+    ("instructions to deploy with docker compose", "en"),
+    ("the model answers very slowly on the cpu", "en"),
+    ("find quarterly sales reports", "en"),
+    ("differences between the free and paid version", "en"),
+    ("pricing table for companies", "en"),
+    ("explain the document conversion flow", "en"),
+    ("my invoice does not match the subscribed plan", "en"),
+    ("change the interface language", "en"),
+    ("the video subtitles are not showing", "en"),
+    ("need help with authentication", "en"),
+    ("Gracias por la ayuda", "es"),
+    ("Please send me the report", "en"),
+    ("PDF", "en"),
+    ("OCR", "en"),
+)
+
+
+def legacy_detect(text: str) -> str:
+    """The heuristics + langdetect path used before ``common.language_id``."""
+
+    stripped_text = text.strip()
+    if not stripped_text:
+        return "es"
+    normalized_lower = stripped_text.lower()
+    tokens = {token for token in re.split(r"\W+", normalized_lower) if token}
+    try:
+        detected = detect(stripped_text).lower()
+    except LangDetectException:
+        detected = ""
+    if any(char in SPANISH_HINT_CHARACTERS for char in stripped_text):
+        return "es"
+    if any(word in normalized_lower for word in SPANISH_HINT_WORDS):
+        return "es"
+    if tokens & ENGLISH_HINT_WORDS:
+        return "en"
+    if detected.startswith("es"):
+        return "es"
+    if detected.startswith("en"):
+        return "en"
+    return "en" if stripped_text.isascii() else "es"
+
+
+def _measure(func: Callable[[str], str], repeat: int) -> Tuple[float, List[float]]:
+    correct = sum(func(text) == expected for text, expected in LABELLED_QUERIES)
+    timings: List[float] = []
+    for _ in range(repeat):
+        for text, _ in LABELLED_QUERIES:
+            started = time.perf_counter()
+            func(text)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+    return correct / len(LABELLED_QUERIES), timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--show-errors", action="store_true")
+    args = parser.parse_args()
+
+    legacy_detect("warm up langdetect profiles")
+    cold = LanguageIdentifier(cache_size=0)
+    warm = LanguageIdentifier()
+
+    fallbacks = sum(cold.ngram_guess(text) is None for text, _ in LABELLED_QUERIES)
+    rows = [
+        ("legacy (langdetect)", *_measure(legacy_detect, args.repeat)),
+        ("language_id sin caché", *_measure(cold.classify, args.repeat)),
+        ("language_id con caché", *_measure(warm.classify, args.repeat)),
+    ]
+
+    print(f"{'método':<24}{'precisión':>10}{'p50 µs':>10}{'p95 µs':>10}{'media µs':>10}")
+    for name, accuracy, timings in rows:
+        ordered = sorted(timings)
+        p95 = ordered[int(len(ordered) * 0.95) - 1]
+        print(
+            f"{name:<24}{accuracy:>10.1%}{statistics.median(ordered):>10.1f}"
+            f"{p95:>10.1f}{statistics.fmean(ordered):>10.1f}"
+        )
+    print(f"Consultas resueltas con langdetect: {fallbacks}/{len(LABELLED_QUERIES)}")
+
+    if args.show_errors:
+        for text, expected in LABELLED_QUERIES:
+            for name, func in (("legacy", legacy_detect), ("language_id", cold.classify)):
+                result = func(text)
+                if result != expected:
+                    print(f"[{name}] {text!r}: {result} (esperado {expected})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Generate ``app/common/language_profiles.py`` from the langdetect profiles.
+
+The fast es/en classifier in ``common.language_id`` scores character
+trigrams against a small precomputed table. This script derives that table
+from the Wikipedia n-gram profiles bundled with ``langdetect`` (Apache 2.0)
+so it can be regenerated reproducibly::
+
+    python scripts/analysis/build_language_profiles.py --top 400
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+from pathlib import Path
+
+import langdetect
+
+LANGUAGES = ("es", "en")
+OUTPUT = Path(__file__).resolve().parents[2] / "app" / "common" / "language_profiles.py"
+
+
+def _load_trigrams(language: str) -> tuple[dict[str, int], int]:
+    profile_path = Path(langdetect.__file__).parent / "profiles" / language
+    payload = json.loads(profile_path.read_text(encoding="utf-8"))
+    trigrams: dict[str, int] = {}
+    for gram, count in payload["freq"].items():
+        if len(gram) == 3:
+            # Queries are lowercased before scoring, so fold case here too.
+            key = gram.lower()
+            trigrams[key] = trigrams.get(key, 0) + int(count)
+    return trigrams, int(payload["n_words"][2])
+
+
+def build(top: int) -> str:
+    profiles = {language: _load_trigrams(language) for language in LANGUAGES}
+    selected: set[str] = set()
+    for trigrams, _ in profiles.values():
+        ranked = sorted(trigrams, key=lambda gram: (-trigrams[gram], gram))
+        selected.update(ranked[:top])
+
+    lines = [
+        '"""Character trigram log-probabilities for the es/en classifier.',
+        "",
+        "Generated by ``scripts/analysis/build_language_profiles.py`` from the",
+        "langdetect Wikipedia profiles (Apache 2.0). Do not edit by hand.",
+        '"""',
+        "",
+        "from typing import Dict",
+        "",
+    ]
+    floors = {}
+    for language, (trigrams, total) in profiles.items():
+        kept = {gram: trigrams[gram] for gram in selected if gram in trigrams}
+        floor = math.log(min(kept.values()) / total) - 1.0
+        floors[language] = round(floor, 3)
+        name = f"{language.upper()}_TRIGRAMS"
+        lines.append(f"{name}: Dict[str, float] = {{")
+        for gram in sorted(kept):
+            lines.append(f"    {gram!r}: {math.log(kept[gram] / total):.3f},")
+        lines.append("}")
+        lines.append("")
+    lines.append("UNSEEN_LOG_PROBABILITY: Dict[str, float] = {")
+    for language in LANGUAGES:
+        lines.append(f"    {language!r}: {floors[language]},")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--top", type=int, default=400, help="trigrams kept per language")
+    parser.add_argument("--output", type=Path, default=OUTPUT)
+    args = parser.parse_args()
+    args.output.write_text(build(args.top), encoding="utf-8")
+    print(f"Perfil escrito en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
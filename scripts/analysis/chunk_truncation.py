@@ -0,0 +1,125 @@
+"""Report how many chunks exceed the embedding model's token limit.
+
+Files are chunked twice, with the character sizes of ``CHUNKING_CONFIG``
+(before) and with the token-budgeted splitter (after), and every chunk is
+measured with the tokenizer of the domain's embedding model::
+
+    python scripts/analysis/chunk_truncation.py docs/ README.md
+    python scripts/analysis/chunk_truncation.py --collection documents
+
+``--collection`` measures the chunks already stored in Chroma instead.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from common.token_chunking import (  # noqa: E402
+    TruncationReport,
+    get_token_splitter,
+    get_tokenizer,
+    model_max_tokens,
+    truncation_report,
+)
+
+_TEXT_EXTENSIONS = {".txt", ".md", ".rst", ".py", ".js", ".ts", ".java", ".sql", ".html", ".json", ".yaml", ".yml"}
+
+
+def _iter_files(paths: Iterable[str]) -> Iterable[Path]:
+    for raw in paths:
+        path = Path(raw)
+        if path.is_dir():
+            yield from (item for item in sorted(path.rglob("*")) if item.suffix.lower() in _TEXT_EXTENSIONS)
+        elif path.is_file():
+            yield path
+
+
+def _print_report(label: str, report: TruncationReport) -> None:
+    print(
+        f"  {label:<8}{report.chunks:>8}{report.truncated:>11}{report.rate:>9.1%}"
+        f"{report.mean_tokens:>10.0f}{report.fill_ratio:>8.0%}{report.largest_tokens:>9}"
+    )
+
+
+def _header(domain: str, model_name: str, max_tokens: int) -> None:
+    print(f"\n{domain} — {model_name} (límite {max_tokens} tokens)")
+    print(f"  {'':<8}{'chunks':>8}{'truncados':>11}{'tasa':>9}{'media':>10}{'uso':>8}{'máximo':>9}")
+
+
+def _measure_files(paths: List[str]) -> None:
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    from common.ingest_file import CHUNKING_CONFIG, _embedding_model_for_domain, _get_ingestor_for_extension
+
+    texts: Dict[str, List[str]] = defaultdict(list)
+    for path in _iter_files(paths):
+        try:
+            domain = _get_ingestor_for_extension(path.suffix.lower()).domain
+        except ValueError:
+            domain = "documents"
+        texts[domain].append(path.read_text(encoding="utf-8", errors="replace"))
+
+    for domain, contents in sorted(texts.items()):
+        config = CHUNKING_CONFIG.get(domain, CHUNKING_CONFIG["default"])
+        model_name = _embedding_model_for_domain(domain) or "all-MiniLM-L6-v2"
+        tokenizer = get_tokenizer(model_name)
+        if tokenizer is None:
+            raise SystemExit(f"No se pudo cargar el tokenizador de {model_name}")
+        max_tokens = model_max_tokens(model_name, tokenizer)
+        characters = RecursiveCharacterTextSplitter(
+            chunk_size=config["chunk_size"],
+            chunk_overlap=config["chunk_overlap"],
+            separators=config["separators"],
+        )
+        tokens = get_token_splitter(
+            model_name, config["separators"], overlap_ratio=config["chunk_overlap"] / config["chunk_size"]
+        )
+        if tokens is None:
+            raise SystemExit("El chunking por tokens está desactivado (TOKEN_AWARE_CHUNKING)")
+
+        _header(domain, model_name, max_tokens)
+        before = [chunk for content in contents for chunk in characters.split_text(content)]
+        after = [chunk for content in contents for chunk in tokens.split_text(content)]
+        _print_report("antes", truncation_report(before, tokenizer, max_tokens))
+        _print_report("después", truncation_report(after, tokenizer, max_tokens))
+
+
+def _measure_collection(name: str) -> None:
+    from common.constants import CHROMA_CLIENT, CHROMA_COLLECTIONS
+    from common.ingest_file import _embedding_model_for_domain
+
+    domain = CHROMA_COLLECTIONS[name].domain if name in CHROMA_COLLECTIONS else None
+    model_name = _embedding_model_for_domain(domain) or "all-MiniLM-L6-v2"
+    tokenizer = get_tokenizer(model_name)
+    if tokenizer is None:
+        raise SystemExit(f"No se pudo cargar el tokenizador de {model_name}")
+    documents = CHROMA_CLIENT.get_collection(name).get(include=["documents"]).get("documents") or []
+    max_tokens = model_max_tokens(model_name, tokenizer)
+    _header(name, model_name, max_tokens)
+    _print_report("actual", truncation_report(documents, tokenizer, max_tokens))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", help="Files or folders to chunk.")
+    parser.add_argument("--collection", help="Measure the chunks stored in this Chroma collection.")
+    args = parser.parse_args()
+    if args.collection:
+        _measure_collection(args.collection)
+    elif args.paths:
+        _measure_files(args.paths)
+    else:
+        parser.error("indica rutas o --collection")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Sweep HNSW search parameters and report the recall@k / latency frontier.
+
+Vectors are read from an existing Chroma collection (or generated with
+``--synthetic``); a held-out sample is used as the query set and exact
+neighbours computed by brute force are the ground truth::
+
+    python scripts/analysis/tune_hnsw.py --collection troubleshooting --k 10
+    python scripts/analysis/tune_hnsw.py --synthetic 20000 --dimension 384 --target-recall 0.98
+
+The recommendation is printed both as a ``CollectionConfig`` entry for
+``common/constants.py`` and as a ``CHROMA_HNSW_OVERRIDES`` value. New
+settings only apply to collections created afterwards.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import List, Sequence
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from common.hnsw_tuning import pareto_frontier, recommend, split_held_out, sweep  # noqa: E402
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _load_collection(name: str) -> tuple[np.ndarray, str]:
+    from common.constants import CHROMA_CLIENT, hnsw_config_for
+
+    collection = CHROMA_CLIENT.get_collection(name)
+    embeddings = collection.get(include=["embeddings"]).get("embeddings")
+    if embeddings is None or len(embeddings) == 0:
+        raise SystemExit(f"La colección '{name}' no tiene embeddings")
+    metadata = collection.metadata or {}
+    space = str(metadata.get("hnsw:space") or hnsw_config_for(name).space)
+    return np.asarray(embeddings, dtype=np.float32), space
+
+
+def _synthetic(count: int, dimension: int, seed: int) -> np.ndarray:
+    """Clustered unit vectors, closer to real embeddings than uniform noise."""
+
+    rng = np.random.default_rng(seed)
+    centres = rng.normal(size=(max(count // 200, 8), dimension))
+    vectors = centres[rng.integers(0, len(centres), count)] + rng.normal(scale=0.6, size=(count, dimension))
+    return (vectors / np.linalg.norm(vectors, axis=1, keepdims=True)).astype(np.float32)
+
+
+def _print_table(title: str, rows: Sequence) -> None:
+    print(title)
+    print(f"{'M':>4}{'ef_constr':>11}{'ef_search':>11}{'recall':>9}{'p50 ms':>9}{'p95 ms':>9}{'build s':>9}")
+    for row in rows:
+        print(
+            f"{row.m:>4}{row.construction_ef:>11}{row.search_ef:>11}{row.recall:>9.3f}"
+            f"{row.latency_p50_ms:>9.3f}{row.latency_p95_ms:>9.3f}{row.build_seconds:>9.2f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--collection", help="Chroma collection to read vectors from.")
+    source.add_argument("--synthetic", type=int, metavar="N", help="Generate N clustered vectors instead.")
+    parser.add_argument("--dimension", type=int, default=384, help="Dimension for --synthetic.")
+    parser.add_argument("--space", choices=("l2", "cosine", "ip"), help="Override the collection's space.")
+    parser.add_argument("--queries", type=int, default=200, help="Held-out query count.")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--m", type=_int_list, default=[8, 16, 32])
+    parser.add_argument("--construction-ef", type=_int_list, default=[100, 200])
+    parser.add_argument("--search-ef", type=_int_list, default=[10, 20, 40, 80, 160])
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Write all results as JSON.")
+    args = parser.parse_args()
+
+    if args.collection:
+        vectors, space = _load_collection(args.collection)
+        name = args.collection
+    else:
+        vectors, space = _synthetic(args.synthetic, args.dimension, args.seed), "l2"
+        name = "synthetic"
+    space = args.space or space
+
+    indexed, queries = split_held_out(vectors, args.queries, seed=args.seed)
+    print(f"{name}: {len(indexed)} vectores indexados, {len(queries)} consultas, dim={vectors.shape[1]}, espacio={space}")
+    results = sweep(
+        indexed,
+        queries,
+        k=args.k,
+        space=space,
+        m_values=args.m,
+        construction_ef_values=args.construction_ef,
+        search_ef_values=args.search_ef,
+    )
+
+    _print_table("\nTodas las combinaciones", results)
+    _print_table(f"\nFrontera recall@{args.k} / latencia", pareto_frontier(results))
+
+    best = recommend(results, args.target_recall)
+    if best is not None:
+        reached = "alcanza" if best.recall >= args.target_recall else "NO alcanza"
+        print(f"\nRecomendación ({reached} recall {args.target_recall:.2f}): recall={best.recall:.3f}, p50={best.latency_p50_ms:.3f} ms")
+        print(
+            f'    "{name}": CollectionConfig(domain=..., hnsw=HNSWConfig('
+            f'space="{space}", m={best.m}, construction_ef={best.construction_ef}, search_ef={best.search_ef})),'
+        )
+        print(f"    CHROMA_HNSW_OVERRIDES={name}={best.m}:{best.construction_ef}:{best.search_ef}:{space}")
+
+    if args.output is not None:
+        payload = {
+            "collection": name,
+            "space": space,
+            "k": args.k,
+            "indexed": int(len(indexed)),
+            "queries": int(len(queries)),
+            "results": [result.as_dict() for result in results],
+            "recommended": best.as_dict() if best is not None else None,
+        }
+        args.output.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+if __name__ == "__main__":
+    main()
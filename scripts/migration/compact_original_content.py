@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Strip redundant ``original_page_content`` copies from existing collections.
+
+Chunks ingested before provenance was made compact carry their full text
+twice. This migration removes copies identical to the stored document and
+re-encodes long differing ones as a patch or compressed blob::
+
+    python scripts/migration/compact_original_content.py --dry-run
+    python scripts/migration/compact_original_content.py --collection troubleshooting
+
+The original text is still recoverable with
+``common.text_normalization.restore_original_content``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from common.chroma_utils import compact_collection_provenance  # noqa: E402
+from common.constants import CHROMA_CLIENT  # noqa: E402
+
+
+def _collection_names(client) -> list[str]:
+    names = []
+    for item in client.list_collections():
+        names.append(item if isinstance(item, str) else item.name)
+    return sorted(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", help="Collection to migrate (repeatable; default: all).")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Report the savings without writing.")
+    args = parser.parse_args()
+
+    names = args.collection or _collection_names(CHROMA_CLIENT)
+    totals = {"scanned": 0, "removed": 0, "compacted": 0, "bytes_saved": 0}
+    print(f"{'colección':<28}{'revisados':>10}{'eliminados':>11}{'comprimidos':>12}{'KiB ahorrados':>15}")
+    for name in names:
+        collection = CHROMA_CLIENT.get_collection(name)
+        stats = compact_collection_provenance(collection, batch_size=args.batch_size, dry_run=args.dry_run)
+        for key in totals:
+            totals[key] += stats[key]
+        print(
+            f"{name:<28}{stats['scanned']:>10}{stats['removed']:>11}{stats['compacted']:>12}"
+            f"{stats['bytes_saved'] / 1024:>15.1f}"
+        )
+    print(
+        f"{'total':<28}{totals['scanned']:>10}{totals['removed']:>11}{totals['compacted']:>12}"
+        f"{totals['bytes_saved'] / 1024:>15.1f}"
+    )
+    if args.dry_run:
+        print("\nSimulación: no se ha modificado ninguna colección.")
+
+
+if __name__ == "__main__":
+    main()
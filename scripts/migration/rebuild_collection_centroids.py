@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""Rebuild the routing centroids from the embeddings stored in Chroma.
+
+The collection router only folds in chunks ingested after it was enabled,
+so collections with older chunks are never skipped until their centroid is
+rebuilt. This migration pages every stored embedding into the router::
+
+    python scripts/migration/rebuild_collection_centroids.py
+    python scripts/migration/rebuild_collection_centroids.py --collection troubleshooting
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from common.collection_router import get_collection_router, rebuild_collection_centroid  # noqa: E402
+from common.constants import CHROMA_CLIENT  # noqa: E402
+
+
+def _collection_names(client) -> list[str]:
+    names = []
+    for item in client.list_collections():
+        names.append(item if isinstance(item, str) else item.name)
+    return sorted(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", help="Collection to rebuild (repeatable; default: all).")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    router = get_collection_router()
+    names = args.collection or _collection_names(CHROMA_CLIENT)
+    total = 0
+    print(f"{'colección':<28}{'embeddings':>12}")
+    for name in names:
+        collection = CHROMA_CLIENT.get_collection(name)
+        count = rebuild_collection_centroid(collection, router, batch_size=args.batch_size)
+        total += count
+        print(f"{name:<28}{count:>12}")
+    print(f"{'total':<28}{total:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Build the BM25 lexical index for chunks already stored in Chroma.
+
+Only chunks ingested after hybrid search was enabled are indexed
+incrementally, so exact-identifier queries miss older documents until this
+migration pages every collection into the lexical index::
+
+    python scripts/migration/rebuild_lexical_index.py
+    python scripts/migration/rebuild_lexical_index.py --collection legal_compliance
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from common.constants import CHROMA_CLIENT  # noqa: E402
+from common.lexical_index import rebuild_lexical_index  # noqa: E402
+
+
+def _collection_names(client) -> list[str]:
+    names = []
+    for item in client.list_collections():
+        names.append(item if isinstance(item, str) else item.name)
+    return sorted(names)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--collection", action="append", help="Collection to index (repeatable; default: all).")
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    names = args.collection or _collection_names(CHROMA_CLIENT)
+    total = 0
+    print(f"{'colección':<28}{'indexados':>10}")
+    for name in names:
+        collection = CHROMA_CLIENT.get_collection(name)
+        count = rebuild_lexical_index(collection, batch_size=args.batch_size)
+        total += count
+        print(f"{name:<28}{count:>10}")
+    print(f"{'total':<28}{total:>10}")
+
+
+if __name__ == "__main__":
+    main()
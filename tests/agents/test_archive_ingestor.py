@@ -0,0 +1,112 @@
+"""Tests for the streaming ZIP/tar archive loaders."""
+
+from __future__ import annotations
+
+import gzip
+import io
+import tarfile
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from app.agents.archive_agent.ingestor import (
+    ARCHIVE_LOADERS,
+    ArchiveLimits,
+    GzipFileLoader,
+    TarFileLoader,
+    ZipFileLoader,
+)
+
+
+def _by_path(documents) -> dict:
+    return {doc.metadata["archive_path"]: doc for doc in documents}
+
+
+def _zip(path: Path, members: dict) -> Path:
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, data in members.items():
+            archive.writestr(name, data)
+    return path
+
+
+def test_zip_members_are_read_in_memory_and_filtered_before_decompression(tmp_path, monkeypatch) -> None:
+    archive = _zip(
+        tmp_path / "bundle.zip",
+        {
+            "docs/guía.md": "# Guía\n\nAcción correctiva".encode("utf-8"),
+            "src/app.py": b"print('hola')\n",
+            "img/logo.png": b"\x89PNG" + bytes(200),
+            "logs/huge.log": b"x" * 5000,
+            "../evil.txt": b"fuera",
+        },
+    )
+    monkeypatch.setattr(zipfile.ZipFile, "extractall", lambda *args, **kwargs: pytest.fail("extractall"))
+    limits = ArchiveLimits(max_member_bytes=4096, max_compression_ratio=1000, workers=2)
+
+    documents = ZipFileLoader(str(archive), limits=limits).load()
+    by_path = _by_path(documents)
+
+    assert by_path["docs/guía.md"].page_content == "# Guía\n\nAcción correctiva"
+    assert by_path["docs/guía.md"].metadata["parser"] == "archive_stream"
+    assert by_path["docs/guía.md"].metadata["source"] == str(archive)
+    assert by_path["src/app.py"].page_content == "print('hola')\n"
+    assert by_path["img/logo.png"].metadata["skip_reason"] == "binary"
+    assert by_path["logs/huge.log"].metadata["skip_reason"] == "member_too_large"
+    assert by_path["../evil.txt"].metadata["skip_reason"] == "unsafe_path"
+    # Eligible members keep archive order after the skipped placeholders.
+    assert [doc.metadata["archive_path"] for doc in documents[-2:]] == ["docs/guía.md", "src/app.py"]
+
+
+def test_zip_bombs_and_total_size_are_rejected(tmp_path) -> None:
+    archive = _zip(
+        tmp_path / "bomb.zip",
+        {"a.txt": b"0" * 200_000, "b.txt": b"texto normal", "c.txt": b"otro texto normal"},
+    )
+    limits = ArchiveLimits(max_compression_ratio=50, max_total_bytes=20)
+
+    by_path = _by_path(ZipFileLoader(str(archive), limits=limits).load())
+
+    assert by_path["a.txt"].metadata["skip_reason"] == "compression_ratio"
+    assert by_path["b.txt"].page_content == "texto normal"
+    assert by_path["c.txt"].metadata["skip_reason"] == "total_size_limit"
+
+
+def test_tar_gz_members_are_streamed(tmp_path) -> None:
+    path = tmp_path / "bundle.tar.gz"
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in (("notas/uno.txt", "primero"), ("bin/tool", "\x00\x01"), ("notas/dos.md", "segundo")):
+            payload = data.encode("utf-8")
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            archive.addfile(info, io.BytesIO(payload))
+
+    assert ARCHIVE_LOADERS[".gz"][0] is GzipFileLoader
+    documents = GzipFileLoader(str(path), limits=ArchiveLimits(workers=2)).load()
+    by_path = _by_path(documents)
+
+    assert by_path["notas/uno.txt"].page_content == "primero"
+    assert by_path["notas/dos.md"].page_content == "segundo"
+    assert by_path["bin/tool"].metadata["parser"] == "skipped"
+
+    broken = tmp_path / "plain.gz"
+    broken.write_bytes(b"not a tarball")
+    [error] = TarFileLoader(str(broken)).load()
+    assert error.metadata["parser"] == "error"
+
+
+def test_plain_gzip_files_are_read_as_a_single_member(tmp_path) -> None:
+    path = tmp_path / "notes.txt.gz"
+    with gzip.open(path, "wb") as handle:
+        handle.write("notas comprimidas".encode("utf-8"))
+
+    [document] = GzipFileLoader(str(path)).load()
+
+    assert document.page_content == "notas comprimidas"
+    assert document.metadata["archive_path"] == "notes.txt"
+
+    bomb = tmp_path / "bomb.txt.gz"
+    with gzip.open(bomb, "wb") as handle:
+        handle.write(b"a" * 200_000)
+    [skipped] = GzipFileLoader(str(bomb), limits=ArchiveLimits(max_compression_ratio=10)).load()
+    assert skipped.metadata["skip_reason"] == "compression_ratio"
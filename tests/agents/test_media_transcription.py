@@ -0,0 +1,175 @@
+"""Tests for cached, chunked Whisper transcription."""
+
+from __future__ import annotations
+
+import io
+import sys
+
+import numpy as np
+import pytest
+
+from app.agents.media_agent import transcription
+from app.agents.media_agent.ingestor import _transcription_documents
+from app.agents.media_agent.transcription import (
+    SAMPLE_RATE,
+    TranscriptionEngine,
+    ffmpeg_pcm_stream,
+    get_whisper_model,
+    silence_boundaries,
+    stream_chunks,
+)
+
+
+class _FakeModel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls: list = []
+
+    def transcribe(self, audio, **options):
+        seconds = len(audio) / SAMPLE_RATE
+        self.calls.append(seconds)
+        return {
+            "text": f" trozo de {seconds:.0f}s",
+            "language": "es",
+            "segments": [
+                {"id": 0, "start": 0.0, "end": seconds / 2, "text": "inicio", "tokens": [1, 2]},
+                {"id": 1, "start": seconds / 2, "end": seconds, "text": "final", "tokens": [3]},
+            ],
+        }
+
+
+@pytest.fixture
+def fake_models(monkeypatch):
+    loaded: list = []
+
+    def _loader(name: str) -> _FakeModel:
+        loaded.append(name)
+        return _FakeModel(name)
+
+    monkeypatch.setattr(transcription, "_MODEL_LOADER", _loader)
+    transcription.clear_model_cache()
+    yield loaded
+    transcription.clear_model_cache()
+
+
+def test_models_are_loaded_once_per_process(fake_models) -> None:
+    first = get_whisper_model("base")
+    assert get_whisper_model("base") is first
+    get_whisper_model("small")
+    assert fake_models == ["base", "small"]
+
+
+def test_cuts_land_on_the_quietest_frame_near_the_target() -> None:
+    audio = np.full(SAMPLE_RATE * 25, 0.5, dtype=np.float32)
+    audio[SAMPLE_RATE * 11 : SAMPLE_RATE * 11 + 800] = 0.0  # silence at 11s
+    audio[SAMPLE_RATE * 19 : SAMPLE_RATE * 19 + 800] = 0.0  # silence at 19s
+
+    ranges = silence_boundaries(audio, target_seconds=10, search_seconds=2)
+
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(audio)
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    assert SAMPLE_RATE * 11 <= ranges[0][1] < SAMPLE_RATE * 11 + 800
+    assert SAMPLE_RATE * 19 <= ranges[1][1] < SAMPLE_RATE * 19 + 800
+    assert silence_boundaries(audio[: SAMPLE_RATE], target_seconds=10) == [(0, SAMPLE_RATE)]
+
+
+def test_chunks_are_stitched_with_global_timestamps(fake_models) -> None:
+    engine = TranscriptionEngine(workers=1)
+    chunks = [(0.0, np.zeros(SAMPLE_RATE * 4, dtype=np.float32)), (4.0, np.zeros(SAMPLE_RATE * 6, dtype=np.float32))]
+
+    result = engine.transcribe_chunks(chunks, "base", duration=10.0)
+
+    assert result.text == "trozo de 4s trozo de 6s"
+    assert result.language == "es"
+    assert [segment["id"] for segment in result.segments] == [0, 1, 2, 3]
+    assert [(segment["start"], segment["end"]) for segment in result.segments] == [
+        (0.0, 2.0),
+        (2.0, 4.0),
+        (4.0, 7.0),
+        (7.0, 10.0),
+    ]
+    assert "tokens" not in result.segments[0]
+
+    documents = _transcription_documents("charla.mp3", "audio", "base", result)
+    assert documents[0].metadata["segments_count"] == 4
+    assert documents[0].metadata["duration"] == 10.0
+    assert documents[3].metadata["media_type"] == "audio_segment"
+    assert documents[3].metadata["segment_id"] == 2
+    assert documents[3].metadata["start_time"] == 4.0
+
+
+def test_short_audio_is_transcribed_in_process(fake_models, monkeypatch) -> None:
+    engine = TranscriptionEngine(workers=4, segment_seconds=5)
+    monkeypatch.setattr(engine, "_get_pool", lambda: pytest.fail("pool used for short audio"))
+
+    result = engine.transcribe_audio(np.zeros(SAMPLE_RATE * 8, dtype=np.float32), "base")
+
+    assert get_whisper_model("base").calls == [8.0]
+    assert result.duration == 8.0
+
+
+def test_stream_chunks_buffer_at_most_one_window() -> None:
+    audio = np.full(SAMPLE_RATE * 25, 0.5, dtype=np.float32)
+    audio[SAMPLE_RATE * 11 : SAMPLE_RATE * 11 + 800] = 0.0
+    blocks = (audio[start : start + SAMPLE_RATE] for start in range(0, len(audio), SAMPLE_RATE))
+
+    windows = list(stream_chunks(blocks, target_seconds=10, search_seconds=2))
+
+    assert np.array_equal(np.concatenate([samples for _, samples in windows]), audio)
+    assert windows[0][0] == 0.0
+    assert SAMPLE_RATE * 11 <= len(windows[0][1]) < SAMPLE_RATE * 11 + 800
+    assert windows[1][0] == len(windows[0][1]) / SAMPLE_RATE
+    assert max(len(samples) for _, samples in windows) <= SAMPLE_RATE * 12
+
+
+def test_ffmpeg_pipe_is_decoded_to_float_blocks(monkeypatch) -> None:
+    pcm = np.array([0, 16384, -32768, 32767, 8192], dtype=np.int16).tobytes()
+
+    class _ShortReads(io.BytesIO):
+        def read(self, size=-1):
+            return super().read(min(size, 3))
+
+    class _FakeProcess:
+        def __init__(self, command, **_):
+            assert command[0] == "ffmpeg" and "s16le" in command
+            self.stdout = _ShortReads(pcm)
+            self.stderr = io.BytesIO(b"")
+            self.returncode = None
+
+        def poll(self):
+            return self.returncode
+
+        def wait(self):
+            self.returncode = 0
+            return 0
+
+    monkeypatch.setattr(transcription.subprocess, "Popen", _FakeProcess)
+
+    # Short pipe reads split samples across blocks; none may be lost.
+    blocks = list(ffmpeg_pcm_stream("clip.mp4", sample_rate=1, block_seconds=2))
+
+    assert np.allclose(np.concatenate(blocks), [0.0, 0.5, -1.0, 32767 / 32768, 0.25])
+
+
+def test_ffmpeg_stderr_is_drained_while_decoding(monkeypatch) -> None:
+    # Far more stderr than a pipe buffer holds, written before any audio.
+    script = (
+        "import sys\n"
+        "sys.stderr.write('warning: corrupt frame\\n' * 20000)\n"
+        "sys.stderr.flush()\n"
+        "sys.stdout.buffer.write(b'\\x00\\x40' * 4)\n"
+        "sys.exit(1)\n"
+    )
+    real_popen = transcription.subprocess.Popen
+    monkeypatch.setattr(
+        transcription.subprocess,
+        "Popen",
+        lambda command, **kwargs: real_popen([sys.executable, "-c", script], **kwargs),
+    )
+
+    blocks = []
+    with pytest.raises(transcription.AudioDecodeError, match="corrupt frame"):
+        for block in ffmpeg_pcm_stream("clip.mp4", sample_rate=1, block_seconds=2):
+            blocks.append(block)
+
+    assert np.allclose(np.concatenate(blocks), [0.5] * 4)
@@ -0,0 +1,40 @@
+"""Tests for the page-range parallel PDF loader."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.agents.document_agent.pdf_loader import ParallelPyMuPDFLoader, page_ranges, shutdown_pool
+
+
+def test_page_ranges_cover_every_page_once() -> None:
+    assert page_ranges(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert page_ranges(3, 16) == [(0, 3)]
+    assert page_ranges(0, 16) == []
+
+
+def test_parallel_load_matches_sequential_order_and_metadata(tmp_path: Path) -> None:
+    fitz = pytest.importorskip("fitz")
+    pdf_path = tmp_path / "manual.pdf"
+    with fitz.open() as document:
+        for number in range(7):
+            page = document.new_page()
+            page.insert_text((72, 72), f"Página {number}")
+        document.set_metadata({"title": "Manual"})
+        document.save(pdf_path)
+
+    sequential = ParallelPyMuPDFLoader(str(pdf_path), min_parallel_pages=100).load()
+    try:
+        parallel = ParallelPyMuPDFLoader(str(pdf_path), pages_per_task=2, min_parallel_pages=1).load()
+    finally:
+        shutdown_pool()
+
+    assert [doc.metadata["page"] for doc in parallel] == list(range(7))
+    assert [doc.page_content for doc in parallel] == [doc.page_content for doc in sequential]
+    assert [doc.metadata for doc in parallel] == [doc.metadata for doc in sequential]
+    assert "Página 3" in parallel[3].page_content
+    assert parallel[0].metadata["total_pages"] == 7
+    assert parallel[0].metadata["title"] == "Manual"
+    assert parallel[0].metadata["source"] == str(pdf_path)
@@ -0,0 +1 @@
+"""Throughput and latency benchmarks that run against local stand-ins."""
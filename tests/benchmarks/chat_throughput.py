@@ -0,0 +1,438 @@
+"""End-to-end ``/chat`` throughput benchmark against local stand-ins.
+
+The real FastAPI app is served by uvicorn on a loopback port. Retrieval runs
+against an ephemeral in-process Chroma filled with a synthetic corpus, and
+the LLM is :class:`~tests.benchmarks.fake_ollama.FakeOllamaServer`, so the
+numbers measure the application's own overhead plus a known model speed.
+
+Time-to-first-token is taken from the ``rag.response`` and
+``rag.llm_first_token`` spans emitted by :mod:`common.tracing`::
+
+    python -m tests.benchmarks.chat_throughput --requests 200 --concurrency 8
+    python -m tests.benchmarks.chat_throughput --save-baseline tests/benchmarks/baselines/chat_throughput.json
+    python -m tests.benchmarks.chat_throughput --baseline tests/benchmarks/baselines/chat_throughput.json
+
+With ``--baseline`` the process exits with status 1 when QPS drops, or a
+latency percentile grows, by more than ``--tolerance`` (relative).
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import platform
+import random
+import re
+import socket
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from tests.benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer  # noqa: E402
+
+BENCHMARK_TOKEN = "benchmark-token"
+
+# Metrics compared against a baseline, and whether a larger value is better.
+COMPARED_METRICS: Mapping[str, bool] = {
+    "qps": True,
+    "latency_p50_ms": False,
+    "latency_p95_ms": False,
+    "latency_p99_ms": False,
+    "ttft_p50_ms": False,
+    "ttft_p95_ms": False,
+}
+
+_TOPICS = (
+    ("conversión", "conversion", "docx", "pdf", "epub", "markdown", "plantilla", "formato"),
+    ("ingesta", "ingestion", "chunk", "embedding", "colección", "índice", "metadatos", "lote"),
+    ("error", "timeout", "memoria", "reintento", "registro", "traza", "latencia", "fallo"),
+    ("contrato", "licencia", "cláusula", "privacidad", "retención", "auditoría", "política", "jurisdicción"),
+    ("factura", "precio", "plan", "suscripción", "cliente", "pago", "empresa", "informe"),
+)
+_FILLER = (
+    "el", "la", "de", "para", "con", "sistema", "usuario", "archivo", "proceso", "datos",
+    "the", "of", "for", "with", "system", "user", "file", "process", "data", "service",
+)
+_QUERIES = (
+    ("¿Cómo convierto un archivo docx a pdf sin perder el formato?", "es"),
+    ("How do I fix a timeout error during ingestion?", "en"),
+    ("Qué dice la cláusula de privacidad sobre la retención de datos", "es"),
+    ("Summarize the pricing plan for a company subscription", "en"),
+    ("explica el proceso de chunk y embedding de la colección", "es"),
+    ("Which markdown template does the converter use?", "en"),
+)
+
+
+@dataclass
+class BenchmarkConfig:
+    """Shape of the synthetic workload."""
+
+    collections: int = 3
+    documents_per_collection: int = 500
+    words_per_document: int = 80
+    embedding_dimension: int = 256
+    requests: int = 120
+    concurrency: int = 8
+    warmup_requests: int = 4
+    tokens_per_second: float = 200.0
+    first_token_delay: float = 0.02
+    response_tokens: int = 32
+    # Generations the LLM scheduler lets through at once. The fake model serves
+    # any number in parallel, so the default matches the client concurrency.
+    llm_max_concurrency: int = 8
+    seed: int = 7
+
+    @classmethod
+    def from_mapping(cls, values: Mapping[str, Any]) -> "BenchmarkConfig":
+        known = {field.name for field in fields(cls)}
+        return cls(**{key: value for key, value in values.items() if key in known})
+
+
+class HashingEmbeddings:
+    """Deterministic bag-of-words embeddings; no model download required."""
+
+    def __init__(self, dimension: int = 256) -> None:
+        self.dimension = dimension
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+            bucket = int.from_bytes(digest[:4], "little") % self.dimension
+            vector[bucket] += 1.0 if digest[4] & 1 else -1.0
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        return [value / norm for value in vector]
+
+    def embed_documents(self, texts: Sequence[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+
+def synthetic_corpus(config: BenchmarkConfig) -> Dict[str, List[SimpleNamespace]]:
+    """Return ``collection -> documents`` for the first configured collections."""
+
+    from common.constants import CHROMA_COLLECTIONS
+
+    names = list(CHROMA_COLLECTIONS)[: max(1, min(config.collections, len(CHROMA_COLLECTIONS)))]
+    rng = random.Random(config.seed)
+    corpus: Dict[str, List[SimpleNamespace]] = {}
+    for position, name in enumerate(names):
+        topic = _TOPICS[position % len(_TOPICS)]
+        documents = []
+        for index in range(config.documents_per_collection):
+            words = [
+                rng.choice(topic) if rng.random() < 0.3 else rng.choice(_FILLER)
+                for _ in range(config.words_per_document)
+            ]
+            documents.append(
+                SimpleNamespace(
+                    page_content=" ".join(words),
+                    metadata={
+                        "collection": name,
+                        "source": f"synthetic/{name}/doc-{index:05d}.txt",
+                        "chunk_id": index,
+                    },
+                )
+            )
+        corpus[name] = documents
+    return corpus
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    """Linear-interpolated percentile of *values* (``fraction`` in [0, 1])."""
+
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * min(max(fraction, 0.0), 1.0)
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    if lower == upper:
+        return ordered[lower]
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class _TTFTCollector:
+    """Span exporter that keeps time-to-first-token per finished trace."""
+
+    def __init__(self) -> None:
+        self.samples: List[float] = []
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> None:
+        root = next((item for item in spans if item.name == "rag.response"), None)
+        first = next((item for item in spans if item.name == "rag.llm_first_token"), None)
+        if root is None or first is None or first.end_ns is None:
+            return
+        with self._lock:
+            self.samples.append((first.end_ns - root.start_ns) / 1e9)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples.clear()
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def _configured_app(config: BenchmarkConfig, ollama_url: str, workdir: Path, collector: _TTFTCollector) -> Iterator[Any]:
+    """Point the app's singletons at the local stand-ins and restore them afterwards."""
+
+    import chromadb
+
+    import common.langchain_module as rag_module
+    from app import api_endpoints
+    from common import collection_router, embeddings_manager, lexical_index, llm_scheduler, local_vector_cache, tracing
+    from common.chroma_utils import add_langchain_documents
+    from security import AdvancedSecurityManager, SecurityPolicy
+
+    embeddings = HashingEmbeddings(config.embedding_dimension)
+    client = chromadb.PersistentClient(path=str(workdir / "chroma"))
+    previous = {
+        "CHROMA_SETTINGS": rag_module.CHROMA_SETTINGS,
+        "ollama_base_url": rag_module.ollama_base_url,
+        "model": rag_module.model,
+        "parse_arguments": rag_module.parse_arguments,
+    }
+    previous_security = api_endpoints.advanced_security
+    previous_tokens = os.environ.get("ANCLORA_API_TOKENS")
+
+    embeddings_manager.configure_default_manager(
+        embeddings_manager.EmbeddingsManager(embedding_factory=lambda *, model_name: embeddings)
+    )
+    lexical_index.configure_default_registry(lexical_index.LexicalIndexRegistry(workdir / "lexical"))
+    collection_router.configure_default_router(collection_router.CollectionRouter(persist=False))
+    local_vector_cache.configure_default_cache(None)
+    llm_scheduler.configure_default_scheduler(
+        llm_scheduler.LLMScheduler(llm_scheduler.SchedulerConfig(max_concurrency=config.llm_max_concurrency))
+    )
+    tracing.configure_default_tracer(tracing.Tracer(exporter=collector))
+    rag_module._collections_cache.clear()
+    rag_module.CHROMA_SETTINGS = client
+    rag_module.ollama_base_url = ollama_url
+    rag_module.model = FakeOllamaConfig.model
+    rag_module.parse_arguments = lambda: argparse.Namespace(hide_source=False, mute_stream=True)
+    api_endpoints.advanced_security = AdvancedSecurityManager(
+        SecurityPolicy(
+            max_queries_per_minute=10**9,
+            max_queries_per_hour=10**9,
+            rate_limit_whitelist={"127.0.0.1"},
+            enable_anomaly_detection=False,
+        )
+    )
+    os.environ["ANCLORA_API_TOKENS"] = BENCHMARK_TOKEN
+
+    try:
+        for name, documents in synthetic_corpus(config).items():
+            add_langchain_documents(client, name, embeddings, documents, batch_size=500)
+        yield api_endpoints.app
+    finally:
+        for attribute, value in previous.items():
+            setattr(rag_module, attribute, value)
+        rag_module._collections_cache.clear()
+        api_endpoints.advanced_security = previous_security
+        if previous_tokens is None:
+            os.environ.pop("ANCLORA_API_TOKENS", None)
+        else:
+            os.environ["ANCLORA_API_TOKENS"] = previous_tokens
+        embeddings_manager.configure_default_manager(None)
+        lexical_index.get_lexical_registry().close()
+        lexical_index.configure_default_registry(None)
+        collection_router.configure_default_router(None)
+        local_vector_cache.configure_default_cache(None)
+        llm_scheduler.configure_default_scheduler(None)
+        tracing.configure_default_tracer(None)
+
+
+@contextmanager
+def _serve(app: Any) -> Iterator[str]:
+    import uvicorn
+
+    port = _free_port()
+    server = uvicorn.Server(
+        uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    )
+    thread = threading.Thread(target=server.run, name="benchmark-uvicorn", daemon=True)
+    thread.start()
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if not thread.is_alive() or time.monotonic() > deadline:
+            raise RuntimeError("uvicorn did not start")
+        time.sleep(0.02)
+    try:
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+
+
+async def _drive_load(base_url: str, config: BenchmarkConfig, total: int) -> Dict[str, Any]:
+    import httpx
+
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+    headers = {"Authorization": f"Bearer {BENCHMARK_TOKEN}"}
+    limits = httpx.Limits(max_connections=config.concurrency, max_keepalive_connections=config.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, headers=headers, limits=limits, timeout=120) as client:
+
+        async def worker() -> None:
+            nonlocal errors
+            for index in counter:
+                message, language = _QUERIES[index % len(_QUERIES)]
+                started = time.perf_counter()
+                try:
+                    reply = await client.post("/chat", json={"message": message, "language": language})
+                    ok = reply.status_code == 200 and reply.json().get("status") in {"success", "warning"}
+                except Exception:
+                    ok = False
+                if ok:
+                    latencies.append(time.perf_counter() - started)
+                else:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(max(config.concurrency, 1))))
+        elapsed = time.perf_counter() - started
+
+    return {"latencies": latencies, "errors": errors, "elapsed": elapsed}
+
+
+def run_benchmark(config: BenchmarkConfig) -> Dict[str, Any]:
+    """Run the workload described by *config* and return the JSON report."""
+
+    collector = _TTFTCollector()
+    ollama_config = FakeOllamaConfig(
+        tokens_per_second=config.tokens_per_second,
+        first_token_delay=config.first_token_delay,
+        response_tokens=config.response_tokens,
+    )
+    with tempfile.TemporaryDirectory(prefix="anclora-bench-") as tmp, FakeOllamaServer(ollama_config) as ollama:
+        with _configured_app(config, ollama.url, Path(tmp), collector) as app, _serve(app) as base_url:
+            if config.warmup_requests:
+                asyncio.run(_drive_load(base_url, config, config.warmup_requests))
+            collector.reset()
+            measured = asyncio.run(_drive_load(base_url, config, config.requests))
+        llm_calls = ollama.requests
+
+    latencies = measured["latencies"]
+    ttft = list(collector.samples)
+    elapsed = measured["elapsed"]
+    return {
+        "benchmark": "chat_throughput",
+        "config": asdict(config),
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "metrics": {
+            "requests": config.requests,
+            "errors": measured["errors"],
+            "error_rate": measured["errors"] / config.requests if config.requests else 0.0,
+            "elapsed_seconds": round(elapsed, 4),
+            "qps": round(len(latencies) / elapsed, 3) if elapsed else 0.0,
+            "latency_p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+            "latency_p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+            "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+            "ttft_p50_ms": round(percentile(ttft, 0.50) * 1000, 2),
+            "ttft_p95_ms": round(percentile(ttft, 0.95) * 1000, 2),
+            "ttft_samples": len(ttft),
+            "llm_calls": llm_calls,
+        },
+    }
+
+
+def compare_to_baseline(report: Mapping[str, Any], baseline: Mapping[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Return a description of every metric that regressed beyond *tolerance*."""
+
+    regressions: List[str] = []
+    current = report.get("metrics", {})
+    reference = baseline.get("metrics", {})
+    for name, higher_is_better in COMPARED_METRICS.items():
+        before = reference.get(name)
+        after = current.get(name)
+        if not before or after is None:
+            continue
+        change = (after - before) / before
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{name}: {before} -> {after} ({change:+.1%})")
+
+    if current.get("error_rate", 0.0) > reference.get("error_rate", 0.0):
+        regressions.append(
+            f"error_rate: {reference.get('error_rate', 0.0)} -> {current.get('error_rate')}"
+        )
+    return regressions
+
+
+def _parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark /chat throughput with local stand-ins.")
+    defaults = BenchmarkConfig()
+    for field in fields(BenchmarkConfig):
+        parser.add_argument(
+            f"--{field.name.replace('_', '-')}",
+            type=type(getattr(defaults, field.name)),
+            default=None,
+        )
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file.")
+    parser.add_argument("--save-baseline", type=Path, help="Store the report as the new baseline.")
+    parser.add_argument("--baseline", type=Path, help="Compare against this baseline and fail on regressions.")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = _parse_args(argv)
+    # Per-request INFO logs would dominate the measurement.
+    logging.disable(logging.INFO)
+    overrides = {
+        field.name: getattr(args, field.name)
+        for field in fields(BenchmarkConfig)
+        if getattr(args, field.name) is not None
+    }
+
+    baseline = None
+    if args.baseline is not None:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        # Reuse the baseline workload unless explicitly overridden.
+        config = BenchmarkConfig.from_mapping({**baseline.get("config", {}), **overrides})
+    else:
+        config = BenchmarkConfig.from_mapping(overrides)
+
+    report = run_benchmark(config)
+    rendered = json.dumps(report, indent=2, ensure_ascii=False)
+    print(rendered)
+
+    for target in (args.output, args.save_baseline):
+        if target is not None:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(rendered + "\n", encoding="utf-8")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(report, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESIÓN {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
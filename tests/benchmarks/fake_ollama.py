@@ -0,0 +1,169 @@
+"""Minimal Ollama-compatible HTTP server with a configurable token rate.
+
+Only ``POST /api/generate`` (streaming NDJSON and ``"stream": false``) and
+``GET /api/tags`` are implemented, which is what the LangChain ``Ollama``
+client used by :mod:`common.langchain_module` needs.
+"""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class FakeOllamaConfig:
+    """Timing profile of the simulated model."""
+
+    tokens_per_second: float = 200.0
+    first_token_delay: float = 0.02
+    response_tokens: int = 32
+    model: str = "benchmark"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:  # noqa: A002 - stdlib signature
+        return
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:  # noqa: N802 - stdlib naming
+        if self.path.rstrip("/") == "/api/tags":
+            self._send_json(200, {"models": [{"name": self.server.config.model}]})
+            return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:  # noqa: N802 - stdlib naming
+        if self.path.rstrip("/") != "/api/generate":
+            self._send_json(404, {"error": "not found"})
+            return
+
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            request = json.loads(self.rfile.read(length) or b"{}")
+        except json.JSONDecodeError:
+            self._send_json(400, {"error": "invalid json"})
+            return
+
+        config = self.server.config
+        self.server.record_request(request.get("prompt", ""))
+        tokens = [f"tok{index} " for index in range(max(config.response_tokens, 1))]
+        interval = 1.0 / config.tokens_per_second if config.tokens_per_second > 0 else 0.0
+        started = time.perf_counter_ns()
+
+        if request.get("stream", True) is False:
+            time.sleep(config.first_token_delay + interval * (len(tokens) - 1))
+            self._send_json(200, self._final_chunk(request, "".join(tokens), started, len(tokens)))
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(config.first_token_delay)
+        for index, token in enumerate(tokens):
+            if index:
+                time.sleep(interval)
+            self._write_chunk({"model": request.get("model"), "response": token, "done": False})
+        self._write_chunk(self._final_chunk(request, "", started, len(tokens)))
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, payload: dict) -> None:
+        line = (json.dumps(payload) + "\n").encode("utf-8")
+        self.wfile.write(f"{len(line):x}\r\n".encode("ascii") + line + b"\r\n")
+        self.wfile.flush()
+
+    @staticmethod
+    def _final_chunk(request: dict, text: str, started_ns: int, tokens: int) -> dict:
+        return {
+            "model": request.get("model"),
+            "response": text,
+            "done": True,
+            "total_duration": time.perf_counter_ns() - started_ns,
+            "eval_count": tokens,
+        }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, config: FakeOllamaConfig) -> None:
+        super().__init__(address, _Handler)
+        self.config = config
+        self.requests = 0
+        self.last_prompt = ""
+        self._lock = threading.Lock()
+
+    def record_request(self, prompt: str) -> None:
+        with self._lock:
+            self.requests += 1
+            self.last_prompt = prompt
+
+
+class FakeOllamaServer:
+    """Run the fake model server on a background thread.
+
+    Usable as a context manager; :attr:`url` is the ``base_url`` to hand to
+    the Ollama client.
+    """
+
+    def __init__(self, config: Optional[FakeOllamaConfig] = None, *, host: str = "127.0.0.1", port: int = 0) -> None:
+        self.config = config or FakeOllamaConfig()
+        self._address = (host, port)
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise RuntimeError("FakeOllamaServer is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests if self._server is not None else 0
+
+    @property
+    def last_prompt(self) -> str:
+        return self._server.last_prompt if self._server is not None else ""
+
+    def start(self) -> "FakeOllamaServer":
+        if self._server is None:
+            self._server = _Server(self._address, self.config)
+            self._thread = threading.Thread(
+                target=self._server.serve_forever, name="fake-ollama", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+__all__ = ["FakeOllamaConfig", "FakeOllamaServer"]
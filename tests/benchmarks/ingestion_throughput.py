@@ -0,0 +1,500 @@
+"""Ingestion throughput benchmark across formats and sizes.
+
+Synthetic files are generated for every ingestor (document, code, archive
+and the text formats of the media agent) and pushed through the real
+:func:`common.ingest_file.ingest_file` pipeline into a temporary on-disk
+Chroma, using deterministic hashing embeddings instead of a model.
+
+For each format and size the report gives MB/s, chunks/s, peak RSS and the
+time spent per stage, collected from the ``ingest.*`` spans::
+
+    python -m tests.benchmarks.ingestion_throughput
+    python -m tests.benchmarks.ingestion_throughput --formats pdf,py,zip --sizes-kb 64,1024 --repeat 5
+
+Formats whose loader dependency is not installed (PyMuPDF, unstructured)
+are reported with ``status`` ``"error"`` instead of aborting the run.
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import zipfile
+from collections import defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+ROOT = Path(__file__).resolve().parents[2]
+for candidate in (ROOT, ROOT / "app"):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from tests.benchmarks.chat_throughput import HashingEmbeddings  # noqa: E402
+
+# Reported stage -> spans emitted by the ingestion pipeline.
+STAGES: Mapping[str, Tuple[str, ...]] = {
+    "scan": ("ingest.security_scan", "ingest.duplicate_check"),
+    "load": ("ingest.load",),
+    "split": ("ingest.chunking",),
+    "normalise": ("ingest.normalize",),
+    "embed": ("ingest.embed",),
+    "upsert": ("ingest.chroma_add", "ingest.secondary_indexes"),
+}
+
+_WORDS = (
+    "documento", "conversión", "archivo", "sistema", "usuario", "proceso", "datos", "índice",
+    "document", "conversion", "file", "system", "user", "process", "data", "index", "report",
+    "latencia", "memoria", "colección", "embedding", "chunk", "metadatos", "política", "contrato",
+)
+
+
+def _sentence(rng: random.Random, words: int = 14) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraphs(rng: random.Random, size: int) -> Iterator[str]:
+    produced = 0
+    while produced < size:
+        paragraph = " ".join(_sentence(rng) for _ in range(rng.randint(3, 6)))
+        produced += len(paragraph) + 2
+        yield paragraph
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+    return "\n\n".join(_paragraphs(rng, size)).encode("utf-8")
+
+
+def _markdown(rng: random.Random, size: int) -> bytes:
+    blocks = []
+    for index, paragraph in enumerate(_paragraphs(rng, size)):
+        if index % 4 == 0:
+            blocks.append(f"## Sección {index // 4 + 1}")
+        blocks.append(paragraph if index % 3 else f"- {paragraph}")
+    return "\n\n".join(blocks).encode("utf-8")
+
+
+def _html(rng: random.Random, size: int) -> bytes:
+    body = "\n".join(f"<h2>Sección {i}</h2><p>{escape(p)}</p>" for i, p in enumerate(_paragraphs(rng, size)))
+    return f"<!DOCTYPE html><html><head><meta charset=\"utf-8\"></head><body>{body}</body></html>".encode("utf-8")
+
+
+def _csv(rng: random.Random, size: int) -> bytes:
+    rows = ["id,cliente,importe,descripcion"]
+    produced = 0
+    while produced < size:
+        row = f"{len(rows)},{rng.choice(_WORDS)},{rng.randint(1, 9999)}.{rng.randint(0, 99):02d},{_sentence(rng, 8)}"
+        rows.append(row)
+        produced += len(row) + 1
+    return "\n".join(rows).encode("utf-8")
+
+
+def _python(rng: random.Random, size: int) -> bytes:
+    blocks = []
+    produced = 0
+    while produced < size:
+        index = len(blocks)
+        block = (
+            f"class Handler{index}:\n"
+            f'    """{_sentence(rng)}"""\n\n'
+            f"    def process_{index}(self, items):\n"
+            f"        total = 0\n"
+            f"        for item in items:\n"
+            f"            if item > {rng.randint(1, 99)}:\n"
+            f"                total += item * {rng.randint(2, 9)}\n"
+            f"        return total\n\n\n"
+            f"def helper_{index}(value):\n"
+            f"    # {_sentence(rng, 8)}\n"
+            f"    return Handler{index}().process_{index}([value] * {rng.randint(1, 5)})\n"
+        )
+        blocks.append(block)
+        produced += len(block) + 2
+    return "\n\n".join(blocks).encode("utf-8")
+
+
+def _javascript(rng: random.Random, size: int) -> bytes:
+    blocks = []
+    produced = 0
+    while produced < size:
+        index = len(blocks)
+        block = (
+            f"// {_sentence(rng, 8)}\n"
+            f"function transform{index}(items) {{\n"
+            f"  return items.filter((item) => item > {rng.randint(1, 99)}).map((item) => item * {rng.randint(2, 9)});\n"
+            f"}}\n"
+        )
+        blocks.append(block)
+        produced += len(block) + 2
+    return "\n\n".join(blocks).encode("utf-8")
+
+
+def _cues(rng: random.Random, size: int, *, vtt: bool) -> bytes:
+    separator = "." if vtt else ","
+    lines = ["WEBVTT", ""] if vtt else []
+    produced = 0
+    index = 0
+    while produced < size:
+        start, end = index * 3, index * 3 + 2
+        cue = [
+            str(index + 1),
+            f"00:{start // 60:02d}:{start % 60:02d}{separator}000 --> 00:{end // 60:02d}:{end % 60:02d}{separator}500",
+            _sentence(rng, 10),
+            "",
+        ]
+        lines.extend(cue)
+        produced += sum(len(line) + 1 for line in cue)
+        index += 1
+    return "\n".join(lines).encode("utf-8")
+
+
+def _pdf(rng: random.Random, size: int) -> bytes:
+    """Build a text-only PDF (Helvetica, one content stream per page)."""
+
+    lines = [_sentence(rng, 10) for _ in range(max(size // 80, 1))]
+    pages = [lines[start:start + 50] for start in range(0, len(lines), 50)]
+    objects: List[bytes] = []
+    page_ids = [4 + 2 * index for index in range(len(pages))]
+    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects.append(f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode("ascii"))
+    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    for page_id, page_lines in zip(page_ids, pages):
+        text = "".join(
+            "({}) Tj T*\n".format(
+                line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            )
+            for line in page_lines
+        )
+        stream = f"BT /F1 9 Tf 12 TL 40 800 Td\n{text}ET".encode("cp1252", errors="replace")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> "
+            f"/Contents {page_id + 1} 0 R >>".encode("ascii")
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    output = io.BytesIO()
+    output.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(output.tell())
+        output.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+    xref = output.tell()
+    output.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    for offset in offsets:
+        output.write(b"%010d 00000 n \n" % offset)
+    output.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return output.getvalue()
+
+
+def _docx(rng: random.Random, size: int) -> bytes:
+    """Build a minimal WordprocessingML package."""
+
+    paragraphs = "".join(
+        f"<w:p><w:r><w:t>{escape(paragraph)}</w:t></w:r></w:p>" for paragraph in _paragraphs(rng, size)
+    )
+    namespace = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    output = io.BytesIO()
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr(
+            "[Content_Types].xml",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/word/document.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+            "</Types>",
+        )
+        package.writestr(
+            "_rels/.rels",
+            '<?xml version="1.0" encoding="UTF-8"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="word/document.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+            "</Relationships>",
+        )
+        package.writestr(
+            "word/document.xml",
+            f'<?xml version="1.0" encoding="UTF-8"?><w:document xmlns:w="{namespace}"><w:body>{paragraphs}</w:body></w:document>',
+        )
+    return output.getvalue()
+
+
+def _zip(rng: random.Random, size: int) -> bytes:
+    """Archive mixing Markdown, Python and plain text members."""
+
+    output = io.BytesIO()
+    members = (("docs/guia-{}.md", _markdown), ("src/modulo_{}.py", _python), ("notas/nota-{}.txt", _text))
+    share = max(size // 6, 1)
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index in range(6):
+            pattern, generator = members[index % len(members)]
+            archive.writestr(pattern.format(index), generator(rng, share))
+    return output.getvalue()
+
+
+# extension -> (owning agent, generator). Sizes refer to the uncompressed text.
+GENERATORS: Mapping[str, Tuple[str, Callable[[random.Random, int], bytes]]] = {
+    "txt": ("document_agent", _text),
+    "md": ("document_agent", _markdown),
+    "html": ("document_agent", _html),
+    "csv": ("document_agent", _csv),
+    "pdf": ("document_agent", _pdf),
+    "docx": ("document_agent", _docx),
+    "py": ("code_agent", _python),
+    "js": ("code_agent", _javascript),
+    "zip": ("archive_agent", _zip),
+    "srt": ("media_agent", lambda rng, size: _cues(rng, size, vtt=False)),
+    "vtt": ("media_agent", lambda rng, size: _cues(rng, size, vtt=True)),
+}
+
+
+def generate_file(extension: str, size_bytes: int, seed: int) -> bytes:
+    """Return synthetic content of roughly *size_bytes* for *extension*."""
+
+    _, generator = GENERATORS[extension]
+    return generator(random.Random(seed), size_bytes)
+
+
+class _UploadedFile(io.BytesIO):
+    """Stand-in for Streamlit's ``UploadedFile``."""
+
+    def __init__(self, name: str, payload: bytes) -> None:
+        super().__init__(payload)
+        self.name = name
+        self.size = len(payload)
+
+
+class _StageCollector:
+    """Span exporter that sums span durations per benchmark stage."""
+
+    def __init__(self) -> None:
+        self._lookup = {span_name: stage for stage, names in STAGES.items() for span_name in names}
+        self.totals: Dict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def export(self, spans) -> None:
+        with self._lock:
+            for item in spans:
+                stage = self._lookup.get(item.name)
+                if stage is not None:
+                    self.totals[stage] += item.duration_seconds
+
+    def take(self) -> Dict[str, float]:
+        with self._lock:
+            totals = dict(self.totals)
+            self.totals.clear()
+        return totals
+
+
+class _PeakRSS:
+    """Sample the resident set size on a background thread while active."""
+
+    def __init__(self, interval: float = 0.005) -> None:
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def current() -> int:
+        try:
+            with open("/proc/self/statm", "rb") as handle:
+                return int(handle.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, ValueError, IndexError):
+            # ru_maxrss is the process high-water mark (KiB on Linux, bytes on macOS).
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self.current())
+            self._stop.wait(self.interval)
+
+    def __enter__(self) -> "_PeakRSS":
+        self.peak = self.current()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.peak = max(self.peak, self.current())
+
+
+@contextmanager
+def _local_pipeline(workdir: Path, collector: _StageCollector, embedding_dimension: int) -> Iterator[Callable]:
+    """Point the ingestion pipeline at a temporary Chroma and a stub embedder."""
+
+    import chromadb
+
+    from common import collection_router, embeddings_manager, ingest_file as ingest_module, lexical_index
+    from common import local_vector_cache, tracing
+
+    embeddings = HashingEmbeddings(embedding_dimension)
+    previous_client = ingest_module.CHROMA_CLIENT
+    ingest_module.CHROMA_CLIENT = chromadb.PersistentClient(path=str(workdir / "chroma"))
+    embeddings_manager.configure_default_manager(
+        embeddings_manager.EmbeddingsManager(embedding_factory=lambda *, model_name: embeddings)
+    )
+    lexical_index.configure_default_registry(lexical_index.LexicalIndexRegistry(workdir / "lexical"))
+    collection_router.configure_default_router(collection_router.CollectionRouter(persist=False))
+    local_vector_cache.configure_default_cache(None)
+    tracing.configure_default_tracer(tracing.Tracer(exporter=collector))
+    try:
+        yield ingest_module.ingest_file
+    finally:
+        ingest_module.CHROMA_CLIENT = previous_client
+        embeddings_manager.configure_default_manager(None)
+        lexical_index.get_lexical_registry().close()
+        lexical_index.configure_default_registry(None)
+        collection_router.configure_default_router(None)
+        local_vector_cache.configure_default_cache(None)
+        tracing.configure_default_tracer(None)
+
+
+def run_benchmark(
+    formats: Sequence[str],
+    sizes_kb: Sequence[int],
+    *,
+    repeat: int = 3,
+    embedding_dimension: int = 256,
+    seed: int = 11,
+) -> Dict[str, object]:
+    """Ingest every format/size combination *repeat* times and return the report."""
+
+    collector = _StageCollector()
+    cases: List[Dict[str, object]] = []
+    with tempfile.TemporaryDirectory(prefix="anclora-ingest-bench-") as tmp:
+        with _local_pipeline(Path(tmp), collector, embedding_dimension) as ingest:
+            for extension in formats:
+                agent, _ = GENERATORS[extension]
+                for size_kb in sizes_kb:
+                    total_bytes = 0
+                    total_chunks = 0
+                    elapsed = 0.0
+                    error: Optional[str] = None
+                    with _PeakRSS() as rss:
+                        for run in range(max(repeat, 1)):
+                            # A different seed per run keeps the duplicate check from short-circuiting.
+                            payload = generate_file(extension, size_kb * 1024, seed + run * 7919 + size_kb)
+                            name = f"bench-{size_kb}k-{run}.{extension}"
+                            started = time.perf_counter()
+                            result = ingest(_UploadedFile(name, payload), name)
+                            elapsed += time.perf_counter() - started
+                            if not result.get("success"):
+                                error = str(result.get("error"))
+                                break
+                            total_bytes += len(payload)
+                            total_chunks += int(result.get("summary", {}).get("chunk_count", 0))
+                    stages = collector.take()
+                    runs = max(repeat, 1) if error is None else 1
+                    case: Dict[str, object] = {
+                        "agent": agent,
+                        "format": extension,
+                        "size_kb": size_kb,
+                        "status": "ok" if error is None else "error",
+                        "peak_rss_mb": round(rss.peak / (1024 * 1024), 1),
+                    }
+                    if error is not None:
+                        case["error"] = error
+                    else:
+                        case.update(
+                            {
+                                "runs": runs,
+                                "bytes": total_bytes,
+                                "chunks": total_chunks,
+                                "seconds": round(elapsed, 4),
+                                "mb_per_s": round(total_bytes / (1024 * 1024) / elapsed, 3) if elapsed else 0.0,
+                                "chunks_per_s": round(total_chunks / elapsed, 1) if elapsed else 0.0,
+                                "stages_ms": {
+                                    stage: round(stages.get(stage, 0.0) * 1000 / runs, 2) for stage in STAGES
+                                },
+                            }
+                        )
+                    cases.append(case)
+
+    return {
+        "benchmark": "ingestion_throughput",
+        "config": {
+            "formats": list(formats),
+            "sizes_kb": list(sizes_kb),
+            "repeat": repeat,
+            "embedding_dimension": embedding_dimension,
+            "seed": seed,
+        },
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "cases": cases,
+    }
+
+
+def format_table(report: Mapping[str, object]) -> str:
+    """Render the per-case results as a fixed-width table."""
+
+    header = f"{'agente':<15}{'formato':<8}{'KB':>6}{'MB/s':>9}{'chunks/s':>10}{'RSS MB':>8}  " + "".join(
+        f"{stage:>10}" for stage in STAGES
+    )
+    rows = [header, "-" * len(header)]
+    for case in report["cases"]:  # type: ignore[index]
+        prefix = f"{case['agent']:<15}{case['format']:<8}{case['size_kb']:>6}"
+        if case["status"] != "ok":
+            rows.append(f"{prefix}  error: {str(case.get('error'))[:70]}")
+            continue
+        stages = case["stages_ms"]
+        rows.append(
+            f"{prefix}{case['mb_per_s']:>9.3f}{case['chunks_per_s']:>10.1f}{case['peak_rss_mb']:>8.1f}  "
+            + "".join(f"{stages[stage]:>10.1f}" for stage in STAGES)
+        )
+    rows.append("(etapas en ms por archivo)")
+    return "\n".join(rows)
+
+
+def _csv_list(value: str) -> List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ingest_file throughput per format and size.")
+    parser.add_argument("--formats", type=_csv_list, default=list(GENERATORS))
+    parser.add_argument("--sizes-kb", type=lambda value: [int(item) for item in _csv_list(value)], default=[16, 256, 1024])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--embedding-dimension", type=int, default=256)
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument("--output", type=Path, help="Write the JSON report to this file.")
+    args = parser.parse_args(argv)
+
+    unknown = sorted(set(args.formats) - set(GENERATORS))
+    if unknown:
+        parser.error(f"formatos desconocidos: {', '.join(unknown)}")
+
+    # Per-file logs would dominate the measurement; failures are part of the report.
+    logging.disable(logging.ERROR)
+    report = run_benchmark(
+        args.formats,
+        args.sizes_kb,
+        repeat=args.repeat,
+        embedding_dimension=args.embedding_dimension,
+        seed=args.seed,
+    )
+    print(format_table(report))
+    if args.output is not None:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""Smoke tests for the ``/chat`` throughput benchmark harness."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks.chat_throughput import ROOT, compare_to_baseline, percentile
+from tests.benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+
+def test_fake_ollama_streams_configured_tokens() -> None:
+    config = FakeOllamaConfig(tokens_per_second=1000, first_token_delay=0, response_tokens=3)
+    with FakeOllamaServer(config) as server:
+        request = urllib.request.Request(
+            f"{server.url}/api/generate",
+            data=json.dumps({"model": "benchmark", "prompt": "hola"}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=5) as reply:
+            chunks = [json.loads(line) for line in reply.read().decode("utf-8").splitlines()]
+
+        assert server.requests == 1
+        assert server.last_prompt == "hola"
+    assert "".join(chunk["response"] for chunk in chunks) == "tok0 tok1 tok2 "
+    assert [chunk["done"] for chunk in chunks] == [False, False, False, True]
+
+
+def test_compare_to_baseline_flags_only_regressions_beyond_tolerance() -> None:
+    baseline = {"metrics": {"qps": 10.0, "latency_p95_ms": 100.0, "ttft_p50_ms": 20.0, "error_rate": 0.0}}
+    report = {"metrics": {"qps": 9.0, "latency_p95_ms": 150.0, "ttft_p50_ms": 10.0, "error_rate": 0.0}}
+
+    regressions = compare_to_baseline(report, baseline, tolerance=0.2)
+
+    assert len(regressions) == 1
+    assert regressions[0].startswith("latency_p95_ms")
+    assert percentile([1.0, 2.0, 3.0, 4.0], 0.5) == pytest.approx(2.5)
+
+
+def test_tiny_end_to_end_run_reports_latency_and_ttft(tmp_path: Path) -> None:
+    pytest.importorskip("chromadb")
+    pytest.importorskip("uvicorn")
+    pytest.importorskip("httpx")
+
+    # The root conftest stubs LangChain, so run the real pipeline in a fresh interpreter.
+    report_path = tmp_path / "report.json"
+    arguments = {
+        "collections": 2,
+        "documents-per-collection": 20,
+        "requests": 4,
+        "concurrency": 2,
+        "warmup-requests": 0,
+        "tokens-per-second": 2000,
+        "first-token-delay": 0,
+        "response-tokens": 4,
+    }
+    command = [sys.executable, "-m", "tests.benchmarks.chat_throughput", "--output", str(report_path)]
+    for name, value in arguments.items():
+        command.extend([f"--{name}", str(value)])
+    env = {key: value for key, value in os.environ.items() if key != "PYTEST_CURRENT_TEST"}
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    metrics = json.loads(report_path.read_text(encoding="utf-8"))["metrics"]
+    assert metrics["errors"] == 0
+    assert metrics["llm_calls"] == 4
+    assert metrics["qps"] > 0
+    assert metrics["ttft_samples"] == 4
+    assert 0 < metrics["ttft_p50_ms"] <= metrics["latency_p99_ms"]
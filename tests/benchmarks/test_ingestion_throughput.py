@@ -0,0 +1,62 @@
+"""Smoke tests for the ingestion throughput benchmark harness."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import subprocess
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from tests.benchmarks.ingestion_throughput import GENERATORS, ROOT, STAGES, generate_file
+
+
+@pytest.mark.parametrize("extension", sorted(GENERATORS))
+def test_generators_are_deterministic_and_sized(extension: str) -> None:
+    first = generate_file(extension, 8 * 1024, seed=3)
+
+    assert first == generate_file(extension, 8 * 1024, seed=3)
+    assert first != generate_file(extension, 8 * 1024, seed=4)
+    if extension not in {"zip", "docx"}:
+        assert len(first) >= 8 * 1024
+
+
+def test_binary_containers_are_well_formed() -> None:
+    with zipfile.ZipFile(io.BytesIO(generate_file("docx", 4096, seed=1))) as package:
+        assert b"<w:t>" in package.read("word/document.xml")
+    with zipfile.ZipFile(io.BytesIO(generate_file("zip", 4096, seed=1))) as archive:
+        assert {Path(name).suffix for name in archive.namelist()} == {".md", ".py", ".txt"}
+
+    pdf = generate_file("pdf", 4096, seed=1)
+    assert pdf.startswith(b"%PDF-1.4") and pdf.rstrip().endswith(b"%%EOF")
+    startxref = int(pdf.rsplit(b"startxref", 1)[1].split()[0])
+    assert pdf[startxref:].startswith(b"xref")
+
+
+def test_text_formats_run_through_the_real_pipeline(tmp_path: Path) -> None:
+    pytest.importorskip("chromadb")
+
+    # The root conftest stubs LangChain, so run the real pipeline in a fresh interpreter.
+    report_path = tmp_path / "report.json"
+    command = [
+        sys.executable, "-m", "tests.benchmarks.ingestion_throughput",
+        "--formats", "txt,py,srt", "--sizes-kb", "8", "--repeat", "1", "--output", str(report_path),
+    ]
+    env = {key: value for key, value in os.environ.items() if key != "PYTEST_CURRENT_TEST"}
+    completed = subprocess.run(command, cwd=ROOT, env=env, capture_output=True, text=True, timeout=300)
+    assert completed.returncode == 0, completed.stderr[-2000:]
+
+    cases = json.loads(report_path.read_text(encoding="utf-8"))["cases"]
+    assert [(case["agent"], case["status"]) for case in cases] == [
+        ("document_agent", "ok"),
+        ("code_agent", "ok"),
+        ("media_agent", "ok"),
+    ]
+    for case in cases:
+        assert case["chunks"] > 0 and case["mb_per_s"] > 0 and case["peak_rss_mb"] > 0
+        assert set(case["stages_ms"]) == set(STAGES)
+        assert case["stages_ms"]["embed"] > 0 and case["stages_ms"]["upsert"] > 0
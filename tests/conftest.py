@@ -1,6 +1,8 @@
 """Test configuration helpers."""
 
+import os
 import sys
+import tempfile
 import types
 import typing
 from pathlib import Path
@@ -182,6 +184,24 @@ def _install_langchain_stubs() -> None:
     _install_stubbed_dependencies()
 
 
+def _install_analytics_package() -> None:
+    """Import ``app/analytics`` before ``common.constants`` claims the name.
+
+    ``common.constants`` registers a telemetry stub as ``analytics`` unless
+    the name is already taken, which would hide the package that
+    ``optimization.auto_optimizer`` imports from.
+    """
+
+    try:  # pragma: no cover - prefer the real package
+        import analytics.predictive_analyzer  # type: ignore  # noqa: F401
+    except Exception:  # pragma: no cover - stub path
+        _install_stub_submodule(
+            "analytics.predictive_analyzer",
+            PredictiveAnalyzer=type("PredictiveAnalyzer", (), {}),
+            PredictiveInsight=type("PredictiveInsight", (), {}),
+        )
+
+
 def _install_common_stubs() -> None:
     """Provide lightweight fallbacks for optional ``common`` modules."""
 
@@ -228,11 +248,27 @@ def _install_common_stubs() -> None:
         def _delete_file_from_vectordb(filename: str) -> None:
             return None
 
+        def _delete_file_version(file_name: str, file_hash: str) -> int:
+            return 0
+
+        def _rename_file_version(old_name: str, new_name: str, file_hash: str, metadata: object = None) -> int:
+            return 0
+
+        def _does_vectorstore_exist(settings: object, collection_name: str) -> bool:
+            return False
+
+        def _get_embeddings(domain: object = None) -> None:
+            return None
+
         _install_stub_submodule(
             "common.ingest_file",
             ingest_file=_ingest_file,
             validate_uploaded_file=_validate_uploaded_file,
             delete_file_from_vectordb=_delete_file_from_vectordb,
+            delete_file_version=_delete_file_version,
+            rename_file_version=_rename_file_version,
+            does_vectorstore_exist=_does_vectorstore_exist,
+            get_embeddings=_get_embeddings,
         )
 
 
@@ -259,9 +295,22 @@ def _install_langdetect_stub() -> None:
         )
 
 
+def _isolate_local_indexes() -> None:
+    """Keep index, cache and job files written during the tests out of the repository."""
+
+    scratch_dir = Path(tempfile.mkdtemp(prefix="anclora-indexes-"))
+    os.environ.setdefault("LEXICAL_INDEX_DIR", str(scratch_dir / "lexical"))
+    os.environ.setdefault("COLLECTION_ROUTER_PATH", str(scratch_dir / "centroids.sqlite3"))
+    os.environ.setdefault("SPEED_CACHE_DIR", str(scratch_dir / "cache"))
+    os.environ.setdefault("FAST_PATH_STORE_PATH", str(scratch_dir / "fast_path_patterns.sqlite3"))
+    os.environ.setdefault("CONVERSION_JOB_STORE_PATH", str(scratch_dir / "conversion_jobs.sqlite3"))
+
+
 _patch_forward_ref_evaluate()
 _ensure_project_root_on_path()
 _ensure_app_dir_on_path()
 _install_langchain_stubs()
+_install_analytics_package()
 _install_common_stubs()
 _install_langdetect_stub()
+_isolate_local_indexes()
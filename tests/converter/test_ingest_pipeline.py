@@ -10,7 +10,12 @@ import types
 
 import pytest
 
-from app.common.text_normalization import Document, NORMALIZATION_FORM
+from app.common.text_normalization import (
+    Document,
+    NORMALIZATION_FORM,
+    PROVENANCE_KEYS,
+    restore_original_content,
+)
 
 FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
 
@@ -436,15 +441,17 @@ def test_process_file_pipeline_preserves_metadata(
     assert accent_doc.metadata["source"].endswith(uploaded.name)
     assert accent_doc.metadata["chunk_index"] == accent_chunk_index
     assert accent_doc.metadata["normalization"] == NORMALIZATION_FORM
-    assert "original_page_content" in accent_doc.metadata
-    assert "\u0301" in accent_doc.metadata["original_page_content"]
+    assert "\u0301" in restore_original_content(accent_doc.page_content, accent_doc.metadata)
     assert any(
         normalized in accent_doc.page_content
         for normalized in ("acción", "café", "preventiva")
     )
 
     for doc in documents:
-        assert "original_page_content" in doc.metadata
+        original = restore_original_content(doc.page_content, doc.metadata)
+        # Provenance is only stored for chunks that normalisation changed.
+        stored = any(key in doc.metadata for key in PROVENANCE_KEYS)
+        assert stored == (original != doc.page_content)
         assert doc.metadata["normalization"] == NORMALIZATION_FORM
         assert doc.metadata["source"].endswith(uploaded.name)
 
@@ -489,7 +496,7 @@ def test_ingest_file_adds_documents_with_metadata(ingest_env: SimpleNamespace) -
     assert ingested_docs, "No se agregaron documentos a la colección"
 
     accent_doc = next(
-        doc for doc in ingested_docs if "\u0301" in doc.metadata["original_page_content"]
+        doc for doc in ingested_docs if "\u0301" in restore_original_content(doc.page_content, doc.metadata)
     )
     assert "café" in accent_doc.page_content
     assert all(doc.metadata["normalization"] == NORMALIZATION_FORM for doc in ingested_docs)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import asyncio
+import os
+
+from app.ingestion import advanced_ingestion_system as module
+from app.ingestion import folder_sync
+from app.ingestion.advanced_ingestion_system import AdvancedIngestionSystem, IngestionStatus
+from app.ingestion.folder_sync import FolderManifest, diff_folder, file_sha256
+
+
+def _write(path, text: str, mtime_ns: int | None = None) -> str:
+    path.write_text(text, encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+    return str(path)
+
+
+def _manifest_with(manifest: FolderManifest, *paths) -> None:
+    for path in paths:
+        stat = os.stat(path)
+        manifest.record(path.name, stat.st_size, stat.st_mtime_ns, file_sha256(path))
+
+
+def test_diff_skips_unchanged_files_without_hashing(tmp_path, monkeypatch) -> None:
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    kept, touched, edited, gone = (folder / name for name in ("a.txt", "b.txt", "c.txt", "d.txt"))
+    for path in (kept, touched, edited, gone):
+        _write(path, f"texto {path.name}", 1_000_000_000)
+    manifest = FolderManifest(folder, tmp_path / "manifests")
+    _manifest_with(manifest, kept, touched, edited, gone)
+
+    _write(touched, "texto b.txt", 2_000_000_000)
+    _write(edited, "texto nuevo", 2_000_000_000)
+    gone.unlink()
+    new = _write(folder / "e.txt", "otro")
+
+    hashed: list = []
+    monkeypatch.setattr(
+        folder_sync, "file_sha256", lambda path: hashed.append(os.path.basename(path)) or file_sha256(path)
+    )
+    changes = diff_folder(manifest, [str(kept), str(touched), str(edited), new])
+
+    assert changes.added == ["e.txt"]
+    assert changes.modified == ["c.txt"]
+    assert changes.deleted == ["d.txt"]
+    assert (changes.unchanged, changes.touched) == (1, 1)
+    assert sorted(hashed) == ["b.txt", "c.txt"]
+    assert manifest.files["b.txt"]["mtime_ns"] == 2_000_000_000
+
+    manifest.save()
+    assert FolderManifest(folder, tmp_path / "manifests").files == manifest.files
+
+
+def test_sync_folder_ingests_changes_and_retracts_old_versions(tmp_path, monkeypatch) -> None:
+    folder = tmp_path / "docs"
+    folder.mkdir()
+    _write(folder / "a.txt", "uno")
+    _write(folder / "b.txt", "dos")
+    _write(folder / "c.txt", "tres")
+
+    processed: list = []
+    deleted: list = []
+
+    async def _process(file_path, metadata):
+        processed.append(os.path.basename(file_path))
+        if os.path.basename(file_path) == "c.txt":
+            return {"file_name": "c.txt", "success": False, "error": module._DUPLICATE_ERROR}
+        return {"file_name": os.path.basename(file_path), "success": True}
+
+    system = AdvancedIngestionSystem()
+    system.folder_manifest_dir = str(tmp_path / "manifests")
+    system.file_processor.process_file_path = _process  # type: ignore[method-assign]
+    monkeypatch.setattr(module, "delete_file_version", lambda name, sha: deleted.append((name, sha)) or 2)
+
+    first = asyncio.run(system.sync_folder(str(folder), "tester"))
+    assert first.status == IngestionStatus.COMPLETED
+    assert sorted(processed) == ["a.txt", "b.txt", "c.txt"]
+    assert (first.processed_files, first.skipped_files) == (2, 1)
+
+    old_b = file_sha256(folder / "b.txt")
+    old_c = file_sha256(folder / "c.txt")
+    processed.clear()
+    _write(folder / "b.txt", "dos, revisado")
+    (folder / "c.txt").unlink()
+
+    second = asyncio.run(system.sync_folder(str(folder), "tester"))
+    assert second.status == IngestionStatus.COMPLETED
+    assert processed == ["b.txt"]
+    assert second.metadata["sync"] == {
+        "added": 0,
+        "modified": 1,
+        "deleted": 1,
+        "unchanged": 1,
+        "renamed": 0,
+        "renamed_chunks": 0,
+        "removed_chunks": 4,
+    }
+    assert sorted(deleted) == [("b.txt", old_b), ("c.txt", old_c)]
+
+    processed.clear()
+    third = asyncio.run(system.sync_folder(str(folder), "tester"))
+    assert processed == [] and third.total_files == 0
+
+
+def test_sync_folder_moves_the_chunks_of_renamed_files(tmp_path, monkeypatch) -> None:
+    folder = tmp_path / "docs"
+    (folder / "sub").mkdir(parents=True)
+    _write(folder / "a.txt", "uno")
+    _write(folder / "b.md", "dos")
+    _write(folder / "c.txt", "tres")
+    _write(folder / "copia.txt", "tres")
+
+    processed: list = []
+    deleted: list = []
+    renamed: list = []
+
+    async def _process(file_path, metadata):
+        processed.append(os.path.basename(file_path))
+        return {"file_name": os.path.basename(file_path), "success": True}
+
+    def _rename(old_name, new_name, sha, metadata):
+        renamed.append((old_name, new_name))
+        # Another extension means another collection: nothing is renamed in place.
+        return 0 if os.path.splitext(old_name)[1] != os.path.splitext(new_name)[1] else 3
+
+    system = AdvancedIngestionSystem()
+    system.folder_manifest_dir = str(tmp_path / "manifests")
+    system.file_processor.process_file_path = _process  # type: ignore[method-assign]
+    monkeypatch.setattr(module, "delete_file_version", lambda name, sha: deleted.append(name) or 2)
+    monkeypatch.setattr(module, "rename_file_version", _rename)
+    asyncio.run(system.sync_folder(str(folder), "tester"))
+
+    processed.clear()
+    os.rename(folder / "a.txt", folder / "sub" / "a.txt")
+    os.rename(folder / "b.md", folder / "b.txt")
+    os.rename(folder / "c.txt", folder / "sub" / "c.txt")
+
+    job = asyncio.run(system.sync_folder(str(folder), "tester"))
+    assert job.status == IngestionStatus.COMPLETED
+    # c.txt's content survives as copia.txt, which keeps the chunks: plain duplicate ingestion.
+    assert sorted(renamed) == [("a.txt", os.path.join("sub", "a.txt")), ("b.md", "b.txt")]
+    assert sorted(processed) == ["b.txt", "c.txt"]
+    assert deleted == ["b.md"]
+    assert job.metadata["sync"]["renamed"] == 1 and job.metadata["sync"]["renamed_chunks"] == 3
+    assert job.total_files == 2
+
+    processed.clear()
+    third = asyncio.run(system.sync_folder(str(folder), "tester"))
+    assert processed == [] and third.total_files == 0
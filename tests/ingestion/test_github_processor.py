@@ -1,9 +1,18 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
+import os
+import subprocess
 from pathlib import Path
 
-from app.ingestion.github_processor import GitHubRepositoryProcessor, RepositoryOptions
+import pytest
+
+from app.ingestion.github_processor import (
+    GitHubRepositoryProcessor,
+    RepositoryOptions,
+    RepositorySyncState,
+)
 
 
 def test_github_processor_filters_repository(tmp_path: Path) -> None:
@@ -27,3 +36,209 @@ def test_github_processor_filters_repository(tmp_path: Path) -> None:
     assert "src/main.py" in relative_paths
     assert all(not path.startswith("node_modules/") for path in relative_paths)
     assert all(item["size"] <= 10 * 1024 * 1024 for item in files)
+
+
+def _git(cwd: Path, *args: str) -> str:
+    return subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.strip()
+
+
+def _commit(work: Path, message: str) -> str:
+    _git(work, "add", "-A")
+    _git(work, "commit", "-q", "-m", message)
+    _git(work, "push", "-q", "origin", "HEAD:main")
+    return _git(work, "rev-parse", "HEAD")
+
+
+@pytest.fixture
+def bare_repository(tmp_path: Path):
+    remote = tmp_path / "remote.git"
+    _git(tmp_path, "init", "-q", "--bare", "-b", "main", str(remote))
+    work = tmp_path / "work"
+    _git(tmp_path, "clone", "-q", str(remote), str(work))
+    _git(work, "checkout", "-q", "-b", "main")
+    (work / "README.md").write_text("Documentacion inicial")
+    (work / "docs").mkdir()
+    (work / "docs" / "guia.md").write_text("Guia de uso")
+    (work / "docs" / "viejo.md").write_text("Contenido obsoleto")
+    (work / "notas.txt").write_text("Notas que se renombran")
+    first = _commit(work, "inicial")
+    return remote, work, first
+
+
+def test_diff_commits_reports_changes_from_a_bare_clone(bare_repository) -> None:
+    remote, work, first = bare_repository
+    (work / "README.md").write_text("Documentacion actualizada")
+    (work / "docs" / "nuevo.md").write_text("Pagina nueva")
+    (work / "docs" / "viejo.md").unlink()
+    (work / "notas.txt").rename(work / "docs" / "notas.txt")
+    second = _commit(work, "cambios")
+
+    processor = GitHubRepositoryProcessor()
+    assert processor.resolve_commit(str(remote), "main") == second
+
+    changes = processor.diff_commits(str(remote), first, second)
+    assert not changes.full
+    assert changes.added == ["docs/nuevo.md"]
+    assert changes.modified == ["README.md"]
+    assert changes.deleted == ["docs/viejo.md"]
+    assert changes.renamed == [("notas.txt", "docs/notas.txt")]
+    assert sorted(changes.changed_paths) == ["README.md", "docs/notas.txt", "docs/nuevo.md"]
+
+    blob = processor.read_blob(str(remote), first, "docs/viejo.md")
+    assert blob is not None and blob[1] == b"Contenido obsoleto"
+    files = processor.list_commit_files(str(remote), second, RepositoryOptions())
+    assert set(files) == {"README.md", "docs/guia.md", "docs/nuevo.md", "docs/notas.txt"}
+
+    unknown = processor.diff_commits(str(remote), "0" * 40, second)
+    assert unknown.full and set(unknown.added) == set(files)
+
+
+def test_sync_state_is_kept_per_repository_and_branch(tmp_path: Path) -> None:
+    state = RepositorySyncState(tmp_path / "state.json")
+    state.set("https://github.com/org/repo.git", "main", "abc")
+    state.set("https://github.com/org/repo", "dev", "def")
+
+    reloaded = RepositorySyncState(tmp_path / "state.json")
+    assert reloaded.get("https://github.com/org/repo/", "main") == "abc"
+    assert reloaded.get("https://github.com/org/repo", "dev") == "def"
+    assert reloaded.get("https://github.com/org/repo", None) is None
+
+
+def test_incremental_sync_reprocesses_only_changed_files(bare_repository, tmp_path: Path, monkeypatch) -> None:
+    from app.ingestion import advanced_ingestion_system as module
+
+    remote, work, first = bare_repository
+    stored: dict = {}
+    deleted: list = []
+
+    async def _fake_process(file_obj, metadata):
+        digest = hashlib.sha256(file_obj.getvalue()).hexdigest()
+        if digest in stored:
+            return {"file_name": file_obj.name, "success": False, "error": "Archivo ya existe en la base de datos"}
+        stored[digest] = metadata["repo_relative_path"]
+        return {"file_name": file_obj.name, "success": True}
+
+    def _fake_delete(file_name, file_hash):
+        deleted.append(stored.pop(file_hash))
+        return 1
+
+    def _fake_rename(old_name, new_name, file_hash, metadata):
+        # Another extension means another collection: nothing is renamed in place.
+        if os.path.splitext(old_name)[1] != os.path.splitext(new_name)[1]:
+            return 0
+        assert stored[file_hash] == old_name and metadata["repo_relative_path"] == new_name
+        stored[file_hash] = new_name
+        return 3
+
+    system = module.AdvancedIngestionSystem()
+    system.repository_state = RepositorySyncState(tmp_path / "state.json")
+    monkeypatch.setattr(system.file_processor, "process_uploaded_file", _fake_process)
+    monkeypatch.setattr(module, "delete_file_version", _fake_delete)
+    monkeypatch.setattr(module, "rename_file_version", _fake_rename)
+
+    def _sync():
+        return asyncio.run(system.ingest_github_repository(str(remote), "tester", branch="main", incremental=True))
+
+    job = _sync()
+    assert job.metadata["sync"]["mode"] == "full"
+    assert job.processed_files == 4 and job.status.value == "completed"
+
+    assert _sync().metadata["sync"]["mode"] == "unchanged"
+
+    (work / "README.md").write_text("Documentacion actualizada")
+    (work / "docs" / "viejo.md").unlink()
+    (work / "notas.txt").rename(work / "docs" / "notas.txt")
+    (work / "docs" / "guia.md").rename(work / "docs" / "guia.txt")
+    second = _commit(work, "cambios")
+
+    job = _sync()
+    assert job.metadata["sync"]["mode"] == "incremental"
+    assert job.metadata["sync"]["to_commit"] == second
+    assert sorted(deleted) == ["README.md", "docs/guia.md", "docs/viejo.md"]
+    # notas.txt is renamed in place; guia.md changes collection, so it is retracted and re-ingested.
+    assert job.metadata["sync"]["renamed_chunks"] == 3
+    assert job.processed_files == 2 and job.skipped_files == 0 and job.failed_files == 0
+    assert sorted(stored.values()) == ["README.md", "docs/guia.txt", "docs/notas.txt"]
+    assert system.repository_state.get(str(remote), "main") == second
+
+
+def test_changes_to_unsupported_files_do_not_block_the_sync_cursor(
+    bare_repository, tmp_path: Path, monkeypatch
+) -> None:
+    from app.common import ingest_file as ingest_module
+    from app.ingestion import advanced_ingestion_system as module
+
+    remote, work, _ = bare_repository
+    stored: dict = {}
+
+    async def _fake_process(file_obj, metadata):
+        stored[hashlib.sha256(file_obj.getvalue()).hexdigest()] = metadata["repo_relative_path"]
+        return {"file_name": file_obj.name, "success": True}
+
+    def _fake_delete(file_name, file_hash):
+        # Mirrors the real helper: unknown extensions were never ingested.
+        if os.path.splitext(file_name)[1].lower() not in ingest_module.SUPPORTED_EXTENSIONS:
+            raise ValueError(f"Tipo de archivo no soportado: {file_name}")
+        return 1 if stored.pop(file_hash, None) else 0
+
+    system = module.AdvancedIngestionSystem()
+    system.repository_state = RepositorySyncState(tmp_path / "state.json")
+    monkeypatch.setattr(system.file_processor, "process_uploaded_file", _fake_process)
+    monkeypatch.setattr(module, "delete_file_version", _fake_delete)
+
+    def _sync():
+        return asyncio.run(system.ingest_github_repository(str(remote), "tester", branch="main", incremental=True))
+
+    (work / "LICENSE").write_text("MIT")
+    (work / "logo.png").write_bytes(b"\x89PNG")
+    _sync()
+
+    (work / "LICENSE").write_text("Apache-2.0")
+    (work / "logo.png").rename(work / "docs" / "logo.png")
+    (work / "README.md").write_text("Documentacion actualizada")
+    second = _commit(work, "licencia")
+
+    job = _sync()
+    assert job.status.value == "completed" and job.failed_files == 0
+    assert system.repository_state.get(str(remote), "main") == second
+    assert _sync().metadata["sync"]["mode"] == "unchanged"
+
+
+def test_walker_prunes_ignored_directories_and_returns_file_handles(tmp_path: Path, monkeypatch) -> None:
+    repo_dir = tmp_path / "repo"
+    (repo_dir / "docs").mkdir(parents=True)
+    (repo_dir / "docs" / "guia.md").write_text("Guia")
+    (repo_dir / "docs" / "debug.log").write_text("ignorado")
+    (repo_dir / "node_modules" / "pkg").mkdir(parents=True)
+    (repo_dir / "node_modules" / "pkg" / "index.js").write_text("skip")
+    outside = tmp_path / "secreto.txt"
+    outside.write_text("fuera del repositorio")
+    (repo_dir / "enlace.txt").symlink_to(outside)
+
+    scanned: list = []
+    real_scandir = os.scandir
+
+    def _tracking_scandir(path):
+        scanned.append(Path(path).name)
+        return real_scandir(path)
+
+    monkeypatch.setattr(os, "scandir", _tracking_scandir)
+    processor = GitHubRepositoryProcessor()
+    files = list(processor.iter_repository_files(str(repo_dir), RepositoryOptions(include_other=True)))
+
+    assert [item["relative_path"] for item in files] == ["docs/guia.md"]
+    assert "node_modules" not in scanned and "pkg" not in scanned
+
+    handle = processor.wrap_file(files[0]["path"], files[0]["size"])
+    assert handle.name == "guia.md" and handle.size == 4
+    with handle:
+        assert handle.read(2) == b"Gu"
+        assert handle.getvalue() == b"Guia"
+        handle.seek(0)
+        assert handle.read() == b"Guia"
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+import io
+
+from app.ingestion.advanced_ingestion_system import AdvancedIngestionSystem, IngestionStatus
+from app.ingestion.config import IngestionConfig
+
+
+def _uploads(count: int) -> list:
+    files = []
+    for index in range(count):
+        buffer = io.BytesIO(f"contenido {index}".encode("utf-8"))
+        buffer.name = f"doc_{index}.txt"  # type: ignore[attr-defined]
+        files.append(buffer)
+    return files
+
+
+def _system(max_concurrency: int, process) -> AdvancedIngestionSystem:
+    system = AdvancedIngestionSystem(config=IngestionConfig(max_concurrency=max_concurrency))
+    system.file_processor.process_uploaded_file = process  # type: ignore[method-assign]
+    return system
+
+
+def test_ingest_files_runs_a_bounded_number_of_files_at_once() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def _process(file_obj, metadata):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return {"file_name": file_obj.name, "success": True}
+
+    system = _system(3, _process)
+    job = asyncio.run(system.ingest_files(_uploads(10), "tester"))
+
+    assert peak == 3
+    assert job.processed_files == 10 and job.handled_files == 10
+    assert job.progress == 1.0
+    assert job.status == IngestionStatus.COMPLETED
+
+
+def test_cancel_job_stops_scheduling_new_files() -> None:
+    system: AdvancedIngestionSystem
+
+    async def _process(file_obj, metadata):
+        await asyncio.sleep(0.01)
+        job = next(iter(system.active_jobs.values()))
+        if job.processed_files == 1:
+            await system.cancel_job(job.job_id)
+        return {"file_name": file_obj.name, "success": True}
+
+    system = _system(2, _process)
+    job = asyncio.run(system.ingest_files(_uploads(20), "tester"))
+
+    assert job.cancel_requested
+    assert job.status == IngestionStatus.FAILED
+    assert job.handled_files < 20
+    assert {"general": "Cancelado por el usuario"} in job.errors
@@ -0,0 +1,143 @@
+"""Tests for centroid-based collection routing in ``app.common.collection_router``."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import threading
+
+import pytest
+
+from app.common.collection_router import CollectionRouter, rebuild_collection_centroid
+
+
+def _router(tmp_path: Path, **kwargs) -> CollectionRouter:
+    return CollectionRouter(tmp_path / "centroids.sqlite3", **kwargs)
+
+
+def test_centroid_is_updated_incrementally(tmp_path: Path) -> None:
+    router = _router(tmp_path)
+    router.add_vectors("format_specs", [[1.0, 0.0], [0.0, 1.0]])
+    router.add_vectors("format_specs", [[1.0, 1.0]])
+
+    assert router.centroid("format_specs") == pytest.approx([2 / 3, 2 / 3])
+
+    router.remove_vectors("format_specs", [[1.0, 1.0]])
+    assert router.centroid("format_specs") == pytest.approx([0.5, 0.5])
+
+    router.remove_vectors("format_specs", [[1.0, 0.0], [0.0, 1.0]])
+    assert router.centroid("format_specs") is None
+
+
+def test_centroids_are_shared_through_the_persisted_store(tmp_path: Path) -> None:
+    writer = _router(tmp_path)
+    reader = _router(tmp_path)
+
+    writer.add_vectors("troubleshooting", [[0.0, 2.0]])
+
+    assert reader.known_collections() == ("troubleshooting",)
+    assert reader.centroid("troubleshooting") == pytest.approx([0.0, 2.0])
+
+
+def test_route_keeps_top_m_and_unknown_collections(tmp_path: Path) -> None:
+    router = _router(tmp_path, top_m=2, min_similarity=0.5)
+    router.add_vectors("legal_documents", [[1.0, 0.0, 0.0]])
+    router.add_vectors("format_specs", [[0.0, 1.0, 0.0]])
+    router.add_vectors("troubleshooting", [[0.9, 0.1, 0.0]])
+    router.add_vectors("multimedia_assets", [[0.0, 0.0, 1.0]])
+
+    candidates = [
+        "format_specs",
+        "legal_documents",
+        "multimedia_assets",
+        "business_docs",
+        "troubleshooting",
+    ]
+    query = [1.0, 0.05, 0.0]
+    decision = router.route({name: query for name in candidates}, candidates)
+
+    assert decision.reason == "routed"
+    assert decision.selected == ("legal_documents", "business_docs", "troubleshooting")
+    assert decision.skipped == ("format_specs", "multimedia_assets")
+    assert decision.routed is True
+
+
+def test_route_falls_back_to_full_fan_out(tmp_path: Path) -> None:
+    router = _router(tmp_path, top_m=1, min_similarity=0.9)
+    candidates = ["a", "b", "c"]
+
+    assert router.route({}, candidates).reason == "no_centroids"
+
+    router.add_vectors("a", [[1.0, 0.0]])
+    assert router.route({"a": [1.0, 0.0]}, candidates).reason == "few_candidates"
+
+    router.add_vectors("b", [[0.0, 1.0]])
+    decision = router.route({name: [0.6, 0.6] for name in candidates}, candidates)
+    assert decision.reason == "low_confidence"
+    assert decision.selected == tuple(candidates)
+    assert decision.skipped == ()
+
+
+def test_dimension_mismatch_resets_centroid(tmp_path: Path) -> None:
+    router = _router(tmp_path)
+    router.add_vectors("research_papers", [[1.0, 0.0]])
+    router.add_vectors("research_papers", [[0.0, 0.0, 3.0]])
+
+    assert router.centroid("research_papers") == pytest.approx([0.0, 0.0, 3.0])
+
+
+def test_concurrent_writers_do_not_lose_updates(tmp_path: Path) -> None:
+    routers = [_router(tmp_path) for _ in range(4)]
+
+    def _ingest(router: CollectionRouter) -> None:
+        for _ in range(25):
+            router.add_vectors("business_docs", [[1.0, 0.0]])
+
+    threads = [threading.Thread(target=_ingest, args=(router,)) for router in routers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert _router(tmp_path).count("business_docs") == 100
+
+
+def test_stale_centroids_are_treated_as_unknown(tmp_path: Path) -> None:
+    router = _router(tmp_path, top_m=1, min_similarity=0.0)
+    router.add_vectors("legal_documents", [[1.0, 0.0]])
+    router.add_vectors("format_specs", [[0.0, 1.0]])
+    candidates = ["legal_documents", "format_specs"]
+    query = {name: [1.0, 0.0] for name in candidates}
+
+    assert router.route(query, candidates, {"legal_documents": 1, "format_specs": 1}).skipped == ("format_specs",)
+
+    # format_specs holds chunks ingested before routing existed.
+    counts = {"legal_documents": 1, "format_specs": 40}
+    assert router.known_collections(counts) == ("legal_documents",)
+    decision = router.route(query, candidates, counts)
+    assert decision.reason == "few_candidates"
+    assert decision.skipped == ()
+
+
+class _Collection:
+    def __init__(self, name: str, embeddings: list) -> None:
+        self.name = name
+        self._embeddings = embeddings
+
+    def get(self, include, limit, offset):
+        assert include == ["embeddings"]
+        page = self._embeddings[offset : offset + limit]
+        return {"ids": [f"id-{offset + index}" for index in range(len(page))], "embeddings": page}
+
+
+def test_rebuild_replaces_centroid_from_stored_embeddings(tmp_path: Path) -> None:
+    router = _router(tmp_path)
+    router.add_vectors("research_papers", [[5.0, 5.0]])
+    collection = _Collection("research_papers", [[1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])
+
+    assert rebuild_collection_centroid(collection, router, batch_size=2) == 3
+    assert router.count("research_papers") == 3
+    assert router.centroid("research_papers") == pytest.approx([2 / 3, 2 / 3])
+
+    assert rebuild_collection_centroid(_Collection("research_papers", []), router) == 0
+    assert router.centroid("research_papers") is None
@@ -0,0 +1,75 @@
+"""Tests for near-duplicate collapsing and packing in ``app.common.context_assembly``."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.common.context_assembly import (
+    collapse_near_duplicates,
+    merge_adjacent_chunks,
+    pack_to_budget,
+    shingle_hashes,
+    simhash,
+)
+
+_PARAGRAPH = (
+    "El conversor de Anclora admite documentos DOCX y PDF con tablas, "
+    "imágenes incrustadas y notas al pie que se conservan en la salida final"
+)
+
+
+def _doc(text: str, **metadata) -> SimpleNamespace:
+    return SimpleNamespace(page_content=text, metadata=dict(metadata))
+
+
+def _factory(text, metadata):
+    return SimpleNamespace(page_content=text, metadata=metadata)
+
+
+def test_simhash_is_stable_for_near_identical_text() -> None:
+    first = simhash(shingle_hashes(_PARAGRAPH))
+    second = simhash(shingle_hashes(_PARAGRAPH.upper() + "."))
+    different = simhash(shingle_hashes("Procedimiento de facturación trimestral para clientes"))
+
+    assert first == second
+    assert bin(first ^ different).count("1") > 3
+
+
+def test_collapse_keeps_best_ranked_copy_across_collections() -> None:
+    docs = [
+        _doc(_PARAGRAPH, collection="business_docs"),
+        _doc("Otro tema completamente distinto sobre licencias y facturación"),
+        _doc(_PARAGRAPH + " también", collection="general_knowledge"),
+        _doc(_PARAGRAPH[:90], collection="general_knowledge"),
+    ]
+
+    kept = collapse_near_duplicates(docs)
+
+    assert kept == docs[:2]
+
+
+def test_merge_adjacent_chunks_removes_overlap() -> None:
+    docs = [
+        _doc("uno dos tres cuatro", chunk_index=4, file_hash="abc", distance=0.4),
+        _doc("otro archivo", chunk_index=5, file_hash="zzz"),
+        _doc("tres cuatro cinco seis", chunk_index=5, file_hash="abc", distance=0.2),
+        _doc("lejano", chunk_index=9, file_hash="abc"),
+    ]
+
+    merged = merge_adjacent_chunks(docs, _factory)
+
+    assert [doc.page_content for doc in merged] == [
+        "uno dos tres cuatro cinco seis",
+        "otro archivo",
+        "lejano",
+    ]
+    assert merged[0].metadata == {"chunk_index": 4, "file_hash": "abc", "distance": 0.2}
+
+
+def test_pack_to_budget_skips_documents_that_do_not_fit() -> None:
+    docs = [_doc("a" * 400), _doc("b" * 400), _doc("c" * 40)]
+
+    packed = pack_to_budget(docs, 120)
+
+    assert [doc.page_content[0] for doc in packed] == ["a", "c"]
+    assert pack_to_budget(docs, 0) == docs
@@ -0,0 +1,66 @@
+"""Tests for adaptive context sizing in ``app.common.context_selection``."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.common.context_selection import (
+    ContextLimits,
+    ContextSelectionConfig,
+    score_cutoff,
+    select_context,
+)
+
+
+def _doc(text: str, distance: float | None = None) -> SimpleNamespace:
+    metadata = {} if distance is None else {"distance": distance}
+    return SimpleNamespace(page_content=text, metadata=metadata)
+
+
+def _distance(doc: SimpleNamespace) -> float | None:
+    return doc.metadata.get("distance")
+
+
+def test_score_cutoff_detects_elbow() -> None:
+    assert score_cutoff([0.30, 0.32, 0.33, 0.80, 0.85], 0.5) == 0.33
+    assert score_cutoff([0.3, 0.4, 0.5, 0.6, 0.7], 0.5) is None
+    assert score_cutoff([0.1, 0.9], 0.5) is None
+
+
+def test_select_context_stops_at_score_gap_but_keeps_minimum() -> None:
+    docs = [_doc("a", 0.30), _doc("b", 0.32), _doc("c", 0.33), _doc("d", 0.80), _doc("e", 0.85)]
+
+    easy = select_context(docs, ContextLimits(1, 5), relevance=_distance)
+    assert [doc.page_content for doc in easy] == ["a", "b", "c"]
+
+    strict = select_context(docs, ContextLimits(4, 5), relevance=_distance)
+    assert [doc.page_content for doc in strict] == ["a", "b", "c", "d"]
+
+
+def test_select_context_respects_token_budget_and_maximum() -> None:
+    docs = [_doc("x" * 400), _doc("y" * 400), _doc("z" * 400), _doc("w" * 400)]
+
+    budgeted = select_context(docs, ContextLimits(1, 4), relevance=_distance, token_budget=250)
+    assert len(budgeted) == 2
+
+    capped = select_context(docs, ContextLimits(1, 3), relevance=_distance, token_budget=0)
+    assert len(capped) == 3
+
+    oversized = select_context([_doc("q" * 8000)], ContextLimits(1, 4), relevance=_distance)
+    assert len(oversized) == 1
+
+
+def test_config_reads_per_variant_limits(monkeypatch) -> None:
+    monkeypatch.setenv("CONTEXT_CHUNK_LIMITS", "documental=2:4, multimedia=1:3, roto=x")
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "800")
+
+    config = ContextSelectionConfig.from_sources(5)
+
+    assert config.token_budget == 800
+    assert config.limits_for("documental") == ContextLimits(2, 4)
+    assert config.limits_for("multimedia") == ContextLimits(1, 3)
+    assert config.limits_for("legal") == ContextLimits(2, 5)
+
+    monkeypatch.setenv("ADAPTIVE_CONTEXT_ENABLED", "false")
+    disabled = ContextSelectionConfig.from_sources(5)
+    assert disabled.limits_for("documental") == ContextLimits(5, 5)
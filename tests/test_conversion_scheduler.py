@@ -0,0 +1,172 @@
+"""Tests for the priority scheduler behind the conversion API."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+import pytest
+
+from app.orchestration.conversion_scheduler import ConversionScheduler, JobStore, SchedulerFullError
+from app.orchestration.hybrid_orchestrator import ConversionRequest, ProcessingPriority
+
+
+def _request(request_id: str, priority: str = "standard") -> ConversionRequest:
+    return ConversionRequest(
+        request_id=request_id,
+        user_id="tester",
+        document_data={"file_type": "txt"},
+        priority=ProcessingPriority(priority),
+    )
+
+
+class _Processor:
+    """Conversion stand-in that records order and concurrency and can be held."""
+
+    def __init__(self) -> None:
+        self.order: list = []
+        self.running = 0
+        self.peak = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, request: ConversionRequest) -> dict:
+        self.order.append(request.request_id)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await self.release.wait()
+        finally:
+            self.running -= 1
+        return {"request_id": request.request_id, "success": True, "processing_mode": "fast_path"}
+
+
+async def _until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+def test_jobs_run_by_priority_within_the_worker_limit(tmp_path) -> None:
+    async def _scenario() -> _Processor:
+        processor = _Processor()
+        scheduler = ConversionScheduler(processor, workers=2, store=JobStore(tmp_path / "jobs.sqlite3"))
+        await scheduler.start()
+        # Both workers pick the first two jobs; the rest wait in their queues.
+        await scheduler.submit(_request("first", "batch"))
+        await scheduler.submit(_request("second", "batch"))
+        await _until(lambda: processor.running == 2)
+        for request_id, priority in [("b", "batch"), ("s", "standard"), ("r", "realtime")]:
+            await scheduler.submit(_request(request_id, priority))
+        processor.release.set()
+        job = await scheduler.wait("b", timeout=5)
+        await scheduler.stop()
+        assert job.status == "completed" and job.processing_mode == "fast_path"
+        return processor
+
+    processor = asyncio.run(_scenario())
+    assert processor.order == ["first", "second", "r", "s", "b"]
+    assert processor.peak == 2
+
+
+def test_queued_and_running_jobs_can_be_cancelled(tmp_path) -> None:
+    async def _scenario() -> None:
+        processor = _Processor()
+        scheduler = ConversionScheduler(processor, workers=1, store=JobStore(tmp_path / "jobs.sqlite3"))
+        await scheduler.start()
+        await scheduler.submit(_request("running"))
+        await scheduler.submit(_request("queued"))
+        await asyncio.sleep(0.05)
+
+        assert (await scheduler.cancel("queued")).status == "cancelled"
+        assert (await scheduler.cancel("running")).status == "cancelled"
+        assert processor.running == 0
+        await asyncio.sleep(0.05)
+        assert processor.order == ["running"]
+        assert (await scheduler.stats())["jobs_by_status"] == {"cancelled": 2}
+        await scheduler.stop()
+
+    asyncio.run(_scenario())
+
+
+class _SlowStartStore(JobStore):
+    """Store whose "processing" write is slow, widening the window before the processor runs."""
+
+    def save(self, job) -> None:
+        if job.status == "processing":
+            time.sleep(0.2)
+        super().save(job)
+
+
+def test_cancel_while_the_job_is_being_started_stops_it(tmp_path) -> None:
+    async def _scenario() -> None:
+        processor = _Processor()
+        processor.release.set()
+        scheduler = ConversionScheduler(processor, workers=1, store=_SlowStartStore(tmp_path / "jobs.sqlite3"))
+        await scheduler.start()
+        await scheduler.submit(_request("starting"))
+        await asyncio.sleep(0.05)
+
+        assert (await scheduler.cancel("starting")).status == "cancelled"
+        await asyncio.sleep(0.3)
+        assert processor.order == []
+        assert (await scheduler.get("starting")).status == "cancelled"
+        await scheduler.stop()
+
+    asyncio.run(_scenario())
+    assert JobStore(tmp_path / "jobs.sqlite3").load("starting").status == "cancelled"
+
+
+def test_full_queue_rejects_new_jobs(tmp_path) -> None:
+    async def _scenario() -> None:
+        processor = _Processor()
+        scheduler = ConversionScheduler(
+            processor, workers=1, max_queue_depth=1, store=JobStore(tmp_path / "jobs.sqlite3")
+        )
+        await scheduler.start()
+        await scheduler.submit(_request("running"))
+        await asyncio.sleep(0.05)
+        await scheduler.submit(_request("waiting"))
+        with pytest.raises(SchedulerFullError):
+            await scheduler.submit(_request("rejected"))
+        await scheduler.stop()
+
+    asyncio.run(_scenario())
+
+
+def test_jobs_survive_restarts_and_finished_ones_are_pruned(tmp_path) -> None:
+    path = tmp_path / "jobs.sqlite3"
+
+    async def _first_process() -> None:
+        processor = _Processor()
+        scheduler = ConversionScheduler(processor, workers=1, store=JobStore(path, max_results=2))
+        await scheduler.start()
+        for index in range(3):
+            await scheduler.submit(_request(f"done-{index}"))
+        processor.release.set()
+        await scheduler.wait("done-2", timeout=5)
+        processor.release.clear()
+        await scheduler.submit(_request("interrupted"))
+        await scheduler.submit(_request("pending"))
+        await asyncio.sleep(0.05)
+        await scheduler.stop()
+
+    async def _second_process() -> None:
+        processor = _Processor()
+        processor.release.set()
+        scheduler = ConversionScheduler(processor, workers=1, store=JobStore(path, max_results=2))
+        await scheduler.start()
+        pending = await scheduler.wait("pending", timeout=5)
+        assert pending.status == "completed" and pending.result["request_id"] == "pending"
+        interrupted = await scheduler.get("interrupted")
+        assert interrupted.status == "failed"
+        assert await scheduler.get("done-0") is None
+        await scheduler.stop()
+
+    asyncio.run(_first_process())
+    asyncio.run(_second_process())
+
+    expired = JobStore(path, ttl=0)
+    time.sleep(0.01)
+    expired.save(expired.load("pending"))
+    assert expired.status_counts() == {}
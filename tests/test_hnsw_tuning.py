@@ -0,0 +1,88 @@
+"""Tests for per-collection HNSW settings and the offline tuner."""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from app.common import constants
+from app.common.chroma_utils import get_or_create_collection
+from app.common.hnsw_tuning import SweepResult, exact_neighbours, pareto_frontier, recommend, split_held_out, sweep
+
+
+class _RecordingClient:
+    def __init__(self, accepts_metadata: bool = True) -> None:
+        self.accepts_metadata = accepts_metadata
+        self.calls: list[tuple[str, dict | None]] = []
+
+    def get_or_create_collection(self, name, metadata=None):
+        if metadata is not None and not self.accepts_metadata:
+            raise TypeError("unexpected keyword argument 'metadata'")
+        self.calls.append((name, metadata))
+        return name
+
+
+def test_collections_are_created_with_their_hnsw_metadata(monkeypatch) -> None:
+    monkeypatch.delenv("CHROMA_HNSW_OVERRIDES", raising=False)
+    client = _RecordingClient()
+
+    get_or_create_collection(client, "troubleshooting")
+    get_or_create_collection(client, "not_configured")
+
+    assert client.calls == [
+        ("troubleshooting", constants.HNSW_LARGE.to_metadata()),
+        ("not_configured", constants.HNSW_SMALL.to_metadata()),
+    ]
+    assert constants.HNSW_SMALL.to_metadata() == {
+        "hnsw:space": "l2",
+        "hnsw:M": 16,
+        "hnsw:construction_ef": 100,
+        "hnsw:search_ef": 10,
+    }
+
+    legacy = _RecordingClient(accepts_metadata=False)
+    assert get_or_create_collection(legacy, "format_specs") == "format_specs"
+    assert legacy.calls == [("format_specs", None)]
+
+
+def test_environment_overrides_take_precedence(monkeypatch) -> None:
+    monkeypatch.setenv("CHROMA_HNSW_OVERRIDES", "format_specs=24:150:40:cosine, bad=1:x:3, legal_documents=8:64")
+
+    assert constants.hnsw_config_for("format_specs") == constants.HNSWConfig(
+        space="cosine", m=24, construction_ef=150, search_ef=40
+    )
+    assert constants.hnsw_config_for("legal_documents") == constants.HNSW_SMALL
+    assert constants.collection_metadata("bad") == constants.HNSW_SMALL.to_metadata()
+
+
+def test_sweep_reports_recall_against_exact_neighbours() -> None:
+    pytest.importorskip("hnswlib")
+    vectors = np.random.default_rng(3).normal(size=(600, 16)).astype(np.float32)
+    indexed, queries = split_held_out(vectors, 40, seed=1)
+
+    truth = exact_neighbours(indexed, queries, 5)
+    brute = np.argsort(((queries[:, None, :] - indexed[None, :, :]) ** 2).sum(axis=2), axis=1)[:, :5]
+    assert np.array_equal(truth, brute)
+
+    results = sweep(indexed, queries, k=5, m_values=(8,), construction_ef_values=(64,), search_ef_values=(5, 200))
+    assert [result.search_ef for result in results] == [5, 200]
+    assert results[1].recall == pytest.approx(1.0)
+    assert results[0].recall <= results[1].recall
+
+
+def test_frontier_and_recommendation() -> None:
+    def result(search_ef: int, recall: float, latency: float) -> SweepResult:
+        return SweepResult(16, 100, search_ef, recall, latency, latency * 1.5, 0.1)
+
+    fast, dominated, accurate, exact = (
+        result(10, 0.80, 0.01),
+        result(20, 0.79, 0.02),
+        result(40, 0.96, 0.03),
+        result(80, 1.00, 0.05),
+    )
+    results = [exact, dominated, accurate, fast]
+
+    assert pareto_frontier(results) == [fast, accurate, exact]
+    assert recommend(results, 0.95) == accurate
+    assert recommend([fast, dominated], 0.95) == fast
+    assert recommend([], 0.95) is None
@@ -0,0 +1,179 @@
+"""Tests for the persisted fast-path store and pooled n8n client of the orchestrator."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from app.orchestration.hybrid_orchestrator import (
+    ConversionRequest,
+    HybridOrchestrator,
+    ProcessingMode,
+    ProcessingPriority,
+)
+from app.orchestration.n8n_client import N8nClient, N8nRequestError
+from app.orchestration.pattern_store import PatternStore
+
+
+class _FakeN8n:
+    """Local stand-in for the n8n webhook and a callback receiver."""
+
+    def __init__(self, failures: int = 0) -> None:
+        self.failures = failures
+        self.webhook_calls: list = []
+        self.callbacks: list = []
+        self.peers: set = set()
+        self.app = web.Application()
+        self.app.router.add_post("/webhook/process-document", self._webhook)
+        self.app.router.add_post("/callback", self._callback)
+        self.app.router.add_post("/missing", self._missing)
+
+    async def _webhook(self, request: web.Request) -> web.Response:
+        self.peers.add(request.transport.get_extra_info("peername"))
+        self.webhook_calls.append(await request.json())
+        if len(self.webhook_calls) <= self.failures:
+            return web.json_response({"error": "busy"}, status=503)
+        return web.json_response(
+            {
+                "success": True,
+                "quality_score": 0.95,
+                "processing_time": 2.0,
+                "agent_sequence_used": ["ocr", "layout"],
+            }
+        )
+
+    async def _missing(self, request: web.Request) -> web.Response:
+        return web.json_response({}, status=404)
+
+    async def _callback(self, request: web.Request) -> web.Response:
+        self.callbacks.append(await request.json())
+        return web.json_response({"ok": True})
+
+
+def _request(priority: ProcessingPriority = ProcessingPriority.STANDARD, callback_url=None) -> ConversionRequest:
+    return ConversionRequest(
+        request_id="req-1",
+        user_id="tester",
+        document_data={"file_type": "pdf", "file_size": 1024, "page_count": 2},
+        priority=priority,
+        callback_url=callback_url,
+    )
+
+
+def test_pattern_store_is_bounded_persisted_and_shared(tmp_path) -> None:
+    path = tmp_path / "patterns.sqlite3"
+    worker_a = PatternStore(path, max_patterns=2)
+    worker_b = PatternStore(path, max_patterns=2, refresh_seconds=0)
+
+    worker_a.put("pdf_small_simple", {"agent_sequence": ["ocr"]})
+    assert worker_b.get("pdf_small_simple")["agent_sequence"] == ["ocr"]
+
+    worker_a.put("txt_small_simple", {"agent_sequence": []})
+    worker_a.record_use("pdf_small_simple")  # now more recent than "txt_small_simple"
+    worker_a.put("docx_large_simple", {"agent_sequence": []})
+
+    assert len(worker_a) == 2
+    assert "txt_small_simple" not in worker_b
+    restarted = PatternStore(path, max_patterns=2)
+    assert restarted.warm() == 2
+    assert restarted.get("pdf_small_simple")["usage_count"] == 1
+
+
+class _ThreadRecordingStore(PatternStore):
+    """Pattern store that records which threads perform lookups."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.lookup_threads: set = set()
+
+    def get(self, key, default=None):
+        self.lookup_threads.add(threading.get_ident())
+        return super().get(key, default)
+
+
+def test_pattern_misses_are_cached_and_looked_up_off_the_event_loop(tmp_path) -> None:
+    store = _ThreadRecordingStore(tmp_path / "patterns.sqlite3")
+    statements: list = []
+    store._conn.set_trace_callback(statements.append)
+
+    async def _scenario() -> int:
+        orchestrator = HybridOrchestrator(pattern_store=store, http_client=N8nClient(retries=0))
+        try:
+            for _ in range(3):
+                await orchestrator._determine_processing_mode(_request(ProcessingPriority.REALTIME))
+        finally:
+            await orchestrator.shutdown()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(_scenario())
+
+    assert store.lookup_threads and loop_thread not in store.lookup_threads
+    assert sum("FROM patterns WHERE key" in statement for statement in statements) == 1
+
+    store.put("pdf_small_simple", {"agent_sequence": []})
+    assert "pdf_small_simple" in store
+
+
+def test_client_reuses_one_session_and_retries_transient_errors() -> None:
+    fake = _FakeN8n(failures=2)
+
+    async def _scenario() -> N8nClient:
+        async with TestServer(fake.app) as server:
+            client = N8nClient(retries=2, backoff_base=0.001, max_connections_per_host=2)
+            try:
+                first = await client.post_json(str(server.make_url("/webhook/process-document")), {"n": 1})
+                assert first.status == 200 and first.body["success"]
+                for index in range(3):
+                    await client.post_json(str(server.make_url("/webhook/process-document")), {"n": index})
+                missing = await client.post_json(str(server.make_url("/missing")), {})
+                assert missing.status == 404
+
+                fake.failures = 100
+                with pytest.raises(N8nRequestError) as error:
+                    await client.post_json(str(server.make_url("/webhook/process-document")), {}, retries=1)
+                assert error.value.status == 503
+            finally:
+                await client.close()
+            return client
+
+    client = asyncio.run(_scenario())
+
+    assert client.stats["sessions_created"] == 1
+    assert client.stats["retries"] == 3 and client.stats["failures"] == 1
+    assert len(fake.peers) == 1  # keep-alive: every call rode the same connection
+
+
+def test_learned_patterns_route_later_requests_to_the_fast_path(tmp_path) -> None:
+    fake = _FakeN8n()
+    path = tmp_path / "patterns.sqlite3"
+
+    async def _scenario() -> None:
+        async with TestServer(fake.app) as server:
+            orchestrator = HybridOrchestrator(pattern_store=PatternStore(path), http_client=N8nClient(retries=0))
+            orchestrator.n8n_webhook_url = str(server.make_url("/webhook/process-document"))
+            try:
+                result = await orchestrator._execute_complex_path(_request())
+                assert result["success"] and result["cacheable"]
+                await orchestrator._send_callback(
+                    str(server.make_url("/callback")),
+                    await orchestrator.process_conversion(_request()),
+                )
+            finally:
+                await orchestrator.shutdown()
+
+            restarted = HybridOrchestrator(pattern_store=PatternStore(path), http_client=N8nClient(retries=0))
+            await restarted.startup()
+            mode = await restarted._determine_processing_mode(_request(ProcessingPriority.REALTIME))
+            assert mode == ProcessingMode.FAST_PATH
+            await restarted.shutdown()
+
+    asyncio.run(_scenario())
+
+    assert fake.webhook_calls[0]["document_data"]["file_type"] == "pdf"
+    assert len(fake.webhook_calls) == 1  # the second conversion reused the learned pattern
+    assert fake.callbacks[0]["processing_mode"] == "fast_path"
+    assert fake.callbacks[0]["success"] is True
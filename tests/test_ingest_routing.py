@@ -161,3 +161,15 @@ def test_domain_to_collection_contains_expected_mappings(domain, expected_collec
 
     assert DOMAIN_TO_COLLECTION[domain] == expected_collection
     assert CHROMA_COLLECTIONS[expected_collection].domain == domain
+
+
+@pytest.mark.parametrize("file_name", ["LICENSE", "logo.png", "poetry.lock"])
+def test_file_versions_of_unsupported_files_are_ignored(monkeypatch, file_name):
+    def _unexpected(*_args, **_kwargs):
+        raise AssertionError("unsupported files have no collection")
+
+    monkeypatch.setattr(ingest_module, "get_or_create_collection", _unexpected)
+
+    assert ingest_module.delete_file_version(file_name, "0" * 64) == 0
+    assert ingest_module.rename_file_version(file_name, f"docs/{file_name}", "0" * 64) == 0
+    assert ingest_module.rename_file_version("notas.md", file_name, "0" * 64) == 0
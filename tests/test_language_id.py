@@ -0,0 +1,58 @@
+"""Tests for the cached es/en classifier in ``app.common.language_id``."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.common.language_id import LanguageIdentifier
+
+
+class _RecordingFallback:
+    def __init__(self, answer: str) -> None:
+        self.answer = answer
+        self.calls: list[str] = []
+
+    def __call__(self, text: str) -> str:
+        self.calls.append(text)
+        return self.answer
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Como convierto un archivo DOCX a PDF", "es"),
+        ("necesito ayuda con la autenticacion", "es"),
+        ("give me the steps to configure the api", "en"),
+        ("document ingestion keeps failing", "en"),
+        ("¿Qué formatos soporta?", "es"),
+        ("Please send it", "en"),
+    ],
+)
+def test_classifier_answers_without_langdetect(text: str, expected: str) -> None:
+    fallback = _RecordingFallback("xx")
+    identifier = LanguageIdentifier(fallback=fallback)
+
+    assert identifier.classify(text) == expected
+    assert fallback.calls == []
+
+
+def test_ambiguous_inputs_fall_back_to_langdetect() -> None:
+    fallback = _RecordingFallback("es")
+    identifier = LanguageIdentifier(fallback=fallback)
+
+    assert identifier.classify("PDF") == "es"
+    assert fallback.calls == ["PDF"]
+
+    fallback.answer = "de"
+    assert identifier.classify("OCR") == "en"
+
+
+def test_results_are_cached() -> None:
+    fallback = _RecordingFallback("en")
+    identifier = LanguageIdentifier(fallback=fallback, cache_size=8)
+
+    for _ in range(3):
+        identifier.classify("API")
+
+    assert fallback.calls == ["API"]
+    assert identifier.cache_info().hits == 2
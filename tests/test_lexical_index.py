@@ -0,0 +1,180 @@
+"""Tests for the BM25 lexical index in ``app.common.lexical_index``."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.common import lexical_index
+from app.common.lexical_index import (
+    LexicalIndex,
+    LexicalIndexRegistry,
+    reciprocal_rank_fusion,
+    tokenize,
+)
+from app.common.privacy import PrivacyAuditLogger, PrivacyManager
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    registry = LexicalIndexRegistry(in_memory=True)
+    monkeypatch.setattr(lexical_index, "_DEFAULT_REGISTRY", registry)
+    yield registry
+    registry.close()
+
+
+def test_tokenize_keeps_identifiers_and_their_parts() -> None:
+    tokens = tokenize("Política POL-2023-07 en config.yaml")
+
+    assert "pol-2023-07" in tokens
+    assert {"pol", "2023", "07"} <= set(tokens)
+    assert "config.yaml" in tokens
+    assert "política" in tokens
+
+
+def test_search_ranks_exact_identifier_first() -> None:
+    index = LexicalIndex("legal_compliance")
+    index.add(
+        ["a", "b", "c"],
+        [
+            "La política de retención aplica a todos los contratos.",
+            "Error E-4012 al convertir archivos DOCX con macros.",
+            "Guía general de conversión de formatos.",
+        ],
+        [{"source": "a.md"}, {"source": "b.md"}, {"source": "c.md"}],
+    )
+
+    hits = index.search("¿Qué significa el error E-4012?", k=2)
+
+    assert hits[0].doc_id == "b"
+    assert hits[0].metadata == {"source": "b.md"}
+    assert all(hit.score > 0 for hit in hits)
+
+
+def test_remove_and_reindex_update_postings() -> None:
+    index = LexicalIndex("format_specs")
+    index.add(["x"], ["formato pandoc markdown"])
+    index.add(["x"], ["formato docx"])
+
+    assert [hit.doc_id for hit in index.search("pandoc", k=5)] == []
+    assert [hit.doc_id for hit in index.search("docx", k=5)] == ["x"]
+
+    assert index.remove(["x"]) == 1
+    assert index.count() == 0
+    assert index.search("docx", k=5) == []
+
+
+def test_index_persists_between_instances(tmp_path: Path) -> None:
+    path = tmp_path / "troubleshooting.sqlite3"
+    first = LexicalIndex("troubleshooting", path)
+    first.add(["id-1"], ["Timeout en ollama:11434"], [{"collection": "troubleshooting"}])
+    first.close()
+
+    second = LexicalIndex("troubleshooting", path)
+    hits = second.search("ollama timeout", k=1)
+    second.close()
+
+    assert [hit.doc_id for hit in hits] == ["id-1"]
+
+
+def test_registry_does_not_create_indexes_on_read(tmp_path: Path) -> None:
+    registry = LexicalIndexRegistry(tmp_path)
+
+    assert registry.get("business_docs", create=False) is None
+    assert not list(tmp_path.iterdir())
+
+    registry.get("business_docs").add(["1"], ["hola"])
+    assert registry.get("business_docs", create=False) is not None
+    registry.close()
+
+
+def test_reciprocal_rank_fusion_rewards_agreement() -> None:
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "a"]], k=60)
+
+    assert max(fused, key=fused.get) == "a"
+    assert fused["c"] > fused["b"]
+    assert fused["a"] == pytest.approx(1 / 61 + 1 / 62)
+
+
+def test_module_helpers_respect_feature_flag(registry, monkeypatch) -> None:
+    monkeypatch.setenv("HYBRID_SEARCH_ENABLED", "false")
+    assert lexical_index.index_documents("general_knowledge", ["1"], ["hola mundo"]) == 0
+
+    monkeypatch.setenv("HYBRID_SEARCH_ENABLED", "true")
+    assert lexical_index.index_documents("general_knowledge", ["1"], ["hola mundo"]) == 1
+    assert [hit.doc_id for hit in lexical_index.search_documents("general_knowledge", "mundo", 3)] == ["1"]
+
+
+def test_rebuild_indexes_existing_chunks_and_drops_stale_ones(registry) -> None:
+    class _Collection:
+        name = "legal_compliance"
+        documents = ["Política POL-2023-07", "Cláusula de confidencialidad", "Anexo de tarifas"]
+
+        def get(self, include, limit, offset):
+            assert include == ["documents", "metadatas"]
+            page = self.documents[offset : offset + limit]
+            return {
+                "ids": [f"chunk-{offset + index}" for index in range(len(page))],
+                "documents": page,
+                "metadatas": [{"source": "contrato.pdf"}] * len(page),
+            }
+
+    lexical_index.index_documents("legal_compliance", ["deleted"], ["POL-2023-07 derogada"])
+
+    assert lexical_index.rebuild_lexical_index(_Collection(), batch_size=2) == 3
+    hits = lexical_index.search_documents("legal_compliance", "POL-2023-07", 5)
+    assert [hit.doc_id for hit in hits] == ["chunk-0"]
+    assert hits[0].metadata == {"source": "contrato.pdf"}
+    assert registry.get("legal_compliance").count() == 3
+
+
+def test_privacy_deletion_prunes_lexical_index(registry, tmp_path: Path) -> None:
+    class _Collection:
+        def __init__(self) -> None:
+            self.metadatas = {"doc-1": {"uploaded_file_name": "contrato.pdf"}}
+
+        def get(self, where=None, include=None):
+            ids = [doc_id for doc_id, meta in self.metadatas.items() if not where or all(meta.get(k) == v for k, v in where.items())]
+            return {"ids": ids, "metadatas": [self.metadatas[doc_id] for doc_id in ids]}
+
+        def delete(self, ids=None):
+            for doc_id in ids or []:
+                self.metadatas.pop(doc_id, None)
+
+    collection = _Collection()
+    registry.get("legal_documents").add(["doc-1"], ["Contrato de confidencialidad"])
+
+    class _Client:
+        def get_or_create_collection(self, name):
+            return collection
+
+    manager = PrivacyManager(
+        chroma_client=_Client(),
+        collections={"legal_documents": object()},
+        storage_locations=[tmp_path / "storage"],
+        temporary_locations=[tmp_path / "tmp"],
+        audit_logger=PrivacyAuditLogger(log_path=tmp_path / "audit.log"),
+    )
+
+    summary = manager.forget_document("contrato.pdf", requested_by="tester")
+
+    assert summary.status == "deleted"
+    assert registry.get("legal_documents").count() == 0
+
+
+def test_hybrid_fusion_promotes_documents_found_by_both_retrievers() -> None:
+    from types import SimpleNamespace
+
+    from app.common.langchain_module import _fuse_hybrid_rankings
+
+    def _doc(text: str) -> SimpleNamespace:
+        return SimpleNamespace(page_content=text, metadata={})
+
+    vector = ("troubleshooting", [_doc("general"), _doc("otro"), _doc("E-4012 detalle")])
+    lexical = ("troubleshooting", [_doc("E-4012 detalle")])
+    other = ("format_specs", [_doc("spec")])
+
+    selected = _fuse_hybrid_rankings([vector, other, lexical], max_results=2)
+
+    assert [doc.page_content for doc in selected] == ["E-4012 detalle", "general"]
@@ -0,0 +1,136 @@
+"""Tests for the LLM priority scheduler and its admission control."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from app.common.llm_scheduler import (
+    LLMOverloadedError,
+    LLMScheduler,
+    SchedulerConfig,
+    llm_request_context,
+)
+
+
+def _queued(scheduler: LLMScheduler) -> int:
+    return sum(scheduler.stats()["queued"].values())
+
+
+def _enqueue(scheduler: LLMScheduler, order: list, label: str, priority: str, tenant: str) -> threading.Thread:
+    def _worker() -> None:
+        with llm_request_context(priority, tenant):
+            with scheduler.slot():
+                order.append(label)
+
+    expected = _queued(scheduler) + 1
+    thread = threading.Thread(target=_worker)
+    thread.start()
+    deadline = time.monotonic() + 5
+    while _queued(scheduler) < expected and time.monotonic() < deadline:
+        time.sleep(0.001)
+    return thread
+
+
+def test_waiters_are_served_by_priority_then_round_robin_by_tenant() -> None:
+    scheduler = LLMScheduler(SchedulerConfig(max_concurrency=1))
+    order: list = []
+
+    with scheduler.slot("interactive", "holder"):
+        threads = [
+            _enqueue(scheduler, order, "batch-a", "batch", "a"),
+            _enqueue(scheduler, order, "chat-a1", "interactive", "a"),
+            _enqueue(scheduler, order, "chat-a2", "interactive", "a"),
+            _enqueue(scheduler, order, "media-b", "media", "b"),
+            _enqueue(scheduler, order, "chat-b1", "interactive", "b"),
+        ]
+        assert scheduler.stats()["queued"] == {"interactive": 3, "media": 1, "batch": 1}
+
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert order == ["chat-a1", "chat-b1", "chat-a2", "media-b", "batch-a"]
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_requests_past_their_deadline_are_shed_with_retry_after() -> None:
+    config = SchedulerConfig(max_concurrency=1, queue_timeouts={"interactive": 5, "media": 5, "batch": 0.05})
+    scheduler = LLMScheduler(config)
+
+    with scheduler.slot("interactive"):
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            with scheduler.slot("batch", "nightly"):
+                pass  # pragma: no cover - never admitted
+
+    assert excinfo.value.reason == "deadline"
+    assert excinfo.value.priority == "batch"
+    assert excinfo.value.retry_after >= 1
+    assert scheduler.stats()["queued"]["batch"] == 0
+
+    # The slot is free again, so the next request runs immediately.
+    with scheduler.slot("batch"):
+        assert scheduler.stats()["in_flight"] == 1
+
+
+def test_full_queue_rejects_immediately_and_disabled_scheduler_is_a_no_op() -> None:
+    scheduler = LLMScheduler(SchedulerConfig(max_concurrency=1, max_queue_depth=0))
+
+    with scheduler.slot():
+        started = time.monotonic()
+        with pytest.raises(LLMOverloadedError) as excinfo:
+            with scheduler.slot("media"):
+                pass  # pragma: no cover - never admitted
+        assert time.monotonic() - started < 1
+
+    assert excinfo.value.reason == "queue_full"
+
+    disabled = LLMScheduler(SchedulerConfig(enabled=False, max_concurrency=1))
+    with disabled.slot(), disabled.slot():
+        assert disabled.stats()["in_flight"] == 0
+
+
+def test_config_reads_environment(monkeypatch) -> None:
+    monkeypatch.delenv("LLM_MAX_CONCURRENCY", raising=False)
+    monkeypatch.setenv("OLLAMA_NUM_PARALLEL", "3")
+    monkeypatch.setenv("LLM_QUEUE_TIMEOUTS", "batch=600, bogus=1, media=x")
+    monkeypatch.setenv("LLM_MAX_QUEUE_DEPTH", "10")
+
+    config = SchedulerConfig.from_environment()
+
+    assert config.max_concurrency == 3
+    assert config.max_queue_depth == 10
+    assert config.timeout_for("batch") == 600
+    assert config.timeout_for("media") == 120
+    assert config.timeout_for("interactive") == 30
+
+
+def test_chat_endpoint_maps_overload_to_503(monkeypatch) -> None:
+    from fastapi.testclient import TestClient
+
+    from app import api_endpoints
+    # ``api_endpoints`` imports the scheduler as ``common.llm_scheduler``.
+    from common import llm_scheduler
+
+    seen: dict = {}
+
+    def _overloaded(message, language=None):
+        seen["context"] = llm_scheduler._request_context.get()
+        raise llm_scheduler.LLMOverloadedError("batch", "deadline", 7.2)
+
+    monkeypatch.setenv("ANCLORA_API_TOKENS", "secret-token")
+    monkeypatch.setattr(api_endpoints, "response", _overloaded)
+    monkeypatch.setattr(api_endpoints, "verify_security", lambda request: True)
+    monkeypatch.setattr(api_endpoints.advanced_security, "validate_request", lambda **kwargs: (True, None))
+
+    client = TestClient(api_endpoints.app)
+    reply = client.post(
+        "/chat",
+        json={"message": "hola"},
+        headers={"Authorization": "Bearer secret-token", "X-Request-Priority": "batch", "X-Tenant-ID": "n8n"},
+    )
+
+    assert reply.status_code == 503
+    assert reply.headers["Retry-After"] == "8"
+    assert seen["context"] == ("batch", "n8n")
@@ -0,0 +1,115 @@
+"""Tests for the in-process collection mirrors in ``app.common.local_vector_cache``."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.common.local_vector_cache import LocalVectorCache, LocalVectorRetriever
+
+
+class _FakeCollection:
+    def __init__(self, rows, metadata=None) -> None:
+        self.rows = list(rows)
+        self.metadata = metadata
+        self.loads = 0
+
+    def get(self, include=None):
+        self.loads += 1
+        return {
+            "ids": [row[0] for row in self.rows],
+            "embeddings": [row[1] for row in self.rows],
+            "documents": [row[2] for row in self.rows],
+            "metadatas": [{"source": row[0]} for row in self.rows],
+        }
+
+
+class _FakeClient:
+    def __init__(self, collection: _FakeCollection) -> None:
+        self.collection = collection
+
+    def get_collection(self, name):
+        return self.collection
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+_ROWS = [
+    ("a", [1.0, 0.0], "alpha"),
+    ("b", [0.0, 1.0], "beta"),
+    ("c", [3.0, 0.1], "gamma"),
+]
+
+
+def test_mirror_matches_chroma_distances() -> None:
+    client = _FakeClient(_FakeCollection(_ROWS))
+    mirror = LocalVectorCache().get_mirror(client, "docs", 3)
+
+    l2 = mirror.query([1.0, 0.0], 2)
+    assert [mirror.ids[row] for row, _ in l2] == ["a", "b"]
+    assert [distance for _, distance in l2] == pytest.approx([0.0, 2.0])
+
+    mirror.space = "cosine"
+    cosine = mirror.query([1.0, 0.0], 3)
+    assert [mirror.ids[row] for row, _ in cosine] == ["a", "c", "b"]
+    assert cosine[0][1] == pytest.approx(0.0, abs=1e-6)
+
+
+def test_mirror_is_reused_until_invalidated_or_resized() -> None:
+    collection = _FakeCollection(_ROWS)
+    client = _FakeClient(collection)
+    clock = _FakeClock()
+    cache = LocalVectorCache(ttl_seconds=60, clock=clock)
+
+    first = cache.get_mirror(client, "docs", 3)
+    assert cache.get_mirror(client, "docs", 3) is first
+    assert collection.loads == 1
+
+    cache.invalidate("docs")
+    assert cache.get_mirror(client, "docs", 3) is not first
+    assert collection.loads == 2
+
+    collection.rows.append(("d", [0.5, 0.5], "delta"))
+    assert cache.get_mirror(client, "docs", 4).document_count == 4
+    assert collection.loads == 3
+
+    clock.now = 61
+    cache.get_mirror(client, "docs", 4)
+    assert collection.loads == 4
+
+
+def test_large_or_broken_collections_fall_back_to_chroma() -> None:
+    collection = _FakeCollection(_ROWS)
+    cache = LocalVectorCache(max_documents=2)
+    assert cache.get_mirror(_FakeClient(collection), "docs", 3) is None
+    assert collection.loads == 0
+
+    class _Broken:
+        def get_collection(self, name):
+            raise RuntimeError("offline")
+
+    assert LocalVectorCache().get_mirror(_Broken(), "docs", 1) is None
+    assert LocalVectorCache(enabled=False).get_mirror(_FakeClient(collection), "docs", 3) is None
+
+
+def test_retriever_builds_documents_from_the_mirror() -> None:
+    mirror = LocalVectorCache().get_mirror(_FakeClient(_FakeCollection(_ROWS)), "docs", 3)
+    embeddings = SimpleNamespace(embed_query=lambda text: [0.0, 1.0])
+    retriever = LocalVectorRetriever(
+        mirror,
+        embeddings,
+        1,
+        lambda text, metadata: SimpleNamespace(page_content=text, metadata=metadata),
+    )
+
+    (document,) = retriever.invoke("beta?")
+
+    assert document.page_content == "beta"
+    assert document.metadata == {"source": "b", "distance": pytest.approx(0.0)}
@@ -0,0 +1,102 @@
+"""Tests for the cross-encoder reranking stage in ``app.common.reranker``."""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+from app.common.reranker import RerankerConfig, RerankerManager
+
+
+def _doc(text: str) -> SimpleNamespace:
+    return SimpleNamespace(page_content=text, metadata={})
+
+
+class _KeywordModel:
+    """Scores pairs by how often the query keyword appears in the passage."""
+
+    def __init__(self, clock=None, cost: float = 0.0) -> None:
+        self.batches: list[int] = []
+        self._clock = clock
+        self._cost = cost
+
+    def predict(self, pairs):
+        self.batches.append(len(pairs))
+        if self._clock is not None:
+            self._clock.now += self._cost
+        return [passage.count(query) for query, passage in pairs]
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_rerank_orders_by_cross_encoder_score() -> None:
+    model = _KeywordModel()
+    loads: list[str] = []
+
+    def _factory(*, model_name: str):
+        loads.append(model_name)
+        return model
+
+    manager = RerankerManager(
+        RerankerConfig(enabled=True, model_name="tiny", batch_size=2),
+        model_factory=_factory,
+    )
+    docs = [_doc("nada"), _doc("pdf"), _doc("pdf pdf"), _doc("otro")]
+
+    first = manager.rerank("pdf", docs, top_n=2)
+    manager.rerank("pdf", docs, top_n=2)
+
+    assert [doc.page_content for doc in first] == ["pdf pdf", "pdf"]
+    assert model.batches == [2, 2, 2, 2]
+    assert loads == ["tiny"]
+
+
+def test_rerank_stops_when_budget_is_exhausted() -> None:
+    clock = _FakeClock()
+    model = _KeywordModel(clock=clock, cost=0.2)
+    manager = RerankerManager(
+        RerankerConfig(enabled=True, batch_size=2, time_budget_seconds=0.3),
+        model_factory=lambda **_: model,
+        clock=clock,
+    )
+    docs = [_doc("a"), _doc("x x"), _doc("x x x"), _doc("x")]
+
+    result = manager.rerank("x", docs, top_n=4)
+
+    assert model.batches == [2]
+    assert [doc.page_content for doc in result] == ["x x", "a", "x x x", "x"]
+
+
+def test_rerank_preserves_order_when_disabled_or_model_missing() -> None:
+    docs = [_doc("uno"), _doc("dos"), _doc("tres")]
+
+    disabled = RerankerManager(RerankerConfig(enabled=False), model_factory=lambda **_: None)
+    assert disabled.rerank("dos", docs, top_n=2) == docs[:2]
+    assert disabled.candidate_limit(5) == 5
+
+    def _broken(**_: object):
+        raise ImportError("sentence-transformers missing")
+
+    broken = RerankerManager(RerankerConfig(enabled=True), model_factory=_broken)
+    assert broken.rerank("dos", docs, top_n=2) == docs[:2]
+    assert broken.get_model() is None
+    assert broken.candidate_limit(5) == 20
+
+
+def test_config_reads_environment(monkeypatch) -> None:
+    monkeypatch.setenv("RERANKER_ENABLED", "true")
+    monkeypatch.setenv("RERANKER_MODEL_NAME", "custom/model")
+    monkeypatch.setenv("RERANKER_TIME_BUDGET_MS", "150")
+    monkeypatch.setenv("RERANKER_CANDIDATES_PER_COLLECTION", "12")
+
+    config = RerankerConfig.from_sources()
+
+    assert config.enabled is True
+    assert config.model_name == "custom/model"
+    assert config.time_budget_seconds == 0.15
+    assert config.candidates_per_collection == 12
@@ -0,0 +1,92 @@
+"""Tests for the two-tier processing cache in ``SpeedOptimizer``."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.optimization import speed_optimizations
+from app.optimization.speed_optimizations import DiskCache, OptimizationLevel, ProcessingCache, SpeedOptimizer
+
+
+def _entry(key: str, payload: str = "x", created_at: float | None = None) -> ProcessingCache:
+    now = time.time() if created_at is None else created_at
+    return ProcessingCache(content_hash=key, result_data={"data": payload}, processing_time=1.5, created_at=now)
+
+
+def test_memory_tier_evicts_least_recently_used(tmp_path) -> None:
+    optimizer = SpeedOptimizer(cache_dir=str(tmp_path))
+    optimizer.max_memory_cache_size = 2
+
+    async def _scenario() -> None:
+        optimizer._add_to_memory_cache("a", _entry("a"))
+        optimizer._add_to_memory_cache("b", _entry("b"))
+        assert await optimizer._get_from_cache("a") is not None  # "b" is now the oldest
+        optimizer._add_to_memory_cache("c", _entry("c"))
+
+    asyncio.run(_scenario())
+
+    assert list(optimizer.memory_cache) == ["a", "c"]
+    assert optimizer.get_optimization_stats()["memory_evictions"] == 1
+
+
+def test_disk_tier_expires_and_bounds_entries_and_bytes(tmp_path) -> None:
+    cache = DiskCache(str(tmp_path / "cache.sqlite3"), max_entries=2, max_bytes=10_000, ttl=60)
+
+    cache.put(_entry("old", created_at=time.time() - 120))
+    assert cache.get("old") is None
+    for key in ("a", "b", "c"):
+        cache.put(_entry(key))
+    assert cache.get("a") is None and cache.get("c").result_data == {"data": "x"}
+    assert cache.get("c").processing_time == 1.5
+
+    cache.max_bytes = 60
+    cache.put(_entry("big", payload="y" * 40))
+    stats = cache.stats()
+    assert stats["entries"] == 1 and stats["bytes"] <= 60
+    assert stats["expirations"] == 1 and stats["evictions"] == 3
+    assert not cache.put(_entry("huge", payload="z" * 100))
+
+
+def test_results_are_keyed_by_content_and_served_from_disk(tmp_path) -> None:
+    calls: list = []
+
+    async def _process(document_data):
+        calls.append(document_data["file_name"])
+        return {"success": True, "processed_content": document_data["file_name"]}
+
+    first_file = tmp_path / "a.txt"
+    second_file = tmp_path / "b.txt"
+    first_file.write_bytes(b"same name, same size, content A")
+    second_file.write_bytes(b"same name, same size, content B")
+
+    def _document(path) -> dict:
+        return {"file_name": "doc.txt", "file_type": "txt", "file_size": 31, "temp_file_path": str(path)}
+
+    async def _run(optimizer: SpeedOptimizer, path) -> dict:
+        result = await optimizer.optimize_document_processing(_document(path), _process, OptimizationLevel.BASIC)
+        await asyncio.gather(*optimizer._pending_writes)
+        return result
+
+    optimizer = SpeedOptimizer(cache_dir=str(tmp_path / "cache"))
+    assert not asyncio.run(_run(optimizer, first_file))["cache_hit"]
+    assert not asyncio.run(_run(optimizer, second_file))["cache_hit"]
+    assert asyncio.run(_run(optimizer, first_file))["cache_hit"]
+
+    restarted = SpeedOptimizer(cache_dir=str(tmp_path / "cache"))
+    result = asyncio.run(_run(restarted, second_file))
+
+    assert result["cache_hit"] and calls == ["doc.txt", "doc.txt"]
+    stats = restarted.get_optimization_stats()
+    assert stats["disk_cache_hits"] == 1 and stats["disk_cache_size"] == 2
+    assert stats["memory_cache_size"] == 1
+
+
+def test_default_cache_dir_is_anchored_to_the_repository(monkeypatch, tmp_path) -> None:
+    repo_root = speed_optimizations.Path(speed_optimizations.__file__).resolve().parents[2]
+    monkeypatch.delenv("SPEED_CACHE_DIR", raising=False)
+    monkeypatch.chdir(tmp_path)
+    assert speed_optimizations._default_cache_dir() == str(repo_root / "data" / "cache")
+
+    monkeypatch.setenv("SPEED_CACHE_DIR", "var/cache")
+    assert speed_optimizations._default_cache_dir() == str(repo_root / "var" / "cache")
@@ -1,9 +1,15 @@
 from types import SimpleNamespace
 
+import pytest
+
 from app.common.text_normalization import (
     NORMALIZATION_FORM,
+    ORIGINAL_CONTENT_KEY,
+    ORIGINAL_PATCH_KEY,
+    PROVENANCE_KEYS,
     normalize_documents_nfc,
     normalize_to_nfc,
+    restore_original_content,
 )
 
 
@@ -31,3 +37,82 @@ def test_normalize_to_nfc_keeps_accented_words_distinct():
     assert normalized != "cafe"
     assert normalize_to_nfc("café") == "café"
     assert normalize_to_nfc("cafe") == "cafe"
+
+
+def test_unchanged_chunks_do_not_store_a_second_copy():
+    doc = SimpleNamespace(page_content="texto ya normalizado", metadata={"source": "demo.txt"})
+
+    normalized_doc = normalize_documents_nfc([doc])[0]
+
+    assert not set(PROVENANCE_KEYS) & set(normalized_doc.metadata)
+    assert restore_original_content(normalized_doc.page_content, normalized_doc.metadata) == "texto ya normalizado"
+
+
+def test_long_originals_are_stored_compactly_and_restored_exactly():
+    original = ("Informe de acción correctiva del café. " * 40) + "cafe\u0301 " + ("Línea final. " * 20)
+    doc = SimpleNamespace(page_content=original, metadata={})
+
+    normalized_doc = normalize_documents_nfc([doc])[0]
+    provenance = {key: normalized_doc.metadata[key] for key in PROVENANCE_KEYS if key in normalized_doc.metadata}
+
+    assert list(provenance) == [ORIGINAL_PATCH_KEY]
+    assert len(provenance[ORIGINAL_PATCH_KEY]) < 40
+    assert restore_original_content(normalized_doc.page_content, normalized_doc.metadata) == original
+
+    # Re-normalising keeps the provenance of the first ingestion.
+    again = normalize_documents_nfc([normalized_doc])[0]
+    assert restore_original_content(again.page_content, again.metadata) == original
+
+
+def test_compact_collection_provenance_strips_and_reencodes(monkeypatch, tmp_path):
+    chromadb = pytest.importorskip("chromadb")
+    from app.common import chroma_utils
+
+    long_original = "cafe\u0301 " * 300
+    long_normalized = normalize_to_nfc(long_original)
+
+    client = chromadb.PersistentClient(path=str(tmp_path / "chroma"))
+    collection = client.create_collection("legacy")
+    records = {
+        "same": ("sin cambios", {"source": "a.txt", ORIGINAL_CONTENT_KEY: "sin cambios"}),
+        "short": ("café", {ORIGINAL_CONTENT_KEY: "cafe\u0301"}),
+        "long": (long_normalized, {ORIGINAL_CONTENT_KEY: long_original}),
+        "none": ("otro", {"source": "b.txt"}),
+    }
+    collection.add(
+        ids=list(records),
+        documents=[text for text, _ in records.values()],
+        embeddings=[[float(index), 1.0] for index in range(len(records))],
+        metadatas=[metadata for _, metadata in records.values()],
+    )
+
+    def _stored():
+        stored = collection.get(include=["documents", "metadatas", "embeddings"])
+        return {
+            record_id: (text, metadata, list(embedding))
+            for record_id, text, metadata, embedding in zip(
+                stored["ids"], stored["documents"], stored["metadatas"], stored["embeddings"]
+            )
+        }
+
+    reindexed = []
+    monkeypatch.setattr(chroma_utils, "index_documents", lambda name, ids, texts, metas: reindexed.append(list(ids)))
+    monkeypatch.setattr(chroma_utils, "invalidate_local_mirror", lambda name: None)
+
+    dry = chroma_utils.compact_collection_provenance(collection, batch_size=3, dry_run=True)
+    assert _stored()["same"][1][ORIGINAL_CONTENT_KEY] == "sin cambios"
+    assert reindexed == []
+
+    stats = chroma_utils.compact_collection_provenance(collection, batch_size=3)
+    stored = _stored()
+
+    assert stats == dry
+    assert stats["scanned"] == 4 and stats["removed"] == 1 and stats["compacted"] == 1
+    assert stats["bytes_saved"] > len(long_original)
+    assert stored["same"][:2] == ("sin cambios", {"source": "a.txt"})
+    assert stored["short"][1] == {ORIGINAL_CONTENT_KEY: "cafe\u0301"}
+    assert ORIGINAL_CONTENT_KEY not in stored["long"][1]
+    assert restore_original_content(*stored["long"][:2]) == long_original
+    assert stored["long"][2] == [2.0, 1.0]
+    assert reindexed == [["same", "long"]]
+    assert chroma_utils.compact_collection_provenance(collection)["removed"] == 0
@@ -0,0 +1,131 @@
+"""Tests for token-budgeted chunking in ``app.common.token_chunking``."""
+
+from __future__ import annotations
+
+import pytest
+
+from app.common import token_chunking
+from app.common.token_chunking import (
+    TokenBudgetSplitter,
+    get_token_splitter,
+    get_tokenizer,
+    model_max_tokens,
+    truncation_report,
+)
+
+
+class _WordTokenizer:
+    """One token per whitespace-separated word, plus [CLS] and [SEP]."""
+
+    model_max_length = 512
+
+    def encode(self, text: str, add_special_tokens: bool = True) -> list:
+        tokens = text.split()
+        return ["[CLS]", *tokens, "[SEP]"] if add_special_tokens else tokens
+
+
+@pytest.fixture
+def fake_tokenizers(monkeypatch):
+    loaded: list = []
+
+    def _loader(name: str) -> _WordTokenizer:
+        loaded.append(name)
+        return _WordTokenizer()
+
+    monkeypatch.setattr(token_chunking, "_TOKENIZER_LOADER", _loader)
+    monkeypatch.delenv("EMBEDDINGS_MAX_TOKENS", raising=False)
+    monkeypatch.delenv("TOKEN_AWARE_CHUNKING", raising=False)
+    token_chunking.clear_tokenizer_cache()
+    yield loaded
+    token_chunking.clear_tokenizer_cache()
+
+
+def _paragraph(words: int, tag: str) -> str:
+    return " ".join(f"{tag}{index}" for index in range(words))
+
+
+def test_chunks_fill_the_budget_without_exceeding_it() -> None:
+    splitter = TokenBudgetSplitter(_WordTokenizer(), max_tokens=12, separators=["\n\n", " "])
+    text = "\n\n".join([_paragraph(4, "a"), _paragraph(5, "b"), _paragraph(25, "c"), _paragraph(3, "d")])
+
+    chunks = splitter.split_text(text)
+
+    assert chunks[0] == f"{_paragraph(4, 'a')}\n\n{_paragraph(5, 'b')}"
+    assert all(splitter.count_tokens(chunk) <= 12 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+    assert max(splitter.count_tokens(chunk) for chunk in chunks) == 12
+
+
+def test_overlap_repeats_the_tail_of_the_previous_chunk() -> None:
+    splitter = TokenBudgetSplitter(_WordTokenizer(), max_tokens=7, chunk_overlap=2, separators=[" "])
+
+    chunks = splitter.split_text(_paragraph(12, "w"))
+
+    assert chunks[0] == "w0 w1 w2 w3 w4"
+    assert chunks[1].startswith("w3 w4 ")
+    assert chunks[-1].endswith("w11")
+
+
+def test_unsplittable_text_is_cut_at_the_longest_fitting_prefix() -> None:
+    class _CharTokenizer:
+        def encode(self, text: str, add_special_tokens: bool = True) -> list:
+            return list(text)
+
+    splitter = TokenBudgetSplitter(_CharTokenizer(), max_tokens=4, separators=["\n"])
+
+    assert splitter.split_text("abcdefghij") == ["abcd", "efgh", "ij"]
+
+
+def test_hard_split_tokenizes_a_bounded_window_per_chunk() -> None:
+    class _PairTokenizer:
+        def __init__(self) -> None:
+            self.encoded_chars = 0
+
+        def encode(self, text: str, add_special_tokens: bool = True) -> list:
+            self.encoded_chars += len(text)
+            return [text[index:index + 2] for index in range(0, len(text), 2)]
+
+    tokenizer = _PairTokenizer()
+    splitter = TokenBudgetSplitter(tokenizer, max_tokens=64, separators=["\n"])
+    blob = "QUJD" * 50_000  # unbroken base64, 200 KB
+
+    chunks = splitter.split_text(blob)
+
+    assert "".join(chunks) == blob
+    assert all(len(chunk) == 128 for chunk in chunks[:-1])
+    # Linear in the input: a few dozen chunk-sized encodes per chunk, not the remainder.
+    assert tokenizer.encoded_chars < 50 * len(blob)
+
+
+def test_tokenizers_and_splitters_are_cached_per_model(fake_tokenizers) -> None:
+    first = get_token_splitter("all-MiniLM-L6-v2", ["\n\n", " "])
+
+    assert get_token_splitter("all-MiniLM-L6-v2", ["\n\n", " "]) is first
+    assert get_tokenizer("sentence-transformers/all-mpnet-base-v2") is not None
+    assert fake_tokenizers == ["all-MiniLM-L6-v2", "sentence-transformers/all-mpnet-base-v2"]
+    assert first.max_tokens == 256 and first.budget == 254
+    assert model_max_tokens("sentence-transformers/all-mpnet-base-v2") == 384
+    assert model_max_tokens("custom/model", _WordTokenizer()) == 512
+
+
+def test_character_splitting_is_kept_without_a_tokenizer(monkeypatch, fake_tokenizers) -> None:
+    def _missing(name: str):
+        raise ImportError("transformers")
+
+    monkeypatch.setattr(token_chunking, "_TOKENIZER_LOADER", _missing)
+    assert get_token_splitter("all-MiniLM-L6-v2") is None
+
+    monkeypatch.setattr(token_chunking, "_TOKENIZER_LOADER", lambda name: _WordTokenizer())
+    token_chunking.clear_tokenizer_cache()
+    monkeypatch.setenv("TOKEN_AWARE_CHUNKING", "0")
+    assert get_token_splitter("all-MiniLM-L6-v2") is None
+
+
+def test_truncation_report_counts_chunks_over_the_limit() -> None:
+    texts = [_paragraph(3, "a"), _paragraph(10, "b"), _paragraph(6, "c")]
+
+    report = truncation_report(texts, _WordTokenizer(), max_tokens=8)
+
+    assert (report.chunks, report.truncated, report.largest_tokens) == (3, 1, 12)
+    assert report.rate == pytest.approx(1 / 3)
+    assert report.mean_tokens == pytest.approx((5 + 8 + 8) / 3)
@@ -0,0 +1,90 @@
+"""Tests for pipeline span tracing in ``app.common.tracing``."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from app.common import tracing
+from app.common.tracing import JsonFileSpanExporter, Tracer
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    observations: list[tuple[str, float, str | None]] = []
+    monkeypatch.setattr(
+        tracing,
+        "record_stage_duration",
+        lambda stage, seconds, collection=None: observations.append((stage, seconds, collection)),
+    )
+    return observations
+
+
+@pytest.fixture
+def tracer(tmp_path: Path):
+    instance = Tracer(exporter=JsonFileSpanExporter(tmp_path / "traces.jsonl", "test-service"))
+    tracing.configure_default_tracer(instance)
+    yield instance
+    tracing.configure_default_tracer(None)
+
+
+def _exported(tracer: Tracer) -> list[dict]:
+    lines = tracer.exporter.path.read_text(encoding="utf-8").splitlines()
+    return [json.loads(line) for line in lines]
+
+
+def test_nested_spans_are_exported_as_one_otlp_trace(tracer, recorded) -> None:
+    root = tracer.start_span("rag.response")
+    with tracing.span("rag.retrieval", collection="troubleshooting") as child:
+        child.set_attribute("documents", 3)
+    tracing.record_stage("rag.llm_first_token", 0.25)
+
+    assert not tracer.exporter.path.exists()
+    root.end()
+
+    (payload,) = _exported(tracer)
+    resource = payload["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"] == {"stringValue": "test-service"}
+    spans = {span["name"]: span for span in resource["scopeSpans"][0]["spans"]}
+    assert set(spans) == {"rag.response", "rag.retrieval", "rag.llm_first_token"}
+    assert {span["traceId"] for span in spans.values()} == {spans["rag.response"]["traceId"]}
+    assert spans["rag.retrieval"]["parentSpanId"] == spans["rag.response"]["spanId"]
+    assert "parentSpanId" not in spans["rag.response"]
+    assert {"key": "documents", "value": {"intValue": "3"}} in spans["rag.retrieval"]["attributes"]
+
+    first_token = spans["rag.llm_first_token"]
+    duration = int(first_token["endTimeUnixNano"]) - int(first_token["startTimeUnixNano"])
+    assert duration == pytest.approx(0.25e9, rel=1e-3)
+
+    assert [stage for stage, _, _ in recorded] == [
+        "rag.retrieval",
+        "rag.llm_first_token",
+        "rag.response",
+    ]
+    assert recorded[0][2] == "troubleshooting"
+
+
+def test_failed_span_records_error_status(tracer, recorded) -> None:
+    with pytest.raises(RuntimeError):
+        with tracing.span("ingest.embed", collection="business_docs"):
+            raise RuntimeError("boom")
+
+    (payload,) = _exported(tracer)
+    (span,) = payload["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    assert span["status"] == {"code": 2, "message": "RuntimeError: boom"}
+    assert recorded[0][0] == "ingest.embed"
+
+
+def test_disabled_tracer_records_nothing(tmp_path: Path, recorded) -> None:
+    disabled = Tracer(enabled=False, exporter=JsonFileSpanExporter(tmp_path / "off.jsonl"))
+    tracing.configure_default_tracer(disabled)
+    try:
+        with tracing.span("rag.routing"):
+            pass
+    finally:
+        tracing.configure_default_tracer(None)
+
+    assert recorded == []
+    assert not (tmp_path / "off.jsonl").exists()
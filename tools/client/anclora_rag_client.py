@@ -183,6 +183,7 @@ class AncloraRAGClient:
         message: str,
         max_length: int = 1000,
         language: Optional[str] = None,
+        priority: Optional[str] = None,
     ) -> Dict[str, Any]:
         """
         Realizar consulta al sistema RAG
@@ -191,6 +192,8 @@ class AncloraRAGClient:
             message (str): Pregunta o consulta
             max_length (int): Longitud máxima del mensaje (debe ser > 0)
             language (Optional[str]): Idioma a utilizar en la consulta
+            priority (Optional[str]): Clase de prioridad ante el LLM
+                (``interactive``, ``media`` o ``batch``)
 
         Returns:
             Dict con la respuesta del RAG
@@ -208,7 +211,8 @@ class AncloraRAGClient:
             }
             self._add_language_to_payload(payload, language)
 
-            response = self.session.post(f"{self.base_url}/chat", json=payload)
+            headers = {"X-Request-Priority": priority} if priority else None
+            response = self.session.post(f"{self.base_url}/chat", json=payload, headers=headers)
             response.raise_for_status()
 
             result = self._safe_json_loads(response)
@@ -328,7 +332,7 @@ class AncloraRAGClient:
         """
         results = []
         for message in messages:
-            result = self.query(message, language=language)
+            result = self.query(message, language=language, priority="batch")
             results.append(result)
         return results
 